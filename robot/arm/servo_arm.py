@@ -2,6 +2,10 @@
 import time
 from arm.arm_base import ArmBase
 from arm.kinematics import ArmKinematics
+from utils.metrics import REGISTRY, timed
+
+I2C_WRITES = REGISTRY.counter("i2c_writes", "Servo angle writes to the PCA9685", {"device": "pca9685"})
+MOVE_SECONDS = REGISTRY.histogram("arm_move_xyz_seconds", "move_to_xyz duration (IK + servo writes)")
 
 
 class ServoArm(ArmBase):
@@ -56,6 +60,7 @@ class ServoArm(ArmBase):
         channel = self.channels[joint]
 
         self.kit.servo[channel].angle = angle
+        I2C_WRITES.inc()
         self._angles[joint] = angle
         time.sleep(0.02)  # small delay for stability
 
@@ -101,6 +106,7 @@ class ServoArm(ArmBase):
     # Task-space control (IK)
     # -------------------------
 
+    @timed(MOVE_SECONDS)
     def move_to_xyz(self, x: float, y: float, z: float):
         """
         Move end-effector to (x, y, z) in cm using inverse kinematics.
@@ -118,6 +124,13 @@ class ServoArm(ArmBase):
         self.move_joint("shoulder", shoulder)
         self.move_joint("elbow", elbow)
 
+    @property
+    def angles(self) -> dict:
+        """
+        Last commanded joint angles (degrees).
+        """
+        return dict(self._angles)
+
     # -------------------------
     # Forward kinematics (debug)
     # -------------------------
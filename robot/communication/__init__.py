@@ -0,0 +1,32 @@
+# communication/__init__.py
+
+from .command_server import ClientSession, CommandServer
+from .commands import CommandHandler
+from .jobs import Job, JobCancelled, JobExecutor, JobStatus
+from .telemetry import ExpFilter, Subscription, TelemetryHub, robot_fields
+from .transports import (
+    RfcommTransport,
+    TcpTransport,
+    Transport,
+    UnixTransport,
+    transports_from_config,
+)
+
+__all__ = [
+    "ClientSession",
+    "CommandServer",
+    "CommandHandler",
+    "Job",
+    "JobCancelled",
+    "JobExecutor",
+    "JobStatus",
+    "ExpFilter",
+    "Subscription",
+    "TelemetryHub",
+    "robot_fields",
+    "Transport",
+    "TcpTransport",
+    "UnixTransport",
+    "RfcommTransport",
+    "transports_from_config",
+]
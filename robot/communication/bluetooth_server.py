@@ -2,67 +2,151 @@
 bluetooth_server.py
 Handles Bluetooth communication with a phone / laptop.
 
-Protocol (simple text commands, one per line):
+Protocol (simple text commands, one per line; see framing.py for
+request ids and the binary mode):
   START_AUTO       -> robot starts driving with obstacle avoidance
   STOP             -> robot stops
   PILL_SCAN        -> run pill detection behavior
   PING             -> respond with 'PONG'
+
+Lifecycle:
+  start() blocks the calling thread on an Event (no polling) until
+  stop() is called or SIGINT/SIGTERM arrives. stop() shuts down the
+  listening and client sockets so blocked accept()/recv() return at once.
 """
 
-import json
+import signal
+import socket
 import threading
-from pathlib import Path
+import time
+
+from communication.commands import CommandHandler
+from communication.framing import FrameError, Framer
+from utils.config import get_config
+from utils.lazy_import import optional_import
+from utils.logger import kv, setup_logger
+from utils.metrics import REGISTRY
 
-from navigation import NavigationController
-from robot.drive.gopigo_drive import GoPiGoController
-from sensors import SensorSuite
+log = setup_logger(__name__)
 
-CONFIG_PATH = Path(__file__).resolve().parents[1] / "config.json"
+_LABELS = {"server": "bluetooth"}
+COMMAND_SECONDS = REGISTRY.histogram("command_seconds", "Command handler time", _LABELS)
+BATCH_SECONDS = REGISTRY.histogram(
+    "command_batch_seconds", "Packet received to its replies written", _LABELS
+)
 
-try:
-    import bluetooth  # PyBluez
-except ImportError:
-    bluetooth = None
-    print("[WARN] PyBluez not installed; BluetoothServer will not run.")
+# PyBluez, imported on first use
+bluetooth = optional_import("bluetooth")
+if bluetooth is None:
+    log.warning("PyBluez not installed; BluetoothServer will not run.")
 
 
 def load_config():
-    with open(CONFIG_PATH) as f:
-        return json.load(f)
+    return get_config().data
 
 
 class BluetoothServer:
-    def __init__(
-        self,
-        nav: NavigationController,
-        controller: GoPiGoController,
-        sensors: SensorSuite,
-    ):
+    def __init__(self, nav, controller, sensors, config: dict | None = None):
+        """
+        :param nav: navigation controller (drive_forward_safe, search_for_pill)
+        :param controller: drive controller (stop)
+        :param sensors: sensor suite (get_front_distance)
+        :param config: full config dict; loaded from config.json if None
+        """
         self.nav = nav
         self.controller = controller
         self.sensors = sensors
-        self.cfg = load_config()
+        self.cfg = config if config is not None else load_config()
+        self.commands = CommandHandler(nav, controller, sensors)
         self.running = False
 
-    def start(self):
-        if bluetooth is None:
-            print("[ERROR] Bluetooth not available on this system.")
+        self.server_thread = None
+        self._stop_event = threading.Event()
+        self._sock_lock = threading.Lock()
+        self._server_sock = None
+        self._client_sock = None
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+
+    def start(self, install_signal_handlers: bool = True):
+        """
+        Start the server thread and block until stop() or a signal.
+        :param install_signal_handlers: handle SIGINT/SIGTERM (main thread only)
+        """
+        if not self.start_background():
             return
 
+        previous = {}
+        if install_signal_handlers and threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                previous[signum] = signal.signal(signum, self._on_signal)
+
+        try:
+            # Sleeps in the kernel; signal handlers still run on the main thread
+            self._stop_event.wait()
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+            self.stop()
+            self.join()
+
+    def start_background(self) -> bool:
+        """
+        Start the server thread and return immediately.
+        :return: False if no transport is available
+        """
+        if not self._transport_available():
+            log.error("Bluetooth not available on this system.")
+            return False
+
+        self._stop_event.clear()
         self.running = True
         self.server_thread = threading.Thread(target=self._run_server, daemon=True)
         self.server_thread.start()
-        print("[BT] Bluetooth server thread started.")
-
-        # Keep main thread alive
-        try:
-            while self.running:
-                pass
-        except KeyboardInterrupt:
-            print("[BT] KeyboardInterrupt: stopping server.")
-            self.running = False
+        log.info("Bluetooth server thread started.")
+        return True
 
-    def _run_server(self):
+    def stop(self):
+        """
+        Request shutdown. Safe to call from any thread or a signal handler.
+        """
+        self.running = False
+        self._stop_event.set()
+        with self._sock_lock:
+            socks = [self._client_sock, self._server_sock]
+        for sock in socks:
+            if sock is not None:
+                _shutdown(sock)
+
+    def join(self, timeout: float | None = 2.0):
+        if self.server_thread is not None:
+            self.server_thread.join(timeout)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Block until the server is asked to stop.
+        :return: True if stopped, False on timeout
+        """
+        return self._stop_event.wait(timeout)
+
+    def _on_signal(self, signum, frame):
+        log.info("Signal %s: stopping server.", signum)
+        self.stop()
+
+    # -------------------------
+    # Sockets
+    # -------------------------
+
+    def _transport_available(self) -> bool:
+        return bluetooth is not None
+
+    def _open_server_socket(self):
+        """
+        Create, bind, listen and advertise the RFCOMM socket.
+        Subclasses may return another stream socket (e.g. TCP for tests).
+        """
         service_name = self.cfg["bluetooth"]["service_name"]
         uuid = self.cfg["bluetooth"]["uuid"]
 
@@ -79,51 +163,92 @@ class BluetoothServer:
             profiles=[bluetooth.SERIAL_PORT_PROFILE],
         )
 
-        print(f"[BT] Waiting for connection on RFCOMM channel {port}...")
+        log.info("Waiting for connection on RFCOMM channel %s...", port)
+        return server_sock
 
-        while self.running:
-            client_sock, client_info = server_sock.accept()
-            print(f"[BT] Accepted connection from {client_info}")
-            try:
-                self._handle_client(client_sock)
-            finally:
-                client_sock.close()
+    def _run_server(self):
+        server_sock = self._open_server_socket()
+        with self._sock_lock:
+            self._server_sock = server_sock
+        if not self.running:
+            # stop() raced with startup
+            _shutdown(server_sock)
 
-        server_sock.close()
-        print("[BT] Server socket closed.")
+        try:
+            while self.running:
+                try:
+                    # Blocks in the kernel; stop() shuts the socket down to wake it
+                    client_sock, client_info = server_sock.accept()
+                except OSError:
+                    break
+                if not self.running:
+                    client_sock.close()
+                    break
+
+                log.info("Accepted connection", extra=kv(peer=client_info))
+                with self._sock_lock:
+                    self._client_sock = client_sock
+                try:
+                    self._handle_client(client_sock)
+                except OSError as e:
+                    log.warning("Connection error: %s", e)
+                finally:
+                    with self._sock_lock:
+                        self._client_sock = None
+                    client_sock.close()
+        finally:
+            with self._sock_lock:
+                self._server_sock = None
+            server_sock.close()
+            log.info("Server socket closed.")
 
     def _handle_client(self, sock):
         sock.send(b"CONNECTED\n")
+        framer = Framer()
         while self.running:
             data = sock.recv(1024)
             if not data:
                 break
-            cmd = data.decode("utf-8").strip().upper()
-            print(f"[BT] Received command: {cmd}")
-            resp = self._handle_command(cmd)
-            if resp is not None:
-                sock.send((resp + "\n").encode("utf-8"))
-
-    # ---------- Command handling ----------
-
-    def _handle_command(self, cmd: str) -> str | None:
-        if cmd == "PING":
-            return "PONG"
+            t0 = time.perf_counter()
+            framer.feed(data)
 
-        if cmd == "START_AUTO":
-            threading.Thread(target=self.nav.drive_forward_safe, daemon=True).start()
-            return "OK"
-
-        if cmd == "STOP":
-            self.controller.stop()
-            return "OK"
+            # A packet may hold part of a command or several; reply to
+            # every complete one in a single send
+            out = []
+            try:
+                for req_id, cmd in framer:
+                    ack = framer.handle_control(req_id, cmd)
+                    if ack is not None:
+                        out.append(ack)
+                        continue
+                    log.debug("Received command", extra=kv(cmd=cmd))
+                    resp = self._handle_command(cmd)
+                    if resp is not None:
+                        out.append(framer.encode(req_id, resp))
+            except FrameError as e:
+                out.append(framer.encode(None, f"ERROR FRAME {e}"))
+                sock.sendall(b"".join(out))
+                break
 
-        if cmd == "PILL_SCAN":
-            threading.Thread(target=self.nav.search_for_pill, daemon=True).start()
-            return "PILL_SCAN_STARTED"
+            if out:
+                sock.sendall(b"".join(out))
+                BATCH_SECONDS.observe(time.perf_counter() - t0)
 
-        if cmd == "DIST":
-            d = self.sensors.get_front_distance()
-            return f"DIST {d:.1f}"
+    # ---------- Command handling ----------
 
-        return "UNKNOWN_COMMAND"
+    def _handle_command(self, cmd: str) -> str | None:
+        t0 = time.perf_counter()
+        try:
+            return self.commands.handle(cmd)
+        finally:
+            COMMAND_SECONDS.observe(time.perf_counter() - t0)
+
+
+def _shutdown(sock):
+    """
+    Wake any thread blocked in accept()/recv() on sock.
+    """
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except (OSError, AttributeError):
+        pass
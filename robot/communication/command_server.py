@@ -0,0 +1,355 @@
+# communication/command_server.py
+"""
+asyncio command server: one event loop, any number of transports
+(RFCOMM, TCP, Unix socket) and any number of concurrent clients.
+
+Each client gets its own StreamReader/StreamWriter and Framer, so a slow
+client only back-pressures itself. See framing.py for the wire format.
+"""
+
+import asyncio
+import inspect
+import signal
+import threading
+import time
+
+from communication.framing import FrameError, Framer
+from communication.telemetry import Subscription, TelemetryHub
+from communication.transports import transports_from_config
+from utils.logger import kv, setup_logger
+from utils.metrics import REGISTRY
+
+log = setup_logger(__name__)
+
+_LABELS = {"server": "command"}
+COMMAND_SECONDS = REGISTRY.histogram("command_seconds", "Command handler time", _LABELS)
+BATCH_SECONDS = REGISTRY.histogram(
+    "command_batch_seconds", "Packet received to its replies written", _LABELS
+)
+CLIENTS = REGISTRY.gauge("server_clients", "Connected clients", _LABELS)
+REJECTED = REGISTRY.counter("server_rejected_clients", "Connections refused with BUSY", _LABELS)
+
+
+class ClientSession:
+    """
+    One connected client.
+    """
+
+    def __init__(self, client_id: int, reader, writer, transport_name: str, max_frame: int = 4096):
+        self.id = client_id
+        self.reader = reader
+        self.writer = writer
+        self.transport = transport_name
+        self.peer = writer.get_extra_info("peername")
+        self.framer = Framer(max_frame)
+        self.subscription = None
+        self.commands = 0
+
+    def send(self, reply: str, req_id=None):
+        """
+        Queue a reply in this client's write buffer (no await needed).
+        """
+        self.writer.write(self.framer.encode(req_id, reply))
+
+    async def drain(self):
+        await self.writer.drain()
+
+    def close(self):
+        if self.subscription is not None:
+            self.subscription.cancel()
+            self.subscription = None
+        self.writer.close()
+
+    def __repr__(self):
+        return f"ClientSession({self.id}, {self.transport}, {self.peer})"
+
+
+class CommandServer:
+    def __init__(
+        self,
+        handler,
+        transports,
+        max_clients: int | None = None,
+        read_limit: int = 64 * 1024,
+        write_high_water: int = 64 * 1024,
+        greeting: str | None = "CONNECTED",
+        max_frame: int = 4096,
+        telemetry: TelemetryHub | None = None,
+    ):
+        """
+        :param handler: callable(cmd: str) -> reply str/None (may be async),
+                        e.g. CommandHandler
+        :param transports: list of Transport
+        :param max_clients: refuse connections above this (None = unlimited)
+        :param read_limit: per-client read buffer limit (bytes)
+        :param write_high_water: per-client write buffer size before drain() waits
+        :param greeting: line sent on connect (None = no greeting)
+        :param max_frame: largest accepted command frame (bytes)
+        :param telemetry: enables SUBSCRIBE/UNSUBSCRIBE
+        """
+        self.handler = handler
+        self.transports = list(transports)
+        self.max_clients = max_clients
+        self.read_limit = read_limit
+        self.write_high_water = write_high_water
+        self.greeting = greeting
+        self.max_frame = max_frame
+        self.telemetry = telemetry
+
+        self.clients = {}   # id -> ClientSession
+        self._next_id = 1
+        self._servers = []
+        self._loop = None
+        self._stopped = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._start_error = None
+
+    @classmethod
+    def from_config(cls, handler, config: dict, telemetry: TelemetryHub | None = None):
+        """
+        Build from config["server"] (transports, max_clients).
+        """
+        server_cfg = config.get("server", {})
+        return cls(
+            handler,
+            transports_from_config(config),
+            max_clients=server_cfg.get("max_clients"),
+            telemetry=telemetry,
+        )
+
+    # -------------------------
+    # Lifecycle (inside the loop)
+    # -------------------------
+
+    async def start(self):
+        """
+        Open every transport that can be opened (e.g. RFCOMM fails on a
+        host without Bluetooth). Must be awaited on the serving loop.
+        :raises OSError: no transport could be started
+        """
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        started = []
+        try:
+            for transport in self.transports:
+                try:
+                    server = await transport.start(self._client_cb(transport), self.read_limit)
+                except Exception as e:
+                    log.warning("Transport %r unavailable: %s", transport, e)
+                    transport.close()
+                    continue
+                self._servers.append(server)
+                started.append(transport)
+                log.info("Listening on %r", transport)
+            if not started:
+                raise OSError("no transport could be started")
+        except BaseException as e:
+            # Don't leak listeners opened before the failure
+            await self.close()
+            self._start_error = e
+            self._ready.set()
+            raise
+        self.transports = started
+        self._ready.set()
+
+    async def serve_forever(self):
+        """
+        start() and then wait until stop() is requested.
+        """
+        if not self._servers:
+            await self.start()
+        try:
+            await self._stopped.wait()
+        finally:
+            await self.close()
+
+    async def close(self):
+        for server in self._servers:
+            server.close()
+        for session in list(self.clients.values()):
+            session.close()
+        for server in self._servers:
+            await server.wait_closed()
+        for transport in self.transports:
+            transport.close()
+        self._servers = []
+        log.info("Server closed.")
+
+    # -------------------------
+    # Lifecycle (from other threads)
+    # -------------------------
+
+    def run(self, install_signal_handlers: bool = True):
+        """
+        Serve on a new event loop in the calling thread until stop() or
+        SIGINT/SIGTERM.
+        """
+
+        async def main():
+            if install_signal_handlers and threading.current_thread() is threading.main_thread():
+                loop = asyncio.get_running_loop()
+                for signum in (signal.SIGINT, signal.SIGTERM):
+                    loop.add_signal_handler(signum, self.stop)
+            await self.serve_forever()
+
+        asyncio.run(main())
+
+    def start_in_thread(self, timeout: float = 5.0):
+        """
+        Serve on a background thread; returns once transports are listening.
+        """
+        self._ready.clear()
+        self._start_error = None
+        self._thread = threading.Thread(target=self._run_thread, daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise RuntimeError("CommandServer did not start")
+        if self._start_error is not None:
+            raise RuntimeError("CommandServer did not start") from self._start_error
+
+    def _run_thread(self):
+        try:
+            self.run(install_signal_handlers=False)
+        except Exception:
+            # A failed start() is raised to start_in_thread's caller
+            if self._start_error is None:
+                raise
+
+    def stop(self):
+        """
+        Request shutdown. Thread-safe.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._stopped.set)
+        except RuntimeError:
+            # Loop already shut down
+            pass
+
+    def join(self, timeout: float | None = 2.0):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # -------------------------
+    # Clients
+    # -------------------------
+
+    def _client_cb(self, transport):
+        async def on_connect(reader, writer):
+            await self._serve_client(reader, writer, transport.name)
+
+        return on_connect
+
+    async def _serve_client(self, reader, writer, transport_name: str):
+        if self.max_clients is not None and len(self.clients) >= self.max_clients:
+            writer.write(b"BUSY\n")
+            writer.close()
+            REJECTED.inc()
+            return
+
+        writer.transport.set_write_buffer_limits(high=self.write_high_water)
+        session = ClientSession(self._next_id, reader, writer, transport_name, self.max_frame)
+        self._next_id += 1
+        self.clients[session.id] = session
+        CLIENTS.inc()
+        log.info("Client connected", extra=kv(client=session.id, transport=transport_name, peer=session.peer))
+
+        try:
+            if self.greeting is not None:
+                session.send(self.greeting)
+                await session.drain()
+            await self._client_loop(session)
+        except ConnectionError:
+            pass
+        finally:
+            del self.clients[session.id]
+            CLIENTS.dec()
+            session.close()
+            log.info("Client disconnected", extra=kv(client=session.id))
+
+    async def _client_loop(self, session: ClientSession):
+        reader = session.reader
+        framer = session.framer
+        while True:
+            data = await reader.read(self.read_limit)
+            if not data:
+                return
+            t0 = time.perf_counter()
+            framer.feed(data)
+
+            # Dispatch every complete frame, then reply in one write
+            out = []
+            try:
+                for req_id, cmd in framer:
+                    ack = framer.handle_control(req_id, cmd)
+                    if ack is None:
+                        ack = self._session_command(session, req_id, cmd)
+                    if ack is not None:
+                        out.append(ack)
+                        continue
+                    session.commands += 1
+                    reply = await self._dispatch(cmd)
+                    if reply is not None:
+                        out.append(framer.encode(req_id, reply))
+            except FrameError as e:
+                out.append(framer.encode(None, f"ERROR FRAME {e}"))
+                session.writer.write(b"".join(out))
+                await session.drain()
+                return
+
+            if out:
+                session.writer.write(b"".join(out))
+                BATCH_SECONDS.observe(time.perf_counter() - t0)
+            # Only waits when this client's write buffer is over the high-water mark
+            await session.drain()
+
+    def _session_command(self, session: ClientSession, req_id, cmd: str) -> bytes | None:
+        """
+        Per-connection commands:
+          SUBSCRIBE <hz> [field ...]   push changed telemetry fields at hz
+          UNSUBSCRIBE
+        :return: encoded reply, or None if cmd is not one of them
+        """
+        words = cmd.split()
+        verb = words[0].upper()
+        if verb not in ("SUBSCRIBE", "UNSUBSCRIBE"):
+            return None
+        if self.telemetry is None:
+            return session.framer.encode(req_id, "UNSUPPORTED")
+
+        if session.subscription is not None:
+            session.subscription.cancel()
+            session.subscription = None
+        if verb == "UNSUBSCRIBE":
+            return session.framer.encode(req_id, "OK")
+
+        try:
+            rate_hz = float(words[1])
+        except (IndexError, ValueError):
+            return session.framer.encode(req_id, "ERROR SUBSCRIBE <hz> [field ...]")
+        fields = [f.lower() for f in words[2:]] or None
+        if rate_hz <= 0 or (fields and not set(fields) <= set(self.telemetry.fields)):
+            return session.framer.encode(req_id, "ERROR SUBSCRIBE <hz> [field ...]")
+
+        sub = Subscription(self.telemetry, session.send, session.drain, rate_hz, fields)
+        session.subscription = sub
+        # The ack is written before the task's first push
+        reply = session.framer.encode(req_id, f"OK SUBSCRIBED {sub.rate_hz:g}")
+        sub.start()
+        return reply
+
+    async def _dispatch(self, cmd: str):
+        t0 = time.perf_counter()
+        try:
+            reply = self.handler(cmd)
+            if inspect.isawaitable(reply):
+                reply = await reply
+        except Exception as e:
+            log.error("Command %r failed: %s", cmd, e)
+            return "ERROR"
+        finally:
+            COMMAND_SECONDS.observe(time.perf_counter() - t0)
+        return reply
@@ -0,0 +1,86 @@
+# communication/commands.py
+from communication.jobs import JobExecutor
+
+
+class CommandHandler:
+    """
+    Text command set shared by every server/transport.
+    handle() must return quickly: long behaviors run as jobs on the
+    JobExecutor and are polled/cancelled with JOB/JOBS/CANCEL.
+    """
+
+    def __init__(self, nav, controller, sensors, jobs: JobExecutor | None = None):
+        """
+        :param nav: navigation controller; drive_forward_safe(job) and
+                    search_for_pill(job) run until done or job.cancelled
+        :param controller: drive controller (stop)
+        :param sensors: sensor suite (get_front_distance)
+        :param jobs: executor for long-running commands
+                     (default: 2 workers, cancelling motion stops the drive)
+        """
+        self.nav = nav
+        self.controller = controller
+        self.sensors = sensors
+        self.jobs = jobs if jobs is not None else JobExecutor(workers=2, stop_motion=controller.stop)
+
+    def __call__(self, cmd: str) -> str | None:
+        return self.handle(cmd)
+
+    def handle(self, cmd: str) -> str | None:
+        words = cmd.strip().upper().split()
+        if not words:
+            return None
+        cmd, args = words[0], words[1:]
+
+        if cmd == "PING":
+            return "PONG"
+
+        if cmd == "START_AUTO":
+            return self._start_job("START_AUTO", self.nav.drive_forward_safe, "OK", motion=True)
+
+        if cmd == "STOP":
+            # Motion jobs see the cancel flag on their next tick; the
+            # drive is stopped now regardless
+            self.jobs.cancel_motion()
+            self.controller.stop()
+            return "OK"
+
+        if cmd == "PILL_SCAN":
+            return self._start_job("PILL_SCAN", self.nav.search_for_pill, "PILL_SCAN_STARTED", motion=True)
+
+        if cmd == "DIST":
+            d = self.sensors.get_front_distance()
+            # None: no sonar, or the read failed
+            return "DIST NONE" if d is None else f"DIST {d:.1f}"
+
+        if cmd == "JOB":
+            job = self._job_arg(args)
+            return f"JOB {job.describe()}" if job is not None else "UNKNOWN_JOB"
+
+        if cmd == "JOBS":
+            jobs = self.jobs.jobs(active_only=not (args and args[0] == "ALL"))
+            return "JOBS " + ",".join(j.describe() for j in jobs) if jobs else "JOBS"
+
+        if cmd == "CANCEL":
+            job = self._job_arg(args)
+            if job is None:
+                return "UNKNOWN_JOB"
+            return "OK" if self.jobs.cancel(job.id) else "JOB_FINISHED"
+
+        return "UNKNOWN_COMMAND"
+
+    # -------------------------
+    # Jobs
+    # -------------------------
+
+    def _start_job(self, kind: str, fn, ok: str, motion: bool) -> str:
+        job, created = self.jobs.submit(kind, fn, motion=motion)
+        if job is None:
+            return "BUSY"
+        # A repeated tap returns the job already in flight
+        return f"{ok} JOB {job.id}" + ("" if created else " RUNNING")
+
+    def _job_arg(self, args):
+        if len(args) != 1 or not args[0].isdigit():
+            return None
+        return self.jobs.get(int(args[0]))
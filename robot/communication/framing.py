@@ -0,0 +1,155 @@
+# communication/framing.py
+"""
+Per-connection framing for the command protocol.
+
+Text mode (default): one command per line ("\n" or "\r\n").
+  PING            -> PONG
+  #17 PING        -> #17 PONG      (optional request id, echoed back)
+
+Binary mode (after "MODE BINARY"): length-prefixed frames.
+  [u32 length][u32 request id][utf-8 command]   (big-endian; length
+  counts everything after itself; request id 0 = none)
+
+Bytes are accumulated in a reassembly buffer, so a command split across
+packets is parsed once complete, and several commands in one packet are
+all parsed. Callers dispatch every complete frame and send the replies
+back in one write (pipelining + batched replies).
+"""
+
+import struct
+
+_HEADER = struct.Struct(">II")
+
+TEXT = "text"
+BINARY = "binary"
+
+
+class FrameError(ValueError):
+    """
+    Malformed or oversized frame; the stream cannot be resynchronized.
+    """
+
+
+class Framer:
+    def __init__(self, max_frame: int = 4096, mode: str = TEXT):
+        """
+        :param max_frame: largest accepted frame payload (bytes)
+        :param mode: TEXT or BINARY
+        """
+        self.max_frame = max_frame
+        self.mode = mode
+        self._buf = bytearray()
+
+    # -------------------------
+    # Input
+    # -------------------------
+
+    def feed(self, data: bytes):
+        self._buf += data
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buf)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        """
+        Next complete (request_id, command) from the buffer.
+        Frames are pulled lazily so a MODE switch applies to the very
+        next frame, even if it arrived in the same packet.
+        """
+        while True:
+            frame = self._next_text() if self.mode == TEXT else self._next_binary()
+            if frame is None:
+                raise StopIteration
+            if frame[1]:
+                return frame
+
+    def _next_text(self):
+        buf = self._buf
+        end = buf.find(b"\n")
+        if end < 0:
+            if len(buf) > self.max_frame:
+                raise FrameError("line too long")
+            return None
+        if end > self.max_frame:
+            raise FrameError("line too long")
+
+        line = bytes(buf[:end])
+        del buf[: end + 1]
+        text = line.decode("utf-8", errors="replace").strip()
+
+        req_id = None
+        if text.startswith("#"):
+            tag, _, rest = text.partition(" ")
+            try:
+                req_id = int(tag[1:])
+            except ValueError:
+                raise FrameError(f"bad request id {tag!r}") from None
+            text = rest.strip()
+        return req_id, text
+
+    def _next_binary(self):
+        buf = self._buf
+        if len(buf) < 4:
+            return None
+        (length,) = struct.unpack_from(">I", buf)
+        if length < 4 or length - 4 > self.max_frame:
+            raise FrameError(f"bad frame length {length}")
+        if len(buf) < 4 + length:
+            return None
+
+        _, req_id = _HEADER.unpack_from(buf)
+        payload = bytes(buf[8 : 4 + length])
+        del buf[: 4 + length]
+        return (req_id or None), payload.decode("utf-8", errors="replace").strip()
+
+    # -------------------------
+    # Output
+    # -------------------------
+
+    def encode(self, req_id, reply: str) -> bytes:
+        """
+        Encode one reply in the current mode.
+        """
+        if self.mode == TEXT:
+            if req_id is not None:
+                return f"#{req_id} {reply}\n".encode("utf-8")
+            return (reply + "\n").encode("utf-8")
+
+        payload = reply.encode("utf-8")
+        return _HEADER.pack(4 + len(payload), req_id or 0) + payload
+
+    # -------------------------
+    # Control commands
+    # -------------------------
+
+    def handle_control(self, req_id, cmd: str) -> bytes | None:
+        """
+        Handle framing-level commands (MODE TEXT / MODE BINARY).
+        The acknowledgement is encoded in the old mode, then the mode
+        switches for every following frame.
+        :return: encoded reply, or None if cmd is not a control command
+        """
+        words = cmd.upper().split()
+        if len(words) != 2 or words[0] != "MODE":
+            return None
+        if words[1] not in (TEXT.upper(), BINARY.upper()):
+            return self.encode(req_id, "ERROR UNKNOWN_MODE")
+
+        ack = self.encode(req_id, "OK")
+        self.mode = words[1].lower()
+        return ack
+
+
+def encode_request(req_id, cmd: str, mode: str = TEXT) -> bytes:
+    """
+    Client-side helper: encode one command.
+    """
+    if mode == TEXT:
+        prefix = f"#{req_id} " if req_id is not None else ""
+        return f"{prefix}{cmd}\n".encode("utf-8")
+    payload = cmd.encode("utf-8")
+    return _HEADER.pack(4 + len(payload), req_id or 0) + payload
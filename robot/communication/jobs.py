@@ -0,0 +1,264 @@
+# communication/jobs.py
+"""
+Job executor for long-running commands (START_AUTO, PILL_SCAN, ...).
+
+- A fixed number of worker threads; extra jobs wait in a bounded queue
+- At most one in-flight job per kind: repeated requests return the
+  job that is already queued/running
+- Jobs report progress and poll a cancel flag once per control tick;
+  cancelling a motion job also stops the drive immediately
+"""
+
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum, auto
+
+from utils.logger import kv, setup_logger
+from utils.metrics import REGISTRY
+
+log = setup_logger(__name__)
+
+JOB_SECONDS = REGISTRY.histogram("job_run_seconds", "Job run time, queue wait excluded")
+
+
+class JobStatus(Enum):
+    QUEUED = auto()
+    RUNNING = auto()
+    DONE = auto()
+    FAILED = auto()
+    CANCELLED = auto()
+
+
+FINISHED = (JobStatus.DONE, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class JobCancelled(Exception):
+    """
+    Raised by Job.check() inside a job once it has been cancelled.
+    """
+
+
+class Job:
+    """
+    Handle passed to the job function and returned to callers.
+    """
+
+    def __init__(self, job_id: int, kind: str, fn, motion: bool, clock=time.monotonic):
+        self.id = job_id
+        self.kind = kind
+        self.fn = fn
+        self.motion = motion
+        self.clock = clock
+
+        self.status = JobStatus.QUEUED
+        self.progress = 0.0
+        self.error = None
+        self.created = clock()
+        self.started = None
+        self.finished = None
+
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+
+    # -------------------------
+    # Used inside the job
+    # -------------------------
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check(self):
+        """
+        Raise JobCancelled if cancellation was requested.
+        """
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Sleep up to timeout, waking at once on cancel.
+        Use as the per-tick sleep of a control loop.
+        :return: True if cancelled
+        """
+        return self._cancel.wait(timeout)
+
+    def set_progress(self, progress: float):
+        self.progress = max(0.0, min(1.0, float(progress)))
+
+    # -------------------------
+    # Used by callers
+    # -------------------------
+
+    @property
+    def active(self) -> bool:
+        return self.status not in FINISHED
+
+    def join(self, timeout: float | None = None) -> bool:
+        """
+        Wait for the job to finish.
+        :return: True if finished
+        """
+        return self._done.wait(timeout)
+
+    def describe(self) -> str:
+        return f"{self.id} {self.kind} {self.status.name} {self.progress:.2f}"
+
+    def __repr__(self):
+        return f"Job({self.describe()})"
+
+
+class JobExecutor:
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queued: int = 8,
+        history: int = 64,
+        stop_motion=None,
+        clock=time.monotonic,
+    ):
+        """
+        :param workers: worker threads (jobs running at once)
+        :param max_queued: jobs waiting for a worker before submit() refuses
+        :param history: finished jobs kept for status queries
+        :param stop_motion: callable run when motion jobs are cancelled
+                            (e.g. drive.stop), so motors halt immediately
+        :param clock: monotonic time source (seconds)
+        """
+        self.workers = workers
+        self.max_queued = max_queued
+        self.history = history
+        self.stop_motion = stop_motion
+        self.clock = clock
+
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._jobs = OrderedDict()  # id -> Job (active + recent history)
+        self._inflight = {}         # kind -> active Job
+
+    # -------------------------
+    # Submission
+    # -------------------------
+
+    def submit(self, kind: str, fn, motion: bool = False):
+        """
+        Queue fn(job). If a job of this kind is already queued or running,
+        return it instead of starting another.
+        :return: (job, created) or (None, False) if the queue is full
+        """
+        with self._lock:
+            existing = self._inflight.get(kind)
+            if existing is not None:
+                return existing, False
+
+            queued = sum(1 for j in self._inflight.values() if j.status == JobStatus.QUEUED)
+            if queued >= self.max_queued:
+                return None, False
+
+            job = Job(next(self._ids), kind, fn, motion, self.clock)
+            self._inflight[kind] = job
+            self._jobs[job.id] = job
+            self._trim_history()
+
+        self._pool.submit(self._run, job)
+        return job, True
+
+    def _run(self, job: Job):
+        with self._lock:
+            if job.cancelled:
+                self._finish(job, JobStatus.CANCELLED)
+                return
+            job.status = JobStatus.RUNNING
+            job.started = self.clock()
+
+        try:
+            job.fn(job)
+        except JobCancelled:
+            status = JobStatus.CANCELLED
+        except Exception as e:
+            job.error = e
+            status = JobStatus.FAILED
+            log.error("Job failed: %s", e, extra=kv(kind=job.kind, job=job.id))
+        else:
+            status = JobStatus.CANCELLED if job.cancelled else JobStatus.DONE
+            if status == JobStatus.DONE:
+                job.progress = 1.0
+
+        with self._lock:
+            self._finish(job, status)
+
+    def _finish(self, job: Job, status: JobStatus):
+        # Caller holds the lock
+        job.status = status
+        job.finished = self.clock()
+        REGISTRY.counter("jobs_finished", "Jobs by final status", {"status": status.name.lower()}).inc()
+        if job.started is not None:
+            JOB_SECONDS.observe(job.finished - job.started)
+        if self._inflight.get(job.kind) is job:
+            del self._inflight[job.kind]
+        job._done.set()
+
+    def _trim_history(self):
+        # Caller holds the lock; drop the oldest finished jobs
+        excess = len(self._jobs) - len(self._inflight) - self.history
+        if excess <= 0:
+            return
+        for job_id in [i for i, j in self._jobs.items() if not j.active][:excess]:
+            del self._jobs[job_id]
+
+    # -------------------------
+    # Queries
+    # -------------------------
+
+    def get(self, job_id: int) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, active_only: bool = False):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [j for j in jobs if j.active] if active_only else jobs
+
+    # -------------------------
+    # Cancellation
+    # -------------------------
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Request cancellation. A queued job never runs; a running job
+        sees the flag at its next tick.
+        :return: False if the job is unknown or already finished
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job.active:
+                return False
+            job._cancel.set()
+            motion = job.motion
+        if motion and self.stop_motion is not None:
+            self.stop_motion()
+        return True
+
+    def cancel_motion(self):
+        """
+        Cancel every motion job and stop the drive right away.
+        :return: cancelled jobs
+        """
+        with self._lock:
+            jobs = [j for j in self._inflight.values() if j.motion]
+            for job in jobs:
+                job._cancel.set()
+        if jobs and self.stop_motion is not None:
+            self.stop_motion()
+        return jobs
+
+    def shutdown(self, cancel: bool = True, wait: bool = True):
+        if cancel:
+            with self._lock:
+                for job in self._inflight.values():
+                    job._cancel.set()
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,191 @@
+# communication/telemetry.py
+"""
+Telemetry for SUBSCRIBE: a shared sampler plus per-client push loops.
+
+- Field providers are sampled at most sample_hz times per second,
+  however many clients subscribe
+- Each subscriber sends at its own rate and only the fields that
+  changed since its last message
+- A subscriber never queues samples: each tick it takes the latest
+  one. While a slow client's write buffer drains, ticks are skipped
+  (counted in .dropped) instead of piling up in memory
+"""
+
+import asyncio
+import math
+import time
+
+
+class ExpFilter:
+    """
+    First-order low-pass filter for irregularly timed samples.
+    """
+
+    def __init__(self, tau_sec: float = 0.3, clock=time.monotonic):
+        self.tau = tau_sec
+        self.clock = clock
+        self.value = None
+        self._t = None
+
+    def update(self, x):
+        if x is None:
+            return self.value
+        now = self.clock()
+        if self.value is None:
+            self.value = float(x)
+        else:
+            alpha = 1.0 - math.exp(-(now - self._t) / self.tau) if self.tau > 0 else 1.0
+            self.value += alpha * (float(x) - self.value)
+        self._t = now
+        return self.value
+
+
+class TelemetryHub:
+    def __init__(self, fields: dict, sample_hz: float = 20.0, max_rate_hz: float = 20.0, clock=time.monotonic):
+        """
+        :param fields: name -> callable() returning the current value.
+                       Providers run on the server loop, so they must
+                       not block (read cached values, not hardware)
+        :param sample_hz: shared sampling rate cap
+        :param max_rate_hz: highest per-client rate accepted
+        :param clock: monotonic time source (seconds)
+        """
+        self.fields = dict(fields)
+        self.sample_period = 1.0 / sample_hz
+        self.max_rate_hz = max_rate_hz
+        self.clock = clock
+
+        self.seq = 0
+        self._latest = {}
+        self._sampled_at = None
+
+    def latest(self) -> tuple:
+        """
+        (seq, {name: formatted value}), resampled if older than one sample period.
+        """
+        now = self.clock()
+        if self._sampled_at is None or now - self._sampled_at >= self.sample_period:
+            self._latest = self._sample()
+            self._sampled_at = now
+            self.seq += 1
+        return self.seq, self._latest
+
+    def _sample(self) -> dict:
+        snapshot = {}
+        for name, provider in self.fields.items():
+            try:
+                snapshot[name] = _format(provider())
+            except Exception:
+                snapshot[name] = "ERR"
+        return snapshot
+
+
+class Subscription:
+    """
+    One client's push loop. Runs as a task on the server loop.
+    """
+
+    def __init__(self, hub: TelemetryHub, send, drain, rate_hz: float, fields=None):
+        """
+        :param send: callable(line) queueing a line in the client's buffer
+        :param drain: coroutine function waiting for the client's buffer
+        :param rate_hz: messages per second (capped at hub.max_rate_hz)
+        :param fields: subset of hub field names (None = all)
+        """
+        self.hub = hub
+        self.send = send
+        self.drain = drain
+        self.rate_hz = min(rate_hz, hub.max_rate_hz)
+        self.fields = fields
+
+        self.sent = 0
+        self.dropped = 0
+        self._last = {}
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def cancel(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        period = 1.0 / self.rate_hz
+        next_t = loop.time()
+        while True:
+            self.push()
+            # Waits only while this client's buffer is over its high-water mark
+            await self.drain()
+
+            next_t += period
+            behind = loop.time() - next_t
+            if behind > 0:
+                # Lagging: skip the missed ticks rather than bursting them
+                missed = int(behind / period) + 1
+                self.dropped += missed
+                next_t += missed * period
+            await asyncio.sleep(next_t - loop.time())
+
+    def push(self) -> bool:
+        """
+        Send the fields that changed since the last push.
+        :return: True if a message was sent
+        """
+        seq, snapshot = self.hub.latest()
+        last = self._last
+        delta = [
+            (name, value)
+            for name, value in snapshot.items()
+            if (self.fields is None or name in self.fields) and last.get(name) != value
+        ]
+        if not delta:
+            return False
+        for name, value in delta:
+            last[name] = value
+        self.send(f"TLM {seq} " + " ".join(f"{name}={value}" for name, value in delta))
+        self.sent += 1
+        return True
+
+
+def _format(value) -> str:
+    """
+    Compact, change-stable text: floats to 0.1, None as "-".
+    """
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.1f}"
+    if hasattr(value, "name"):  # Enum
+        return value.name
+    return str(value).replace(" ", "_")
+
+
+# -------------------------
+# Standard robot fields
+# -------------------------
+
+def robot_fields(fsm=None, nav=None, arm=None, jobs=None, distance_tau_sec: float = 0.3) -> dict:
+    """
+    Field providers for the usual robot telemetry. All read state the
+    control loop already keeps, so sampling never touches hardware.
+    :param fsm: StateMachine -> "state"
+    :param nav: Navigator -> "dist" (low-pass filtered last sonar reading)
+    :param arm: ServoArm -> "arm" (joint angles)
+    :param jobs: JobExecutor -> "jobs" (active jobs)
+    """
+    fields = {}
+    if fsm is not None:
+        fields["state"] = lambda: fsm.state
+    if nav is not None:
+        dist_filter = ExpFilter(distance_tau_sec)
+        fields["dist"] = lambda: dist_filter.update(nav.avoidance.last_distance_cm)
+    if arm is not None:
+        fields["arm"] = lambda: ",".join(f"{j}:{a:.0f}" for j, a in sorted(arm.angles.items()))
+    if jobs is not None:
+        fields["jobs"] = lambda: ",".join(
+            f"{j.id}:{j.kind}:{j.status.name}:{j.progress:.2f}" for j in jobs.jobs(active_only=True)
+        ) or "-"
+    return fields
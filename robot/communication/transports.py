@@ -0,0 +1,198 @@
+# communication/transports.py
+"""
+Stream transports for CommandServer. Each transport opens a listening
+socket and hands accepted connections to asyncio, so every client gets
+its own StreamReader/StreamWriter buffers regardless of the medium.
+"""
+
+import asyncio
+import os
+import socket
+
+from utils.lazy_import import optional_import
+
+# PyBluez (optional: only used for SDP advertising), imported on first use
+bluetooth = optional_import("bluetooth")
+
+
+class Transport:
+    """
+    Base class: subclasses implement start().
+    """
+
+    name = "base"
+
+    async def start(self, client_connected_cb, limit: int):
+        """
+        Start listening.
+        :param client_connected_cb: async callback(reader, writer)
+        :param limit: per-client read buffer limit (bytes)
+        :return: asyncio.Server
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Release anything start() created besides the server itself.
+        """
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.describe()})"
+
+    def describe(self) -> str:
+        return self.name
+
+
+class TcpTransport(Transport):
+    name = "tcp"
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, backlog: int = 16):
+        """
+        :param host: bind address (loopback by default)
+        :param port: 0 picks a free port; see .port after start()
+        """
+        self.host = host
+        self.port = port
+        self.backlog = backlog
+
+    async def start(self, client_connected_cb, limit: int):
+        server = await asyncio.start_server(
+            client_connected_cb,
+            self.host,
+            self.port,
+            limit=limit,
+            backlog=self.backlog,
+            reuse_address=True,
+        )
+        self.port = server.sockets[0].getsockname()[1]
+        return server
+
+    def describe(self) -> str:
+        return f"{self.host}:{self.port}"
+
+
+class UnixTransport(Transport):
+    name = "unix"
+
+    def __init__(self, path: str, backlog: int = 16):
+        self.path = path
+        self.backlog = backlog
+
+    async def start(self, client_connected_cb, limit: int):
+        if os.path.exists(self.path):
+            # Stale socket from a previous run
+            os.unlink(self.path)
+        return await asyncio.start_unix_server(
+            client_connected_cb,
+            self.path,
+            limit=limit,
+            backlog=self.backlog,
+        )
+
+    def close(self):
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def describe(self) -> str:
+        return self.path
+
+
+class RfcommTransport(Transport):
+    """
+    Bluetooth RFCOMM (serial port profile).
+
+    The listening socket is a kernel AF_BLUETOOTH socket, so it works with
+    asyncio directly. If PyBluez is installed and a UUID is configured the
+    service is also advertised over SDP so phones can find it.
+    """
+
+    name = "rfcomm"
+
+    def __init__(
+        self,
+        channel: int = 1,
+        service_name: str | None = None,
+        uuid: str | None = None,
+        backlog: int = 4,
+    ):
+        self.channel = channel
+        self.service_name = service_name
+        self.uuid = uuid
+        self.backlog = backlog
+        self._bt_sock = None
+
+    async def start(self, client_connected_cb, limit: int):
+        if not hasattr(socket, "AF_BLUETOOTH"):
+            raise OSError("RFCOMM sockets are not supported on this system")
+
+        if bluetooth is not None and self.uuid:
+            # SDP advertising needs a PyBluez socket; asyncio gets a dup
+            # of the same kernel socket.
+            bt_sock = bluetooth.BluetoothSocket(bluetooth.RFCOMM)
+            bt_sock.bind(("", self.channel))
+            bt_sock.listen(self.backlog)
+            bluetooth.advertise_service(
+                bt_sock,
+                self.service_name or "robot",
+                service_id=self.uuid,
+                service_classes=[self.uuid, bluetooth.SERIAL_PORT_CLASS],
+                profiles=[bluetooth.SERIAL_PORT_PROFILE],
+            )
+            self._bt_sock = bt_sock
+            sock = socket.socket(fileno=os.dup(bt_sock.fileno()))
+        else:
+            sock = socket.socket(socket.AF_BLUETOOTH, socket.SOCK_STREAM, socket.BTPROTO_RFCOMM)
+            sock.bind((socket.BDADDR_ANY, self.channel))
+            sock.listen(self.backlog)
+
+        sock.setblocking(False)
+        return await asyncio.start_server(client_connected_cb, sock=sock, limit=limit)
+
+    def close(self):
+        if self._bt_sock is not None:
+            try:
+                bluetooth.stop_advertising(self._bt_sock)
+            except Exception:
+                pass
+            self._bt_sock.close()
+            self._bt_sock = None
+
+    def describe(self) -> str:
+        return f"channel {self.channel}"
+
+
+# -------------------------
+# Config
+# -------------------------
+
+def transports_from_config(config: dict):
+    """
+    Build transports from config["server"]["transports"], e.g.
+      [{"type": "tcp", "host": "127.0.0.1", "port": 8765},
+       {"type": "unix", "path": "/tmp/robot.sock"},
+       {"type": "rfcomm", "channel": 1}]
+    RFCOMM picks up service_name/uuid from config["bluetooth"].
+    """
+    bt_cfg = config.get("bluetooth", {})
+    specs = config.get("server", {}).get("transports", [{"type": "rfcomm"}])
+
+    transports = []
+    for spec in specs:
+        kind = spec.get("type", "tcp")
+        if kind == "tcp":
+            transports.append(TcpTransport(spec.get("host", "127.0.0.1"), spec.get("port", 8765)))
+        elif kind == "unix":
+            transports.append(UnixTransport(spec.get("path", "/tmp/robot.sock")))
+        elif kind == "rfcomm":
+            transports.append(
+                RfcommTransport(
+                    channel=spec.get("channel", 1),
+                    service_name=bt_cfg.get("service_name"),
+                    uuid=bt_cfg.get("uuid"),
+                )
+            )
+        else:
+            raise ValueError(f"Unknown transport type: {kind}")
+    return transports
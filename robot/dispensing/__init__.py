@@ -0,0 +1,17 @@
+# dispensing/__init__.py
+
+from .actions import DispenseActions, RobotActions
+from .orchestrator import DispenseOrchestrator, DispenseReport, timeline
+from .stage_graph import GraphRun, Stage, StageFailed, StageGraph
+
+__all__ = [
+    "DispenseActions",
+    "DispenseOrchestrator",
+    "DispenseReport",
+    "GraphRun",
+    "RobotActions",
+    "Stage",
+    "StageFailed",
+    "StageGraph",
+    "timeline",
+]
@@ -0,0 +1,162 @@
+# dispensing/actions.py
+import math
+import time
+from abc import ABC, abstractmethod
+
+
+class DispenseActions(ABC):
+    """
+    What the dispense orchestrator asks of the robot. Each call may
+    block; long ones should poll run.cancelled / sleep with run.wait().
+    :param run: dispensing.stage_graph.GraphRun of the current round
+    """
+
+    @abstractmethod
+    def prefetch(self, doses: list, run) -> dict:
+        """
+        Load what verification needs (patient records, face embeddings,
+        today's schedule). :return: patient_id -> record
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def drive_to_room(self, room, run):
+        """Drive to the approach point outside the room."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def final_approach(self, room, run):
+        """Short, slow segment from the approach point to the bedside."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def warm_vision(self, run):
+        """Open the camera, settle exposure, load and warm the detectors."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def preposition_arm(self, run):
+        """Move the arm to its ready pose above the tray."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def verify(self, dose, record, run):
+        """
+        Check the patient and the pill for one dose.
+        :return: preception.verification.Decision
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def dispense(self, dose, run):
+        """Pick the pill and hand it over."""
+        raise NotImplementedError
+
+
+class RobotActions(DispenseActions):
+    """
+    DispenseActions on the real stack: Navigator, ServoArm, SensorManager
+    and the multi-frame verifier.
+    """
+
+    def __init__(
+        self,
+        nav,
+        arm,
+        sensors,
+        config: dict,
+        classify,
+        patients=None,
+        clock=time.monotonic,
+    ):
+        """
+        :param config: full config; uses "dispense" (rooms, arm poses,
+                       warm-up frames) and "verification"
+        :param classify: callable(frame) -> (patient_id, conf, pill_id, conf)
+        :param patients: callable(patient_id) -> record (None = no records)
+        :param clock: monotonic time source for verification deadlines
+        """
+        cfg = config.get("dispense", {})
+        self.nav = nav
+        self.arm = arm
+        self.sensors = sensors
+        self.config = config
+        self.classify = classify
+        self.patients = patients
+        self.clock = clock
+        self.rooms = cfg.get("rooms", {})
+        self.ready_xyz = cfg.get("arm_ready_xyz", (10.0, 0.0, 12.0))
+        self.pick_xyz = cfg.get("arm_pick_xyz", (14.0, 0.0, 2.0))
+        self.present_xyz = cfg.get("arm_present_xyz", (18.0, 0.0, 14.0))
+        self.warmup_frames = cfg.get("warmup_frames", 5)
+        self.arrive_tolerance_cm = cfg.get("arrive_tolerance_cm", 15.0)
+        self.frame_retry_sec = cfg.get("frame_retry_sec", 0.02)
+
+    def _goal(self, room, key: str):
+        spot = self.rooms.get(str(room), {}).get(key)
+        if spot is None:
+            raise KeyError(f"no {key} location for room {room!r}")
+        return spot
+
+    def _drive(self, goal, route_key, run):
+        self.nav.go_to(goal, route_key=route_key)
+        self.nav.drive_forward_safe(run)
+        if run.cancelled:
+            return
+        # The navigator also goes idle when it finds no route
+        pose = self.nav.pose_provider()
+        if math.hypot(pose[0] - goal[0], pose[1] - goal[1]) > self.arrive_tolerance_cm:
+            raise RuntimeError(f"did not reach {route_key}")
+
+    def prefetch(self, doses, run):
+        if self.patients is None:
+            return {}
+        return {d.patient_id: self.patients(d.patient_id) for d in doses}
+
+    def drive_to_room(self, room, run):
+        self._drive(self._goal(room, "approach"), ("room", str(room)), run)
+
+    def final_approach(self, room, run):
+        self._drive(self._goal(room, "bedside"), ("bedside", str(room)), run)
+
+    def warm_vision(self, run):
+        # Loads OpenCV on first use, then lets exposure settle
+        from preception.cvtest import detect_pills
+
+        frame = None
+        for _ in range(self.warmup_frames):
+            if run.cancelled:
+                return
+            frame = self.sensors.get_camera_frame()
+        if frame is not None:
+            detect_pills(frame)
+
+    def preposition_arm(self, run):
+        self.arm.move_to_xyz(*self.ready_xyz)
+        self.arm.open_gripper()
+
+    def verify(self, dose, record, run):
+        from preception.verification import VerificationAggregator, verify_frames
+
+        agg = VerificationAggregator.from_config(
+            lambda patient_id, pill_id: patient_id == dose.patient_id and pill_id == dose.pill,
+            self.config,
+            clock=self.clock,
+        )
+
+        def frames():
+            while not run.cancelled:
+                frame = self.sensors.get_camera_frame()
+                yield frame
+                if frame is None:
+                    # No frame yet: back off instead of spinning on the camera
+                    run.wait(self.frame_retry_sec)
+
+        return verify_frames(frames(), self.classify, agg)
+
+    def dispense(self, dose, run):
+        self.arm.move_to_xyz(*self.pick_xyz)
+        self.arm.close_gripper()
+        self.arm.move_to_xyz(*self.present_xyz)
+        self.arm.open_gripper()
+        self.arm.move_to_xyz(*self.ready_xyz)
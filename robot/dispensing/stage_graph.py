@@ -0,0 +1,190 @@
+# dispensing/stage_graph.py
+"""
+Dependency graph of named stages, run with as much overlap as the
+dependencies allow.
+
+Each stage is fn(run) -> result; run.results holds the results of the
+stages it depends on (and any other finished stage). A stage starts as
+soon as everything it depends on has finished. If a stage fails, the
+stages already running are cancelled (run.cancelled turns True, and
+run.wait() wakes up) and no further stage starts.
+
+  g = StageGraph()
+  g.add("drive", drive)
+  g.add("warm", warm_camera)
+  g.add("verify", verify, after=("drive", "warm"))
+  run = g.run(pool)
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+
+class StageFailed(Exception):
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"stage {stage!r} failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class Stage:
+    def __init__(self, name: str, fn, after=()):
+        self.name = name
+        self.fn = fn
+        self.after = tuple(after)
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, after={self.after})"
+
+
+class GraphRun:
+    """
+    State of one run, passed to every stage.
+    """
+
+    def __init__(self, job=None, clock=time.perf_counter):
+        """
+        :param job: optional communication.jobs.Job; cancelling it
+                    cancels the run
+        """
+        self.job = job
+        self.clock = clock
+        self.results = {}
+        self.timings = {}  # name -> (start, end), seconds from run start
+        self.failed = None  # StageFailed
+        self.wall_sec = 0.0
+        self._t0 = clock()
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set() or (self.job is not None and self.job.cancelled)
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Sleep up to timeout, waking early on cancel.
+        :return: True if cancelled
+        """
+        if self.job is None:
+            return self._cancel.wait(timeout)
+        # Poll both flags; stage ticks are short anyway
+        end = self.clock() + timeout
+        while not self.cancelled:
+            left = end - self.clock()
+            if left <= 0:
+                return False
+            self._cancel.wait(min(left, 0.02))
+        return True
+
+    @property
+    def busy_sec(self) -> float:
+        """
+        Sum of stage run times: the wall time if nothing overlapped.
+        """
+        return sum(end - start for start, end in self.timings.values())
+
+    def _time(self) -> float:
+        return self.clock() - self._t0
+
+
+class StageGraph:
+    def __init__(self):
+        self.stages = {}  # name -> Stage, in insertion order
+
+    def add(self, name: str, fn, after=()) -> Stage:
+        if name in self.stages:
+            raise ValueError(f"duplicate stage {name!r}")
+        stage = self.stages[name] = Stage(name, fn, after)
+        return stage
+
+    def order(self) -> list:
+        """
+        Stage names in a valid sequential order (insertion order where
+        dependencies allow).
+        :raises ValueError: unknown dependency or cycle
+        """
+        for stage in self.stages.values():
+            for dep in stage.after:
+                if dep not in self.stages:
+                    raise ValueError(f"stage {stage.name!r} depends on unknown stage {dep!r}")
+        done, out = set(), []
+        while len(out) < len(self.stages):
+            progressed = False
+            for name, stage in self.stages.items():
+                if name not in done and all(d in done for d in stage.after):
+                    done.add(name)
+                    out.append(name)
+                    progressed = True
+                    break
+            if not progressed:
+                left = [n for n in self.stages if n not in done]
+                raise ValueError(f"dependency cycle among {left}")
+        return out
+
+    # -------------------------
+    # Running
+    # -------------------------
+
+    def run(self, pool=None, job=None, clock=time.perf_counter) -> GraphRun:
+        """
+        :param pool: concurrent.futures executor with enough workers for
+                     the widest level of the graph; None runs the stages
+                     one after another on this thread
+        :param job: optional Job whose cancel flag cancels the run
+        :return: GraphRun (check .failed; a cancelled run has stages
+                 missing from .results)
+        """
+        order = self.order()
+        run = GraphRun(job, clock)
+        if pool is None:
+            for name in order:
+                if run.cancelled:
+                    break
+                self._call(run, self.stages[name])
+        else:
+            self._run_parallel(run, pool)
+        run.wall_sec = run._time()
+        return run
+
+    def _run_parallel(self, run: GraphRun, pool):
+        waiting = {name: set(stage.after) for name, stage in self.stages.items()}
+        dependents = {name: [] for name in self.stages}
+        for name, stage in self.stages.items():
+            for dep in stage.after:
+                dependents[dep].append(name)
+
+        running = {}
+        ready = [name for name, deps in waiting.items() if not deps]
+        while ready or running:
+            if not run.cancelled:
+                for name in ready:
+                    running[pool.submit(self._call, run, self.stages[name])] = name
+            ready = []
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                if name not in run.results:
+                    continue  # failed or cancelled: dependents never start
+                for child in dependents[name]:
+                    waiting[child].discard(name)
+                    if not waiting[child]:
+                        ready.append(child)
+
+    def _call(self, run: GraphRun, stage: Stage):
+        start = run._time()
+        try:
+            if run.cancelled:
+                return
+            run.results[stage.name] = stage.fn(run)
+        except Exception as e:
+            if run.failed is None:
+                run.failed = StageFailed(stage.name, e)
+            run.cancel()
+        finally:
+            run.timings[stage.name] = (start, run._time())
@@ -1,7 +1,10 @@
 from .drive_base import DriveBase
 from .gopigo_drive import GopiGoDrive
+from .odometry import Odometry, PoseHistory
 
 __all__ = [
     "DriveBase",
-    "GopiGoDrive"
+    "GopiGoDrive",
+    "Odometry",
+    "PoseHistory",
 ]
\ No newline at end of file
@@ -5,9 +5,14 @@ from abc import ABC, abstractmethod
 #nav and control code should only depen on this interface never on hardware
 class DriveBase(ABC):
     def __init__(self, config:dict):
+        self.reconfigure(config)
+
+    def reconfigure(self, config: dict):
+        # config is the "drive" section; also usable as a ConfigService
+        # subscriber so speed changes apply without a restart
         self.config = config
         self.default_speed = config.get("default_speed", 50)
-        self.turn_speed = config.get("turn_spped", 40)
+        self.turn_speed = config.get("turn_speed", 40)
         
     @abstractmethod   
     def forward(self, speed: int | None = None):
@@ -36,7 +41,7 @@ class DriveBase(ABC):
        
        if abs (angular) > abs(linear):
            if angular > 0:
-               self.turn_lef()
+               self.turn_left()
            else:
                self.turn_right()
        else:
@@ -46,7 +51,7 @@ class DriveBase(ABC):
                 self.backward()
     
     def emergency_stop(self):
-        self.stop
+        self.stop()
                    
     
     
\ No newline at end of file
@@ -3,15 +3,18 @@ from drive.drive_base import DriveBase
 
 class GopiGoDrive(DriveBase):
     
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, gpg=None):
         super().__init__(config)
         
-        try:
-            from easygogpigo3 import EasyGoPiGo3
-        except ImportError as e:
-            raise ImportError(" easygopigo3 not found") from e
+        # gpg can be injected (e.g. a mock EasyGoPiGo3 in tests)
+        if gpg is None:
+            try:
+                from easygopigo3 import EasyGoPiGo3
+            except ImportError as e:
+                raise ImportError(" easygopigo3 not found") from e
+            gpg = EasyGoPiGo3()
         
-        self.gpg = EasyGoPiGo3
+        self.gpg = gpg
         self._apply_default_speed()
         
         
@@ -51,4 +54,20 @@ class GopiGoDrive(DriveBase):
         Safe to call repeatedly.
         """
         self.gpg.stop()
+    
+    #encoder access (used by drive.odometry)
+    
+    def read_encoders(self):
+        """
+        Returns (left_deg, right_deg) cumulative wheel rotation.
+        """
+        return self.gpg.read_encoders()
+    
+    @property
+    def wheel_diameter_mm(self) -> float:
+        return self.gpg.WHEEL_DIAMETER
+    
+    @property
+    def wheel_base_mm(self) -> float:
+        return self.gpg.WHEEL_BASE_WIDTH
         
\ No newline at end of file
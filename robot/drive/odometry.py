@@ -0,0 +1,236 @@
+# drive/odometry.py
+import math
+import threading
+import time
+from array import array
+
+
+class PoseHistory:
+    """
+    Fixed-size ring buffer of timestamped poses (t, x_cm, y_cm, theta_rad).
+    Storage is preallocated; theta is kept unwrapped so it can be
+    interpolated across +/-pi.
+    """
+
+    def __init__(self, size: int = 1024):
+        self.size = size
+        self._t = array("d", bytes(8 * size))
+        self._x = array("d", bytes(8 * size))
+        self._y = array("d", bytes(8 * size))
+        self._th = array("d", bytes(8 * size))
+        self._head = 0    # next write slot
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+
+    def append(self, t, x, y, theta):
+        i = self._head
+        self._t[i] = t
+        self._x[i] = x
+        self._y[i] = y
+        self._th[i] = theta
+        self._head = (i + 1) % self.size
+        if self._count < self.size:
+            self._count += 1
+
+    def _slot(self, k):
+        """Physical slot of the k-th oldest entry."""
+        return (self._head - self._count + k) % self.size
+
+    def latest(self):
+        if self._count == 0:
+            return None
+        i = (self._head - 1) % self.size
+        return self._t[i], self._x[i], self._y[i], self._th[i]
+
+    def oldest_time(self):
+        return self._t[self._slot(0)] if self._count else None
+
+    def at(self, t):
+        """
+        Pose at time t, linearly interpolated between the two nearest
+        samples. Clamped to the oldest/newest sample outside the range.
+        Returns (x, y, theta_unwrapped) or None if empty.
+        """
+        n = self._count
+        if n == 0:
+            return None
+
+        ts = self._t
+        slot = self._slot
+
+        # Binary search for the first sample with time >= t
+        lo, hi = 0, n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ts[slot(mid)] < t:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        if lo == 0:
+            i = slot(0)
+            return self._x[i], self._y[i], self._th[i]
+        if lo == n:
+            i = slot(n - 1)
+            return self._x[i], self._y[i], self._th[i]
+
+        a, b = slot(lo - 1), slot(lo)
+        span = ts[b] - ts[a]
+        f = 0.0 if span <= 0 else (t - ts[a]) / span
+        return (
+            self._x[a] + f * (self._x[b] - self._x[a]),
+            self._y[a] + f * (self._y[b] - self._y[a]),
+            self._th[a] + f * (self._th[b] - self._th[a]),
+        )
+
+
+class Odometry:
+    """
+    Differential-drive dead reckoning from wheel encoders.
+
+    - Samples encoders at a fixed rate on a background thread
+    - Integrates pose along the travelled arc
+    - Keeps a pose history for "pose at time t" queries, so sensor
+      readings can be stamped with the pose they were taken from
+    """
+
+    def __init__(
+        self,
+        encoders,
+        wheel_diameter_mm: float | None = None,
+        wheel_base_mm: float | None = None,
+        rate_hz: float = 100.0,
+        history_size: int = 1024,
+        clock=time.monotonic,
+    ):
+        """
+        :param encoders: object with read_encoders() -> (left_deg, right_deg),
+                         e.g. GopiGoDrive
+        :param wheel_diameter_mm: defaults to encoders.wheel_diameter_mm
+        :param wheel_base_mm: defaults to encoders.wheel_base_mm
+        :param rate_hz: background sampling rate
+        :param history_size: pose samples kept (1024 @ 100 Hz ~ 10 s)
+        :param clock: monotonic time source (seconds)
+        """
+        self.encoders = encoders
+        if wheel_diameter_mm is None:
+            wheel_diameter_mm = encoders.wheel_diameter_mm
+        if wheel_base_mm is None:
+            wheel_base_mm = encoders.wheel_base_mm
+
+        # encoder degrees -> cm travelled
+        self._cm_per_deg = math.pi * (wheel_diameter_mm / 10.0) / 360.0
+        self._wheel_base_cm = wheel_base_mm / 10.0
+        self.period = 1.0 / rate_hz
+        self.clock = clock
+
+        self.history = PoseHistory(history_size)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self._x = 0.0
+        self._y = 0.0
+        self._theta = 0.0  # unwrapped
+        self._last_ticks = None
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self):
+        next_tick = self.clock()
+        while not self._stop_event.is_set():
+            self.sample()
+            next_tick += self.period
+            delay = next_tick - self.clock()
+            if delay < 0:
+                # Fell behind (e.g. I2C stall): resync rather than burst
+                next_tick = self.clock()
+                delay = 0
+            self._stop_event.wait(delay)
+
+    # -------------------------
+    # Integration
+    # -------------------------
+
+    def reset(self, x_cm: float = 0.0, y_cm: float = 0.0, theta_rad: float = 0.0):
+        with self._lock:
+            self._x, self._y, self._theta = x_cm, y_cm, theta_rad
+            self._last_ticks = None
+            self.history.clear()
+
+    def sample(self):
+        """
+        Read encoders once and integrate. Called by the background
+        thread; can also be called directly for manual stepping.
+        """
+        left, right = self.encoders.read_encoders()
+        now = self.clock()
+
+        with self._lock:
+            if self._last_ticks is not None:
+                dl = (left - self._last_ticks[0]) * self._cm_per_deg
+                dr = (right - self._last_ticks[1]) * self._cm_per_deg
+                self._integrate(dl, dr)
+            self._last_ticks = (left, right)
+            self.history.append(now, self._x, self._y, self._theta)
+
+    def _integrate(self, dl: float, dr: float):
+        ds = 0.5 * (dl + dr)
+        dth = (dr - dl) / self._wheel_base_cm
+
+        if abs(dth) < 1e-9:
+            self._x += ds * math.cos(self._theta)
+            self._y += ds * math.sin(self._theta)
+        else:
+            # Exact arc: chord of length 2R sin(dth/2) at the mid heading
+            chord = 2.0 * (ds / dth) * math.sin(0.5 * dth)
+            mid = self._theta + 0.5 * dth
+            self._x += chord * math.cos(mid)
+            self._y += chord * math.sin(mid)
+        self._theta += dth
+
+    # -------------------------
+    # Queries
+    # -------------------------
+
+    def pose(self):
+        """
+        Latest (x_cm, y_cm, theta_rad) with theta in [-pi, pi].
+        """
+        with self._lock:
+            return self._x, self._y, _wrap(self._theta)
+
+    def pose_at(self, t: float):
+        """
+        Interpolated pose at clock time t, or None if no samples yet.
+        """
+        with self._lock:
+            p = self.history.at(t)
+        if p is None:
+            return None
+        return p[0], p[1], _wrap(p[2])
+
+
+def _wrap(angle: float) -> float:
+    return math.atan2(math.sin(angle), math.cos(angle))
@@ -1,17 +1,248 @@
-from communication.bluetooth_server import BluetoothServer
-from robot.drive.gopigo_drive import GoPiGoController
-from sensors import SensorSuite
-from navigation import NavigationController
-from robot.preception.object_detection import ObjectDetector
-
-def main():
-    controller = GoPiGoController()
-    sensors = SensorSuite()
-    detector = ObjectDetector()
-    nav = NavigationController(controller, sensors, detector)
-
-    server = BluetoothServer(nav, controller, sensors)
-    server.start()
+# main.py
+"""
+Robot entrypoint with role-based startup.
+
+  python main.py --role drive    # drive base, sonar, navigation, command server
+  python main.py --role vision   # camera + pill scanning, command server
+  python main.py --role full     # everything (default)
+
+Each subsystem is imported inside its builder, so a role only pays for
+the modules it uses. --dry-run builds the role and prints an import-time
+report instead of serving. --record PATH logs sensors, commands and FSM
+transitions to a flight-recorder ring file (replay with
+python -m recording.replay PATH).
+"""
+
+import argparse
+import sys
+import time
+from types import SimpleNamespace
+
+from utils.logger import setup_logger, shutdown as shutdown_logging
+
+log = setup_logger("main")
+
+T_START = time.perf_counter()
+
+ROLES = {
+    "drive": ("drive", "sonar", "nav"),
+    "vision": ("camera", "vision"),
+    "full": ("drive", "sonar", "nav", "camera", "vision", "arm"),
+}
+
+
+# -------------------------
+# Builders (imports stay local on purpose)
+# -------------------------
+
+def _build_drive(robot, config):
+    from drive.gopigo_drive import GopiGoDrive
+
+    robot.drive = GopiGoDrive(config.section("drive"))
+    if robot.recorder is not None:
+        from recording.taps import RecordingDrive
+
+        robot.drive = RecordingDrive(robot.drive, robot.recorder)
+    config.subscribe("drive", robot.drive.reconfigure)
+
+
+def _build_sonar(robot, config):
+    from sensors.ultrasonic import UltrasonicSensor
+
+    us_cfg = config.section("ultrasonic")
+    if not us_cfg:
+        raise RuntimeError("no 'ultrasonic' section in config")
+    robot.ultrasonic = UltrasonicSensor(us_cfg["trig_pin"], us_cfg["echo_pin"])
+
+
+def _build_camera(robot, config):
+    from sensors.camera import Camera
+
+    robot.camera = Camera()
+
+
+def _build_nav(robot, config):
+    from navigation.navigation import Navigator
+
+    if robot.drive is None:
+        raise RuntimeError("navigation needs the drive")
+    robot.nav = Navigator(robot.drive, robot.sensors, robot.fsm, config.data)
+    robot.nav.recorder = robot.recorder
+
+
+def _build_vision(robot, config):
+    from preception.object_detection import PillScanner
+
+    if robot.camera is None:
+        raise RuntimeError("vision needs the camera")
+    robot.scanner = PillScanner(robot.sensors)
+
+
+def _build_arm(robot, config):
+    from arm.servo_arm import ServoArm
+
+    robot.arm = ServoArm(config.data)
+    if robot.recorder is not None:
+        from recording.taps import RecordingArm
+
+        robot.arm = RecordingArm(robot.arm, robot.recorder)
+
+
+BUILDERS = {
+    "drive": _build_drive,
+    "sonar": _build_sonar,
+    "camera": _build_camera,
+    "nav": _build_nav,
+    "vision": _build_vision,
+    "arm": _build_arm,
+}
+
+
+def build(role: str, config=None, recorder=None):
+    """
+    Construct the subsystems for role. A subsystem whose hardware or
+    library is missing is reported and skipped.
+    :param recorder: optional FlightRecorder wired into sensors, drive,
+                     arm, navigation and the FSM
+    :return: namespace with drive/ultrasonic/camera/sensors/fsm/nav/scanner/arm,
+             plus .timings {subsystem: seconds} and .failed {subsystem: error}
+    """
+    from navigation.state_machine import StateMachine
+    from sensors.sensor_manager import SensorManager
+    from utils.config import get_config
+
+    config = config or get_config()
+    robot = SimpleNamespace(
+        role=role,
+        config=config,
+        drive=None,
+        ultrasonic=None,
+        camera=None,
+        nav=None,
+        scanner=None,
+        arm=None,
+        fsm=StateMachine(),
+        recorder=recorder,
+        timings={},
+        failed={},
+    )
+    robot.sensors = SensorManager(recorder=recorder)
+    if recorder is not None:
+        robot.fsm.add_listener(recorder.transition)
+
+    for name in ROLES[role]:
+        t0 = time.perf_counter()
+        try:
+            BUILDERS[name](robot, config)
+        except Exception as e:
+            robot.failed[name] = e
+            log.warning("%s unavailable: %s", name, e)
+        robot.timings[name] = time.perf_counter() - t0
+        # The sensor manager only sees what was actually built
+        robot.sensors.ultrasonic = robot.ultrasonic
+        robot.sensors.camera = robot.camera
+    return robot
+
+
+def build_server(robot):
+    from communication import CommandHandler, CommandServer, TelemetryHub, robot_fields
+
+    def unavailable(what):
+        def job(_job):
+            raise RuntimeError(f"{what} is not running in the '{robot.role}' role")
+
+        return job
+
+    behaviors = SimpleNamespace(
+        drive_forward_safe=robot.nav.drive_forward_safe if robot.nav else unavailable("navigation"),
+        search_for_pill=robot.scanner.search_for_pill if robot.scanner else unavailable("vision"),
+    )
+    controller = robot.drive or SimpleNamespace(stop=lambda: None)
+    sensors = SimpleNamespace(get_front_distance=robot.sensors.get_front_distance_cm)
+
+    handler = CommandHandler(behaviors, controller, sensors)
+    hub = TelemetryHub(robot_fields(fsm=robot.fsm, nav=robot.nav, arm=robot.arm, jobs=handler.jobs))
+    return CommandServer.from_config(handler, robot.config.data, telemetry=hub)
+
+
+def start_metrics(robot):
+    """
+    Serve the metrics registry on loopback if the "metrics" section enables it.
+    """
+    cfg = robot.config.section("metrics")
+    if not cfg.get("enabled", False):
+        return None
+    from utils.logger import dropped_records
+    from utils.metrics import REGISTRY, MetricsServer
+
+    REGISTRY.gauge("log_dropped_records", "Log records dropped on a full queue").set_function(dropped_records)
+    try:
+        server = MetricsServer.from_config(robot.config.data).start()
+    except OSError as e:
+        log.warning("Metrics endpoint unavailable: %s", e)
+        return None
+    log.info("Metrics on http://%s:%d/metrics", server.host, server.port)
+    return server
+
+
+def print_report(robot):
+    from utils.lazy_import import import_report
+
+    print(f"[MAIN] role={robot.role} startup {1e3 * (time.perf_counter() - T_START):.1f} ms")
+    for name, seconds in robot.timings.items():
+        status = "FAILED" if name in robot.failed else "ok"
+        print(f"[MAIN]   {name:<8} {1e3 * seconds:8.1f} ms  {status}")
+    for name, seconds in import_report():
+        print(f"[MAIN]   lazy import {name:<16} {1e3 * seconds:8.1f} ms")
+    print(f"[MAIN]   modules loaded: {len(sys.modules)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Robot startup")
+    parser.add_argument("--role", choices=sorted(ROLES), default="full")
+    parser.add_argument("--dry-run", action="store_true", help="build, report and exit")
+    parser.add_argument("--record", metavar="PATH", help="flight-recorder ring file")
+    args = parser.parse_args(argv)
+
+    recorder = None
+    if args.record:
+        from recording.flight_recorder import FlightRecorder
+        from utils.config import get_config
+
+        recorder = FlightRecorder(
+            args.record,
+            meta={"role": args.role, "config": get_config().data, "started": time.time()},
+        )
+
+    robot = build(args.role, recorder=recorder)
+    if args.dry_run:
+        print_report(robot)
+        _close_recorder(robot)
+        return robot
+
+    robot.config.start_watching()
+    server = build_server(robot)
+    metrics = start_metrics(robot)
+    print_report(robot)
+    try:
+        server.run()
+    finally:
+        if metrics is not None:
+            metrics.stop()
+        robot.config.stop_watching()
+        server.handler.jobs.shutdown()
+        if robot.drive is not None:
+            robot.drive.stop()
+        _close_recorder(robot)
+        shutdown_logging()
+    return robot
+
+
+def _close_recorder(robot):
+    if robot.recorder is not None:
+        robot.fsm.close()  # deliver pending transitions first
+        robot.recorder.close()
+
 
 if __name__ == "__main__":
     main()
@@ -2,6 +2,15 @@
 import time
 from navigation.state_machine import RobotState
 from navigation.obstacle_avoidance import ObstacleAvoidance
+from navigation.waypoint_follower import WaypointFollower
+from recording.flight_recorder import NavCmd
+from utils.logger import kv, setup_logger
+from utils.metrics import REGISTRY
+
+log = setup_logger(__name__)
+
+STEP_SECONDS = REGISTRY.histogram("nav_step_seconds", "Navigator.step duration")
+REPLANS = REGISTRY.counter("nav_replans", "Route (re)plans")
 
 
 class Navigator:
@@ -10,28 +19,59 @@ class Navigator:
     - runs obstacle avoidance checks
     - executes behavior based on FSM state
     - accepts manual commands (from Bluetooth)
+    - follows planned routes in AUTO when a map and pose are available
     """
 
-    def __init__(self, drive, sensors, fsm, config: dict):
+    def __init__(
+        self,
+        drive,
+        sensors,
+        fsm,
+        config: dict,
+        grid=None,
+        pose_provider=None,
+        clock=time.monotonic,
+    ):
         """
         :param drive: DriveBase implementation (e.g., GoPiGoDrive)
         :param sensors: SensorManager
         :param fsm: StateMachine
         :param config: full config dict loaded from config.json
+        :param grid: optional OccupancyGrid (enables mapping + planning)
+        :param pose_provider: callable -> (x_cm, y_cm, theta_rad) or None
+        :param clock: monotonic time source (a virtual clock in simulation)
         """
         self.drive = drive
         self.sensors = sensors
         self.fsm = fsm
+        self.clock = clock
+
+        # Optional FlightRecorder: logs inputs and each control tick
+        self.recorder = None
 
         nav_cfg = config.get("navigation", {})
         avoid_cfg = nav_cfg.get("avoidance", {})
 
+        # Predictive (time-to-collision) braking is on by default; the
+        # stop distance then only sets the minimum margin.
+        predictive = avoid_cfg.get("predictive", True)
+
         self.avoidance = ObstacleAvoidance(
             drive=self.drive,
             sensors=self.sensors,
             fsm=self.fsm,
-            stop_distance_cm=avoid_cfg.get("stop_distance_cm", 25.0),
+            stop_distance_cm=avoid_cfg.get(
+                "stop_distance_cm", 10.0 if predictive else 25.0
+            ),
             turn_duration=avoid_cfg.get("turn_duration_sec", 0.6),
+            settle_duration=avoid_cfg.get("settle_duration_sec", 0.1),
+            clock=clock,
+            ttc_threshold_sec=(
+                avoid_cfg.get("ttc_threshold_sec", 1.0) if predictive else None
+            ),
+            reaction_time_sec=avoid_cfg.get("reaction_time_sec", 0.25),
+            max_decel_cm_s2=avoid_cfg.get("max_decel_cm_s2", 80.0),
+            cm_per_speed_unit=avoid_cfg.get("cm_per_speed_unit", 0.058),
         )
 
         # Manual control state (set by handle_manual_command)
@@ -40,9 +80,42 @@ class Navigator:
         self._manual_last_update = 0.0
         self._manual_timeout_sec = nav_cfg.get("manual_timeout_sec", 0.6)
 
-        # Auto mode behavior (simple for now)
+        # Auto mode behavior: drive forward, or follow a route if a goal is set
         self._auto_speed = nav_cfg.get("auto_speed", drive.default_speed)
 
+        self.grid = grid
+        self.pose_provider = pose_provider
+        self.planner = None
+        self.follower = None
+        if grid is not None and pose_provider is not None:
+            # Planner pulls in NumPy; only load it when mapping is used
+            from navigation.planner import PENDING, GridPlanner
+
+            self._pending = PENDING
+            plan_cfg = nav_cfg.get("planner", {})
+            self.planner = GridPlanner(
+                grid,
+                inflation_radius_cm=plan_cfg.get("inflation_radius_cm", 10.0),
+                route_reuse_radius_cm=plan_cfg.get("route_reuse_radius_cm", 15.0),
+            )
+            # D* Lite expansions per control tick; a larger search
+            # continues on the next tick instead of overrunning this one
+            self._max_expansions = plan_cfg.get("max_expansions_per_step", 200)
+            self.follower = WaypointFollower(
+                drive=self.drive,
+                pose_provider=pose_provider,
+                speed=self._auto_speed,
+                waypoint_tolerance_cm=plan_cfg.get("waypoint_tolerance_cm", 8.0),
+                heading_tolerance_deg=plan_cfg.get("heading_tolerance_deg", 20.0),
+            )
+
+        self._goal = None
+        self._route_key = None
+        self._replan = False
+
+        # Whether the command issued last tick rotates the base
+        self._turning = False
+
     # -------------------------
     # Manual command entrypoint
     # -------------------------
@@ -54,7 +127,9 @@ class Navigator:
         """
         self._manual_linear = max(-1.0, min(1.0, float(linear)))
         self._manual_angular = max(-1.0, min(1.0, float(angular)))
-        self._manual_last_update = time.time()
+        self._manual_last_update = self.clock()
+        if self.recorder is not None:
+            self.recorder.nav(NavCmd.MANUAL, self._manual_linear, self._manual_angular)
 
         # Put robot into MANUAL mode immediately
         self.fsm.on_manual_command()
@@ -65,15 +140,69 @@ class Navigator:
 
     def enable_autonomy(self):
         """Switch to AUTO mode."""
+        if self.recorder is not None:
+            self.recorder.nav(NavCmd.AUTONOMY)
         self.fsm.on_autonomy_enabled()
 
+    def go_to(self, goal_xy, route_key=None):
+        """
+        Plan to goal (world cm) and switch to AUTO.
+        :param route_key: optional name (e.g. ("pharmacy", "room_12"))
+                          so the route is cached and reused
+        """
+        if self.planner is None:
+            raise RuntimeError("Navigator has no map/pose; cannot plan")
+        self._goal = (float(goal_xy[0]), float(goal_xy[1]))
+        if self.recorder is not None:
+            self.recorder.nav(NavCmd.GO_TO, *self._goal)
+        self._route_key = route_key
+        self._replan = True
+        self.follower.clear()
+        self.fsm.on_autonomy_enabled()
+
+    def cancel_goal(self):
+        if self.recorder is not None:
+            self.recorder.nav(NavCmd.CANCEL)
+        self._clear_goal()
+
+    def _clear_goal(self):
+        self._goal = None
+        self._route_key = None
+        if self.follower is not None:
+            self.follower.clear()
+
+    def drive_forward_safe(self, job, period: float = 0.05):
+        """
+        Run the control loop in AUTO until the job is cancelled or the
+        FSM leaves AUTO/AVOID (e.g. goal reached, STOP). Meant to run as
+        a JobExecutor job.
+        :param job: communication.jobs.Job (cancel flag + progress)
+        :param period: control tick (seconds)
+        """
+        self.enable_autonomy()
+        try:
+            while not job.cancelled:
+                self.step()
+                if self.fsm.state not in (RobotState.AUTO, RobotState.AVOID):
+                    break
+                # Wakes immediately on cancel
+                job.wait(period)
+        finally:
+            self.drive.stop()
+            if self.fsm.state in (RobotState.AUTO, RobotState.AVOID):
+                self.fsm.on_idle()
+
     def emergency_stop(self):
         """Hard stop."""
+        if self.recorder is not None:
+            self.recorder.nav(NavCmd.EMERGENCY_STOP)
         self.fsm.on_emergency_stop()
         self.drive.emergency_stop()
 
     def reset_from_stop(self):
         """Reset STOP -> IDLE."""
+        if self.recorder is not None:
+            self.recorder.nav(NavCmd.RESET)
         self.fsm.on_reset()
 
     # -------------------------
@@ -84,16 +213,36 @@ class Navigator:
         """
         Call this repeatedly (e.g., 10–30 Hz).
         """
+        start = time.perf_counter()
+        recorder = self.recorder
+        if recorder is None:
+            self._step()
+        else:
+            # The tick is written after the step, so the readings and
+            # commands it caused precede it in the recording
+            t0 = self.clock()
+            pose = self.pose_provider() if self.pose_provider is not None else None
+            self._step()
+            recorder.tick(t0, pose)
+        STEP_SECONDS.observe(time.perf_counter() - start)
 
+    def _step(self):
         # STOP overrides everything
         if self.fsm.state == RobotState.STOP:
+            self.avoidance.cancel()
             self.drive.emergency_stop()
             return
 
-        # Always run avoidance check (it will push FSM into AVOID)
+        # Braking distance scales with how fast we are about to drive
+        self.avoidance.set_commanded_speed(self._commanded_speed(), self._turning)
+        self._turning = False
+
+        # Always run avoidance check (it will push FSM into AVOID).
+        # Non-blocking: an ongoing manoeuvre advances one tick at a time.
         self.avoidance.step()
+        self._update_map()
 
-        # If in AVOID, do nothing else this cycle (avoidance already acted)
+        # If in AVOID, do nothing else this cycle (avoidance owns the drive)
         if self.fsm.state == RobotState.AVOID:
             return
 
@@ -114,22 +263,91 @@ class Navigator:
     # Internal behaviors
     # -------------------------
 
+    def _commanded_speed(self) -> float:
+        """
+        Forward speed (drive units) the current behavior will command.
+        AVOID keeps the speed we will resume at once the path clears.
+        """
+        state = self.fsm.state
+        if state == RobotState.AVOID:
+            state = self.fsm.previous_state
+
+        if state == RobotState.AUTO:
+            return self._auto_speed
+        if state == RobotState.MANUAL:
+            return max(0.0, self._manual_linear) * self.drive.default_speed
+        return 0.0
+
+    def _update_map(self):
+        if self.planner is None:
+            return
+        distance = self.avoidance.last_distance_cm
+        if distance is None:
+            return
+        pose = self.pose_provider()
+        if pose is None:
+            return
+        changed = self.grid.update(pose, distance)
+        if self.planner.notify_changed(changed):
+            self._replan = True
+
     def _manual_step(self):
         # If manual commands stop coming in, drop to IDLE for safety
-        if (time.time() - self._manual_last_update) > self._manual_timeout_sec:
+        if (self.clock() - self._manual_last_update) > self._manual_timeout_sec:
             self.drive.stop()
             self.fsm.on_idle()
             return
 
         # Use ROS-style drive.move(linear, angular)
         self.drive.move(self._manual_linear, self._manual_angular)
+        self._turning = abs(self._manual_angular) > abs(self._manual_linear)
 
     def _auto_step(self):
         """
-        Simple AUTO behavior for MVP:
-        - Drive forward at auto_speed
+        AUTO behavior:
+        - With a goal: follow the planned route (replanned on map changes)
+        - Without: drive forward at auto_speed
         - ObstacleAvoidance will interrupt if needed
         """
-        # If path is clear, just go forward.
-        # You can replace this later with waypoint following / vision approach.
+        if self._goal is not None:
+            self._follow_step()
+            return
+
         self.drive.forward(self._auto_speed)
+
+    def _follow_step(self):
+        if self._replan:
+            pose = self.pose_provider()
+            if pose is None:
+                self.drive.stop()
+                return
+
+            start = (pose[0], pose[1])
+            budget = self._max_expansions
+            if self._route_key is not None and not self.follower.remaining:
+                waypoints = self.planner.route(self._route_key, start, self._goal, budget)
+            else:
+                waypoints = self.planner.plan(start, self._goal, budget)
+
+            if waypoints is self._pending:
+                # Search continues next tick; keep to the old path meanwhile
+                if not self.follower.active:
+                    self.drive.stop()
+                    return
+            else:
+                self._replan = False
+                REPLANS.inc()
+                if waypoints is None:
+                    log.warning("No route", extra=kv(goal=self._goal))
+                    self._clear_goal()
+                    self.drive.stop()
+                    self.fsm.on_idle()
+                    return
+                self.follower.set_path(waypoints)
+
+        arrived = self.follower.step()
+        self._turning = self.follower.turning
+        if arrived:
+            log.info("Reached goal", extra=kv(goal=self._goal))
+            self._clear_goal()
+            self.fsm.on_idle()
@@ -0,0 +1,278 @@
+# navigation/obstacle_avoidance.py
+import math
+import time
+from collections import deque
+from enum import Enum, auto
+
+from navigation.state_machine import RobotState
+from utils.logger import kv, setup_logger
+from utils.metrics import REGISTRY
+
+log = setup_logger(__name__)
+
+OBSTACLES = REGISTRY.counter("avoid_obstacles", "Obstacle manoeuvres started")
+
+
+class AvoidPhase(Enum):
+    IDLE = auto()
+    STOPPING = auto()
+    TURNING = auto()
+    VERIFYING = auto()
+
+
+class ObstacleAvoidance:
+    """
+    Reactive obstacle avoidance using distance sensors.
+
+    The manoeuvre (stop -> turn -> verify) is a time-stepped
+    sub-state machine: every call to step() returns immediately,
+    so STOP and manual overrides are honoured on the next tick.
+
+    With ttc_threshold_sec set, the trigger is predictive: closing
+    speed is estimated from the timestamped distance history and the
+    stop distance grows with the commanded drive speed.
+    """
+
+    def __init__(
+        self,
+        drive,
+        sensors,
+        fsm,
+        stop_distance_cm: float = 25.0,
+        turn_duration: float = 0.6,
+        settle_duration: float = 0.1,
+        clock=time.monotonic,
+        ttc_threshold_sec: float | None = None,
+        reaction_time_sec: float = 0.25,
+        max_decel_cm_s2: float = 80.0,
+        cm_per_speed_unit: float = 0.058,
+        history_window_sec: float = 0.5,
+        history_size: int = 8,
+    ):
+        """
+        :param drive: DriveBase instance
+        :param sensors: SensorManager instance
+        :param fsm: StateMachine instance
+        :param stop_distance_cm: threshold to trigger avoidance
+            (the minimum margin when predictive braking is enabled)
+        :param turn_duration: seconds to turn away
+        :param settle_duration: seconds to stay stopped before turning
+        :param clock: monotonic time source (seconds)
+        :param ttc_threshold_sec: trigger when time-to-collision drops
+            below this; None keeps the fixed stop_distance_cm behavior
+        :param reaction_time_sec: sensing + actuation latency budget
+        :param max_decel_cm_s2: braking deceleration of the base
+        :param cm_per_speed_unit: drive speed unit -> cm/s
+            (GoPiGo3 speeds are wheel deg/s; 66.5 mm wheels)
+        :param history_window_sec: age limit for closing-speed samples
+        :param history_size: max samples kept for closing-speed fit
+        """
+        self.drive = drive
+        self.sensors = sensors
+        self.fsm = fsm
+
+        self.stop_distance_cm = stop_distance_cm
+        self.turn_duration = turn_duration
+        self.settle_duration = settle_duration
+        self.clock = clock
+
+        self.ttc_threshold_sec = ttc_threshold_sec
+        self.reaction_time_sec = reaction_time_sec
+        self.max_decel_cm_s2 = max_decel_cm_s2
+        self.cm_per_speed_unit = cm_per_speed_unit
+        self.history_window_sec = history_window_sec
+
+        self._history = deque(maxlen=history_size)  # (t, distance_cm)
+        self._commanded_speed = 0.0
+        self._turning = False
+
+        self._avoiding = False
+        self._phase = AvoidPhase.IDLE
+        self._phase_deadline = 0.0
+
+        # Reading taken on the current tick (None if none was taken),
+        # so other consumers (e.g. mapping) avoid a second sensor read
+        self.last_distance_cm = None
+
+    # -------------------------
+    # Public interface
+    # -------------------------
+
+    @property
+    def phase(self) -> AvoidPhase:
+        return self._phase
+
+    @property
+    def predictive(self) -> bool:
+        return self.ttc_threshold_sec is not None
+
+    def set_commanded_speed(self, speed: float, turning: bool = False):
+        """
+        Forward speed (drive units) the controller intends to run at.
+        Used to scale the braking distance.
+
+        :param turning: heading has been changing since the last tick;
+            a sweeping beam fakes closing speed, so history is dropped
+        """
+        self._commanded_speed = max(0.0, float(speed))
+        self._turning = turning
+
+    def closing_speed_cm_s(self) -> float:
+        """
+        Rate at which the front obstacle is approaching (cm/s),
+        from a least-squares fit over recent samples. 0 if receding
+        or not enough history.
+        """
+        if len(self._history) < 3:
+            return 0.0
+
+        t0 = self._history[0][0]
+        n = len(self._history)
+        sum_t = sum_d = sum_tt = sum_td = 0.0
+        for t, d in self._history:
+            t -= t0
+            sum_t += t
+            sum_d += d
+            sum_tt += t * t
+            sum_td += t * d
+
+        denom = n * sum_tt - sum_t * sum_t
+        if denom <= 1e-9:
+            return 0.0
+
+        slope = (n * sum_td - sum_t * sum_d) / denom
+        return max(0.0, -slope)
+
+    def braking_distance_cm(self, closing_cm_s: float = 0.0) -> float:
+        """
+        Distance needed to stop from the commanded speed (or the
+        measured closing speed if higher), plus the minimum margin.
+        """
+        if not self.predictive:
+            return self.stop_distance_cm
+
+        v = max(self._commanded_speed * self.cm_per_speed_unit, closing_cm_s)
+        return (
+            self.stop_distance_cm
+            + v * self.reaction_time_sec
+            + (v * v) / (2.0 * self.max_decel_cm_s2)
+        )
+
+    def time_to_collision(self, distance: float) -> float:
+        """
+        Seconds until the stop margin is reached at the current
+        closing speed (inf if not closing).
+        """
+        closing = self.closing_speed_cm_s()
+        if closing <= 1e-6:
+            return math.inf
+        return max(0.0, distance - self.stop_distance_cm) / closing
+
+    def step(self):
+        """
+        Called periodically from Navigator.
+        Decides whether to trigger, advance or clear avoidance.
+        Never blocks.
+        """
+        self.last_distance_cm = None
+
+        if self.fsm.state == RobotState.STOP:
+            self.cancel()
+            return
+
+        # Another event (e.g. manual override) took the FSM out of AVOID:
+        # drop the manoeuvre but stay latched until the path is clear.
+        if self._phase != AvoidPhase.IDLE and self.fsm.state != RobotState.AVOID:
+            self._phase = AvoidPhase.IDLE
+
+        if self._phase in (AvoidPhase.STOPPING, AvoidPhase.TURNING):
+            self._advance_manoeuvre(self.clock())
+            return
+
+        distance = self.sensors.get_front_distance_cm()
+        self.last_distance_cm = distance
+
+        if distance is None:
+            return
+
+        if self._should_brake(distance):
+            self._handle_obstacle(distance)
+        else:
+            self._handle_clear()
+
+    def cancel(self):
+        """
+        Abort any manoeuvre in progress (used on STOP).
+        Does not touch the drive; the caller owns the stop.
+        """
+        self._avoiding = False
+        self._phase = AvoidPhase.IDLE
+        self._history.clear()
+
+    # -------------------------
+    # Internal logic
+    # -------------------------
+
+    def _should_brake(self, distance: float) -> bool:
+        if not self.predictive:
+            return distance < self.stop_distance_cm
+
+        now = self.clock()
+        if self._turning:
+            self._history.clear()
+        elif math.isfinite(distance):
+            self._history.append((now, distance))
+        while self._history and now - self._history[0][0] > self.history_window_sec:
+            self._history.popleft()
+
+        closing = self.closing_speed_cm_s()
+        if distance < self.braking_distance_cm(closing):
+            return True
+        return self.time_to_collision(distance) < self.ttc_threshold_sec
+
+    def _handle_obstacle(self, distance: float):
+        if self._phase == AvoidPhase.VERIFYING:
+            # Still blocked after turning: turn again
+            self._start_turn(self.clock())
+            return
+
+        if not self._avoiding:
+            log.info("Obstacle", extra=kv(distance_cm=round(distance, 1)))
+            OBSTACLES.inc()
+
+            self._avoiding = True
+            self.fsm.on_obstacle_detected()
+
+            if self.fsm.state != RobotState.AVOID:
+                return
+
+            self.drive.stop()
+            self._phase = AvoidPhase.STOPPING
+            self._phase_deadline = self.clock() + self.settle_duration
+
+    def _advance_manoeuvre(self, now: float):
+        if now < self._phase_deadline:
+            return
+
+        if self._phase == AvoidPhase.STOPPING:
+            self._start_turn(now)
+        elif self._phase == AvoidPhase.TURNING:
+            self.drive.stop()
+            self._phase = AvoidPhase.VERIFYING
+
+    def _start_turn(self, now: float):
+        # Simple reactive behavior: rotate left.
+        # Readings from the old heading no longer describe what is ahead.
+        self._history.clear()
+        self.drive.turn_left()
+        self._phase = AvoidPhase.TURNING
+        self._phase_deadline = now + self.turn_duration
+
+    def _handle_clear(self):
+        self._phase = AvoidPhase.IDLE
+
+        if self._avoiding:
+            log.info("Path clear")
+
+            self._avoiding = False
+            self.fsm.on_obstacle_cleared()
@@ -0,0 +1,274 @@
+# navigation/occupancy_grid.py
+import math
+
+import numpy as np
+
+
+class OccupancyGrid:
+    """
+    2-D log-odds occupancy grid fed by ultrasonic readings.
+
+    - World frame is in cm; pose is (x_cm, y_cm, theta_rad).
+    - Cell (row, col) covers y in [row*res, (row+1)*res) and
+      x in [col*res, (col+1)*res), offset by the grid origin.
+    - The log-odds array is allocated once; updates touch only the
+      cells inside the sensor cone.
+    """
+
+    def __init__(
+        self,
+        width_cm: float,
+        height_cm: float,
+        resolution_cm: float = 5.0,
+        origin_cm: tuple = (0.0, 0.0),
+        cone_half_angle_deg: float = 15.0,
+        max_range_cm: float = 200.0,
+        l_occ: float = 0.85,
+        l_free: float = -0.4,
+        l_min: float = -4.0,
+        l_max: float = 4.0,
+        occupied_threshold: float = 0.0,
+    ):
+        """
+        :param width_cm: extent along x
+        :param height_cm: extent along y
+        :param resolution_cm: cell edge length
+        :param origin_cm: world (x, y) of cell (0, 0)'s corner
+        :param cone_half_angle_deg: ultrasonic beam half-width
+        :param max_range_cm: readings at/above this mark only free space
+        :param l_occ: log-odds added to cells at the measured range
+        :param l_free: log-odds added to cells before the measured range
+        :param l_min: lower clamp (keeps the map responsive to change)
+        :param l_max: upper clamp
+        :param occupied_threshold: log-odds above which a cell is occupied
+        """
+        self.resolution_cm = float(resolution_cm)
+        self.origin_cm = (float(origin_cm[0]), float(origin_cm[1]))
+        self.rows = int(math.ceil(height_cm / resolution_cm))
+        self.cols = int(math.ceil(width_cm / resolution_cm))
+
+        self.max_range_cm = float(max_range_cm)
+        self.cone_half_angle_deg = float(cone_half_angle_deg)
+        self.l_occ = l_occ
+        self.l_free = l_free
+        self.l_min = l_min
+        self.l_max = l_max
+        self.occupied_threshold = occupied_threshold
+
+        self.log_odds = np.zeros((self.rows, self.cols), dtype=np.float32)
+
+        # Bumped on every update that flips a cell's occupied/free state
+        self.version = 0
+
+        self._build_ray_template()
+
+    # -------------------------
+    # Precomputed cone geometry
+    # -------------------------
+
+    def _build_ray_template(self):
+        """
+        Sample the sensor cone once: enough rays that neighbouring rays
+        are at most one cell apart at max range, and range steps of
+        half a cell along each ray.
+        """
+        half = math.radians(self.cone_half_angle_deg)
+        arc_cm = 2.0 * half * self.max_range_cm
+        n_rays = max(1, int(math.ceil(arc_cm / self.resolution_cm)) + 1)
+
+        self._ray_offsets = np.linspace(-half, half, n_rays, dtype=np.float32)
+        self._ranges = np.arange(
+            0.0, self.max_range_cm, self.resolution_cm / 2.0, dtype=np.float32
+        )
+
+    # -------------------------
+    # Coordinates
+    # -------------------------
+
+    def world_to_cell(self, x_cm: float, y_cm: float):
+        """
+        Return (row, col) for a world point, or None if off the map.
+        """
+        col = int((x_cm - self.origin_cm[0]) // self.resolution_cm)
+        row = int((y_cm - self.origin_cm[1]) // self.resolution_cm)
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row, col
+        return None
+
+    def cell_to_world(self, row: int, col: int):
+        """
+        Return world (x, y) of a cell centre.
+        """
+        return (
+            self.origin_cm[0] + (col + 0.5) * self.resolution_cm,
+            self.origin_cm[1] + (row + 0.5) * self.resolution_cm,
+        )
+
+    def _flat_indices(self, xs, ys):
+        cols = np.floor((xs - self.origin_cm[0]) / self.resolution_cm).astype(np.intp)
+        rows = np.floor((ys - self.origin_cm[1]) / self.resolution_cm).astype(np.intp)
+        inside = (rows >= 0) & (rows < self.rows) & (cols >= 0) & (cols < self.cols)
+        return np.unique(rows[inside] * self.cols + cols[inside])
+
+    # -------------------------
+    # Updates
+    # -------------------------
+
+    def update(self, pose, distance_cm: float):
+        """
+        Integrate one ultrasonic reading taken from pose.
+
+        :param pose: (x_cm, y_cm, theta_rad) of the sensor
+        :param distance_cm: measured range (inf / >= max range = no echo)
+        :return: flat indices of cells whose occupied state flipped
+        """
+        if distance_cm is None or distance_cm <= 0:
+            return np.empty(0, dtype=np.intp)
+
+        x, y, theta = pose
+        hit = distance_cm < self.max_range_cm
+        reach = min(distance_cm, self.max_range_cm)
+
+        angles = theta + self._ray_offsets
+        cos_a = np.cos(angles)
+        sin_a = np.sin(angles)
+
+        # Free space: every sampled range short of the echo
+        free_r = self._ranges[self._ranges < reach - self.resolution_cm / 2.0]
+        free = self._flat_indices(
+            x + np.outer(cos_a, free_r), y + np.outer(sin_a, free_r)
+        )
+
+        if hit:
+            occ = self._flat_indices(x + reach * cos_a, y + reach * sin_a)
+            free = np.setdiff1d(free, occ, assume_unique=True)
+        else:
+            occ = np.empty(0, dtype=np.intp)
+
+        touched = np.concatenate((free, occ))
+        if touched.size == 0:
+            return touched
+
+        flat = self.log_odds.reshape(-1)
+        before = flat[touched] > self.occupied_threshold
+
+        flat[free] += self.l_free
+        flat[occ] += self.l_occ
+        flat[touched] = np.clip(flat[touched], self.l_min, self.l_max)
+
+        changed = touched[(flat[touched] > self.occupied_threshold) != before]
+        if changed.size:
+            self.version += 1
+        return changed
+
+    def clear(self):
+        self.log_odds.fill(0.0)
+        self.version += 1
+
+    # -------------------------
+    # Queries
+    # -------------------------
+
+    def probability(self, log_odds=None):
+        """
+        Occupancy probability for the whole grid (or a window of it).
+        """
+        if log_odds is None:
+            log_odds = self.log_odds
+        return 1.0 - 1.0 / (1.0 + np.exp(log_odds))
+
+    def occupied_mask(self, log_odds=None):
+        if log_odds is None:
+            log_odds = self.log_odds
+        return log_odds > self.occupied_threshold
+
+    def is_occupied(self, x_cm: float, y_cm: float) -> bool:
+        """
+        True if the world point is occupied or off the map.
+        """
+        cell = self.world_to_cell(x_cm, y_cm)
+        if cell is None:
+            return True
+        return bool(self.log_odds[cell] > self.occupied_threshold)
+
+    def window(self, x_cm: float, y_cm: float, half_size_cm: float):
+        """
+        View (no copy) of the log-odds around a world point.
+
+        :return: (view, (row0, col0)) where (row0, col0) is the grid
+                 index of the view's top-left cell
+        """
+        r = int(math.ceil(half_size_cm / self.resolution_cm))
+        col = int((x_cm - self.origin_cm[0]) // self.resolution_cm)
+        row = int((y_cm - self.origin_cm[1]) // self.resolution_cm)
+
+        row0 = max(0, row - r)
+        col0 = max(0, col - r)
+        row1 = min(self.rows, row + r + 1)
+        col1 = min(self.cols, col + r + 1)
+        return self.log_odds[row0:row1, col0:col1], (row0, col0)
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+
+    def save(self, path):
+        """
+        Save grid and its parameters to a compressed .npz file.
+        """
+        np.savez_compressed(
+            path,
+            log_odds=self.log_odds,
+            params=np.array(
+                [
+                    self.resolution_cm,
+                    self.origin_cm[0],
+                    self.origin_cm[1],
+                    self.cone_half_angle_deg,
+                    self.max_range_cm,
+                    self.l_occ,
+                    self.l_free,
+                    self.l_min,
+                    self.l_max,
+                    self.occupied_threshold,
+                ],
+                dtype=np.float64,
+            ),
+        )
+
+    @classmethod
+    def load(cls, path) -> "OccupancyGrid":
+        """
+        Load a grid written by save().
+        """
+        with np.load(path) as data:
+            log_odds = data["log_odds"]
+            (
+                resolution_cm,
+                origin_x,
+                origin_y,
+                cone_half_angle_deg,
+                max_range_cm,
+                l_occ,
+                l_free,
+                l_min,
+                l_max,
+                occupied_threshold,
+            ) = data["params"].tolist()
+
+        rows, cols = log_odds.shape
+        grid = cls(
+            width_cm=cols * resolution_cm,
+            height_cm=rows * resolution_cm,
+            resolution_cm=resolution_cm,
+            origin_cm=(origin_x, origin_y),
+            cone_half_angle_deg=cone_half_angle_deg,
+            max_range_cm=max_range_cm,
+            l_occ=l_occ,
+            l_free=l_free,
+            l_min=l_min,
+            l_max=l_max,
+            occupied_threshold=occupied_threshold,
+        )
+        grid.log_odds[...] = log_odds
+        return grid
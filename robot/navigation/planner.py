@@ -0,0 +1,440 @@
+# navigation/planner.py
+import math
+
+import numpy as np
+
+from utils.indexed_heap import IndexedHeap
+
+INF = math.inf
+
+# Returned by plan()/route() when max_expansions ran out before the
+# search converged; call again with the same goal to continue it.
+PENDING = object()
+
+# Integer move costs (10 per straight cell, 14 per diagonal) keep the
+# D* Lite keys exact; float keys drift as km accumulates and break ties.
+STRAIGHT = 10
+DIAGONAL = 14
+
+# 8-connected moves: (d_row, d_col, cost)
+NEIGHBOUR_MOVES = (
+    (-1, 0, STRAIGHT),
+    (1, 0, STRAIGHT),
+    (0, -1, STRAIGHT),
+    (0, 1, STRAIGHT),
+    (-1, -1, DIAGONAL),
+    (-1, 1, DIAGONAL),
+    (1, -1, DIAGONAL),
+    (1, 1, DIAGONAL),
+)
+
+
+class RouteCache:
+    """
+    Cache of named routes (e.g. "pharmacy" -> "room_12").
+    A route is dropped only when one of the cells it passes through
+    changes blocked/free state.
+    """
+
+    def __init__(self):
+        self._routes = {}      # key -> list of cells
+        self._by_cell = {}     # cell -> set of keys
+
+    def __len__(self):
+        return len(self._routes)
+
+    def get(self, key):
+        return self._routes.get(key)
+
+    def put(self, key, cells):
+        self.discard(key)
+        self._routes[key] = list(cells)
+        for c in cells:
+            self._by_cell.setdefault(c, set()).add(key)
+
+    def discard(self, key):
+        cells = self._routes.pop(key, None)
+        if cells is None:
+            return
+        for c in cells:
+            keys = self._by_cell.get(c)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_cell[c]
+
+    def invalidate(self, cells):
+        """
+        Drop every route touching any of the given cells.
+        :return: list of dropped keys
+        """
+        hit = set()
+        for c in cells:
+            keys = self._by_cell.get(c)
+            if keys:
+                hit.update(keys)
+        for key in hit:
+            self.discard(key)
+        return list(hit)
+
+
+class GridPlanner:
+    """
+    D* Lite path planner over an OccupancyGrid.
+
+    - Searches from the goal back to the robot, so when the robot moves
+      or a few cells change, only the affected part of the search is
+      repaired instead of replanning from scratch.
+    - Occupied cells are inflated by the robot radius.
+    - Named routes are cached in a RouteCache and invalidated only by
+      changes on the cells they use.
+    """
+
+    def __init__(self, grid, inflation_radius_cm: float = 10.0, route_reuse_radius_cm: float = 15.0):
+        """
+        :param grid: OccupancyGrid
+        :param inflation_radius_cm: clearance kept around obstacles
+        :param route_reuse_radius_cm: a cached route is reused only if
+                                      the robot is this close to it
+        """
+        self.grid = grid
+        self.rows = grid.rows
+        self.cols = grid.cols
+        self._inflate = int(math.ceil(inflation_radius_cm / grid.resolution_cm))
+        self._reuse = int(math.ceil(route_reuse_radius_cm / grid.resolution_cm))
+
+        # Precomputed neighbour offsets in flat-index space
+        self._moves = tuple(
+            (dr, dc, dr * self.cols + dc, cost) for dr, dc, cost in NEIGHBOUR_MOVES
+        )
+
+        self._blocked_mask = self._dilate(grid.occupied_mask())
+        self._blocked = bytearray(self._blocked_mask.astype(np.uint8).tobytes())
+
+        self.routes = RouteCache()
+
+        # D* Lite state
+        self._heap = IndexedHeap()
+        self._g = {}
+        self._rhs = {}
+        self._goal = None
+        self._start = None
+        self._last_start = None
+        self._km = 0
+
+    # -------------------------
+    # Public interface
+    # -------------------------
+
+    def plan(self, start_xy, goal_xy, max_expansions: int = 200000):
+        """
+        Plan from start to goal (world cm).
+        Reuses the previous search when the goal is unchanged.
+
+        :param max_expansions: search budget for this call; a control
+                               loop passes a small one and calls again
+                               on the next tick
+        :return: list of world (x, y) waypoints, None if unreachable,
+                 or PENDING if the budget ran out first
+        """
+        cells = self.plan_cells(start_xy, goal_xy, max_expansions)
+        if cells is None or cells is PENDING:
+            return cells
+        return self.cells_to_waypoints(cells)
+
+    def plan_cells(self, start_xy, goal_xy, max_expansions: int = 200000):
+        start = self._to_cell(start_xy)
+        goal = self._to_cell(goal_xy)
+        if start is None or goal is None:
+            return None
+
+        # After an avoidance manoeuvre the robot often sits inside the
+        # inflated margin (and goals are often next to furniture); use
+        # the closest cell outside it.
+        start = self._nearest_free(start)
+        goal = self._nearest_free(goal)
+        if start is None or goal is None:
+            return None
+
+        if goal != self._goal:
+            self._reset(start, goal)
+        elif start != self._start:
+            self._km += self._h(self._last_start, start)
+            self._last_start = start
+            self._start = start
+
+        if not self._compute_shortest_path(max_expansions):
+            return PENDING
+        return self._extract_path()
+
+    def route(self, key, start_xy, goal_xy, max_expansions: int = 200000):
+        """
+        Cached plan for a frequently travelled route. The cached path is
+        followed from its cell nearest the robot, so it is reused only
+        when the robot is on or next to it and the goal is unchanged;
+        otherwise the route is planned again.
+        :param key: hashable route name, e.g. ("pharmacy", "room_12")
+        :param max_expansions: as for plan()
+        """
+        cells = self.routes.get(key)
+        if cells is not None:
+            cells = self._rejoin(cells, self._to_cell(start_xy), self._to_cell(goal_xy))
+        if cells is None:
+            cells = self.plan_cells(start_xy, goal_xy, max_expansions)
+            if cells is None or cells is PENDING:
+                return cells
+            self.routes.put(key, cells)
+        return self.cells_to_waypoints(cells)
+
+    def _rejoin(self, cells, start, goal):
+        """
+        Remainder of a cached path from its cell nearest start, or None
+        if start is off the path or the path ends elsewhere.
+        """
+        if start is None or goal is None or self._nearest_free(goal) != cells[-1]:
+            return None
+        row, col = divmod(start, self.cols)
+        best, best_i = INF, 0
+        for i, c in enumerate(cells):
+            d = max(abs(c // self.cols - row), abs(c % self.cols - col))
+            if d < best:
+                best, best_i = d, i
+        if best > self._reuse:
+            return None
+        return cells[best_i:]
+
+    def notify_changed(self, changed_cells):
+        """
+        Feed cells whose occupancy flipped (as returned by
+        OccupancyGrid.update). Repairs the blocked map and the
+        current search, and invalidates cached routes crossing them.
+
+        :return: flat indices whose blocked state flipped
+        """
+        changed_cells = np.asarray(changed_cells, dtype=np.intp)
+        if changed_cells.size == 0:
+            return []
+
+        flipped = self._refresh_blocked(changed_cells)
+        if not flipped:
+            return flipped
+
+        self.routes.invalidate(flipped)
+
+        if self._goal is not None:
+            self._km += self._h(self._last_start, self._start)
+            self._last_start = self._start
+            for c in flipped:
+                self._update_vertex(c)
+                for nb, _ in self._neighbours(c):
+                    self._update_vertex(nb)
+        return flipped
+
+    def is_blocked(self, cell) -> bool:
+        return bool(self._blocked[cell])
+
+    def cells_to_waypoints(self, cells):
+        """
+        Convert a cell path to world waypoints, keeping only the cells
+        where direction changes (plus the goal).
+        """
+        if not cells:
+            return []
+        cols = self.cols
+        points = []
+        prev_dir = None
+        for a, b in zip(cells, cells[1:]):
+            d = (b // cols - a // cols, b % cols - a % cols)
+            if d != prev_dir and prev_dir is not None:
+                points.append(self._to_world(a))
+            prev_dir = d
+        points.append(self._to_world(cells[-1]))
+        return points
+
+    # -------------------------
+    # Blocked map (inflated occupancy)
+    # -------------------------
+
+    def _dilate(self, occ):
+        r = self._inflate
+        if r <= 0:
+            return occ.copy()
+        out = occ.copy()
+        for d in range(1, r + 1):
+            out[d:, :] |= occ[:-d, :]
+            out[:-d, :] |= occ[d:, :]
+        rows = out.copy()
+        for d in range(1, r + 1):
+            out[:, d:] |= rows[:, :-d]
+            out[:, :-d] |= rows[:, d:]
+        return out
+
+    def _refresh_blocked(self, changed_cells):
+        r = self._inflate
+        rows = changed_cells // self.cols
+        cols = changed_cells % self.cols
+
+        # Output region: every cell within r of a change
+        r0 = max(0, int(rows.min()) - r)
+        r1 = min(self.rows, int(rows.max()) + r + 1)
+        c0 = max(0, int(cols.min()) - r)
+        c1 = min(self.cols, int(cols.max()) + r + 1)
+
+        # Input region needs another r of context
+        ir0, ir1 = max(0, r0 - r), min(self.rows, r1 + r)
+        ic0, ic1 = max(0, c0 - r), min(self.cols, c1 + r)
+
+        occ = self.grid.occupied_mask(self.grid.log_odds[ir0:ir1, ic0:ic1])
+        dil = self._dilate(occ)[r0 - ir0:r1 - ir0, c0 - ic0:c1 - ic0]
+
+        region = self._blocked_mask[r0:r1, c0:c1]
+        fr, fc = np.nonzero(dil != region)
+        if fr.size == 0:
+            return []
+
+        region[...] = dil
+        flipped = ((fr + r0) * self.cols + (fc + c0)).tolist()
+        for c in flipped:
+            self._blocked[c] ^= 1
+        return flipped
+
+    # -------------------------
+    # D* Lite
+    # -------------------------
+
+    def _reset(self, start, goal):
+        self._heap.clear()
+        self._g.clear()
+        self._rhs.clear()
+        self._km = 0
+        self._start = self._last_start = start
+        self._goal = goal
+        self._rhs[goal] = 0
+        self._heap.push(goal, (self._h(start, goal), 0))
+
+    def _h(self, a, b):
+        """Octile distance in move-cost units."""
+        dr = abs(a // self.cols - b // self.cols)
+        dc = abs(a % self.cols - b % self.cols)
+        return STRAIGHT * max(dr, dc) + (DIAGONAL - STRAIGHT) * min(dr, dc)
+
+    def _key(self, s):
+        m = min(self._g.get(s, INF), self._rhs.get(s, INF))
+        return (m + self._h(self._start, s) + self._km, m)
+
+    def _neighbours(self, s):
+        """
+        Yield (neighbour, cost); cost is inf if either end is blocked.
+        """
+        row, col = divmod(s, self.cols)
+        blocked = self._blocked
+        s_blocked = blocked[s]
+        for dr, dc, off, cost in self._moves:
+            r, c = row + dr, col + dc
+            if 0 <= r < self.rows and 0 <= c < self.cols:
+                nb = s + off
+                yield nb, (INF if (s_blocked or blocked[nb]) else cost)
+
+    def _update_vertex(self, u):
+        if u != self._goal:
+            g = self._g
+            best = INF
+            for nb, cost in self._neighbours(u):
+                v = cost + g.get(nb, INF)
+                if v < best:
+                    best = v
+            self._rhs[u] = best
+        self._requeue(u)
+
+    def _requeue(self, u):
+        if self._g.get(u, INF) != self._rhs.get(u, INF):
+            self._heap.update(u, self._key(u))
+        else:
+            self._heap.discard(u)
+
+    def _compute_shortest_path(self, max_expansions: int = 200000) -> bool:
+        """
+        :return: False if max_expansions ran out before convergence (the
+                 search state is kept, so the next call continues it)
+        """
+        heap, g, rhs = self._heap, self._g, self._rhs
+        start, goal = self._start, self._goal
+        expansions = 0
+        while heap and (
+            heap.top_key() < self._key(start)
+            or rhs.get(start, INF) != g.get(start, INF)
+        ):
+            expansions += 1
+            if expansions > max_expansions:
+                return False
+            u, k_old = heap.peek()
+            k_new = self._key(u)
+            g_u = g.get(u, INF)
+            rhs_u = rhs.get(u, INF)
+            if k_old < k_new:
+                heap.update(u, k_new)
+            elif g_u > rhs_u:
+                # Cost to u dropped: neighbours can only improve via u
+                g[u] = rhs_u
+                heap.pop()
+                for nb, cost in self._neighbours(u):
+                    if nb != goal and cost + rhs_u < rhs.get(nb, INF):
+                        rhs[nb] = cost + rhs_u
+                        self._requeue(nb)
+            else:
+                # Cost to u rose: neighbours that relied on u recompute
+                g[u] = INF
+                self._update_vertex(u)
+                for nb, cost in self._neighbours(u):
+                    if nb != goal and rhs.get(nb, INF) == cost + g_u:
+                        self._update_vertex(nb)
+        return True
+
+    def _extract_path(self, max_len: int = 100000):
+        if self._g.get(self._start, INF) == INF:
+            return None
+        path = [self._start]
+        s = self._start
+        g = self._g
+        seen = {s}
+        while s != self._goal:
+            best, best_nb = INF, None
+            for nb, cost in self._neighbours(s):
+                v = cost + g.get(nb, INF)
+                if v < best:
+                    best, best_nb = v, nb
+            if best_nb is None or best_nb in seen or len(path) > max_len:
+                return None
+            s = best_nb
+            seen.add(s)
+            path.append(s)
+        return path
+
+    def _nearest_free(self, cell, max_radius: int | None = None):
+        if not self._blocked[cell]:
+            return cell
+        if max_radius is None:
+            max_radius = 2 * self._inflate + 1
+        row, col = divmod(cell, self.cols)
+        best, best_d = None, INF
+        for r in range(max(0, row - max_radius), min(self.rows, row + max_radius + 1)):
+            for c in range(max(0, col - max_radius), min(self.cols, col + max_radius + 1)):
+                idx = r * self.cols + c
+                if not self._blocked[idx]:
+                    d = (r - row) ** 2 + (c - col) ** 2
+                    if d < best_d:
+                        best, best_d = idx, d
+        return best
+
+    # -------------------------
+    # Coordinates
+    # -------------------------
+
+    def _to_cell(self, xy):
+        cell = self.grid.world_to_cell(xy[0], xy[1])
+        if cell is None:
+            return None
+        return cell[0] * self.cols + cell[1]
+
+    def _to_world(self, cell):
+        return self.grid.cell_to_world(cell // self.cols, cell % self.cols)
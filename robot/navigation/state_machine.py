@@ -1,4 +1,8 @@
 # navigation/state_machine.py
+import queue
+import threading
+import time
+from collections import deque, namedtuple
 from enum import Enum, auto
 
 
@@ -11,14 +15,76 @@ class RobotState(Enum):
     STOP = auto()
 
 
+class RobotEvent(Enum):
+    MANUAL_COMMAND = auto()
+    AUTONOMY_ENABLED = auto()
+    IDLE = auto()
+    OBSTACLE_DETECTED = auto()
+    OBSTACLE_CLEARED = auto()
+    MANIPULATION_START = auto()
+    MANIPULATION_DONE = auto()
+    EMERGENCY_STOP = auto()
+    RESET = auto()
+
+
+# Table target meaning "go back to the state before this one"
+PREVIOUS = object()
+
+Transition = namedtuple("Transition", ["t", "from_state", "to_state", "event"])
+
+
+def _build_transition_table():
+    """
+    (state, event) -> new state. Pairs not in the table are ignored.
+    """
+    table = {}
+    for s in RobotState:
+        table[(s, RobotEvent.MANUAL_COMMAND)] = RobotState.MANUAL
+        table[(s, RobotEvent.AUTONOMY_ENABLED)] = RobotState.AUTO
+        table[(s, RobotEvent.IDLE)] = RobotState.IDLE
+        table[(s, RobotEvent.EMERGENCY_STOP)] = RobotState.STOP
+        table[(s, RobotEvent.RESET)] = RobotState.IDLE
+
+        if s not in (RobotState.STOP, RobotState.MANIPULATE):
+            table[(s, RobotEvent.OBSTACLE_DETECTED)] = RobotState.AVOID
+
+        if s != RobotState.STOP:
+            table[(s, RobotEvent.MANIPULATION_START)] = RobotState.MANIPULATE
+
+    table[(RobotState.AVOID, RobotEvent.OBSTACLE_CLEARED)] = PREVIOUS
+    table[(RobotState.MANIPULATE, RobotEvent.MANIPULATION_DONE)] = RobotState.IDLE
+    return table
+
+
+TRANSITIONS = _build_transition_table()
+
+
 class StateMachine:
     """
     Finite State Machine controlling high-level robot behavior.
+
+    - Events are dispatched through a (state, event) -> state table
+    - Listeners are notified from a background thread, never from
+      the control loop
+    - Every transition is kept in a bounded in-memory log
     """
 
-    def __init__(self):
+    def __init__(self, transitions: dict | None = None, log_size: int = 512, clock=time.monotonic):
+        """
+        :param transitions: override the default transition table
+        :param log_size: transitions kept in the ring-buffer log
+        :param clock: monotonic time source (seconds)
+        """
         self._state = RobotState.IDLE
         self._prev_state = None
+        self._table = TRANSITIONS if transitions is None else transitions
+        self.clock = clock
+
+        self._log = deque(maxlen=log_size)
+
+        self._listeners = []
+        self._notify_queue = None
+        self._notify_thread = None
 
     # -------------------------
     # State access
@@ -28,18 +94,41 @@ class StateMachine:
     def state(self) -> RobotState:
         return self._state
 
+    @property
+    def previous_state(self) -> RobotState | None:
+        return self._prev_state
+
     # -------------------------
     # State transitions
     # -------------------------
 
-    def set_state(self, new_state: RobotState):
+    def dispatch(self, event: RobotEvent) -> bool:
+        """
+        Apply event using the transition table.
+        :return: True if the state changed
+        """
+        target = self._table.get((self._state, event))
+        if target is None:
+            return False
+        if target is PREVIOUS:
+            target = self._prev_state
+            if target is None:
+                return False
+        return self.set_state(target, event)
+
+    def set_state(self, new_state: RobotState, event: RobotEvent | None = None) -> bool:
         if new_state == self._state:
-            return
+            return False
 
         self._prev_state = self._state
         self._state = new_state
 
-        print(f"[FSM] {self._prev_state.name} → {self._state.name}")
+        record = Transition(self.clock(), self._prev_state, new_state, event)
+        self._log.append(record)
+        # Nobody drains the queue once the notifier is closed
+        if self._listeners and self._notify_thread is not None:
+            self._notify_queue.put(record)
+        return True
 
     def restore_previous(self):
         """
@@ -48,43 +137,107 @@ class StateMachine:
         if self._prev_state is not None:
             self.set_state(self._prev_state)
 
+    # -------------------------
+    # Listeners
+    # -------------------------
+
+    def add_listener(self, callback):
+        """
+        Register callback(transition: Transition).
+        Called on a background thread, in transition order.
+        """
+        if self._notify_thread is None:
+            self._notify_queue = queue.SimpleQueue()
+            self._notify_thread = threading.Thread(target=self._notify_loop, daemon=True)
+            self._notify_thread.start()
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def close(self):
+        """
+        Stop the notifier thread after pending notifications are delivered.
+        Later transitions are still logged but not delivered to listeners
+        (add_listener starts a new notifier).
+        """
+        if self._notify_thread is not None:
+            self._notify_queue.put(None)
+            self._notify_thread.join(timeout=1.0)
+            self._notify_thread = None
+
+    def _notify_loop(self):
+        while True:
+            record = self._notify_queue.get()
+            if record is None:
+                return
+            for callback in list(self._listeners):
+                try:
+                    callback(record)
+                except Exception:
+                    # A faulty listener must not kill notification delivery
+                    pass
+
+    # -------------------------
+    # Transition log
+    # -------------------------
+
+    def transitions(self, since: float | None = None, state: RobotState | None = None):
+        """
+        Transitions from the in-memory log, oldest first.
+        :param since: only those at/after this clock time
+        :param state: only those entering this state
+        """
+        records = list(self._log)
+        if since is not None:
+            records = [r for r in records if r.t >= since]
+        if state is not None:
+            records = [r for r in records if r.to_state == state]
+        return records
+
+    def dump_transitions(self, fp):
+        """
+        Write the log as text lines (e.g. after an incident).
+        :param fp: writable text file object
+        """
+        for r in list(self._log):
+            event = r.event.name if r.event is not None else "-"
+            fp.write(f"{r.t:.6f} {r.from_state.name} -> {r.to_state.name} ({event})\n")
+
     # -------------------------
     # Events
     # -------------------------
 
     def on_manual_command(self):
-        self.set_state(RobotState.MANUAL)
+        self.dispatch(RobotEvent.MANUAL_COMMAND)
 
     def on_autonomy_enabled(self):
-        self.set_state(RobotState.AUTO)
+        self.dispatch(RobotEvent.AUTONOMY_ENABLED)
 
     def on_idle(self):
-        self.set_state(RobotState.IDLE)
+        self.dispatch(RobotEvent.IDLE)
 
     def on_obstacle_detected(self):
-        if self._state not in (RobotState.STOP, RobotState.MANIPULATE):
-            self.set_state(RobotState.AVOID)
+        self.dispatch(RobotEvent.OBSTACLE_DETECTED)
 
     def on_obstacle_cleared(self):
-        if self._state == RobotState.AVOID:
-            self.restore_previous()
+        self.dispatch(RobotEvent.OBSTACLE_CLEARED)
 
     def on_manipulation_start(self):
         """
         Enter arm manipulation mode.
         """
-        if self._state != RobotState.STOP:
-            self.set_state(RobotState.MANIPULATE)
+        self.dispatch(RobotEvent.MANIPULATION_START)
 
     def on_manipulation_done(self):
         """
         Exit manipulation → IDLE (safe default).
         """
-        if self._state == RobotState.MANIPULATE:
-            self.set_state(RobotState.IDLE)
+        self.dispatch(RobotEvent.MANIPULATION_DONE)
 
     def on_emergency_stop(self):
-        self.set_state(RobotState.STOP)
+        self.dispatch(RobotEvent.EMERGENCY_STOP)
 
     def on_reset(self):
-        self.set_state(RobotState.IDLE)
+        self.dispatch(RobotEvent.RESET)
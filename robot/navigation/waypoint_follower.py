@@ -0,0 +1,100 @@
+# navigation/waypoint_follower.py
+import math
+
+
+class WaypointFollower:
+    """
+    Turn-then-drive waypoint following for a differential base.
+    Non-blocking: step() issues at most one drive command per call.
+    """
+
+    def __init__(
+        self,
+        drive,
+        pose_provider,
+        speed: int | None = None,
+        waypoint_tolerance_cm: float = 8.0,
+        heading_tolerance_deg: float = 20.0,
+    ):
+        """
+        :param drive: DriveBase instance
+        :param pose_provider: callable -> (x_cm, y_cm, theta_rad) or None
+        :param speed: forward speed (drive units); None = drive default
+        :param waypoint_tolerance_cm: distance at which a waypoint counts as reached
+        :param heading_tolerance_deg: turn in place above this heading error
+        """
+        self.drive = drive
+        self.pose_provider = pose_provider
+        self.speed = speed
+        self.waypoint_tolerance_cm = waypoint_tolerance_cm
+        self.heading_tolerance = math.radians(heading_tolerance_deg)
+
+        self._waypoints = []
+        self._index = 0
+
+        # True while the last command was a turn in place
+        self.turning = False
+
+    # -------------------------
+    # Path management
+    # -------------------------
+
+    @property
+    def active(self) -> bool:
+        return self._index < len(self._waypoints)
+
+    @property
+    def remaining(self):
+        return self._waypoints[self._index:]
+
+    def set_path(self, waypoints):
+        self._waypoints = list(waypoints or [])
+        self._index = 0
+
+    def clear(self):
+        self.set_path([])
+
+    # -------------------------
+    # Control
+    # -------------------------
+
+    def step(self) -> bool:
+        """
+        Drive toward the current waypoint.
+        :return: True once the last waypoint has been reached
+        """
+        self.turning = False
+        if not self.active:
+            return True
+
+        pose = self.pose_provider()
+        if pose is None:
+            self.drive.stop()
+            return False
+
+        x, y, theta = pose
+
+        # Skip every waypoint we are already on top of
+        while self.active:
+            wx, wy = self._waypoints[self._index]
+            if math.hypot(wx - x, wy - y) > self.waypoint_tolerance_cm:
+                break
+            self._index += 1
+
+        if not self.active:
+            self.drive.stop()
+            return True
+
+        wx, wy = self._waypoints[self._index]
+        error = math.atan2(wy - y, wx - x) - theta
+        error = math.atan2(math.sin(error), math.cos(error))
+
+        if error > self.heading_tolerance:
+            self.turning = True
+            self.drive.turn_left()
+        elif error < -self.heading_tolerance:
+            self.turning = True
+            self.drive.turn_right()
+        else:
+            self.drive.forward(self.speed)
+        return False
@@ -7,11 +7,19 @@ Adds simple overlays to trace face and pill regions.
 """
 
 import os
+import sys
 import time
 from datetime import datetime
+from pathlib import Path
 
 import cv2
 
+if not __package__:
+    # Run as a script (python preception/cvtest.py): make robot/ importable
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from preception.verification import Outcome, VerificationAggregator
+
 # ----------------------------
 # MOCK DATABASES
 # ----------------------------
@@ -51,6 +59,20 @@ def identify_pill(frame):
     return "red_round"
 
 
+# Per-frame confidence the mock identifiers report
+MOCK_CONFIDENCE = 0.9
+
+
+def classify_frame(frame):
+    # Per-frame evidence for the verification aggregator
+    return identify_patient(frame), MOCK_CONFIDENCE, identify_pill(frame), MOCK_CONFIDENCE
+
+
+def pill_matches(patient_id, pill_id):
+    patient = PATIENT_DATABASE.get(patient_id)
+    return bool(patient) and PILL_DATABASE.get(pill_id) == patient["required_pill"]
+
+
 # ----------------------------
 # HELPERS
 # ----------------------------
@@ -88,6 +110,25 @@ def report_detection(patient, detected_pill, is_ok):
     print("\nTimestamp:", datetime.now())
 
 
+def decision_result(decision):
+    # (patient, detected_pill, is_ok) as decided over several frames
+    patient = PATIENT_DATABASE.get(decision.patient_id)
+    detected_pill = PILL_DATABASE.get(decision.pill_id, "Unknown pill")
+    if decision.outcome == Outcome.TIMEOUT:
+        # Not confident either way: never dispense on a guess
+        return None, detected_pill, False
+    return patient, detected_pill, decision.outcome == Outcome.VERIFIED
+
+
+def report_decision(decision):
+    report_detection(*decision_result(decision))
+    print(
+        f"Decision: {decision.outcome.name} after {decision.frames} frames, "
+        f"{1000.0 * decision.elapsed_sec:.0f} ms "
+        f"(patient {decision.patient_confidence:.3f}, pill {decision.pill_confidence:.3f})"
+    )
+
+
 def overlay_text(frame, patient, detected_pill, is_ok):
     name = patient["name"] if patient else "Unknown"
     status = "Correct pill" if is_ok else "Incorrect pill"
@@ -163,23 +204,29 @@ def detect_pills(frame):
 
 def main(display_ms=DISPLAY_DURATION_MS):
     cap = cv2.VideoCapture(0)
-    info_printed = False
+    # Decide from several frames, not the first one
+    verifier = VerificationAggregator(pill_matches).start()
     start_time = time.time()
     face_cascade = load_face_cascade()
 
     if cap.isOpened():
         print("[camera] Using laptop webcam; press q or Esc to quit")
+        user_quit = False
         while True:
             success, frame = cap.read()
             if not success:
                 print("[camera] Frame read failed; falling back to demo image")
                 break
 
-            patient, detected_pill, is_ok = analyze_frame(frame)
+            if verifier.decision is None:
+                decision = verifier.add(*classify_frame(frame))
+                if decision is not None:
+                    report_decision(decision)
 
-            if not info_printed:
-                report_detection(patient, detected_pill, is_ok)
-                info_printed = True
+            if verifier.decision is not None:
+                patient, detected_pill, is_ok = decision_result(verifier.decision)
+            else:
+                patient, detected_pill, is_ok = analyze_frame(frame)
 
             face_boxes = detect_faces(frame, face_cascade)
             pill_boxes = detect_pills(frame)
@@ -190,6 +237,7 @@ def main(display_ms=DISPLAY_DURATION_MS):
 
             key = cv2.waitKey(1) & 0xFF
             if key in (ord("q"), 27):
+                user_quit = True
                 break
 
             if display_ms is not None:
@@ -199,7 +247,7 @@ def main(display_ms=DISPLAY_DURATION_MS):
         cap.release()
         cv2.destroyAllWindows()
 
-        if info_printed:
+        if user_quit or verifier.decision is not None:
             return
     else:
         print("[camera] Webcam unavailable; using demo image")
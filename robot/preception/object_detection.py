@@ -1,27 +1,46 @@
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-pass
\ No newline at end of file
+# preception/object_detection.py
+from utils.metrics import REGISTRY
+
+DETECT_SECONDS = REGISTRY.histogram("detect_pills_seconds", "detect_pills latency per frame")
+FRAMES_SCANNED = REGISTRY.counter("pill_scan_frames", "Frames run through pill detection")
+
+
+class PillScanner:
+    """
+    PILL_SCAN behavior: grab camera frames until pills are seen.
+    Runs as a JobExecutor job; OpenCV is loaded on the first scan.
+    """
+
+    def __init__(self, sensors, max_frames: int = 30, frame_period: float = 0.05):
+        """
+        :param sensors: SensorManager with a camera
+        :param max_frames: give up after this many frames
+        :param frame_period: pause between frames (seconds)
+        """
+        self.sensors = sensors
+        self.max_frames = max_frames
+        self.frame_period = frame_period
+        self.last_boxes = []
+
+    def search_for_pill(self, job):
+        """
+        :param job: communication.jobs.Job (cancel flag + progress)
+        :return: pill bounding boxes (x, y, w, h), empty if none found
+        """
+        from preception.cvtest import detect_pills
+
+        self.last_boxes = []
+        for i in range(self.max_frames):
+            if job.cancelled:
+                break
+            frame = self.sensors.get_camera_frame()
+            if frame is not None:
+                with DETECT_SECONDS.time():
+                    boxes = detect_pills(frame)
+                FRAMES_SCANNED.inc()
+                if boxes:
+                    self.last_boxes = boxes
+                    break
+            job.set_progress((i + 1) / self.max_frames)
+            job.wait(self.frame_period)
+        return self.last_boxes
@@ -0,0 +1,228 @@
+# preception/tray_inventory.py
+"""
+Pill counts per type for a dispensing tray, kept up to date frame by frame.
+
+- Pills are segmented by colour (same HSV ranges as detect_pills),
+  then counted with connected components; blobs larger than one pill
+  are split at distance-transform peaks, so touching pills count
+  separately
+- Counts are kept per tile of the image (a pill belongs to the tile
+  holding its centre). Each update diffs the frame against the last
+  counted one and recounts only the changed tiles, reading a margin
+  around them so pills crossing a tile edge are seen whole. A static
+  tray costs one absdiff per frame
+
+  inv = TrayInventory()
+  inv.update(frame)        # {"red_round": 4, "white_oval": 7}
+"""
+
+import time
+
+from utils.lazy_import import lazy_import
+from utils.metrics import REGISTRY
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+UPDATE_SECONDS = REGISTRY.histogram("tray_inventory_update_seconds", "Tray inventory update duration")
+
+# Pill type -> HSV ranges (OpenCV hue 0-179); keys match cvtest.PILL_DATABASE
+PILL_TYPES = {
+    "white_oval": [((0, 0, 150), (180, 50, 255))],
+    "red_round": [((0, 120, 70), (10, 255, 255)), ((160, 120, 70), (179, 255, 255))],
+}
+
+
+def pill_mask(hsv, ranges):
+    """
+    uint8 mask (0/255) of pixels inside any of the HSV ranges, denoised.
+    """
+    mask = cv2.inRange(hsv, *ranges[0])
+    for lo, hi in ranges[1:]:
+        mask |= cv2.inRange(hsv, lo, hi)
+    return cv2.medianBlur(mask, 5)
+
+
+def median_area(mask, min_area_px: int = 150):
+    """
+    Median blob area in a mask (None if there are no blobs).
+    """
+    areas = cv2.connectedComponentsWithStats(mask, connectivity=8)[2][1:, cv2.CC_STAT_AREA]
+    areas = areas[areas >= min_area_px]
+    return float(np.median(areas)) if areas.size else None
+
+
+def pill_centers(mask, min_area_px: int = 150, pill_area_px: float | None = None, split_ratio: float = 0.7):
+    """
+    Centre of every pill in a mask.
+    :param min_area_px: smaller blobs are noise
+    :param pill_area_px: area of one pill; blobs over 1.5x this are split
+                         (None = median blob area in this mask)
+    :param split_ratio: a split blob's pills are the regions where the
+                        distance to the background is at least this
+                        fraction of the blob's maximum
+    :return: float32 array (n, 2) of (x, y)
+    """
+    n, labels, stats, centroids = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    areas = stats[1:, cv2.CC_STAT_AREA]
+    keep = np.flatnonzero(areas >= min_area_px) + 1
+    if keep.size == 0:
+        return np.empty((0, 2), np.float32)
+    if pill_area_px is None:
+        pill_area_px = float(np.median(stats[keep, cv2.CC_STAT_AREA]))
+
+    large = keep[stats[keep, cv2.CC_STAT_AREA] > 1.5 * pill_area_px]
+    single = np.setdiff1d(keep, large, assume_unique=True)
+    centers = [centroids[single].astype(np.float32)]
+    for label in large:
+        x, y, w, h = stats[label, :4]
+        blob = (labels[y:y + h, x:x + w] == label).astype(np.uint8)
+        # Pad so the blob edge at the crop border still counts as background
+        dist = cv2.distanceTransform(cv2.copyMakeBorder(blob, 1, 1, 1, 1, cv2.BORDER_CONSTANT, 0), cv2.DIST_L2, 5)
+        peaks = (dist >= split_ratio * dist.max()).astype(np.uint8)
+        k, _, _, peak_centers = cv2.connectedComponentsWithStats(peaks, connectivity=8)
+        centers.append((peak_centers[1:] + (x - 1, y - 1)).astype(np.float32))
+    return np.concatenate(centers)
+
+
+class TrayInventory:
+    def __init__(
+        self,
+        pill_types: dict = PILL_TYPES,
+        tile_px: int = 32,
+        diff_threshold: int = 25,
+        min_changed_px: int = 12,
+        min_area_px: int = 150,
+        pill_area_px: dict | None = None,
+        split_ratio: float = 0.7,
+        margin_px: int = 32,
+    ):
+        """
+        :param pill_types: type -> list of (lo, hi) HSV ranges
+        :param tile_px: tile size for change tracking
+        :param diff_threshold: grey-level change that counts as changed
+        :param min_changed_px: changed pixels before a tile is recounted
+                               (ignores sensor noise and flicker)
+        :param pill_area_px: type -> area of one pill in pixels (types
+                             left out are estimated from the first frame
+                             they appear in)
+        :param margin_px: context read around changed tiles; at least
+                          one pill radius (more where pills clump)
+        """
+        self.pill_types = dict(pill_types)
+        self.types = list(self.pill_types)
+        self.tile_px = tile_px
+        self.diff_threshold = diff_threshold
+        self.min_changed_px = min_changed_px
+        self.min_area_px = min_area_px
+        self.pill_area_px = dict(pill_area_px or {})
+        self.split_ratio = split_ratio
+        self.margin_px = margin_px
+
+        self._reference = None   # grey frame the counts were taken from
+        self._tile_counts = None  # (types, tiles_y, tiles_x) int32
+        self.last_update = {}
+
+    @property
+    def counts(self) -> dict:
+        if self._tile_counts is None:
+            return {}
+        totals = self._tile_counts.sum(axis=(1, 2))
+        return {t: int(n) for t, n in zip(self.types, totals)}
+
+    def reset(self):
+        self._reference = None
+        self._tile_counts = None
+
+    # -------------------------
+    # Updates
+    # -------------------------
+
+    def update(self, frame) -> dict:
+        """
+        Recount the tiles that changed since the last counted frame.
+        :param frame: BGR image of the tray (same size every call)
+        :return: pill counts per type
+        """
+        t0 = time.perf_counter()
+        grey = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        h, w = grey.shape
+        ty, tx = -(-h // self.tile_px), -(-w // self.tile_px)
+
+        if self._reference is None or self._reference.shape != grey.shape:
+            self._reference = grey
+            self._tile_counts = np.zeros((len(self.types), ty, tx), np.int32)
+            changed = np.ones((ty, tx), np.uint8)
+        else:
+            changed = self._changed_tiles(grey, ty, tx)
+
+        regions = 0
+        processed_px = 0
+        if changed.any():
+            n, _, stats, _ = cv2.connectedComponentsWithStats(changed, connectivity=8)
+            for x0, y0, tw, th, _ in stats[1:]:
+                processed_px += self._recount(frame, grey, x0, y0, x0 + tw, y0 + th)
+            regions = n - 1
+
+        elapsed = time.perf_counter() - t0
+        UPDATE_SECONDS.observe(elapsed)
+        self.last_update = {
+            "changed_tiles": int(changed.sum()),
+            "regions": regions,
+            "processed_fraction": float(processed_px) / (h * w),
+            "seconds": elapsed,
+        }
+        return self.counts
+
+    def recount(self, frame) -> dict:
+        """
+        Full recount, ignoring what was counted before.
+        """
+        self.reset()
+        return self.update(frame)
+
+    def _changed_tiles(self, grey, ty: int, tx: int):
+        diff = cv2.absdiff(grey, self._reference)
+        _, moved = cv2.threshold(diff, self.diff_threshold, 1, cv2.THRESH_BINARY)
+        t = self.tile_px
+        h, w = moved.shape
+        if h % t or w % t:
+            moved = cv2.copyMakeBorder(moved, 0, ty * t - h, 0, tx * t - w, cv2.BORDER_CONSTANT, 0)
+        # Area resampling = fraction of changed pixels per tile
+        fraction = cv2.resize(moved.astype(np.float32), (tx, ty), interpolation=cv2.INTER_AREA)
+        return (fraction * (t * t) >= self.min_changed_px - 0.5).astype(np.uint8)
+
+    def _recount(self, frame, grey, tx0: int, ty0: int, tx1: int, ty1: int) -> int:
+        """
+        Recount the tile rectangle [tx0, tx1) x [ty0, ty1).
+        :return: pixels read
+        """
+        t = self.tile_px
+        h, w = grey.shape
+        # Owned pixels, and the window read around them
+        ox0, oy0, ox1, oy1 = tx0 * t, ty0 * t, min(tx1 * t, w), min(ty1 * t, h)
+        m = self.margin_px
+        rx0, ry0, rx1, ry1 = max(ox0 - m, 0), max(oy0 - m, 0), min(ox1 + m, w), min(oy1 + m, h)
+
+        hsv = cv2.cvtColor(frame[ry0:ry1, rx0:rx1], cv2.COLOR_BGR2HSV)
+        counts = self._tile_counts
+        counts[:, ty0:ty1, tx0:tx1] = 0
+        for i, pill_type in enumerate(self.types):
+            mask = pill_mask(hsv, self.pill_types[pill_type])
+            if pill_type not in self.pill_area_px:
+                # Calibrate on the first view of this type (best on a
+                # tray with most pills apart)
+                area = median_area(mask, self.min_area_px)
+                if area is not None:
+                    self.pill_area_px[pill_type] = area
+            centers = pill_centers(mask, self.min_area_px, self.pill_area_px.get(pill_type), self.split_ratio)
+            if not len(centers):
+                continue
+            cx = (centers[:, 0] + rx0).astype(np.int32) // t
+            cy = (centers[:, 1] + ry0).astype(np.int32) // t
+            # Pills centred in the margin belong to unchanged tiles
+            own = (cx >= tx0) & (cx < tx1) & (cy >= ty0) & (cy < ty1)
+            np.add.at(counts[i], (cy[own], cx[own]), 1)
+
+        self._reference[oy0:oy1, ox0:ox1] = grey[oy0:oy1, ox0:ox1]
+        return int((ry1 - ry0) * (rx1 - rx0))
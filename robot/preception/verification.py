@@ -0,0 +1,259 @@
+# preception/verification.py
+"""
+Multi-frame patient/pill verification.
+
+Each frame contributes (patient_id, confidence) and (pill_id, confidence)
+evidence. Over a sliding window the votes are combined as log-odds: a
+frame voting for a label adds logit(conf) to it, and a frame voting for
+a different label counts the same amount against it. Frames with no
+detection (id None) add nothing. The aggregator commits as soon as both
+the patient and the pill clear the confidence threshold, so clear cases
+finish in a few frames; noisy ones keep collecting until the deadline,
+then give up (TIMEOUT) instead of guessing.
+
+  agg = VerificationAggregator(matches, confidence=0.99, deadline_sec=3.0)
+  agg.start()
+  for frame in frames:
+      decision = agg.add(*classify(frame))
+      if decision:
+          break
+"""
+
+import math
+import time
+from collections import deque, namedtuple
+from enum import Enum, auto
+
+from utils.logger import kv, setup_logger
+from utils.metrics import REGISTRY
+
+log = setup_logger(__name__)
+
+# One frame can never be more sure than this, so a single overconfident
+# misread cannot decide on its own; votes at or below 0.5 carry no weight
+MAX_FRAME_CONFIDENCE = 0.95
+
+
+class Outcome(Enum):
+    VERIFIED = auto()   # right pill for the identified patient
+    MISMATCH = auto()   # confidently the wrong pill: do not dispense
+    TIMEOUT = auto()    # no confident decision before the deadline
+
+
+VERIFY_SECONDS = REGISTRY.histogram("verification_seconds", "Time from first frame to verification decision")
+VERIFY_FRAMES = REGISTRY.histogram(
+    "verification_frames", "Frames used per verification decision", buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55)
+)
+VERIFY_OUTCOMES = {
+    o: REGISTRY.counter("verification_decisions", "Verification decisions", {"outcome": o.name.lower()})
+    for o in Outcome
+}
+
+Evidence = namedtuple("Evidence", ["t", "patient_id", "patient_logit", "pill_id", "pill_logit"])
+Decision = namedtuple(
+    "Decision",
+    ["outcome", "patient_id", "pill_id", "patient_confidence", "pill_confidence", "frames", "elapsed_sec"],
+)
+
+
+def _logit(p: float) -> float:
+    p = min(max(p, 0.5), MAX_FRAME_CONFIDENCE)
+    return math.log(p / (1.0 - p))
+
+
+def _sigmoid(x: float) -> float:
+    if x >= 0:
+        return 1.0 / (1.0 + math.exp(-x))
+    e = math.exp(x)
+    return e / (1.0 + e)
+
+
+class _Votes:
+    """
+    Running log-odds per label for the frames in the window.
+    """
+
+    def __init__(self):
+        self.by_label = {}
+        self.total = 0.0
+
+    def add(self, label, weight: float, sign: int = 1):
+        if label is None:
+            return
+        self.by_label[label] = self.by_label.get(label, 0.0) + sign * weight
+        self.total += sign * weight
+        if abs(self.by_label[label]) < 1e-12:
+            del self.by_label[label]
+
+    def best(self):
+        """
+        (label, confidence) of the strongest label, or (None, 0.0).
+        """
+        if not self.by_label:
+            return None, 0.0
+        label, score = max(self.by_label.items(), key=lambda kv_: kv_[1])
+        # Own votes minus everyone else's
+        return label, _sigmoid(2.0 * score - self.total)
+
+
+class VerificationAggregator:
+    def __init__(
+        self,
+        matches,
+        window_frames: int = 15,
+        confidence: float = 0.99,
+        deadline_sec: float = 3.0,
+        min_frames: int = 2,
+        clock=time.monotonic,
+    ):
+        """
+        :param matches: callable(patient_id, pill_id) -> True if that pill
+                        is the one prescribed for the patient
+        :param window_frames: frames kept (older evidence is forgotten)
+        :param confidence: combined confidence needed to commit, for both
+                           the patient and the pill
+        :param deadline_sec: give up (TIMEOUT) after this long
+        :param min_frames: never commit on fewer frames than this
+        :param clock: monotonic time source (seconds)
+        """
+        if not 0.5 < confidence < 1.0:
+            raise ValueError("confidence must be in (0.5, 1)")
+        self.matches = matches
+        self.window_frames = window_frames
+        self.confidence = confidence
+        self.deadline_sec = deadline_sec
+        self.min_frames = min_frames
+        self.clock = clock
+
+        self.decision = None
+        self._window = deque()
+        self._patients = _Votes()
+        self._pills = _Votes()
+        self._frames = 0
+        self._t0 = None
+
+    @classmethod
+    def from_config(cls, matches, config: dict, clock=time.monotonic):
+        """
+        :param config: full config; uses the "verification" section
+        """
+        cfg = config.get("verification", {})
+        return cls(
+            matches,
+            window_frames=cfg.get("window_frames", 15),
+            confidence=cfg.get("confidence", 0.99),
+            deadline_sec=cfg.get("deadline_sec", 3.0),
+            min_frames=cfg.get("min_frames", 2),
+            clock=clock,
+        )
+
+    # -------------------------
+    # Evidence
+    # -------------------------
+
+    def start(self):
+        """
+        Reset and start the deadline clock.
+        """
+        self.decision = None
+        self._window.clear()
+        self._patients = _Votes()
+        self._pills = _Votes()
+        self._frames = 0
+        self._t0 = self.clock()
+        return self
+
+    def add(self, patient_id, patient_confidence: float, pill_id, pill_confidence: float):
+        """
+        Add one frame's evidence (ids may be None when nothing was seen).
+        :return: Decision once made (also kept in .decision), else None
+        """
+        if self.decision is not None:
+            return self.decision
+        if self._t0 is None:
+            self.start()
+
+        ev = Evidence(self.clock(), patient_id, _logit(patient_confidence), pill_id, _logit(pill_confidence))
+        self._window.append(ev)
+        self._patients.add(ev.patient_id, ev.patient_logit)
+        self._pills.add(ev.pill_id, ev.pill_logit)
+        if len(self._window) > self.window_frames:
+            old = self._window.popleft()
+            self._patients.add(old.patient_id, old.patient_logit, -1)
+            self._pills.add(old.pill_id, old.pill_logit, -1)
+        self._frames += 1
+
+        patient_id, patient_conf = self._patients.best()
+        pill_id, pill_conf = self._pills.best()
+        if (
+            self._frames >= self.min_frames
+            and patient_conf >= self.confidence
+            and pill_conf >= self.confidence
+        ):
+            outcome = Outcome.VERIFIED if self.matches(patient_id, pill_id) else Outcome.MISMATCH
+            return self._decide(outcome, ev.t)
+        return self.check_deadline(ev.t)
+
+    def check_deadline(self, now: float | None = None):
+        """
+        TIMEOUT decision if the deadline has passed (call this when
+        frames stop arriving), else None.
+        """
+        if self.decision is not None:
+            return self.decision
+        if self._t0 is None:
+            return None
+        now = self.clock() if now is None else now
+        if now - self._t0 >= self.deadline_sec:
+            return self._decide(Outcome.TIMEOUT, now)
+        return None
+
+    def finish(self):
+        """
+        Force a decision now (TIMEOUT unless one was already made),
+        e.g. when the frame source ends early.
+        """
+        if self.decision is None:
+            if self._t0 is None:
+                self.start()
+            self._decide(Outcome.TIMEOUT, self.clock())
+        return self.decision
+
+    def _decide(self, outcome: Outcome, now: float):
+        patient_id, patient_conf = self._patients.best()
+        pill_id, pill_conf = self._pills.best()
+        elapsed = now - self._t0
+        self.decision = Decision(outcome, patient_id, pill_id, patient_conf, pill_conf, self._frames, elapsed)
+
+        VERIFY_SECONDS.observe(elapsed)
+        VERIFY_FRAMES.observe(self._frames)
+        VERIFY_OUTCOMES[outcome].inc()
+        log.info(
+            "Verification %s",
+            outcome.name,
+            extra=kv(
+                patient=patient_id,
+                pill=pill_id,
+                frames=self._frames,
+                time_to_decision_ms=round(1000.0 * elapsed, 1),
+            ),
+        )
+        return self.decision
+
+
+def verify_frames(frames, classify, aggregator: VerificationAggregator):
+    """
+    Run frames through classify until the aggregator decides.
+    :param frames: iterable of frames (None entries = failed grabs)
+    :param classify: callable(frame) -> (patient_id, patient_conf, pill_id, pill_conf)
+    :return: Decision (TIMEOUT if frames run out before a decision)
+    """
+    aggregator.start()
+    for frame in frames:
+        if frame is None:
+            decision = aggregator.check_deadline()
+        else:
+            decision = aggregator.add(*classify(frame))
+        if decision is not None:
+            return decision
+    return aggregator.finish()
@@ -0,0 +1,29 @@
+# recording/__init__.py
+
+from .flight_recorder import (
+    ArmCmd,
+    DriveCmd,
+    FlightRecorder,
+    Kind,
+    NavCmd,
+    Record,
+    Recording,
+    read_recording,
+)
+from .taps import RecordingArm, RecordingDrive
+
+# The replay driver lives in recording.replay (python -m recording.replay);
+# it imports the navigation stack, which itself imports this package.
+
+__all__ = [
+    "ArmCmd",
+    "DriveCmd",
+    "FlightRecorder",
+    "Kind",
+    "NavCmd",
+    "Record",
+    "Recording",
+    "read_recording",
+    "RecordingArm",
+    "RecordingDrive",
+]
@@ -0,0 +1,243 @@
+# recording/flight_recorder.py
+"""
+Flight recorder: a fixed-size ring of binary records in a memory-mapped file.
+
+File layout
+  header: magic, version, header size, record size, capacity and a JSON
+          metadata blob (config, role, start time, ...)
+  ring:   capacity slots of RECORD.size bytes
+
+A record is (seq, t, kind, code, aux, n, a, b, c). seq starts at 1 and
+lives in slot (seq - 1) % capacity, so once the ring wraps the oldest
+records are overwritten; readers order by seq and skip empty (seq 0) slots.
+
+Writing a record is one struct.pack_into() into the mapping: no
+allocation, no syscall and no lock (seq comes from itertools.count and
+pack_into runs under the GIL). The kernel writes the dirty pages back, so
+a recording survives a crash of the robot process.
+"""
+
+import itertools
+import json
+import math
+import mmap
+import os
+import struct
+import time
+from collections import namedtuple
+from enum import IntEnum
+
+from utils.config import JOINTS
+
+MAGIC = b"RSFLTREC"
+VERSION = 1
+
+_HEADER = struct.Struct("<8sHIHII")  # magic, version, header size, record size, capacity, meta len
+RECORD = struct.Struct("<QdBBHIddd")  # seq, t, kind, code, aux, n, a, b, c
+PAGE = 4096
+
+NAN = math.nan
+
+Record = namedtuple("Record", ["seq", "t", "kind", "code", "aux", "n", "a", "b", "c"])
+
+
+class Kind(IntEnum):
+    TICK = 1   # Navigator.step: t = start, (a, b, c) = pose or NaN
+    SONAR = 2  # a = distance_cm (NaN = no reading)
+    FRAME = 3  # code = ok, n = frame number, (a, b, c) = height, width, channels
+    DRIVE = 4  # code = DriveCmd, a = speed, (b, c) = linear, angular
+    ARM = 5    # code = ArmCmd, aux = joint index, (a, b, c) = angle or x, y, z
+    FSM = 6    # code = from state, aux = to state, n = event (0 = none)
+    NAV = 7    # code = NavCmd, (a, b) = linear/angular or goal x/y
+
+
+class DriveCmd(IntEnum):
+    FORWARD = 1
+    BACKWARD = 2
+    TURN_LEFT = 3
+    TURN_RIGHT = 4
+    STOP = 5
+    MOVE = 6
+    EMERGENCY_STOP = 7
+
+
+class ArmCmd(IntEnum):
+    HOME = 1
+    MOVE_JOINT = 2
+    OPEN_GRIPPER = 3
+    CLOSE_GRIPPER = 4
+    STOP = 5
+    MOVE_TO_XYZ = 6
+
+
+class NavCmd(IntEnum):
+    MANUAL = 1
+    AUTONOMY = 2
+    GO_TO = 3
+    CANCEL = 4
+    EMERGENCY_STOP = 5
+    RESET = 6
+
+
+_JOINT_INDEX = {j: i for i, j in enumerate(JOINTS)}
+
+
+def _num(value) -> float:
+    return NAN if value is None else float(value)
+
+
+class FlightRecorder:
+    def __init__(self, path, capacity: int = 65536, meta: dict | None = None, clock=time.monotonic):
+        """
+        Create (or overwrite) a recording.
+
+        :param path: ring file location
+        :param capacity: records kept (file size is about capacity * 48 bytes)
+        :param meta: JSON-serialisable run metadata stored in the header;
+                     replay uses meta["config"] and meta["grid"] if present
+        :param clock: time source for record timestamps; use the
+                      Navigator's clock so ticks and samples line up
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        blob = json.dumps(meta or {}, default=dict).encode()
+        header_size = -(-(_HEADER.size + len(blob)) // PAGE) * PAGE
+
+        self.path = os.fspath(path)
+        self.capacity = capacity
+        self.clock = clock
+
+        size = header_size + capacity * RECORD.size
+        with open(self.path, "w+b") as f:
+            f.truncate(size)
+            self._mm = mmap.mmap(f.fileno(), size)
+        _HEADER.pack_into(self._mm, 0, MAGIC, VERSION, header_size, RECORD.size, capacity, len(blob))
+        self._mm[_HEADER.size:_HEADER.size + len(blob)] = blob
+
+        self._base = header_size
+        self._seq = itertools.count(1)
+        self._pack = RECORD.pack_into
+        self._frames = itertools.count(1)
+
+    # -------------------------
+    # Hot path
+    # -------------------------
+
+    def record(self, kind, code=0, aux=0, n=0, a=NAN, b=NAN, c=NAN, t=None):
+        seq = next(self._seq)
+        self._pack(
+            self._mm,
+            self._base + ((seq - 1) % self.capacity) * RECORD.size,
+            seq,
+            self.clock() if t is None else t,
+            kind, code, aux, n, a, b, c,
+        )
+
+    def sonar(self, distance_cm):
+        self.record(Kind.SONAR, a=_num(distance_cm))
+
+    def frame(self, frame):
+        """
+        Camera frame metadata only (number and shape), never pixels.
+        """
+        shape = getattr(frame, "shape", None)
+        if shape is None:
+            self.record(Kind.FRAME, code=0, n=next(self._frames))
+            return
+        channels = shape[2] if len(shape) > 2 else 1
+        self.record(Kind.FRAME, code=1, n=next(self._frames), a=shape[0], b=shape[1], c=channels)
+
+    def drive(self, cmd: DriveCmd, speed=None, linear=NAN, angular=NAN):
+        self.record(Kind.DRIVE, code=cmd, a=_num(speed), b=linear, c=angular)
+
+    def arm(self, cmd: ArmCmd, joint: str | None = None, a=NAN, b=NAN, c=NAN):
+        self.record(Kind.ARM, code=cmd, aux=_JOINT_INDEX.get(joint, 0xFFFF), a=a, b=b, c=c)
+
+    def nav(self, cmd: NavCmd, a=NAN, b=NAN):
+        self.record(Kind.NAV, code=cmd, a=a, b=b)
+
+    def tick(self, t: float, pose=None):
+        if pose is None:
+            self.record(Kind.TICK, t=t)
+        else:
+            self.record(Kind.TICK, t=t, a=pose[0], b=pose[1], c=pose[2])
+
+    def transition(self, tr):
+        """
+        StateMachine listener: fsm.add_listener(recorder.transition).
+        Runs on the FSM's notify thread, stamped with the transition time.
+        """
+        event = tr.event.value if tr.event is not None else 0
+        from_state = tr.from_state.value if tr.from_state is not None else 0
+        self.record(Kind.FSM, code=from_state, aux=tr.to_state.value, n=event, t=tr.t)
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+
+    def flush(self):
+        self._mm.flush()
+
+    def close(self):
+        if not self._mm.closed:
+            self._mm.flush()
+            self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# -------------------------
+# Reading
+# -------------------------
+
+class Recording:
+    def __init__(self, meta: dict, records: list, capacity: int):
+        """
+        :param meta: header metadata
+        :param records: Record tuples in write (seq) order
+        :param capacity: ring size the file was written with
+        """
+        self.meta = meta
+        self.records = records
+        self.capacity = capacity
+
+    @property
+    def overwritten(self) -> int:
+        """
+        Records lost to ring wrap-around (the recording starts mid-run).
+        """
+        return self.records[-1].seq - len(self.records) if self.records else 0
+
+    def of_kind(self, kind: Kind) -> list:
+        return [r for r in self.records if r.kind == kind]
+
+    @property
+    def duration(self) -> float:
+        ticks = self.of_kind(Kind.TICK)
+        return ticks[-1].t - ticks[0].t if len(ticks) > 1 else 0.0
+
+    def __len__(self):
+        return len(self.records)
+
+
+def read_recording(path) -> Recording:
+    """
+    Load a ring file (also while it is still being written).
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, header_size, record_size, capacity, meta_len = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a flight recording")
+    if version != VERSION or record_size != RECORD.size:
+        raise ValueError(f"{path}: unsupported recording version {version}")
+    meta = json.loads(data[_HEADER.size:_HEADER.size + meta_len] or b"{}")
+
+    ring = memoryview(data)[header_size:header_size + capacity * record_size]
+    records = [Record(*r) for r in RECORD.iter_unpack(ring) if r[0]]
+    records.sort(key=lambda r: r.seq)
+    return Recording(meta, records, capacity)
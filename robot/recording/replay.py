@@ -0,0 +1,279 @@
+# recording/replay.py
+"""
+Deterministic replay of a flight recording.
+
+The recorded sonar readings, poses and operator inputs are fed back
+through a SensorManager and a fresh Navigator on a VirtualClock, one
+recorded tick at a time and as fast as the stack runs. The drive
+commands and FSM transitions it produces are compared with the recorded
+ones, so a change to the control code (or config) can be checked for
+behavioural drift and timed on real inputs.
+
+Camera frames are recorded as metadata only and are not replayed.
+Drive commands issued outside Navigator.step (STOP from the command
+server, the end of a drive job) are counted but not compared.
+
+Usage (from the robot/ directory):
+  python -m recording.replay run.rec --json before.json
+  python -m recording.replay run.rec --config candidate.json --baseline before.json
+"""
+
+import argparse
+import json
+import math
+import time
+from collections import deque
+
+from drive.drive_base import DriveBase
+from navigation.navigation import Navigator
+from navigation.state_machine import StateMachine
+from recording.flight_recorder import DriveCmd, Kind, NavCmd, read_recording
+from sensors.sensor_manager import SensorManager
+from simulation.clock import VirtualClock
+
+NAN = math.nan
+
+
+def _opt(value):
+    """
+    NaN (the recorder's "no value") -> None; floats rounded for comparison.
+    """
+    if value != value:  # NaN
+        return None
+    return round(value, 6)
+
+
+def _drive_key(code, speed, linear, angular) -> tuple:
+    return (DriveCmd(code).name, _opt(speed), _opt(linear), _opt(angular))
+
+
+# -------------------------
+# Replay doubles
+# -------------------------
+
+class ReplayUltrasonic:
+    """
+    Serves the readings recorded during the tick being replayed, in
+    order. Reads beyond those repeat the last one; a recorded "no
+    reading" raises, so SensorManager reports None as it did live.
+    """
+
+    def __init__(self):
+        self._pending = deque()
+        self._last = None
+
+    def load(self, readings):
+        self._pending = deque(readings)
+
+    def read_cm(self) -> float:
+        if self._pending:
+            self._last = self._pending.popleft()
+        if self._last is None:
+            raise RuntimeError("no reading recorded")
+        return self._last
+
+
+class ReplayDrive(DriveBase):
+    """
+    Logs commands instead of moving, in the recorder's format.
+    """
+
+    def __init__(self, config: dict):
+        super().__init__(config)
+        self.commands = []
+
+    def _log(self, cmd, speed=None, linear=NAN, angular=NAN):
+        self.commands.append(_drive_key(cmd, NAN if speed is None else float(speed), linear, angular))
+
+    def forward(self, speed=None):
+        self._log(DriveCmd.FORWARD, speed)
+
+    def backward(self, speed=None):
+        self._log(DriveCmd.BACKWARD, speed)
+
+    def turn_left(self, speed=None):
+        self._log(DriveCmd.TURN_LEFT, speed)
+
+    def turn_right(self, speed=None):
+        self._log(DriveCmd.TURN_RIGHT, speed)
+
+    def stop(self):
+        self._log(DriveCmd.STOP)
+
+    def move(self, linear, angular):
+        self._log(DriveCmd.MOVE, linear=float(linear), angular=float(angular))
+
+    def emergency_stop(self):
+        self._log(DriveCmd.EMERGENCY_STOP)
+
+
+# -------------------------
+# Driver
+# -------------------------
+
+def _apply_nav_input(nav, r):
+    cmd = NavCmd(r.code)
+    if cmd == NavCmd.MANUAL:
+        nav.handle_manual_command(r.a, r.b)
+    elif cmd == NavCmd.AUTONOMY:
+        nav.enable_autonomy()
+    elif cmd == NavCmd.GO_TO:
+        nav.go_to((r.a, r.b))
+    elif cmd == NavCmd.CANCEL:
+        nav.cancel_goal()
+    elif cmd == NavCmd.EMERGENCY_STOP:
+        nav.emergency_stop()
+    elif cmd == NavCmd.RESET:
+        nav.reset_from_stop()
+
+
+def first_difference(expected: list, actual: list):
+    """
+    Index of the first tick whose command lists differ (None if equal).
+    """
+    for i, (a, b) in enumerate(zip(expected, actual)):
+        if a != b:
+            return i
+    if len(expected) != len(actual):
+        return min(len(expected), len(actual))
+    return None
+
+
+def replay(recording, config=None, grid=None) -> dict:
+    """
+    Run a recording through a fresh Navigator.
+
+    :param recording: Recording (see read_recording)
+    :param config: full config dict (default: the recorded meta["config"])
+    :param grid: OccupancyGrid (default: built from meta["grid"], if recorded)
+    :return: metrics plus per-tick drive commands ("recorded", "replayed")
+    """
+    meta = recording.meta
+    config = config if config is not None else meta.get("config", {})
+    if grid is None and "grid" in meta:
+        from navigation.occupancy_grid import OccupancyGrid
+
+        grid = OccupancyGrid(**meta["grid"])
+
+    recorded_fsm = recording.of_kind(Kind.FSM)
+    clock = VirtualClock()
+    drive = ReplayDrive(config.get("drive", {}))
+    sonar = ReplayUltrasonic()
+    sensors = SensorManager(ultrasonic=sonar)
+    fsm = StateMachine(log_size=max(512, 2 * len(recorded_fsm) + 16), clock=clock)
+    pose = [None]
+    nav = Navigator(
+        drive,
+        sensors,
+        fsm,
+        config,
+        grid=grid,
+        pose_provider=(lambda: pose[0]) if grid is not None else None,
+        clock=clock,
+    )
+
+    readings = []
+    drive_records = []
+    recorded, replayed = [], []
+    external = 0
+    step_costs = []
+    perf = time.perf_counter
+
+    wall_start = perf()
+    for r in recording.records:
+        kind = r.kind
+        if kind == Kind.SONAR:
+            readings.append(_opt(r.a))
+        elif kind == Kind.DRIVE:
+            drive_records.append(r)
+        elif kind == Kind.NAV:
+            clock.t = r.t
+            _apply_nav_input(nav, r)
+        elif kind == Kind.TICK:
+            # Commands stamped before the tick started came from elsewhere
+            inside = [_drive_key(d.code, d.a, d.b, d.c) for d in drive_records if d.t >= r.t]
+            external += len(drive_records) - len(inside)
+            recorded.append(inside)
+            drive_records = []
+
+            clock.t = r.t
+            pose[0] = None if r.a != r.a else (r.a, r.b, r.c)
+            sonar.load(readings)
+            readings = []
+
+            n = len(drive.commands)
+            t0 = perf()
+            nav.step()
+            step_costs.append(perf() - t0)
+            replayed.append(drive.commands[n:])
+    wall = perf() - wall_start
+
+    expected_fsm = [(r.code, r.aux, r.n) for r in recorded_fsm]
+    actual_fsm = [
+        (
+            t.from_state.value if t.from_state is not None else 0,
+            t.to_state.value,
+            t.event.value if t.event is not None else 0,
+        )
+        for t in fsm.transitions()
+    ]
+
+    ticks = len(step_costs)
+    step_costs.sort()
+    return {
+        "ticks": ticks,
+        "recorded_sec": recording.duration,
+        "wall_sec": wall,
+        "speedup": recording.duration / wall if wall > 0 else math.inf,
+        "step_mean_ms": 1e3 * sum(step_costs) / max(1, ticks),
+        "step_p99_ms": 1e3 * step_costs[int(0.99 * (ticks - 1))] if ticks else 0.0,
+        "overwritten": recording.overwritten,
+        "external_drive_commands": external,
+        "ticks_differing": sum(1 for a, b in zip(recorded, replayed) if a != b),
+        "first_divergent_tick": first_difference(recorded, replayed),
+        "transitions_recorded": len(expected_fsm),
+        "transitions_replayed": len(actual_fsm),
+        "transitions_match": expected_fsm == actual_fsm,
+        "recorded": recorded,
+        "replayed": replayed,
+    }
+
+
+def summarize(result: dict) -> dict:
+    return {k: v for k, v in result.items() if k not in ("recorded", "replayed")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a flight recording")
+    parser.add_argument("recording")
+    parser.add_argument("--config", help="config.json to replay with (default: the recorded one)")
+    parser.add_argument("--json", help="write the full result here")
+    parser.add_argument("--baseline", help="result JSON of an earlier replay to compare with")
+    args = parser.parse_args()
+
+    config = None
+    if args.config:
+        from utils.config import ConfigService
+
+        config = ConfigService(args.config).data
+
+    result = replay(read_recording(args.recording), config=config)
+    for key, value in summarize(result).items():
+        print(f"{key:>24}: {value}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            before = json.load(f)
+        # JSON turned the command tuples into lists
+        after = json.loads(json.dumps(result["replayed"]))
+        tick = first_difference(before["replayed"], after)
+        print(f"{'vs baseline':>24}: {'identical' if tick is None else f'first differs at tick {tick}'}")
+        print(f"{'step_mean_ms before':>24}: {before['step_mean_ms']:.4f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f)
+
+
+if __name__ == "__main__":
+    main()
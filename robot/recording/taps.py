@@ -0,0 +1,91 @@
+# recording/taps.py
+"""
+Pass-through wrappers that log every command to a FlightRecorder.
+Wrap the hardware object before handing it to Navigator/CommandHandler;
+anything not listed here (default_speed, read_encoders, angles, ...)
+goes straight to the wrapped object.
+"""
+
+import math
+
+from recording.flight_recorder import ArmCmd, DriveCmd
+
+NAN = math.nan
+
+
+class RecordingDrive:
+    def __init__(self, drive, recorder):
+        """
+        :param drive: DriveBase implementation
+        :param recorder: FlightRecorder
+        """
+        self.inner = drive
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def forward(self, speed=None):
+        self.recorder.drive(DriveCmd.FORWARD, speed)
+        self.inner.forward(speed)
+
+    def backward(self, speed=None):
+        self.recorder.drive(DriveCmd.BACKWARD, speed)
+        self.inner.backward(speed)
+
+    def turn_left(self, speed=None):
+        self.recorder.drive(DriveCmd.TURN_LEFT, speed)
+        self.inner.turn_left(speed)
+
+    def turn_right(self, speed=None):
+        self.recorder.drive(DriveCmd.TURN_RIGHT, speed)
+        self.inner.turn_right(speed)
+
+    def stop(self):
+        self.recorder.drive(DriveCmd.STOP)
+        self.inner.stop()
+
+    def move(self, linear, angular):
+        self.recorder.drive(DriveCmd.MOVE, linear=float(linear), angular=float(angular))
+        self.inner.move(linear, angular)
+
+    def emergency_stop(self):
+        self.recorder.drive(DriveCmd.EMERGENCY_STOP)
+        self.inner.emergency_stop()
+
+
+class RecordingArm:
+    def __init__(self, arm, recorder):
+        """
+        :param arm: ArmBase implementation
+        :param recorder: FlightRecorder
+        """
+        self.inner = arm
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def home(self):
+        self.recorder.arm(ArmCmd.HOME)
+        self.inner.home()
+
+    def move_joint(self, joint, angle):
+        self.recorder.arm(ArmCmd.MOVE_JOINT, joint, a=float(angle))
+        self.inner.move_joint(joint, angle)
+
+    def open_gripper(self):
+        self.recorder.arm(ArmCmd.OPEN_GRIPPER, "gripper")
+        self.inner.open_gripper()
+
+    def close_gripper(self):
+        self.recorder.arm(ArmCmd.CLOSE_GRIPPER, "gripper")
+        self.inner.close_gripper()
+
+    def stop(self):
+        self.recorder.arm(ArmCmd.STOP)
+        self.inner.stop()
+
+    def move_to_xyz(self, x, y, z):
+        self.recorder.arm(ArmCmd.MOVE_TO_XYZ, a=float(x), b=float(y), c=float(z))
+        self.inner.move_to_xyz(x, y, z)
@@ -0,0 +1,14 @@
+# scheduling/__init__.py
+
+from utils.indexed_heap import IndexedHeap
+
+from .scheduler import Dose, DoseStatus, MedicationScheduler, Priority, Round
+
+__all__ = [
+    "Dose",
+    "DoseStatus",
+    "IndexedHeap",
+    "MedicationScheduler",
+    "Priority",
+    "Round",
+]
@@ -0,0 +1,347 @@
+# scheduling/scheduler.py
+"""
+Medication schedule: which doses to dispense next, and where.
+
+Each dose has a due time and a window around it (early_sec before,
+late_sec after) in which it may be given. Doses live in indexed heaps,
+so add, reschedule and cancel are O(log n):
+
+- pending:   window not open yet, keyed by open time
+- ready:     window open, keyed by (priority, deadline): most urgent first
+- deadlines: window open, keyed by deadline; advance() expires doses
+             whose window closed (MISSED)
+
+next_round() takes the most urgent ready dose and every other ready
+dose in the same room, so one trip serves the whole room.
+
+  sched = MedicationScheduler.from_config(config)
+  sched.add("patient_1", "204", "red_round", due=t)
+  rnd = sched.next_round()      # Round(room="204", doses=[...])
+  sched.complete(rnd.doses[0].id)
+"""
+
+import itertools
+import threading
+import time
+from collections import namedtuple
+from enum import Enum, IntEnum, auto
+
+from utils.indexed_heap import IndexedHeap
+from utils.logger import kv, setup_logger
+from utils.metrics import REGISTRY
+
+log = setup_logger(__name__)
+
+DOSES_MISSED = REGISTRY.counter("doses_missed", "Doses whose window closed before dispensing")
+DOSES_DONE = REGISTRY.counter("doses_completed", "Doses dispensed")
+
+
+class Priority(IntEnum):
+    STAT = 0      # immediately
+    HIGH = 1      # time-critical (e.g. insulin, antibiotics)
+    ROUTINE = 2
+
+
+class DoseStatus(Enum):
+    PENDING = auto()      # window not open
+    READY = auto()        # window open, waiting for the robot
+    IN_PROGRESS = auto()  # handed out in a round
+    DONE = auto()
+    MISSED = auto()
+    CANCELLED = auto()
+
+
+class Dose:
+    def __init__(self, id: int, patient_id, room, pill, due: float, priority: Priority, early_sec: float, late_sec: float):
+        self.id = id
+        self.patient_id = patient_id
+        self.room = room
+        self.pill = pill
+        self.due = due
+        self.priority = priority
+        self.early_sec = early_sec
+        self.late_sec = late_sec
+        self.status = DoseStatus.PENDING
+        self.attempts = 0
+
+    @property
+    def opens_at(self) -> float:
+        return self.due - self.early_sec
+
+    @property
+    def deadline(self) -> float:
+        return self.due + self.late_sec
+
+    def __repr__(self):
+        return (
+            f"Dose({self.id}, patient={self.patient_id!r}, room={self.room!r}, pill={self.pill!r}, "
+            f"due={self.due:.0f}, {self.priority.name}, {self.status.name})"
+        )
+
+
+Round = namedtuple("Round", ["room", "doses"])
+
+
+class MedicationScheduler:
+    def __init__(
+        self,
+        early_sec: float = 1800.0,
+        late_sec: float = 1800.0,
+        max_round_doses: int = 8,
+        clock=time.time,
+    ):
+        """
+        :param early_sec: default window before the due time
+        :param late_sec: default window after the due time
+        :param max_round_doses: doses handed out per round (what the
+                                robot can carry)
+        :param clock: wall-clock time source (seconds); every method
+                      also takes an explicit now
+        """
+        self.early_sec = early_sec
+        self.late_sec = late_sec
+        self.max_round_doses = max_round_doses
+        self.clock = clock
+
+        self._ids = itertools.count(1)
+        self._doses = {}         # id -> Dose (not yet finished)
+        self._by_patient = {}    # patient_id -> {dose id}
+        self._ready_by_room = {}  # room -> {dose id}
+        self._pending = IndexedHeap()
+        self._ready = IndexedHeap()
+        self._deadlines = IndexedHeap()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict, clock=time.time):
+        """
+        :param config: full config; uses the "schedule" section
+        """
+        cfg = config.get("schedule", {})
+        return cls(
+            early_sec=cfg.get("early_window_sec", 1800.0),
+            late_sec=cfg.get("late_window_sec", 1800.0),
+            max_round_doses=cfg.get("max_round_doses", 8),
+            clock=clock,
+        )
+
+    def __len__(self):
+        return len(self._doses)
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    @property
+    def ready_count(self) -> int:
+        return len(self._ready)
+
+    # -------------------------
+    # Changes
+    # -------------------------
+
+    def add(
+        self,
+        patient_id,
+        room,
+        pill,
+        due: float,
+        priority: Priority = Priority.ROUTINE,
+        early_sec: float | None = None,
+        late_sec: float | None = None,
+        now: float | None = None,
+    ) -> Dose:
+        dose = Dose(
+            next(self._ids),
+            patient_id,
+            room,
+            pill,
+            due,
+            Priority(priority),
+            self.early_sec if early_sec is None else early_sec,
+            self.late_sec if late_sec is None else late_sec,
+        )
+        with self._lock:
+            self._doses[dose.id] = dose
+            self._by_patient.setdefault(patient_id, set()).add(dose.id)
+            self._queue(dose, self._now(now))
+        return dose
+
+    def get(self, dose_id: int):
+        return self._doses.get(dose_id)
+
+    def for_patient(self, patient_id) -> list:
+        """
+        Unfinished doses of one patient, by due time.
+        """
+        with self._lock:
+            ids = self._by_patient.get(patient_id, ())
+            return sorted((self._doses[i] for i in ids), key=lambda d: d.due)
+
+    def reschedule(self, dose_id: int, due: float, now: float | None = None) -> Dose:
+        """
+        Move a waiting dose to a new due time (same window widths).
+        """
+        with self._lock:
+            dose = self._waiting(dose_id)
+            self._unqueue(dose)
+            dose.due = due
+            self._queue(dose, self._now(now))
+        return dose
+
+    def set_priority(self, dose_id: int, priority: Priority) -> Dose:
+        with self._lock:
+            dose = self._waiting(dose_id)
+            dose.priority = Priority(priority)
+            if dose.status == DoseStatus.READY:
+                self._ready.update(dose.id, self._ready_key(dose))
+        return dose
+
+    def cancel(self, dose_id: int) -> Dose:
+        with self._lock:
+            dose = self._doses.get(dose_id)
+            if dose is None:
+                raise KeyError(dose_id)
+            self._unqueue(dose)
+            self._finish(dose, DoseStatus.CANCELLED)
+        return dose
+
+    # -------------------------
+    # Dispensing
+    # -------------------------
+
+    def advance(self, now: float | None = None) -> list:
+        """
+        Open windows that have started and expire those that have closed.
+        :return: doses that became MISSED
+        """
+        with self._lock:
+            return self._advance(self._now(now))
+
+    def next_round(self, now: float | None = None, max_doses: int | None = None):
+        """
+        Most urgent ready dose plus the other ready doses in its room
+        (most urgent first), marked IN_PROGRESS.
+        :return: Round, or None if nothing is ready
+        """
+        limit = max_doses or self.max_round_doses
+        with self._lock:
+            self._advance(self._now(now))
+            top = self._ready.peek()
+            if top is None:
+                return None
+            room = self._doses[top[0]].room
+            ids = sorted(self._ready_by_room[room], key=lambda i: self._ready.key(i))[:limit]
+            doses = []
+            for dose_id in ids:
+                dose = self._doses[dose_id]
+                self._unqueue(dose)
+                dose.status = DoseStatus.IN_PROGRESS
+                dose.attempts += 1
+                doses.append(dose)
+        return Round(room, doses)
+
+    def complete(self, dose_id: int) -> Dose:
+        with self._lock:
+            dose = self._in_progress(dose_id)
+            self._finish(dose, DoseStatus.DONE)
+        DOSES_DONE.inc()
+        return dose
+
+    def release(self, dose_id: int, now: float | None = None) -> Dose:
+        """
+        Put an IN_PROGRESS dose back in the queue (dispensing failed or
+        the round was aborted); it is MISSED if its window has closed.
+        """
+        with self._lock:
+            dose = self._in_progress(dose_id)
+            now = self._now(now)
+            if now > dose.deadline:
+                self._miss(dose)
+            else:
+                self._queue(dose, now)
+        return dose
+
+    # -------------------------
+    # Internal helpers
+    # -------------------------
+
+    def _now(self, now):
+        return self.clock() if now is None else now
+
+    @staticmethod
+    def _ready_key(dose: Dose):
+        return (dose.priority, dose.deadline, dose.id)
+
+    def _waiting(self, dose_id: int) -> Dose:
+        dose = self._doses.get(dose_id)
+        if dose is None:
+            raise KeyError(dose_id)
+        if dose.status not in (DoseStatus.PENDING, DoseStatus.READY):
+            raise ValueError(f"dose {dose_id} is {dose.status.name}")
+        return dose
+
+    def _in_progress(self, dose_id: int) -> Dose:
+        dose = self._doses.get(dose_id)
+        if dose is None or dose.status != DoseStatus.IN_PROGRESS:
+            raise ValueError(f"dose {dose_id} is not in progress")
+        return dose
+
+    def _queue(self, dose: Dose, now: float):
+        if dose.opens_at > now:
+            dose.status = DoseStatus.PENDING
+            self._pending.push(dose.id, (dose.opens_at, dose.id))
+        else:
+            self._open(dose)
+
+    def _open(self, dose: Dose):
+        dose.status = DoseStatus.READY
+        self._ready.push(dose.id, self._ready_key(dose))
+        self._deadlines.push(dose.id, (dose.deadline, dose.id))
+        self._ready_by_room.setdefault(dose.room, set()).add(dose.id)
+
+    def _unqueue(self, dose: Dose):
+        if dose.status == DoseStatus.PENDING:
+            self._pending.remove(dose.id)
+        elif dose.status == DoseStatus.READY:
+            self._ready.remove(dose.id)
+            self._deadlines.remove(dose.id)
+            room = self._ready_by_room[dose.room]
+            room.discard(dose.id)
+            if not room:
+                del self._ready_by_room[dose.room]
+
+    def _advance(self, now: float) -> list:
+        while self._pending:
+            dose_id, (opens_at, _) = self._pending.peek()
+            if opens_at > now:
+                break
+            self._pending.pop()
+            self._open(self._doses[dose_id])
+
+        missed = []
+        while self._deadlines:
+            dose_id, (deadline, _) = self._deadlines.peek()
+            if deadline >= now:
+                break
+            dose = self._doses[dose_id]
+            self._unqueue(dose)
+            self._miss(dose)
+            missed.append(dose)
+        return missed
+
+    def _miss(self, dose: Dose):
+        self._finish(dose, DoseStatus.MISSED)
+        DOSES_MISSED.inc()
+        log.warning(
+            "Dose missed",
+            extra=kv(dose=dose.id, patient=dose.patient_id, room=dose.room, pill=dose.pill, priority=dose.priority.name),
+        )
+
+    def _finish(self, dose: Dose, status: DoseStatus):
+        dose.status = status
+        del self._doses[dose.id]
+        ids = self._by_patient[dose.patient_id]
+        ids.discard(dose.id)
+        if not ids:
+            del self._by_patient[dose.patient_id]
@@ -0,0 +1,15 @@
+# sensors/__init__.py
+# Camera and UltrasonicSensor pull in cv2 / gpiozero, so they are
+# imported from their modules directly when hardware is present.
+
+from .sensor_bus import DISTANCE, FRAME, FRAME_CAPACITY, Sample, SensorBus
+from .sensor_manager import SensorManager
+
+__all__ = [
+    "DISTANCE",
+    "FRAME",
+    "FRAME_CAPACITY",
+    "Sample",
+    "SensorBus",
+    "SensorManager",
+]
@@ -1,5 +1,8 @@
 # sensors/camera.py
-import cv2
+from utils.lazy_import import lazy_import
+
+# OpenCV takes a long time to import on the Pi; load it on first use
+cv2 = lazy_import("cv2")
 
 
 class Camera:
@@ -7,8 +10,9 @@ class Camera:
     Camera wrapper (PiCam or USB).
     """
 
-    def __init__(self, device_index: int = 0):
-        self.cap = cv2.VideoCapture(device_index)
+    def __init__(self, device_index: int = 0, cap=None):
+        # cap can be injected (e.g. a fake VideoCapture in tests)
+        self.cap = cap if cap is not None else cv2.VideoCapture(device_index)
         if not self.cap.isOpened():
             raise RuntimeError("Camera could not be opened")
 
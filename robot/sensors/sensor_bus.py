@@ -0,0 +1,233 @@
+# sensors/sensor_bus.py
+"""
+Publish/subscribe bus for timestamped sensor samples.
+
+- Each topic keeps its last `capacity` samples in a preallocated ring,
+  ordered by time, so lookups are a binary search
+- Samples hold a reference to the published value; nothing is copied
+  on publish or read, so consumers must treat values (frames) as
+  read-only
+- Consumers either poll (latest, snapshot, nearest, aligned, window)
+  or subscribe a callback that runs on the publisher's thread
+
+  bus.publish(DISTANCE, 42.0)
+  frame, dist = bus.aligned(FRAME, DISTANCE, max_skew=0.1)
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+from utils.logger import setup_logger
+
+log = setup_logger(__name__)
+
+# Topics published by SensorManager
+DISTANCE = "distance"
+FRAME = "frame"
+
+# A 640x480 BGR frame is ~0.9 MB; the default 64-sample ring would keep
+# ~59 MB of frames alive, and alignment only looks a few frames back
+FRAME_CAPACITY = 4
+
+Sample = namedtuple("Sample", ["t", "seq", "value"])
+
+
+class Topic:
+    """
+    Time-ordered ring of Samples for one topic.
+    """
+
+    def __init__(self, name: str, capacity: int = 64):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.name = name
+        self.capacity = capacity
+        self.seq = 0
+        # Samples older than the newest one are dropped (and counted)
+        # so the ring stays sorted by time
+        self.dropped = 0
+        self._times = [0.0] * capacity
+        self._samples = [None] * capacity
+        self._head = 0  # next slot to write
+        self._count = 0
+        self._latest = None
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def publish(self, value, t: float):
+        with self._lock:
+            if self._latest is not None and t < self._latest.t:
+                self.dropped += 1
+                return None
+            self.seq += 1
+            sample = Sample(t, self.seq, value)
+            head = self._head
+            self._times[head] = t
+            self._samples[head] = sample
+            self._head = (head + 1) % self.capacity
+            if self._count < self.capacity:
+                self._count += 1
+            self._latest = sample
+            subscribers = self._subscribers
+
+        for cb in subscribers:
+            try:
+                cb(sample)
+            except Exception as e:
+                log.error("%s subscriber failed: %s", self.name, e)
+        return sample
+
+    @property
+    def latest(self):
+        return self._latest
+
+    def _slot(self, i: int) -> int:
+        # Logical index (0 = oldest) -> ring slot
+        return (self._head - self._count + i) % self.capacity
+
+    def _bisect(self, t: float) -> int:
+        # First logical index with time >= t (caller holds the lock)
+        lo, hi = 0, self._count
+        times = self._times
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if times[self._slot(mid)] < t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def nearest(self, t: float, max_skew: float | None = None):
+        with self._lock:
+            if self._count == 0:
+                return None
+            i = self._bisect(t)
+            best = None
+            for j in (i - 1, i):
+                if 0 <= j < self._count:
+                    sample = self._samples[self._slot(j)]
+                    if best is None or abs(sample.t - t) < abs(best.t - t):
+                        best = sample
+        if max_skew is not None and abs(best.t - t) > max_skew:
+            return None
+        return best
+
+    def window(self, t0: float, t1: float) -> list:
+        with self._lock:
+            start = self._bisect(t0)
+            out = []
+            for i in range(start, self._count):
+                sample = self._samples[self._slot(i)]
+                if sample.t > t1:
+                    break
+                out.append(sample)
+        return out
+
+    def subscribe(self, callback):
+        with self._lock:
+            # Copy on write: publish iterates its reference without the lock
+            self._subscribers = self._subscribers + [callback]
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            self._subscribers = [cb for cb in self._subscribers if cb is not callback]
+
+
+class SensorBus:
+    def __init__(self, capacity: int = 64, clock=time.monotonic):
+        """
+        :param capacity: default samples kept per topic
+        :param clock: time source for samples published without a time
+        """
+        self.capacity = capacity
+        self.clock = clock
+        self._topics = {}
+        self._lock = threading.Lock()
+
+    def topic(self, name: str, capacity: int | None = None) -> Topic:
+        """
+        Get or create a topic (capacity only applies on creation).
+        """
+        topic = self._topics.get(name)
+        if topic is None:
+            with self._lock:
+                topic = self._topics.get(name)
+                if topic is None:
+                    topic = self._topics[name] = Topic(name, capacity or self.capacity)
+        return topic
+
+    def topics(self) -> list:
+        return list(self._topics)
+
+    # -------------------------
+    # Publish / subscribe
+    # -------------------------
+
+    def publish(self, topic: str, value, t: float | None = None):
+        """
+        :param t: sample time on the bus clock (default: now)
+        :return: the stored Sample, or None if it was older than the newest one
+        """
+        return self.topic(topic).publish(value, self.clock() if t is None else t)
+
+    def subscribe(self, topic: str, callback):
+        """
+        callback(sample) runs after each publish, on the publishing thread;
+        keep it short (hand work off to a queue).
+        """
+        self.topic(topic).subscribe(callback)
+
+    def unsubscribe(self, topic: str, callback):
+        self.topic(topic).unsubscribe(callback)
+
+    # -------------------------
+    # Queries
+    # -------------------------
+
+    def latest(self, topic: str):
+        t = self._topics.get(topic)
+        return t.latest if t is not None else None
+
+    def snapshot(self, topics=None) -> dict:
+        """
+        {topic: latest Sample} for the given topics (default: all).
+        """
+        names = self.topics() if topics is None else topics
+        return {name: self.latest(name) for name in names}
+
+    def nearest(self, topic: str, t: float, max_skew: float | None = None):
+        """
+        Sample closest in time to t, or None if none within max_skew seconds.
+        """
+        tp = self._topics.get(topic)
+        return tp.nearest(t, max_skew) if tp is not None else None
+
+    def window(self, topic: str, t0: float, t1: float) -> list:
+        """
+        Samples with t0 <= t <= t1, oldest first.
+        """
+        tp = self._topics.get(topic)
+        return tp.window(t0, t1) if tp is not None else []
+
+    def aligned(self, anchor: str, *others: str, max_skew: float | None = None, at=None):
+        """
+        (anchor sample, nearest sample of each other topic), e.g. a frame
+        with the distance reading taken closest to it.
+        :param at: anchor Sample to align to (default: latest on anchor)
+        :return: tuple of Samples, or None if any topic has no sample
+                 within max_skew of the anchor
+        """
+        sample = at if at is not None else self.latest(anchor)
+        if sample is None:
+            return None
+        out = [sample]
+        for name in others:
+            match = self.nearest(name, sample.t, max_skew)
+            if match is None:
+                return None
+            out.append(match)
+        return tuple(out)
@@ -1,34 +1,89 @@
 # sensors/sensor_manager.py
+import time
+
+from sensors.sensor_bus import DISTANCE, FRAME, FRAME_CAPACITY, SensorBus
+from utils.metrics import REGISTRY
+
+SONAR_SECONDS = REGISTRY.histogram("sonar_read_seconds", "Ultrasonic read duration")
+CAMERA_SECONDS = REGISTRY.histogram("camera_read_seconds", "Camera frame grab duration")
+SONAR_ERRORS = REGISTRY.counter("sensor_read_errors", "Failed sensor reads", {"sensor": "sonar"})
+CAMERA_ERRORS = REGISTRY.counter("sensor_read_errors", "Failed sensor reads", {"sensor": "camera"})
 
 class SensorManager:
     """
     Central access point for all sensors.
+    Every successful read is also published on self.bus ("distance",
+    "frame"), stamped with the bus clock when the read completed.
     """
 
-    def __init__(self, ultrasonic=None, camera=None):
+    def __init__(self, ultrasonic=None, camera=None, recorder=None, bus=None, frame_capacity: int = FRAME_CAPACITY):
+        """
+        :param recorder: optional FlightRecorder; every reading is logged
+        :param bus: SensorBus to publish on (default: a new one)
+        :param frame_capacity: frames kept on the bus (if this creates the
+                               "frame" topic)
+        """
         self.ultrasonic = ultrasonic
         self.camera = camera
+        self.recorder = recorder
+        self.bus = bus if bus is not None else SensorBus()
+        # Frames are large; keep only the last few on the bus
+        self.bus.topic(FRAME, frame_capacity)
 
     # -------------------------
     # Distance sensing
     # -------------------------
 
     def get_front_distance_cm(self):
+        distance = self._read_distance()
+        if distance is not None:
+            self.bus.publish(DISTANCE, distance)
+        if self.recorder is not None:
+            self.recorder.sonar(distance)
+        return distance
+
+    def _read_distance(self):
         if self.ultrasonic is None:
             return None
+        t0 = time.perf_counter()
         try:
             return self.ultrasonic.read_cm()
         except Exception:
+            SONAR_ERRORS.inc()
             return None
+        finally:
+            SONAR_SECONDS.observe(time.perf_counter() - t0)
 
     # -------------------------
     # Vision
     # -------------------------
 
     def get_camera_frame(self):
+        frame = self._read_frame()
+        if frame is not None:
+            self.bus.publish(FRAME, frame)
+        if self.recorder is not None:
+            self.recorder.frame(frame)
+        return frame
+
+    def _read_frame(self):
         if self.camera is None:
             return None
-        ret, frame = self.camera.read()
+        with CAMERA_SECONDS.time():
+            ret, frame = self.camera.read()
         if not ret:
+            CAMERA_ERRORS.inc()
             return None
         return frame
+
+    # -------------------------
+    # Fused reads
+    # -------------------------
+
+    def frame_with_distance(self, max_skew_sec: float = 0.1):
+        """
+        Latest published frame and the distance reading closest to it in time.
+        :return: (frame Sample, distance Sample), or None if either is
+                 missing or they are more than max_skew_sec apart
+        """
+        return self.bus.aligned(FRAME, DISTANCE, max_skew=max_skew_sec)
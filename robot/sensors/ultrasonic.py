@@ -1,6 +1,4 @@
 # sensors/ultrasonic.py
-from gpiozero import DistanceSensor
-
 
 class UltrasonicSensor:
     """
@@ -14,6 +12,11 @@ class UltrasonicSensor:
         echo_pin: int,
         max_distance_cm: float = 200.0,
     ):
+        try:
+            from gpiozero import DistanceSensor
+        except ImportError as e:
+            raise ImportError("gpiozero is not installed") from e
+
         self.sensor = DistanceSensor(
             trigger=trigger_pin,
             echo=echo_pin,
@@ -0,0 +1,15 @@
+# simulation/__init__.py
+
+from .clock import VirtualClock
+from .world import RoomMap
+from .sim_drive import SimDrive
+from .sim_sensors import SimUltrasonic
+
+# The episode runner lives in simulation.runner (python -m simulation.runner)
+
+__all__ = [
+    "VirtualClock",
+    "RoomMap",
+    "SimDrive",
+    "SimUltrasonic",
+]
@@ -0,0 +1,20 @@
+# simulation/clock.py
+
+
+class VirtualClock:
+    """
+    Manually advanced clock. Callable, so it can be passed anywhere a
+    time.monotonic-style clock is accepted.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.t = float(start)
+
+    def __call__(self) -> float:
+        return self.t
+
+    def now(self) -> float:
+        return self.t
+
+    def advance(self, dt: float):
+        self.t += dt
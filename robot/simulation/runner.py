@@ -0,0 +1,212 @@
+# simulation/runner.py
+"""
+Headless episode runner for the navigation stack.
+
+Each episode builds a room, a SimDrive, a SensorManager over a
+SimUltrasonic, a StateMachine and a Navigator on a VirtualClock, then
+steps them faster than real time and reports metrics.
+
+Usage (from the robot/ directory):
+  python -m simulation.runner --episodes 1000 --workers 4
+  python -m simulation.runner --episodes 40 --json sim.json --max-collisions 0
+
+--json writes the summary, the run arguments and every episode's
+metrics, so results are compared run against run instead of being
+copied into docs. --max-collisions makes the exit status fail when
+episodes hit obstacles. Run with --workers 1 for step timings: worker
+processes compete for the CPU and inflate them.
+"""
+
+import argparse
+import json
+import math
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from navigation.navigation import Navigator
+from navigation.occupancy_grid import OccupancyGrid
+from navigation.state_machine import RobotState, StateMachine
+from sensors.sensor_bus import SensorBus
+from sensors.sensor_manager import SensorManager
+from simulation.clock import VirtualClock
+from simulation.sim_drive import SimDrive
+from simulation.sim_sensors import SimUltrasonic
+from simulation.world import RoomMap
+
+DEFAULT_CONFIG = {
+    "drive": {"default_speed": 100, "turn_speed": 100},
+    "navigation": {
+        "auto_speed": 100,
+        # Robot radius plus a margin: the sonar only sees what is ahead,
+        # so obstacle corners off to the side are under-mapped.
+        "planner": {"inflation_radius_cm": 15.0},
+    },
+}
+
+
+def random_episode_specs(n: int, seed: int = 0, width_cm: float = 600.0, height_cm: float = 400.0):
+    """
+    Generate n episode specs: a room with a few furniture blocks,
+    start on the left, goal on the right.
+    """
+    rng = random.Random(seed)
+    specs = []
+    for i in range(n):
+        obstacles = []
+        for _ in range(rng.randint(2, 6)):
+            w = rng.uniform(30, 120)
+            h = rng.uniform(30, 120)
+            x = rng.uniform(120, width_cm - 120 - w)
+            y = rng.uniform(0, height_cm - h)
+            obstacles.append((x, y, x + w, y + h))
+        specs.append(
+            {
+                "seed": seed * 100003 + i,
+                "width_cm": width_cm,
+                "height_cm": height_cm,
+                "obstacles": obstacles,
+                "start": (40.0, rng.uniform(40, height_cm - 40), 0.0),
+                "goal": (width_cm - 40.0, rng.uniform(40, height_cm - 40)),
+                "dt": 0.05,
+                "max_time_sec": 400.0,
+            }
+        )
+    return specs
+
+
+def run_episode(spec: dict, config: dict | None = None) -> dict:
+    """
+    Run one episode to the goal (or until max_time_sec of sim time).
+    :return: metrics dict
+    """
+    config = config or DEFAULT_CONFIG
+    clock = VirtualClock()
+    world = RoomMap(spec["width_cm"], spec["height_cm"], spec["obstacles"])
+    drive = SimDrive(config.get("drive", {}), world, pose=spec["start"])
+    sensors = SensorManager(
+        ultrasonic=SimUltrasonic(world, drive, seed=spec["seed"]),
+        bus=SensorBus(clock=clock),
+    )
+    fsm = StateMachine(clock=clock)
+    # One wide-cone echo marks a whole arc; require a repeat before a
+    # cell blocks planning so phantom arcs do not seal doorways.
+    grid = OccupancyGrid(
+        spec["width_cm"],
+        spec["height_cm"],
+        resolution_cm=5.0,
+        occupied_threshold=1.0,
+    )
+    nav = Navigator(
+        drive,
+        sensors,
+        fsm,
+        config,
+        grid=grid,
+        pose_provider=lambda: drive.pose,
+        clock=clock,
+    )
+
+    goal = spec["goal"]
+    dt = spec["dt"]
+    nav.go_to(goal)
+
+    step_costs = []
+    reached = False
+    perf = time.perf_counter
+    wall_start = perf()
+    while clock.t < spec["max_time_sec"]:
+        t0 = perf()
+        nav.step()
+        step_costs.append(perf() - t0)
+
+        drive.advance(dt)
+        clock.advance(dt)
+
+        if fsm.state == RobotState.IDLE:
+            reached = math.hypot(drive.x - goal[0], drive.y - goal[1]) < 15.0
+            break
+    wall = perf() - wall_start
+
+    step_costs.sort()
+    return {
+        "seed": spec["seed"],
+        "reached": reached,
+        "time_to_goal_sec": clock.t if reached else None,
+        "sim_time_sec": clock.t,
+        "wall_time_sec": wall,
+        "speedup": clock.t / wall if wall > 0 else math.inf,
+        "collisions": drive.collisions,
+        "distance_cm": drive.distance_cm,
+        "avoid_entries": len(fsm.transitions(state=RobotState.AVOID)),
+        "steps": len(step_costs),
+        "step_mean_ms": 1e3 * sum(step_costs) / max(1, len(step_costs)),
+        "step_p99_ms": 1e3 * step_costs[int(0.99 * (len(step_costs) - 1))] if step_costs else 0.0,
+    }
+
+
+def run_episodes(specs, workers: int | None = None, config: dict | None = None):
+    """
+    Run episodes across a process pool (workers=1 runs in-process).
+    """
+    if workers == 1:
+        return [run_episode(s, config) for s in specs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_episode, specs, [config] * len(specs), chunksize=8))
+
+
+def summarize(results) -> dict:
+    """
+    Aggregate per-episode metrics.
+    """
+    n = len(results)
+    reached = [r for r in results if r["reached"]]
+    ttg = [r["time_to_goal_sec"] for r in reached]
+    return {
+        "episodes": n,
+        "success_rate": len(reached) / n if n else 0.0,
+        "collisions_total": sum(r["collisions"] for r in results),
+        "episodes_with_collision": sum(1 for r in results if r["collisions"]),
+        "time_to_goal_median_sec": statistics.median(ttg) if ttg else None,
+        "step_mean_ms": statistics.fmean(r["step_mean_ms"] for r in results) if n else 0.0,
+        "step_p99_ms": max((r["step_p99_ms"] for r in results), default=0.0),
+        "speedup_median": statistics.median(r["speedup"] for r in results) if n else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless navigation simulation")
+    parser.add_argument("--episodes", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write summary and per-episode results here")
+    parser.add_argument(
+        "--max-collisions",
+        type=int,
+        default=None,
+        help="exit with status 1 if more episodes than this collide",
+    )
+    args = parser.parse_args()
+
+    specs = random_episode_specs(args.episodes, seed=args.seed)
+    t0 = time.perf_counter()
+    results = run_episodes(specs, workers=args.workers)
+    elapsed = time.perf_counter() - t0
+
+    summary = summarize(results)
+    for key, value in summary.items():
+        print(f"{key:>26}: {value}")
+    print(f"{'wall_time_sec':>26}: {elapsed:.2f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "summary": summary, "episodes": results}, f, indent=1)
+
+    if args.max_collisions is not None and summary["episodes_with_collision"] > args.max_collisions:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,124 @@
+# simulation/sim_drive.py
+import math
+
+from drive.drive_base import DriveBase
+
+
+class SimDrive(DriveBase):
+    """
+    Differential-drive model implementing DriveBase.
+
+    Wheel semantics follow EasyGoPiGo3: turn_left()/turn_right() pivot
+    about the stationary wheel. Speeds are drive units (wheel deg/s),
+    clamped to 0..100 like GopiGoDrive. Also exposes read_encoders()
+    so drive.odometry.Odometry can run on it.
+    """
+
+    WHEEL_DIAMETER_MM = 66.5
+    WHEEL_BASE_MM = 117.0
+
+    def __init__(self, config: dict, world, pose=(0.0, 0.0, 0.0), robot_radius_cm: float = 10.0):
+        super().__init__(config)
+        self.world = world
+        self.x, self.y, self.theta = pose
+        self.robot_radius_cm = robot_radius_cm
+
+        self._cm_per_deg = math.pi * (self.WHEEL_DIAMETER_MM / 10.0) / 360.0
+        self._base_cm = self.WHEEL_BASE_MM / 10.0
+
+        self._left_dps = 0.0
+        self._right_dps = 0.0
+        self._left_deg = 0.0
+        self._right_deg = 0.0
+
+        self.collisions = 0
+        self.in_contact = False
+        self.distance_cm = 0.0
+        self.commands = 0
+
+    # -------------------------
+    # DriveBase implementation
+    # -------------------------
+
+    def _resolve_speed(self, speed):
+        if speed is None:
+            return self.default_speed
+        return max(0, min(100, int(speed)))
+
+    def _set_wheels(self, left, right):
+        self.commands += 1
+        self._left_dps = float(left)
+        self._right_dps = float(right)
+
+    def forward(self, speed: int | None = None):
+        s = self._resolve_speed(speed)
+        self._set_wheels(s, s)
+
+    def backward(self, speed: int | None = None):
+        s = self._resolve_speed(speed)
+        self._set_wheels(-s, -s)
+
+    def turn_left(self, speed: int | None = None):
+        s = self._resolve_speed(speed or self.turn_speed)
+        self._set_wheels(0.0, s)
+
+    def turn_right(self, speed: int | None = None):
+        s = self._resolve_speed(speed or self.turn_speed)
+        self._set_wheels(s, 0.0)
+
+    def stop(self):
+        self._set_wheels(0.0, 0.0)
+
+    # -------------------------
+    # Encoders (odometry source)
+    # -------------------------
+
+    def read_encoders(self):
+        return int(self._left_deg), int(self._right_deg)
+
+    @property
+    def wheel_diameter_mm(self) -> float:
+        return self.WHEEL_DIAMETER_MM
+
+    @property
+    def wheel_base_mm(self) -> float:
+        return self.WHEEL_BASE_MM
+
+    # -------------------------
+    # Physics
+    # -------------------------
+
+    @property
+    def pose(self):
+        return self.x, self.y, self.theta
+
+    def advance(self, dt: float):
+        """
+        Integrate motion over dt. Motion into an obstacle is blocked
+        and counted as one collision per contact.
+        """
+        self._left_deg += self._left_dps * dt
+        self._right_deg += self._right_dps * dt
+
+        dl = self._left_dps * dt * self._cm_per_deg
+        dr = self._right_dps * dt * self._cm_per_deg
+        ds = 0.5 * (dl + dr)
+        dth = (dr - dl) / self._base_cm
+
+        mid = self.theta + 0.5 * dth
+        nx = self.x + ds * math.cos(mid)
+        ny = self.y + ds * math.sin(mid)
+        self.theta = math.atan2(math.sin(self.theta + dth), math.cos(self.theta + dth))
+
+        if abs(ds) < 1e-12:
+            return
+
+        if self.world.collides(nx, ny, self.robot_radius_cm):
+            if not self.in_contact:
+                self.collisions += 1
+            self.in_contact = True
+            return
+
+        self.in_contact = False
+        self.x, self.y = nx, ny
+        self.distance_cm += abs(ds)
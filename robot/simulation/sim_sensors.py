@@ -0,0 +1,45 @@
+# simulation/sim_sensors.py
+import math
+import random
+
+
+class SimUltrasonic:
+    """
+    Ray-cast HC-SR04 model: nearest echo across the beam cone,
+    with Gaussian noise. Same read_cm() interface as
+    sensors.ultrasonic.UltrasonicSensor, so it plugs into SensorManager.
+    """
+
+    def __init__(
+        self,
+        world,
+        drive,
+        max_distance_cm: float = 200.0,
+        cone_half_angle_deg: float = 15.0,
+        rays: int = 5,
+        noise_cm: float = 0.5,
+        seed=None,
+    ):
+        self.world = world
+        self.drive = drive
+        self.max_distance_cm = max_distance_cm
+        half = math.radians(cone_half_angle_deg)
+        if rays <= 1:
+            self._offsets = (0.0,)
+        else:
+            self._offsets = tuple(-half + 2 * half * i / (rays - 1) for i in range(rays))
+        self.noise_cm = noise_cm
+        self.rng = random.Random(seed)
+        self.reads = 0
+
+    def read_cm(self) -> float:
+        self.reads += 1
+        x, y, theta = self.drive.pose
+        d = min(
+            self.world.ray_cast(x, y, theta + off, self.max_distance_cm)
+            for off in self._offsets
+        )
+        if self.noise_cm:
+            d += self.rng.gauss(0.0, self.noise_cm)
+        d = max(0.0, min(self.max_distance_cm, d))
+        return round(d, 2)
@@ -0,0 +1,80 @@
+# simulation/world.py
+import math
+
+
+class RoomMap:
+    """
+    2-D room: outer walls plus axis-aligned rectangular obstacles
+    (beds, carts, cabinets). Units are cm.
+    """
+
+    def __init__(self, width_cm: float, height_cm: float, obstacles=()):
+        """
+        :param obstacles: iterable of (x0, y0, x1, y1) rectangles
+        """
+        self.width_cm = float(width_cm)
+        self.height_cm = float(height_cm)
+        self.obstacles = [
+            (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+            for x0, y0, x1, y1 in obstacles
+        ]
+
+    def ray_cast(self, x: float, y: float, theta: float, max_range: float) -> float:
+        """
+        Distance along the ray to the first wall/obstacle (slab method),
+        or max_range if nothing is hit.
+        """
+        dx = math.cos(theta)
+        dy = math.sin(theta)
+        best = max_range
+
+        # Outer walls (we are inside the room)
+        if dx > 1e-12:
+            best = min(best, (self.width_cm - x) / dx)
+        elif dx < -1e-12:
+            best = min(best, -x / dx)
+        if dy > 1e-12:
+            best = min(best, (self.height_cm - y) / dy)
+        elif dy < -1e-12:
+            best = min(best, -y / dy)
+
+        inv_dx = 1.0 / dx if abs(dx) > 1e-12 else math.inf
+        inv_dy = 1.0 / dy if abs(dy) > 1e-12 else math.inf
+        for x0, y0, x1, y1 in self.obstacles:
+            if inv_dx == math.inf:
+                if not (x0 <= x <= x1):
+                    continue
+                tx0, tx1 = -math.inf, math.inf
+            else:
+                tx0, tx1 = (x0 - x) * inv_dx, (x1 - x) * inv_dx
+                if tx0 > tx1:
+                    tx0, tx1 = tx1, tx0
+            if inv_dy == math.inf:
+                if not (y0 <= y <= y1):
+                    continue
+                ty0, ty1 = -math.inf, math.inf
+            else:
+                ty0, ty1 = (y0 - y) * inv_dy, (y1 - y) * inv_dy
+                if ty0 > ty1:
+                    ty0, ty1 = ty1, ty0
+            t_near = max(tx0, ty0)
+            t_far = min(tx1, ty1)
+            if t_near <= t_far and t_far >= 0.0:
+                best = min(best, max(0.0, t_near))
+        return max(0.0, best)
+
+    def collides(self, x: float, y: float, radius: float) -> bool:
+        """
+        True if a disc of radius at (x, y) touches a wall or obstacle.
+        """
+        if x - radius < 0 or y - radius < 0:
+            return True
+        if x + radius > self.width_cm or y + radius > self.height_cm:
+            return True
+        r2 = radius * radius
+        for x0, y0, x1, y1 in self.obstacles:
+            cx = min(max(x, x0), x1)
+            cy = min(max(y, y0), y1)
+            if (x - cx) ** 2 + (y - cy) ** 2 < r2:
+                return True
+        return False
@@ -0,0 +1,13 @@
+# storage/__init__.py
+
+from .audit_log import AuditLog, AuditReader, AuditRecord
+from .local_store import LocalStore
+from .lru_cache import LRUCache
+
+__all__ = [
+    "AuditLog",
+    "AuditReader",
+    "AuditRecord",
+    "LocalStore",
+    "LRUCache",
+]
@@ -0,0 +1,485 @@
+# storage/audit_log.py
+"""
+Append-only audit log of verification and dispense outcomes.
+
+Files (in one directory)
+  audit-000001.log  segment: header (magic, version, segment number),
+                    then records
+  audit-000001.idx  per-patient offsets of a sealed segment (JSON)
+
+A record is a 24-byte header (payload length, CRC-32, seq, t) and a
+JSON payload; the CRC covers the length, seq, t and payload, so a
+record cut short by a crash or power loss fails the check.
+
+Writing
+  append() only encodes the record and queues it; it never touches the
+  disk. A background flusher writes everything queued with one write()
+  and one fsync() (group commit), at most group_ms after the first record
+  of the batch arrived. The queue is bounded: when max_pending records
+  are waiting, append() blocks until the next commit, so a stalled SD
+  card slows the caller instead of growing memory. wait_durable(seq)
+  blocks until a record is on disk.
+
+  When the active segment reaches segment_bytes it is sealed: its
+  patient index is written next to it and a new segment starts.
+
+Recovery
+  On open, the active (last) segment is scanned and cut after the last
+  valid record, dropping a torn tail. Sealed segments are not read: their
+  .idx files give the patient index (a missing one is rebuilt).
+
+Reading
+  AuditReader(directory).history("patient_1") seeks straight to that
+  patient's records; AuditLog has the same methods for the live log.
+
+  log = AuditLog.from_config(config)
+  seq = log.append("dispense", "patient_1", dose=12, pill="red_round")
+  log.wait_durable(seq)
+"""
+
+import json
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import namedtuple
+from pathlib import Path
+
+from utils.logger import kv, setup_logger
+from utils.metrics import REGISTRY
+
+log = setup_logger(__name__)
+
+ROBOT_DIR = Path(__file__).resolve().parents[1]
+
+MAGIC = b"RSAUDIT1"
+VERSION = 1
+MAX_PAYLOAD = 1 << 20
+
+_SEGMENT = struct.Struct("<8sHI")   # magic, version, segment number
+_RECORD = struct.Struct("<IIQd")    # payload length, crc32, seq, t
+_CRC_FIELDS = struct.Struct("<IQd")  # what the crc covers besides the payload
+_SEGMENT_NAME = re.compile(r"audit-(\d{6})\.log$")
+
+COMMIT_SECONDS = REGISTRY.histogram(
+    "audit_commit_seconds",
+    "Audit log group commit (write + fsync)",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+COMMIT_RECORDS = REGISTRY.histogram(
+    "audit_commit_records", "Records per audit log commit", buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+)
+APPEND_BLOCKED = REGISTRY.counter("audit_append_blocked", "Appends that waited for a full queue to drain")
+
+AuditRecord = namedtuple("AuditRecord", ["seq", "t", "kind", "patient_id", "data"])
+
+
+def _segment_path(directory: Path, n: int) -> Path:
+    return directory / f"audit-{n:06d}.log"
+
+
+def _index_path(directory: Path, n: int) -> Path:
+    return directory / f"audit-{n:06d}.idx"
+
+
+def _encode(seq: int, t: float, kind: str, patient_id, data: dict) -> bytes:
+    payload = json.dumps({"kind": kind, "patient": patient_id, **data}, separators=(",", ":"), default=str).encode()
+    crc = zlib.crc32(payload, zlib.crc32(_CRC_FIELDS.pack(len(payload), seq, t)))
+    return _RECORD.pack(len(payload), crc, seq, t) + payload
+
+
+def _decode(header: bytes, payload: bytes):
+    """
+    :return: AuditRecord, or None if the record is damaged
+    """
+    length, crc, seq, t = _RECORD.unpack(header)
+    if len(payload) != length or zlib.crc32(payload, zlib.crc32(_CRC_FIELDS.pack(length, seq, t))) != crc:
+        return None
+    data = json.loads(payload)
+    return AuditRecord(seq, t, data.pop("kind"), data.pop("patient"), data)
+
+
+def _scan(path: Path):
+    """
+    Read a segment up to the first damaged or incomplete record.
+    :return: ([(offset, AuditRecord)], end of the last valid record, file size)
+    """
+    out = []
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        head = f.read(_SEGMENT.size)
+        if len(head) < _SEGMENT.size or _SEGMENT.unpack(head)[0] != MAGIC:
+            return out, 0, size
+        offset = _SEGMENT.size
+        while True:
+            header = f.read(_RECORD.size)
+            if len(header) < _RECORD.size:
+                break
+            length = _RECORD.unpack(header)[0]
+            if length > MAX_PAYLOAD:
+                break
+            record = _decode(header, f.read(length))
+            if record is None:
+                break
+            out.append((offset, record))
+            offset += _RECORD.size + length
+    return out, offset, size
+
+
+def _fsync_dir(directory: Path):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# -------------------------
+# Reading
+# -------------------------
+
+class AuditReader:
+    """
+    Patient index over a log directory: sealed segments from their .idx
+    files, the active segment by scanning it.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.segments = sorted(
+            int(m.group(1)) for m in (_SEGMENT_NAME.match(p.name) for p in self.directory.glob("audit-*.log")) if m
+        )
+        self._index_lock = threading.Lock()
+        self._index = {}        # patient_id -> [(segment, offset)]
+        self._first_seq = {}    # segment -> first seq (sealed segments)
+        self._active_index = {}  # patient_id -> [offset] in the active segment
+        self._rebuilt = {}      # segment -> index rebuilt from a segment without .idx
+        self.last_seq = 0
+        self._tail = None       # (valid end, file size) of the active segment
+        self._active_first_seq = None
+
+        for n in self.segments[:-1]:
+            self._load_sealed(n)
+        if self.segments:
+            records, end, size = _scan(_segment_path(self.directory, self.segments[-1]))
+            for offset, record in records:
+                self._add(self.segments[-1], offset, record)
+            self._tail = (end, size)
+            self._active_first_seq = records[0][1].seq if records else None
+
+    def _load_sealed(self, n: int):
+        try:
+            idx = json.loads(_index_path(self.directory, n).read_text())
+        except (OSError, ValueError):
+            # Crashed while sealing: rebuild from the segment itself
+            idx = self._rebuilt[n] = self._rebuild_index(n)
+        self._first_seq[n] = idx["first_seq"]
+        self.last_seq = max(self.last_seq, idx["last_seq"])
+        for patient_id, offsets in idx["patients"].items():
+            self._index.setdefault(patient_id, []).extend((n, o) for o in offsets)
+
+    def _rebuild_index(self, n: int) -> dict:
+        records, _, _ = _scan(_segment_path(self.directory, n))
+        patients = {}
+        for offset, record in records:
+            if record.patient_id is not None:
+                patients.setdefault(str(record.patient_id), []).append(offset)
+        seqs = [r.seq for _, r in records] or [0]
+        log.warning("Rebuilt audit index", extra=kv(segment=n, records=len(records)))
+        return {"first_seq": seqs[0], "last_seq": seqs[-1], "patients": patients}
+
+    def _add(self, segment: int, offset: int, record: AuditRecord):
+        self.last_seq = max(self.last_seq, record.seq)
+        if record.patient_id is None:
+            return
+        key = str(record.patient_id)
+        with self._index_lock:
+            self._index.setdefault(key, []).append((segment, offset))
+            self._active_index.setdefault(key, []).append(offset)
+
+    def patients(self) -> list:
+        with self._index_lock:
+            return sorted(self._index)
+
+    def history(self, patient_id, since_seq: int = 0) -> list:
+        """
+        One patient's records, oldest first, read by offset (no scan).
+        """
+        with self._index_lock:
+            locations = list(self._index.get(str(patient_id), ()))
+        out = []
+        f, open_segment = None, None
+        try:
+            for segment, offset in locations:
+                if segment != open_segment:
+                    if f is not None:
+                        f.close()
+                    f, open_segment = open(_segment_path(self.directory, segment), "rb"), segment
+                f.seek(offset)
+                header = f.read(_RECORD.size)
+                record = _decode(header, f.read(_RECORD.unpack(header)[0]))
+                if record is None:
+                    log.error("Damaged audit record", extra=kv(segment=segment, offset=offset))
+                elif record.seq > since_seq:
+                    out.append(record)
+        finally:
+            if f is not None:
+                f.close()
+        return out
+
+    def records(self, since_seq: int = 0):
+        """
+        Every record in order (full scan; for export and checks).
+        """
+        for i, n in enumerate(self.segments):
+            later = self.segments[i + 1] if i + 1 < len(self.segments) else None
+            if later in self._first_seq and self._first_seq[later] <= since_seq:
+                continue  # the whole segment is older than since_seq
+            for _, record in _scan(_segment_path(self.directory, n))[0]:
+                if record.seq > since_seq:
+                    yield record
+
+
+# -------------------------
+# Writing
+# -------------------------
+
+class AuditLog(AuditReader):
+    def __init__(
+        self,
+        directory,
+        segment_bytes: int = 4 << 20,
+        group_ms: float = 20.0,
+        max_pending: int = 4096,
+        fsync: bool = True,
+        clock=time.time,
+    ):
+        """
+        Open (or create) the log and recover the active segment.
+
+        :param directory: log directory (created if missing)
+        :param segment_bytes: seal a segment once a commit takes it past
+                              this (a segment ends on a commit boundary)
+        :param group_ms: longest a record waits before its group commit
+        :param max_pending: queued records before append() blocks
+        :param fsync: fsync each commit (off only for tests/benchmarks)
+        :param clock: wall-clock time source for record timestamps
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        super().__init__(directory)
+        self.segment_bytes = segment_bytes
+        self.group_sec = group_ms / 1000.0
+        self.max_pending = max_pending
+        self.fsync = fsync
+        self.clock = clock
+
+        self._recover()
+        self._cond = threading.Condition()
+        self._pending = []       # (seq, patient_id, bytes)
+        self._first_pending = None
+        self._next_seq = self.last_seq + 1
+        self._durable_seq = self.last_seq
+        self._closing = False
+        self._error = None
+        self._flusher = threading.Thread(target=self._flush_loop, name="audit-flush", daemon=True)
+        self._flusher.start()
+
+    @classmethod
+    def from_config(cls, config: dict, clock=time.time):
+        """
+        :param config: full config; uses the "audit" section. A relative
+                       directory is taken from the robot/ directory.
+        """
+        cfg = config.get("audit", {})
+        return cls(
+            ROBOT_DIR / cfg.get("directory", "data/audit"),
+            segment_bytes=cfg.get("segment_bytes", 4 << 20),
+            group_ms=cfg.get("group_ms", 20.0),
+            max_pending=cfg.get("max_pending", 4096),
+            fsync=cfg.get("fsync", True),
+            clock=clock,
+        )
+
+    def _recover(self):
+        for sealed, idx in self._rebuilt.items():
+            self._write_index(sealed, idx)
+        if not self.segments:
+            self._open_segment(1)
+            return
+        n = self.segments[-1]
+        end, size = self._tail
+        if end == 0:
+            # Crashed before the segment header reached the disk
+            self._open_segment(n, create=True)
+            return
+        if end < size:
+            with open(_segment_path(self.directory, n), "r+b") as f:
+                f.truncate(end)
+                os.fsync(f.fileno())
+            log.warning("Truncated torn audit tail", extra=kv(segment=n, dropped_bytes=size - end))
+        self._open_segment(n, create=False)
+
+    # -------------------------
+    # Appending
+    # -------------------------
+
+    def append(self, kind: str, patient_id=None, **data) -> int:
+        """
+        Queue one record for the next group commit.
+        :param kind: what happened, e.g. "verify", "dispense"
+        :param data: JSON-serialisable fields
+        :return: record seq (see wait_durable)
+        """
+        with self._cond:
+            if len(self._pending) >= self.max_pending and self._error is None and not self._closing:
+                APPEND_BLOCKED.inc()
+                while len(self._pending) >= self.max_pending and self._error is None and not self._closing:
+                    self._cond.wait()
+            # Checked after the wait: a failed commit or close() may be
+            # what woke us, and the flusher is gone by then
+            if self._error is not None:
+                raise self._error
+            if self._closing:
+                raise RuntimeError("audit log is closed")
+            seq = self._next_seq
+            self._next_seq += 1
+            # Encoded under the lock so seq order is file order
+            self._pending.append((seq, patient_id, _encode(seq, self.clock(), kind, patient_id, data)))
+            if self._first_pending is None:
+                self._first_pending = time.monotonic()
+                self._cond.notify_all()
+        return seq
+
+    def wait_durable(self, seq: int, timeout: float | None = None) -> bool:
+        """
+        Block until record seq is on disk.
+        :return: False on timeout
+        :raises OSError: a commit failed (the log accepts no more records)
+        """
+        with self._cond:
+            done = self._cond.wait_for(lambda: self._durable_seq >= seq or self._error is not None, timeout)
+            if self._error is not None and self._durable_seq < seq:
+                raise self._error
+            return done
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Block until everything appended so far is on disk.
+        """
+        with self._cond:
+            last = self._next_seq - 1
+        return self.wait_durable(last, timeout)
+
+    def close(self):
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        self._flusher.join()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -------------------------
+    # Flusher
+    # -------------------------
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closing)
+                if not self._pending:
+                    return
+                # Let the group fill up until the oldest record has waited group_ms
+                deadline = self._first_pending + self.group_sec
+                while not self._closing and len(self._pending) < self.max_pending:
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        break
+                    self._cond.wait(left)
+                batch, self._pending, self._first_pending = self._pending, [], None
+                self._cond.notify_all()  # unblock appenders waiting for room
+            try:
+                self._commit(batch)
+            except OSError as e:
+                # The card is failing: stop accepting records rather than
+                # leave a gap; reopening recovers what reached the disk
+                log.error("Audit commit failed: %s", e, extra=kv(records=len(batch)))
+                with self._cond:
+                    self._error = e
+                    self._pending = []
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self._durable_seq = batch[-1][0]
+                self._cond.notify_all()
+
+    def _commit(self, batch: list):
+        t0 = time.perf_counter()
+        offset = self._size
+        self._file.write(b"".join(blob for _, _, blob in batch))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        COMMIT_SECONDS.observe(time.perf_counter() - t0)
+        COMMIT_RECORDS.observe(len(batch))
+
+        with self._index_lock:
+            for seq, patient_id, blob in batch:
+                if patient_id is not None:
+                    key = str(patient_id)
+                    self._index.setdefault(key, []).append((self._segment, offset))
+                    self._active_index.setdefault(key, []).append(offset)
+                offset += len(blob)
+        self._size = offset
+        self.last_seq = batch[-1][0]
+        if self._active_first_seq is None:
+            self._active_first_seq = batch[0][0]
+        if self._size >= self.segment_bytes:
+            self._rotate()
+
+    # -------------------------
+    # Segments
+    # -------------------------
+
+    def _open_segment(self, n: int, create: bool = True):
+        path = _segment_path(self.directory, n)
+        if create:
+            with open(path, "wb") as f:
+                f.write(_SEGMENT.pack(MAGIC, VERSION, n))
+                f.flush()
+                os.fsync(f.fileno())
+            _fsync_dir(self.directory)
+            if n not in self.segments:
+                self.segments.append(n)
+        self._file = open(path, "ab")
+        self._segment = n
+        self._size = self._file.tell()
+        if create:
+            self._active_first_seq = None
+
+    def _rotate(self):
+        n = self._segment
+        self._file.close()
+        with self._index_lock:
+            patients, self._active_index = self._active_index, {}
+        first = self._active_first_seq
+        self._write_index(n, {"first_seq": first, "last_seq": self.last_seq, "patients": patients})
+        self._first_seq[n] = first
+        self._open_segment(n + 1)
+        log.info("Audit segment sealed", extra=kv(segment=n, last_seq=self.last_seq))
+
+    def _write_index(self, n: int, idx: dict):
+        path = _index_path(self.directory, n)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(idx, separators=(",", ":")))
+        os.replace(tmp, path)
+        _fsync_dir(self.directory)
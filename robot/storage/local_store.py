@@ -0,0 +1,269 @@
+# storage/local_store.py
+"""
+On-robot store for patients, pills and the dose schedule.
+
+The backend (MongoDB behind the web app) is not reachable when Wi-Fi
+drops, so the robot keeps its own copy in SQLite and syncs into it with
+batched upserts. Tables and indexes:
+
+- patients: patient_id (primary key), room, pill (the pill type the
+            patient takes, as named by the vision code, e.g. "red_round")
+- pills:    pill_id (primary key)
+- doses:    (patient_id, pill, due) primary key, (room, due), pill, due
+
+Every row carries the backend's "updated" time; an upsert never replaces
+a row with an older version, so replaying a sync is harmless.
+
+patient() and pill() are read-through: an LRU cache in front of the
+database, cleared for the affected keys on every upsert. Records are
+read-only mappings, shared with the cache.
+
+  store = LocalStore.from_config(config)
+  store.upsert_patients(backend_rows)
+  store.pill_matches("patient_1", "red_round")   # verification matches()
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+
+from storage.lru_cache import MISSING, LRUCache
+from utils.logger import kv, setup_logger
+
+log = setup_logger(__name__)
+
+ROBOT_DIR = Path(__file__).resolve().parents[1]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS patients (
+    patient_id TEXT PRIMARY KEY,
+    name TEXT,
+    room TEXT,
+    pill TEXT,
+    updated REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_patients_room ON patients (room);
+CREATE INDEX IF NOT EXISTS idx_patients_pill ON patients (pill);
+
+CREATE TABLE IF NOT EXISTS pills (
+    pill_id TEXT PRIMARY KEY,
+    name TEXT,
+    description TEXT,
+    updated REAL NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS doses (
+    patient_id TEXT NOT NULL,
+    pill TEXT NOT NULL,
+    due REAL NOT NULL,
+    room TEXT,
+    priority INTEGER NOT NULL DEFAULT 2,
+    updated REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (patient_id, pill, due)
+);
+CREATE INDEX IF NOT EXISTS idx_doses_room ON doses (room, due);
+CREATE INDEX IF NOT EXISTS idx_doses_pill ON doses (pill);
+CREATE INDEX IF NOT EXISTS idx_doses_due ON doses (due);
+"""
+
+# table -> (key columns, other columns, defaults)
+TABLES = {
+    "patients": (("patient_id",), ("name", "room", "pill"), {}),
+    "pills": (("pill_id",), ("name", "description"), {}),
+    "doses": (("patient_id", "pill", "due"), ("room", "priority"), {"priority": 2}),
+}
+
+
+def _upsert_sql(table: str) -> str:
+    keys, cols, _ = TABLES[table]
+    names = keys + cols + ("updated",)
+    updates = ", ".join(f"{c} = excluded.{c}" for c in cols + ("updated",))
+    return (
+        f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join(':' + n for n in names)}) "
+        f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates} "
+        f"WHERE excluded.updated >= {table}.updated"
+    )
+
+
+class LocalStore:
+    def __init__(self, path: str | Path = ":memory:", cache_size: int = 4096, batch_size: int = 500):
+        """
+        :param path: database file (":memory:" for a throwaway store)
+        :param cache_size: patient/pill records kept in the LRU cache
+        :param batch_size: rows per transaction in upserts
+        """
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.cache = LRUCache(cache_size)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if self.path != ":memory:":
+            # Readers don't block the sync writer; fsync at checkpoints only
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._upserts = {table: _upsert_sql(table) for table in TABLES}
+        self._lock = threading.RLock()
+        log.info("Local store opened", extra=kv(path=self.path, patients=self.count("patients")))
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """
+        :param config: full config; uses the "store" section. A relative
+                       path is taken from the robot/ directory.
+        """
+        cfg = config.get("store", {})
+        path = cfg.get("path", "data/robot.db")
+        if path != ":memory:":
+            path = ROBOT_DIR / path
+        return cls(path, cache_size=cfg.get("cache_size", 4096), batch_size=cfg.get("batch_size", 500))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -------------------------
+    # Hot-path lookups (cached)
+    # -------------------------
+
+    def patient(self, patient_id):
+        """
+        :return: read-only record (patient_id, name, room, pill, updated),
+                 or None if unknown
+        """
+        return self._cached("patients", patient_id)
+
+    def pill(self, pill_id):
+        """
+        :return: read-only record (pill_id, name, description, updated),
+                 or None if unknown
+        """
+        return self._cached("pills", pill_id)
+
+    def pill_matches(self, patient_id, pill_id) -> bool:
+        """
+        Whether pill_id is the patient's pill; fits VerificationAggregator's
+        matches(patient_id, pill_id).
+        """
+        patient = self.patient(patient_id)
+        return patient is not None and patient["pill"] == pill_id
+
+    def _cached(self, table: str, key):
+        record = self.cache.get((table, key))
+        if record is not MISSING:
+            return record
+        key_col = TABLES[table][0][0]
+        with self._lock:
+            row = self._conn.execute(f"SELECT * FROM {table} WHERE {key_col} = ?", (key,)).fetchone()
+            # Unknown ids are cached too: a misread face repeats every frame
+            record = None if row is None else MappingProxyType(dict(row))
+            self.cache.put((table, key), record)
+        return record
+
+    # -------------------------
+    # Indexed queries
+    # -------------------------
+
+    def patients_in_room(self, room) -> list:
+        return self._query("SELECT * FROM patients WHERE room = ? ORDER BY patient_id", (room,))
+
+    def patients_on_pill(self, pill) -> list:
+        return self._query("SELECT * FROM patients WHERE pill = ? ORDER BY patient_id", (pill,))
+
+    def doses_for_patient(self, patient_id, start: float = float("-inf"), end: float = float("inf")) -> list:
+        return self._query(
+            "SELECT * FROM doses WHERE patient_id = ? AND due BETWEEN ? AND ? ORDER BY due",
+            (patient_id, start, end),
+        )
+
+    def doses_in_room(self, room, start: float = float("-inf"), end: float = float("inf")) -> list:
+        return self._query("SELECT * FROM doses WHERE room = ? AND due BETWEEN ? AND ? ORDER BY due", (room, start, end))
+
+    def doses_for_pill(self, pill) -> list:
+        return self._query("SELECT * FROM doses WHERE pill = ? ORDER BY due", (pill,))
+
+    def doses_between(self, start: float, end: float) -> list:
+        """
+        Doses due in [start, end], e.g. to fill a MedicationScheduler.
+        """
+        return self._query("SELECT * FROM doses WHERE due BETWEEN ? AND ? ORDER BY due", (start, end))
+
+    def count(self, table: str) -> int:
+        return self._query(f"SELECT COUNT(*) AS n FROM {table}")[0]["n"]
+
+    def last_updated(self, table: str) -> float:
+        """
+        Newest "updated" time in a table: sync from the backend asks for
+        rows changed after this.
+        """
+        return self._query(f"SELECT COALESCE(MAX(updated), 0) AS t FROM {table}")[0]["t"]
+
+    def _query(self, sql: str, params=()) -> list:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [MappingProxyType(dict(row)) for row in rows]
+
+    # -------------------------
+    # Sync (batched upserts)
+    # -------------------------
+
+    def upsert_patients(self, rows) -> int:
+        """
+        :param rows: iterable of dicts with patient_id and any of name,
+                     room, pill, updated (extra keys are ignored)
+        :return: rows written
+        """
+        return self._upsert("patients", rows)
+
+    def upsert_pills(self, rows) -> int:
+        return self._upsert("pills", rows)
+
+    def upsert_doses(self, rows) -> int:
+        """
+        :param rows: dicts with patient_id, pill, due and any of room,
+                     priority (scheduling.Priority value), updated
+        """
+        return self._upsert("doses", rows)
+
+    def _upsert(self, table: str, rows) -> int:
+        keys, cols, defaults = TABLES[table]
+        names = keys + cols
+        cached = table in ("patients", "pills")
+        sql = self._upserts[table]
+        t0 = time.perf_counter()
+        written = 0
+        batch = []
+        for row in rows:
+            record = {n: row.get(n, defaults.get(n)) for n in names}
+            record["updated"] = row.get("updated") or 0.0
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                written += self._write(sql, batch, table if cached else None)
+                batch = []
+        if batch:
+            written += self._write(sql, batch, table if cached else None)
+        log.debug(
+            "Upsert",
+            extra=kv(table=table, rows=written, ms=round(1e3 * (time.perf_counter() - t0), 1)),
+        )
+        return written
+
+    def _write(self, sql: str, batch: list, cached_table: str | None) -> int:
+        key_col = TABLES[cached_table][0][0] if cached_table else None
+        with self._lock:
+            before = self._conn.total_changes
+            with self._conn:  # one transaction per batch
+                self._conn.executemany(sql, batch)
+            if key_col is not None:
+                self.cache.invalidate((cached_table, r[key_col]) for r in batch)
+            return self._conn.total_changes - before
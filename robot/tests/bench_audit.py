@@ -0,0 +1,127 @@
+# tests/bench_audit.py
+"""
+Audit log: group commit vs fsync per record, and indexed history reads.
+
+1. Baseline: write + fsync each record on the caller's thread
+2. AuditLog (group commit): append() latency p50/p99/max on the caller's
+   thread, time until durable, commits per second
+3. Reopen (recovery) time, and one patient's history through the index
+   vs a scan of the whole log
+
+Run it on the robot's SD card with --dir to see the real fsync cost.
+
+Usage (from the robot/ directory):
+  python tests/bench_audit.py --records 20000 --dir /home/pi/audit-bench
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from storage import AuditLog  # noqa: E402
+from storage.audit_log import COMMIT_RECORDS, _encode  # noqa: E402
+from utils.logger import set_console_level  # noqa: E402
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return (
+        1e6 * samples[len(samples) // 2],
+        1e6 * samples[int(0.99 * (len(samples) - 1))],
+        1e6 * samples[-1],
+    )
+
+
+def report(name, samples):
+    p50, p99, worst = percentiles(samples)
+    print(f"{name:<30} p50 {p50:9.1f} us   p99 {p99:9.1f} us   max {worst:9.1f} us")
+
+
+def fields(i, patients):
+    return f"patient_{i % patients}", {"dose": i, "pill": "red_round", "outcome": "VERIFIED", "frames": 4}
+
+
+def bench_fsync_each(path: Path, records: int, patients: int):
+    perf = time.perf_counter
+    samples = []
+    with open(path, "ab") as f:
+        for i in range(records):
+            patient_id, data = fields(i, patients)
+            t0 = perf()
+            f.write(_encode(i + 1, time.time(), "verify", patient_id, data))
+            f.flush()
+            os.fsync(f.fileno())
+            samples.append(perf() - t0)
+    return samples
+
+
+def bench_group_commit(directory: Path, args):
+    perf = time.perf_counter
+    samples, durable = [], []
+    log = AuditLog(directory, segment_bytes=args.segment_kb * 1024, group_ms=args.group_ms)
+    commits = COMMIT_RECORDS.count
+    t_start = perf()
+    for i in range(args.records):
+        patient_id, data = fields(i, args.patients)
+        t0 = perf()
+        log.append("verify", patient_id, **data)
+        samples.append(perf() - t0)
+    log.flush()
+    wall = perf() - t_start
+    commits = COMMIT_RECORDS.count - commits
+    for i in range(args.durable_samples):
+        patient_id, data = fields(i, args.patients)
+        t0 = perf()
+        log.wait_durable(log.append("verify", patient_id, **data))
+        durable.append(perf() - t0)
+    log.close()
+    return samples, durable, wall, commits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit log benchmark")
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--baseline-records", type=int, default=2000, help="records for fsync-per-record")
+    parser.add_argument("--patients", type=int, default=500)
+    parser.add_argument("--durable-samples", type=int, default=50, help="append + wait_durable round trips")
+    parser.add_argument("--group-ms", type=float, default=20.0)
+    parser.add_argument("--segment-kb", type=int, default=512)
+    parser.add_argument("--dir", help="directory on the disk to test (default: temp dir)")
+    args = parser.parse_args()
+    set_console_level(logging.WARNING)
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        tmp = Path(tmp)
+        samples = bench_fsync_each(tmp / "baseline.log", args.baseline_records, args.patients)
+        report("fsync per record", samples)
+        print(f"{'':<30} {len(samples) / sum(samples):9.0f} records/s")
+
+        samples, durable, wall, commits = bench_group_commit(tmp / "audit", args)
+        report("group commit: append()", samples)
+        report("group commit: until durable", durable)
+        print(f"{'':<30} {args.records / wall:9.0f} records/s, {commits} commits")
+
+        t0 = time.perf_counter()
+        log = AuditLog(tmp / "audit", fsync=False)
+        reopen = time.perf_counter() - t0
+        segments = len(log.segments)
+        t0 = time.perf_counter()
+        history = log.history("patient_7")
+        indexed = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        scanned = [r for r in log.records() if r.patient_id == "patient_7"]
+        scan = time.perf_counter() - t0
+        log.close()
+        assert len(history) == len(scanned)
+        print(f"reopen (recovery), {segments} segments {1e3 * reopen:9.2f} ms")
+        print(f"history, {len(history)} records: index {1e3 * indexed:.2f} ms, full scan {1e3 * scan:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
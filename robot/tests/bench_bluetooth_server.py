@@ -0,0 +1,82 @@
+# tests/bench_bluetooth_server.py
+"""
+Idle CPU and command round-trip benchmark for BluetoothServer, over a
+loopback TCP socket (no Bluetooth hardware needed).
+
+Compares the blocking lifecycle with the old "while self.running: pass"
+keep-alive loop.
+
+Usage (from the robot/ directory):
+  python tests/bench_bluetooth_server.py --idle-sec 2 --pings 2000
+"""
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from mock.mock_bluetooth import LoopbackBluetoothServer  # noqa: E402
+
+
+def _busy_keep_alive(server):
+    # What BluetoothServer.start used to do on the main thread
+    while server.running:
+        pass
+
+
+def measure(idle_sec: float, pings: int, busy_wait: bool) -> dict:
+    server = LoopbackBluetoothServer()
+    if busy_wait:
+        server.start_background()
+        keeper = threading.Thread(target=_busy_keep_alive, args=(server,))
+    else:
+        keeper = threading.Thread(target=server.start, kwargs={"install_signal_handlers": False})
+    keeper.start()
+    client = server.connect()
+
+    # Idle: connected client, no traffic
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    time.sleep(idle_sec)
+    idle_cpu = (time.process_time() - cpu0) / (time.perf_counter() - wall0)
+
+    # Round trip: one PING at a time
+    rtts = []
+    for _ in range(pings):
+        t0 = time.perf_counter()
+        client.sendall(b"PING\n")
+        client.recv(64)
+        rtts.append(time.perf_counter() - t0)
+
+    server.stop()
+    keeper.join(timeout=2.0)
+    client.close()
+
+    rtts.sort()
+    return {
+        "idle_cpu_pct": 100.0 * idle_cpu,
+        "rtt_median_us": 1e6 * statistics.median(rtts),
+        "rtt_p99_us": 1e6 * rtts[int(0.99 * (len(rtts) - 1))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BluetoothServer idle CPU / RTT benchmark")
+    parser.add_argument("--idle-sec", type=float, default=2.0)
+    parser.add_argument("--pings", type=int, default=2000)
+    args = parser.parse_args()
+
+    for label, busy in (("busy-wait (old)", True), ("blocking (new)", False)):
+        r = measure(args.idle_sec, args.pings, busy)
+        print(
+            f"{label:>16}: idle CPU {r['idle_cpu_pct']:6.1f}%  "
+            f"RTT median {r['rtt_median_us']:7.1f} us  p99 {r['rtt_p99_us']:7.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
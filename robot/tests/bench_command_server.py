@@ -0,0 +1,86 @@
+# tests/bench_command_server.py
+"""
+Concurrent-client benchmark for CommandServer over loopback TCP.
+
+Each client sends PING and waits for PONG, repeatedly; all clients run
+at once. With --pipeline N each client keeps N id-tagged PINGs in flight
+and reads the batched replies. Reports aggregate throughput and
+per-command latency.
+
+Usage (from the robot/ directory):
+  python tests/bench_command_server.py --clients 1 8 32 --pings 500 --pipeline 1 16
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from communication import CommandHandler, CommandServer, TcpTransport  # noqa: E402
+from communication.framing import encode_request  # noqa: E402
+from mock.mock_bluetooth import MockController, MockNav, MockSensors  # noqa: E402
+
+
+async def _client(port: int, pings: int, depth: int, rtts: list):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    await reader.readline()  # CONNECTED
+    perf = time.perf_counter
+    for start in range(0, pings, depth):
+        batch = range(start, min(pings, start + depth))
+        t0 = perf()
+        writer.write(b"".join(encode_request(i, "PING") for i in batch))
+        for i in batch:
+            assert await reader.readline() == f"#{i} PONG\n".encode()
+        rtts.append((perf() - t0) / len(batch))
+    writer.close()
+    await writer.wait_closed()
+
+
+async def _run_clients(port: int, clients: int, pings: int, depth: int):
+    rtts = []
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_client(port, pings, depth, rtts) for _ in range(clients)))
+    return time.perf_counter() - t0, rtts
+
+
+def measure(clients: int, pings: int, depth: int = 1) -> dict:
+    transport = TcpTransport(port=0)
+    server = CommandServer(CommandHandler(MockNav(), MockController(), MockSensors()), [transport])
+    server.start_in_thread()
+    try:
+        elapsed, rtts = asyncio.run(_run_clients(transport.port, clients, pings, depth))
+    finally:
+        server.stop()
+        server.join()
+
+    rtts.sort()
+    return {
+        "commands_per_sec": clients * pings / elapsed,
+        "rtt_median_us": 1e6 * statistics.median(rtts),
+        "rtt_p99_us": 1e6 * rtts[int(0.99 * (len(rtts) - 1))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CommandServer multi-client benchmark")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--pings", type=int, default=500)
+    parser.add_argument("--pipeline", type=int, nargs="+", default=[1, 16])
+    args = parser.parse_args()
+
+    for depth in args.pipeline:
+        for n in args.clients:
+            r = measure(n, args.pings, depth)
+            print(
+                f"depth {depth:>3}, {n:>4} clients: {r['commands_per_sec']:9.0f} cmd/s  "
+                f"per-cmd median {r['rtt_median_us']:7.1f} us  p99 {r['rtt_p99_us']:7.1f} us"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# tests/bench_dispense.py
+"""
+Dispense rounds, stages one after another vs overlapped.
+
+Runs rounds of 1, 3 and 8 doses with TimedActions (each action sleeps
+its duration times --scale) through DispenseOrchestrator with
+parallel=False and parallel=True, and reports wall time per dose and the
+time per dose saved by overlap. Times are printed in robot seconds
+(divided by --scale). The durations are mock_dispense.DEFAULT_DURATIONS,
+which are assumed, not measured: the savings show what overlap can buy
+if the stages take that long.
+
+Usage (from the robot/ directory):
+  python tests/bench_dispense.py --scale 0.05 --timeline
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from dispensing import DispenseOrchestrator, timeline  # noqa: E402
+from mock.mock_dispense import TimedActions  # noqa: E402
+from scheduling import MedicationScheduler  # noqa: E402
+from utils.logger import set_console_level  # noqa: E402
+
+
+def run(doses: int, parallel: bool, scale: float, repeat: int):
+    orch = DispenseOrchestrator(TimedActions(scale=scale), MedicationScheduler(clock=lambda: 0.0), parallel=parallel)
+    reports = []
+    try:
+        for _ in range(repeat):
+            for i in range(doses):
+                orch.scheduler.add(f"patient_{i}", "204", "red_round", due=0.0)
+            reports.append(orch.run_next())
+    finally:
+        orch.shutdown()
+    wall = sum(r.wall_sec for r in reports) / repeat / scale
+    return wall, reports[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Overlapped dispense pipeline benchmark")
+    parser.add_argument("--scale", type=float, default=0.05, help="sleep this fraction of each stage's duration")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--doses", type=int, nargs="+", default=[1, 3, 8])
+    parser.add_argument("--timeline", action="store_true", help="print the stage timeline of the last round")
+    args = parser.parse_args()
+    set_console_level(logging.WARNING)
+
+    print(f"{'doses':>5} {'sequential s/dose':>18} {'overlapped s/dose':>18} {'saved s/dose':>13}")
+    for n in args.doses:
+        seq, _ = run(n, False, args.scale, args.repeat)
+        par, report = run(n, True, args.scale, args.repeat)
+        print(f"{n:>5} {seq / n:18.2f} {par / n:18.2f} {(seq - par) / n:13.2f}")
+        if args.timeline:
+            print(timeline(report))
+
+
+if __name__ == "__main__":
+    main()
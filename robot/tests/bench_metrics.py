@@ -0,0 +1,57 @@
+# tests/bench_metrics.py
+"""
+Per-sample cost of the metrics primitives (ns), against an empty call.
+
+Usage (from the robot/ directory):
+  python tests/bench_metrics.py --n 500000
+"""
+
+import argparse
+import sys
+import time
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.metrics import Registry, timed  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metrics overhead benchmark")
+    parser.add_argument("--n", type=int, default=500000)
+    args = parser.parse_args()
+
+    reg = Registry()
+    counter = reg.counter("bench_events")
+    hist = reg.histogram("bench_seconds")
+    perf = time.perf_counter
+
+    def empty():
+        pass
+
+    timed_empty = timed(hist)(empty)
+
+    def with_block():
+        with hist.time():
+            pass
+
+    def manual():
+        t0 = perf()
+        hist.observe(perf() - t0)
+
+    cases = {
+        "empty call": empty,
+        "counter.inc": counter.inc,
+        "histogram.observe": lambda: hist.observe(0.0003),
+        "perf_counter pair + observe": manual,
+        "@timed (overhead)": timed_empty,
+        "with hist.time()": with_block,
+    }
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=args.n, repeat=5)) / args.n
+        print(f"{name:<28} {1e9 * best:8.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# tests/bench_occupancy_grid.py
+"""
+Occupancy grid cost per ultrasonic reading.
+
+Times OccupancyGrid.update() for echoes at short, mid and max range and
+for no-echo readings, on a grid the size of a ward corridor, and
+compares the p99 with the sonar's sample period. Run it on the Pi to get
+the number that matters: this container is several times faster.
+
+Usage (from the robot/ directory):
+  python tests/bench_occupancy_grid.py --updates 5000 --rate-hz 20
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from navigation.occupancy_grid import OccupancyGrid  # noqa: E402
+
+
+def bench(grid, rng, updates: int, distance) -> list:
+    perf = time.perf_counter
+    samples = []
+    for _ in range(updates):
+        pose = (rng.uniform(100.0, 900.0), rng.uniform(100.0, 500.0), rng.uniform(-math.pi, math.pi))
+        d = distance(rng)
+        t0 = perf()
+        grid.update(pose, d)
+        samples.append(perf() - t0)
+    samples.sort()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Occupancy grid update benchmark")
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--width-cm", type=float, default=1000.0)
+    parser.add_argument("--height-cm", type=float, default=600.0)
+    parser.add_argument("--resolution-cm", type=float, default=5.0)
+    parser.add_argument("--max-range-cm", type=float, default=200.0)
+    parser.add_argument("--rate-hz", type=float, default=20.0, help="sonar sample rate")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    grid = OccupancyGrid(
+        args.width_cm, args.height_cm, resolution_cm=args.resolution_cm, max_range_cm=args.max_range_cm
+    )
+    rng = random.Random(args.seed)
+    period_us = 1e6 / args.rate_hz
+    print(f"grid {grid.rows}x{grid.cols} cells, {args.resolution_cm:g} cm, max range {args.max_range_cm:g} cm")
+    print(f"budget: {period_us:.0f} us per reading at {args.rate_hz:g} Hz")
+    cases = (
+        ("echo 20-60 cm", lambda r: r.uniform(20.0, 60.0)),
+        ("echo 60-150 cm", lambda r: r.uniform(60.0, 150.0)),
+        ("echo near max", lambda r: r.uniform(0.9, 0.99) * args.max_range_cm),
+        ("no echo", lambda r: math.inf),
+    )
+    for name, distance in cases:
+        s = bench(grid, rng, args.updates, distance)
+        p50, p99 = 1e6 * s[len(s) // 2], 1e6 * s[int(0.99 * (len(s) - 1))]
+        print(f"{name:<16} p50 {p50:7.1f} us   p99 {p99:7.1f} us   ({100.0 * p99 / period_us:.1f}% of a period)")
+
+
+if __name__ == "__main__":
+    main()
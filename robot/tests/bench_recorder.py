@@ -0,0 +1,118 @@
+# tests/bench_recorder.py
+"""
+Flight recorder cost and replay speed.
+
+1. Hot path: time per recorder call (sonar sample, drive command, tick).
+2. Control loop: Navigator.step in a simulated episode with and without
+   a recorder attached.
+3. Replay: the recorded episode replayed through a fresh Navigator,
+   as a multiple of real time.
+
+Usage (from the robot/ directory):
+  python tests/bench_recorder.py --steps 4000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from navigation.navigation import Navigator  # noqa: E402
+from navigation.occupancy_grid import OccupancyGrid  # noqa: E402
+from navigation.state_machine import StateMachine  # noqa: E402
+from recording import DriveCmd, FlightRecorder, RecordingDrive, read_recording  # noqa: E402
+from recording.replay import replay  # noqa: E402
+from sensors.sensor_manager import SensorManager  # noqa: E402
+from simulation.clock import VirtualClock  # noqa: E402
+from simulation.runner import DEFAULT_CONFIG  # noqa: E402
+from simulation.sim_drive import SimDrive  # noqa: E402
+from simulation.sim_sensors import SimUltrasonic  # noqa: E402
+from simulation.world import RoomMap  # noqa: E402
+
+GRID = {"width_cm": 600.0, "height_cm": 400.0, "resolution_cm": 5.0, "occupied_threshold": 1.0}
+OBSTACLES = [(200.0, 120.0, 260.0, 260.0), (380.0, 0.0, 420.0, 180.0)]
+
+
+def bench_calls(path, n: int) -> dict:
+    perf = time.perf_counter
+    out = {}
+    with FlightRecorder(path, capacity=65536) as rec:
+        for name, call in (
+            ("sonar", lambda: rec.sonar(42.5)),
+            ("drive", lambda: rec.drive(DriveCmd.FORWARD, 100)),
+            ("tick", lambda: rec.tick(1.0, (1.0, 2.0, 0.5))),
+        ):
+            t0 = perf()
+            for _ in range(n):
+                call()
+            out[name] = 1e9 * (perf() - t0) / n
+    return out
+
+
+def run_episode(steps: int, recorder_path=None) -> dict:
+    clock = VirtualClock()
+    world = RoomMap(GRID["width_cm"], GRID["height_cm"], OBSTACLES)
+    sim = SimDrive(DEFAULT_CONFIG["drive"], world, pose=(40.0, 200.0, 0.0))
+    rec = None
+    drive = sim
+    if recorder_path is not None:
+        rec = FlightRecorder(recorder_path, capacity=200000, meta={"config": DEFAULT_CONFIG, "grid": GRID}, clock=clock)
+        drive = RecordingDrive(sim, rec)
+
+    sensors = SensorManager(ultrasonic=SimUltrasonic(world, sim, seed=1), recorder=rec)
+    fsm = StateMachine(clock=clock)
+    if rec is not None:
+        fsm.add_listener(rec.transition)
+    nav = Navigator(
+        drive, sensors, fsm, DEFAULT_CONFIG,
+        grid=OccupancyGrid(**GRID), pose_provider=lambda: sim.pose, clock=clock,
+    )
+    nav.recorder = rec
+    nav.go_to((560.0, 200.0))
+
+    perf = time.perf_counter
+    costs = []
+    for _ in range(steps):
+        t0 = perf()
+        nav.step()
+        costs.append(perf() - t0)
+        sim.advance(0.05)
+        clock.advance(0.05)
+    fsm.close()
+    if rec is not None:
+        rec.close()
+    costs.sort()
+    return {"step_mean_us": 1e6 * sum(costs) / len(costs), "step_p50_us": 1e6 * costs[len(costs) // 2]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flight recorder benchmark")
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--steps", type=int, default=4000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.rec"
+        for name, ns in bench_calls(path, args.calls).items():
+            print(f"recorder.{name:<6} {ns:8.0f} ns/call")
+
+        plain = run_episode(args.steps)
+        recorded = run_episode(args.steps, recorder_path=path)
+        print(f"step without recorder  mean {plain['step_mean_us']:8.1f} us  p50 {plain['step_p50_us']:8.1f} us")
+        print(f"step with recorder     mean {recorded['step_mean_us']:8.1f} us  p50 {recorded['step_p50_us']:8.1f} us")
+
+        recording = read_recording(path)
+        result = replay(recording)
+        print(
+            f"replay: {result['ticks']} ticks, {result['recorded_sec']:.1f} s recorded in "
+            f"{result['wall_sec']:.2f} s ({result['speedup']:.0f}x real time), "
+            f"first divergent tick: {result['first_divergent_tick']}, "
+            f"transitions match: {result['transitions_match']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
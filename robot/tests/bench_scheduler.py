@@ -0,0 +1,152 @@
+# tests/bench_scheduler.py
+"""
+Medication scheduler under load.
+
+Builds a ward (patients spread over rooms, several doses a day each,
+mixed priorities), then measures:
+
+1. add / reschedule / cancel cost per operation
+2. A simulated stretch of time on a ward one robot can serve
+   (--sim-patients over --sim-rooms): the robot takes a round, spends
+   --trip-sec plus --dose-sec per dose on it, and idles a minute when
+   nothing is ready. Reports next_round latency (p50/p99), doses per
+   round and missed doses, with room grouping and without (one dose
+   per trip)
+3. For scale: one linear scan for the most urgent ready dose, which is
+   what a plain list of doses would cost per decision
+
+Usage (from the robot/ directory):
+  python tests/bench_scheduler.py --patients 800 --days 4
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scheduling import MedicationScheduler, Priority  # noqa: E402
+from utils.logger import set_console_level  # noqa: E402
+
+DAY = 86400.0
+DOSE_TIMES = (8 * 3600.0, 12 * 3600.0, 18 * 3600.0, 22 * 3600.0)
+PILLS = ("red_round", "white_oval")
+
+
+def build(args, rng, patients: int, rooms: int):
+    sched = MedicationScheduler(early_sec=1800, late_sec=1800, max_round_doses=args.round_size, clock=lambda: 0.0)
+    plan = []
+    for p in range(patients):
+        room = f"{100 + p % rooms}"
+        for day in range(args.days):
+            for t in DOSE_TIMES[: args.doses_per_day]:
+                due = day * DAY + t + rng.uniform(-300, 300)
+                priority = rng.choices(list(Priority), weights=(1, 10, 89))[0]
+                plan.append((f"patient_{p}", room, rng.choice(PILLS), due, priority))
+    rng.shuffle(plan)
+
+    perf = time.perf_counter
+    t0 = perf()
+    doses = [sched.add(*row, now=0.0) for row in plan]
+    add_ns = 1e9 * (perf() - t0) / len(plan)
+    return sched, doses, add_ns
+
+
+def bench_changes(sched, doses, rng):
+    perf = time.perf_counter
+    sample = rng.sample(doses, len(doses) // 10)
+    t0 = perf()
+    for d in sample:
+        sched.reschedule(d.id, d.due + rng.uniform(-600, 600), now=0.0)
+    reschedule_ns = 1e9 * (perf() - t0) / len(sample)
+
+    cancel = rng.sample(doses, len(doses) // 20)
+    t0 = perf()
+    for d in cancel:
+        sched.cancel(d.id)
+    cancel_ns = 1e9 * (perf() - t0) / len(cancel)
+    return reschedule_ns, cancel_ns
+
+
+def naive_scan_ns(doses, now, repeat=20):
+    perf = time.perf_counter
+    t0 = perf()
+    for _ in range(repeat):
+        min(
+            (d for d in doses if d.due - d.early_sec <= now <= d.due + d.late_sec),
+            key=lambda d: (d.priority, d.deadline, d.id),
+            default=None,
+        )
+    return 1e9 * (perf() - t0) / repeat
+
+
+def simulate(sched, hours: float, trip_sec: float, dose_sec: float, max_doses: int | None = None):
+    perf = time.perf_counter
+    latencies, sizes = [], []
+    missed = 0
+    now = 0.0
+    while now < hours * 3600.0:
+        missed += len(sched.advance(now=now))
+        t0 = perf()
+        rnd = sched.next_round(now=now, max_doses=max_doses)
+        latencies.append(perf() - t0)
+        if rnd is None:
+            now += 60.0
+            continue
+        sizes.append(len(rnd.doses))
+        for dose in rnd.doses:
+            sched.complete(dose.id)
+        now += trip_sec + dose_sec * len(rnd.doses)
+    latencies.sort()
+    return {
+        "rounds": len(sizes),
+        "doses": sum(sizes),
+        "per_round": sum(sizes) / max(len(sizes), 1),
+        "p50_us": 1e6 * latencies[len(latencies) // 2],
+        "p99_us": 1e6 * latencies[int(0.99 * (len(latencies) - 1))],
+        "missed": missed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Medication scheduler load benchmark")
+    parser.add_argument("--patients", type=int, default=800)
+    parser.add_argument("--rooms", type=int, default=200)
+    parser.add_argument("--doses-per-day", type=int, default=4)
+    parser.add_argument("--days", type=int, default=4)
+    parser.add_argument("--round-size", type=int, default=8)
+    parser.add_argument("--sim-patients", type=int, default=40)
+    parser.add_argument("--sim-rooms", type=int, default=12)
+    parser.add_argument("--hours", type=float, default=48.0, help="simulated time to dispense through")
+    parser.add_argument("--trip-sec", type=float, default=90.0, help="travel + setup per round")
+    parser.add_argument("--dose-sec", type=float, default=20.0, help="verify + dispense per dose")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    set_console_level(logging.ERROR)
+
+    rng = random.Random(args.seed)
+    sched, doses, add_ns = build(args, rng, args.patients, args.rooms)
+    print(f"{len(doses)} doses, {args.patients} patients, {args.rooms} rooms")
+    print(f"add          {add_ns:8.0f} ns/op")
+    reschedule_ns, cancel_ns = bench_changes(sched, doses, rng)
+    print(f"reschedule   {reschedule_ns:8.0f} ns/op")
+    print(f"cancel       {cancel_ns:8.0f} ns/op")
+    live = [d for d in doses if sched.get(d.id) is not None]
+    print(f"linear scan  {naive_scan_ns(live, 8 * 3600.0):8.0f} ns per decision ({len(live)} doses)")
+
+    print(f"dispensing: {args.sim_patients} patients in {args.sim_rooms} rooms, {args.hours:g} h")
+    for name, max_doses in (("by room", None), ("one per trip", 1)):
+        sched, _, _ = build(args, random.Random(args.seed), args.sim_patients, args.sim_rooms)
+        r = simulate(sched, args.hours, args.trip_sec, args.dose_sec, max_doses)
+        print(
+            f"{name:<13} {r['doses']} doses in {r['rounds']} rounds "
+            f"({r['per_round']:.1f}/round), missed {r['missed']}, "
+            f"next_round p50 {r['p50_us']:.1f} us p99 {r['p99_us']:.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# tests/bench_startup.py
+"""
+Startup latency per role, from fresh interpreters.
+
+Runs "python -X importtime main.py --role R --dry-run" several times per
+role and reports wall time, total import time and the slowest imports.
+Save results to compare runs across changes (e.g. on the Pi).
+
+Usage (from the robot/ directory):
+  python tests/bench_startup.py --runs 5 --save startup.json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROBOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROBOT_DIR))
+
+from main import ROLES  # noqa: E402
+
+
+def parse_importtime(stderr: str):
+    """
+    -X importtime lines -> (total_us, {module: cumulative_us}) over
+    top-level imports (nested ones are already in their parent's total).
+    """
+    total = 0
+    top = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        # One space after "|" for top-level imports, more when nested
+        if name.startswith("  "):
+            continue
+        total += int(cumulative_us)
+        top[name.strip()] = int(cumulative_us)
+    return total, top
+
+
+def measure(role: str, runs: int) -> dict:
+    walls, imports = [], []
+    top = {}
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "main.py", "--role", role, "--dry-run"],
+            cwd=ROBOT_DIR,
+            capture_output=True,
+            text=True,
+        )
+        walls.append(time.perf_counter() - t0)
+        total_us, top = parse_importtime(proc.stderr)
+        imports.append(total_us / 1e6)
+
+    slowest = sorted(top.items(), key=lambda kv: kv[1], reverse=True)[:5]
+    return {
+        "role": role,
+        "wall_median_ms": 1e3 * statistics.median(walls),
+        "import_median_ms": 1e3 * statistics.median(imports),
+        "slowest_imports_ms": {name: us / 1e3 for name, us in slowest},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-role startup benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--roles", nargs="+", default=sorted(ROLES))
+    parser.add_argument("--save", type=str, default=None, help="write results as JSON")
+    args = parser.parse_args()
+
+    results = [measure(role, args.runs) for role in args.roles]
+    for r in results:
+        slowest = ", ".join(f"{n} {ms:.1f}" for n, ms in r["slowest_imports_ms"].items())
+        print(
+            f"{r['role']:>7}: wall {r['wall_median_ms']:7.1f} ms  "
+            f"imports {r['import_median_ms']:7.1f} ms  [{slowest}]"
+        )
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# tests/bench_store.py
+"""
+On-robot store with --patients patients (default 10k).
+
+Measures, on a database file in a temp directory:
+
+1. Sync: upsert rate with batched transactions (--batch rows each) vs one
+   transaction per row
+2. Patient lookups: cold (cache cleared, every lookup reads SQLite) and
+   warm (LRU hit), p50/p99, and pill_matches() as verification calls it
+3. Indexed queries: patients in a room, a patient's doses, and the room
+   query again without its index for scale
+
+Usage (from the robot/ directory):
+  python tests/bench_store.py --patients 10000
+"""
+
+import argparse
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from storage import LocalStore  # noqa: E402
+from utils.logger import set_console_level  # noqa: E402
+
+PILLS = ("red_round", "white_oval", "blue_capsule", "yellow_round", "green_oval")
+DOSE_TIMES = (8 * 3600.0, 12 * 3600.0, 18 * 3600.0, 22 * 3600.0)
+
+
+def make_rows(args, rng):
+    patients = [
+        {
+            "patient_id": f"patient_{i}",
+            "name": f"Patient {i}",
+            "room": f"{100 + i % args.rooms}",
+            "pill": rng.choice(PILLS),
+            "updated": 1.0,
+        }
+        for i in range(args.patients)
+    ]
+    doses = [
+        {"patient_id": p["patient_id"], "pill": p["pill"], "room": p["room"], "due": day * 86400.0 + t}
+        for p in patients
+        for day in range(args.days)
+        for t in DOSE_TIMES
+    ]
+    return patients, doses
+
+
+def timed(fn, items):
+    perf = time.perf_counter
+    samples = []
+    for item in items:
+        t0 = perf()
+        fn(item)
+        samples.append(perf() - t0)
+    samples.sort()
+    return 1e6 * samples[len(samples) // 2], 1e6 * samples[int(0.99 * (len(samples) - 1))]
+
+
+def report(name, p50_p99):
+    print(f"{name:<28} p50 {p50_p99[0]:7.1f} us   p99 {p50_p99[1]:7.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="On-robot store benchmark")
+    parser.add_argument("--patients", type=int, default=10000)
+    parser.add_argument("--rooms", type=int, default=2500)
+    parser.add_argument("--days", type=int, default=2)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--unbatched", type=int, default=2000, help="rows synced one transaction each")
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    set_console_level(logging.WARNING)
+
+    rng = random.Random(args.seed)
+    patients, doses = make_rows(args, rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LocalStore(Path(tmp) / "robot.db", cache_size=2 * args.patients, batch_size=args.batch)
+
+        t0 = time.perf_counter()
+        store.upsert_patients(patients)
+        store.upsert_doses(doses)
+        sec = time.perf_counter() - t0
+        print(f"{len(patients)} patients, {len(doses)} doses, {args.rooms} rooms")
+        print(f"upsert, {args.batch}/transaction     {(len(patients) + len(doses)) / sec:10.0f} rows/s")
+        single = LocalStore(Path(tmp) / "single.db", batch_size=1)
+        t0 = time.perf_counter()
+        single.upsert_patients(patients[: args.unbatched])
+        print(f"upsert, 1/transaction       {args.unbatched / (time.perf_counter() - t0):10.0f} rows/s")
+        single.close()
+
+        ids = [rng.choice(patients)["patient_id"] for _ in range(args.lookups)]
+        store.cache.clear()
+        report("patient() cold (SQLite)", timed(lambda pid: (store.cache.clear(), store.patient(pid)), ids[:2000]))
+        for pid in ids:
+            store.patient(pid)
+        report("patient() warm (LRU)", timed(store.patient, ids))
+        report("pill_matches() warm", timed(lambda pid: store.pill_matches(pid, "red_round"), ids))
+        print(f"cache hit rate {store.cache.hit_rate:.3f}, {len(store.cache)} entries")
+
+        rooms = [f"{100 + rng.randrange(args.rooms)}" for _ in range(2000)]
+        report("patients_in_room()", timed(store.patients_in_room, rooms))
+        report("doses_for_patient()", timed(store.doses_for_patient, ids[:2000]))
+        scan = "SELECT * FROM patients NOT INDEXED WHERE room = ?"
+        report("room query, no index", timed(lambda room: store._query(scan, (room,)), rooms[:200]))
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# tests/bench_verification.py
+"""
+Verification strategies on a simulated noisy classifier.
+
+Each trial shows one patient holding either the prescribed pill or a
+wrong one (half each). Every frame the classifier reads the patient and
+the pill correctly with probability --accuracy, misreads them otherwise,
+and sees nothing with probability --miss. Reported confidences overlap
+between right and wrong reads, as they do for real detectors.
+
+Strategies:
+  single   decide on the first frame (the old analyze_frame path)
+  window   majority over a fixed window of frames
+  early    VerificationAggregator (commit at the confidence threshold)
+
+For each: time to decision (median / p90, at --fps), wrong decisions
+(dispensing the wrong pill, or refusing the right one) and timeouts.
+
+Usage (from the robot/ directory):
+  python tests/bench_verification.py --trials 5000 --accuracy 0.85
+"""
+
+import argparse
+import logging
+import random
+import statistics
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from preception.verification import Outcome, VerificationAggregator  # noqa: E402
+from utils.logger import set_console_level  # noqa: E402
+
+PATIENTS = [f"patient_{i}" for i in range(6)]
+PILLS = [f"pill_{i}" for i in range(6)]
+PRESCRIBED = dict(zip(PATIENTS, PILLS))
+
+
+def matches(patient_id, pill_id):
+    return PRESCRIBED.get(patient_id) == pill_id
+
+
+def make_reader(rng, accuracy: float, miss: float):
+    def read(truth, labels):
+        if rng.random() < miss:
+            return None, 0.0
+        if rng.random() < accuracy:
+            return truth, rng.uniform(0.65, 0.95)
+        return rng.choice([x for x in labels if x != truth]), rng.uniform(0.55, 0.85)
+
+    return read
+
+
+def frames_for_trial(rng, read):
+    patient = rng.choice(PATIENTS)
+    right = rng.random() < 0.5
+    pill = PRESCRIBED[patient] if right else rng.choice([p for p in PILLS if p != PRESCRIBED[patient]])
+    expected = Outcome.VERIFIED if right else Outcome.MISMATCH
+
+    def frame():
+        return (*read(patient, PATIENTS), *read(pill, PILLS))
+
+    return expected, frame
+
+
+def run_single(frame, max_frames, fps):
+    for n in range(1, max_frames + 1):
+        patient_id, _, pill_id, _ = frame()
+        if patient_id is not None and pill_id is not None:
+            return (Outcome.VERIFIED if matches(patient_id, pill_id) else Outcome.MISMATCH), n / fps
+    return Outcome.TIMEOUT, max_frames / fps
+
+
+def run_window(frame, n_frames, fps):
+    patients, pills = Counter(), Counter()
+    for _ in range(n_frames):
+        patient_id, _, pill_id, _ = frame()
+        if patient_id is not None:
+            patients[patient_id] += 1
+        if pill_id is not None:
+            pills[pill_id] += 1
+    if not patients or not pills:
+        return Outcome.TIMEOUT, n_frames / fps
+    patient_id = patients.most_common(1)[0][0]
+    pill_id = pills.most_common(1)[0][0]
+    return (Outcome.VERIFIED if matches(patient_id, pill_id) else Outcome.MISMATCH), n_frames / fps
+
+
+def run_early(frame, args, clock):
+    agg = VerificationAggregator(
+        matches,
+        window_frames=args.window,
+        confidence=args.confidence,
+        deadline_sec=args.deadline,
+        clock=lambda: clock[0],
+    ).start()
+    while True:
+        # Frame n is available 1/fps after frame n-1
+        clock[0] += 1.0 / args.fps
+        decision = agg.add(*frame())
+        if decision is not None:
+            # start() was at t=0, so this includes the wait for the first frame
+            return decision.outcome, decision.elapsed_sec
+
+
+def summarize(name, results):
+    times = sorted(t for _, _, t in results)
+    wrong = sum(1 for expected, got, _ in results if got != Outcome.TIMEOUT and got != expected)
+    wrong_dispense = sum(
+        1 for expected, got, _ in results if got == Outcome.VERIFIED and expected != Outcome.VERIFIED
+    )
+    timeouts = sum(1 for _, got, _ in results if got == Outcome.TIMEOUT)
+    n = len(results)
+    print(
+        f"{name:<8} median {1000 * statistics.median(times):6.0f} ms  "
+        f"p90 {1000 * times[int(0.9 * (n - 1))]:6.0f} ms  "
+        f"wrong {100.0 * wrong / n:5.2f}%  "
+        f"wrong-dispense {100.0 * wrong_dispense / n:5.2f}%  "
+        f"timeout {100.0 * timeouts / n:5.2f}%"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verification strategy benchmark")
+    parser.add_argument("--trials", type=int, default=5000)
+    parser.add_argument("--accuracy", type=float, default=0.85, help="per-frame correct read probability")
+    parser.add_argument("--miss", type=float, default=0.1, help="per-frame no-detection probability")
+    parser.add_argument("--fps", type=float, default=15.0)
+    parser.add_argument("--window", type=int, default=15)
+    parser.add_argument("--confidence", type=float, default=0.99)
+    parser.add_argument("--deadline", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    set_console_level(logging.WARNING)
+
+    results = {"single": [], "window": [], "early": []}
+    rng = random.Random(args.seed)
+    read = make_reader(rng, args.accuracy, args.miss)
+    max_frames = int(args.deadline * args.fps)
+    for _ in range(args.trials):
+        expected, frame = frames_for_trial(rng, read)
+        results["single"].append((expected, *run_single(frame, max_frames, args.fps)))
+        results["window"].append((expected, *run_window(frame, args.window, args.fps)))
+        results["early"].append((expected, *run_early(frame, args, [0.0])))
+
+    print(
+        f"{args.trials} trials, accuracy {args.accuracy}, miss {args.miss}, {args.fps:g} fps, "
+        f"window {args.window}, confidence {args.confidence}, deadline {args.deadline} s"
+    )
+    for name, res in results.items():
+        summarize(name, res)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+# tests/benchmarks/bench_hotpaths.py
+"""
+Benchmarks for the robot's hot paths on fake hardware (see conftest.py
+for how to run, save and compare).
+"""
+
+import sys
+import types
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from arm.kinematics import ArmKinematics  # noqa: E402
+from communication.commands import CommandHandler  # noqa: E402
+from communication.framing import Framer, encode_request  # noqa: E402
+from drive.gopigo_drive import GopiGoDrive  # noqa: E402
+from mock.Mock_drive import MockEasyGoPiGo3  # noqa: E402
+from mock.Mock_sensors import (  # noqa: E402
+    FakeVideoCapture,
+    fake_gpiozero_module,
+    make_face_image,
+    make_tray_image,
+)
+from mock.mock_arm import ARM_CONFIG, fake_servokit_module  # noqa: E402
+from mock.mock_bluetooth import MockController, MockNav, MockSensors  # noqa: E402
+from navigation.navigation import Navigator  # noqa: E402
+from navigation.state_machine import RobotEvent, RobotState, StateMachine  # noqa: E402
+from sensors.sensor_bus import DISTANCE, FRAME, SensorBus  # noqa: E402
+from sensors.sensor_manager import SensorManager  # noqa: E402
+
+SWEEP = [(12.0, 4.0, 6.0), (8.0, -6.0, 10.0), (15.0, 0.0, 2.0), (5.0, 5.0, 14.0)]
+
+
+# -------------------------
+# Fixtures
+# -------------------------
+
+@pytest.fixture
+def servokit(monkeypatch, hw_latency):
+    module = fake_servokit_module(latency=hw_latency)
+    monkeypatch.setitem(sys.modules, "adafruit_servokit", module)
+    return module
+
+
+@pytest.fixture
+def arm(servokit, monkeypatch):
+    from arm import servo_arm
+
+    arm = servo_arm.ServoArm(ARM_CONFIG)
+    # Skip the 20 ms settle pause so the software path is what is timed
+    monkeypatch.setattr(servo_arm, "time", types.SimpleNamespace(sleep=lambda s: None))
+    return arm
+
+
+@pytest.fixture
+def gopigo_drive(hw_latency):
+    return GopiGoDrive({"default_speed": 60, "turn_speed": 50}, gpg=MockEasyGoPiGo3(latency=hw_latency, max_calls=64))
+
+
+@pytest.fixture
+def sonar(monkeypatch, hw_latency):
+    monkeypatch.setitem(
+        sys.modules, "gpiozero", fake_gpiozero_module(distances_cm=(150.0, 140.0, 120.0, 90.0), latency=hw_latency)
+    )
+    from sensors.ultrasonic import UltrasonicSensor
+
+    return UltrasonicSensor(23, 24)
+
+
+@pytest.fixture(scope="module")
+def tray_image():
+    return make_tray_image(pills=8)
+
+
+@pytest.fixture(scope="module")
+def cvtest():
+    pytest.importorskip("cv2")
+    from preception import cvtest
+
+    return cvtest
+
+
+# -------------------------
+# Arm
+# -------------------------
+
+@pytest.mark.benchmark(group="arm")
+def test_kinematics_inverse(benchmark):
+    kin = ArmKinematics(ARM_CONFIG["arm"]["link_lengths_cm"])
+
+    def sweep():
+        for target in SWEEP:
+            kin.inverse(*target)
+
+    benchmark(sweep)
+
+
+@pytest.mark.benchmark(group="arm")
+def test_kinematics_forward(benchmark):
+    kin = ArmKinematics(ARM_CONFIG["arm"]["link_lengths_cm"])
+    benchmark(kin.forward, 30.0, 45.0, 60.0)
+
+
+@pytest.mark.benchmark(group="arm")
+def test_servo_arm_move_to_xyz(benchmark, arm, servokit):
+    targets = iter(SWEEP * 1000000)
+    benchmark(lambda: arm.move_to_xyz(*next(targets)))
+    assert servokit.kit.writes > 0
+
+
+@pytest.mark.benchmark(group="arm")
+def test_servo_arm_move_joint(benchmark, arm):
+    benchmark(arm.move_joint, "base", 120.0)
+
+
+# -------------------------
+# Drive, sensors, navigation
+# -------------------------
+
+@pytest.mark.benchmark(group="drive")
+def test_drive_move(benchmark, gopigo_drive):
+    commands = [(1.0, 0.0), (0.2, 0.8), (0.2, -0.8), (-1.0, 0.1), (0.0, 0.0)]
+
+    def cycle():
+        for linear, angular in commands:
+            gopigo_drive.move(linear, angular)
+
+    benchmark(cycle)
+
+
+@pytest.mark.benchmark(group="sensors")
+def test_sensor_manager_sonar(benchmark, sonar):
+    sensors = SensorManager(ultrasonic=sonar)
+    assert benchmark(sensors.get_front_distance_cm) is not None
+
+
+@pytest.mark.benchmark(group="sensors")
+def test_sensor_manager_camera(benchmark, tray_image, hw_latency):
+    from sensors.camera import Camera
+
+    sensors = SensorManager(camera=Camera(cap=FakeVideoCapture(frames=[tray_image], latency=hw_latency)))
+    assert benchmark(sensors.get_camera_frame) is not None
+
+
+@pytest.mark.benchmark(group="sensors")
+def test_sensor_bus_publish(benchmark):
+    bus = SensorBus()
+    benchmark(bus.publish, DISTANCE, 42.0)
+
+
+@pytest.mark.benchmark(group="sensors")
+def test_sensor_bus_aligned(benchmark, tray_image):
+    bus = SensorBus(capacity=256)
+    for i in range(256):
+        bus.publish(DISTANCE, 100.0, t=i * 0.02)
+    bus.publish(FRAME, tray_image, t=3.001)
+    assert benchmark(bus.aligned, FRAME, DISTANCE, max_skew=0.05) is not None
+
+
+@pytest.mark.benchmark(group="navigation")
+def test_navigator_step_reactive(benchmark, gopigo_drive, sonar):
+    fsm = StateMachine()
+    nav = Navigator(gopigo_drive, SensorManager(ultrasonic=sonar), fsm, {"navigation": {"auto_speed": 60}})
+    nav.enable_autonomy()
+    benchmark(nav.step)
+
+
+@pytest.mark.benchmark(group="navigation")
+def test_occupancy_grid_update(benchmark):
+    from navigation.occupancy_grid import OccupancyGrid
+
+    grid = OccupancyGrid(1000.0, 600.0, resolution_cm=5.0)
+    readings = iter([((300.0, 300.0, 0.4), 120.0), ((300.0, 300.0, 0.4), float("inf"))] * 1000000)
+    benchmark(lambda: grid.update(*next(readings)))
+
+
+@pytest.mark.benchmark(group="navigation")
+def test_navigator_step_mapped(benchmark):
+    from navigation.occupancy_grid import OccupancyGrid
+    from simulation.clock import VirtualClock
+    from simulation.runner import DEFAULT_CONFIG
+    from simulation.sim_drive import SimDrive
+    from simulation.sim_sensors import SimUltrasonic
+    from simulation.world import RoomMap
+
+    clock = VirtualClock()
+    world = RoomMap(600.0, 400.0, [(200.0, 120.0, 260.0, 260.0)])
+    drive = SimDrive(DEFAULT_CONFIG["drive"], world, pose=(40.0, 200.0, 0.0))
+    sensors = SensorManager(ultrasonic=SimUltrasonic(world, drive, seed=1))
+    fsm = StateMachine(clock=clock)
+    grid = OccupancyGrid(600.0, 400.0, resolution_cm=5.0, occupied_threshold=1.0)
+    nav = Navigator(drive, sensors, fsm, DEFAULT_CONFIG, grid=grid, pose_provider=lambda: drive.pose, clock=clock)
+
+    def tick():
+        if fsm.state == RobotState.IDLE:
+            drive.x, drive.y, drive.theta = 40.0, 200.0, 0.0
+            nav.go_to((560.0, 200.0))
+        nav.step()
+        drive.advance(0.05)
+        clock.advance(0.05)
+
+    benchmark(tick)
+
+
+@pytest.mark.benchmark(group="fsm")
+def test_state_machine_dispatch(benchmark):
+    fsm = StateMachine()
+    events = [
+        RobotEvent.AUTONOMY_ENABLED,
+        RobotEvent.OBSTACLE_DETECTED,
+        RobotEvent.OBSTACLE_CLEARED,
+        RobotEvent.MANUAL_COMMAND,
+        RobotEvent.IDLE,
+    ]
+
+    def cycle():
+        for event in events:
+            fsm.dispatch(event)
+
+    benchmark(cycle)
+
+
+# -------------------------
+# Communication
+# -------------------------
+
+@pytest.mark.benchmark(group="commands")
+def test_framer_parse_pipelined_packet(benchmark):
+    packet = b"".join(encode_request(i, "PING") for i in range(32))
+
+    def parse():
+        framer = Framer()
+        framer.feed(packet)
+        return sum(1 for _ in framer)
+
+    assert benchmark(parse) == 32
+
+
+@pytest.mark.benchmark(group="commands")
+def test_command_handler(benchmark):
+    handler = CommandHandler(MockNav(), MockController(), MockSensors())
+    commands = ["PING", "DIST", "JOBS", "JOB 7", "BOGUS"]
+
+    def cycle():
+        for cmd in commands:
+            handler.handle(cmd)
+
+    try:
+        benchmark(cycle)
+    finally:
+        handler.jobs.shutdown()
+
+
+# -------------------------
+# Perception
+# -------------------------
+
+@pytest.mark.benchmark(group="vision")
+def test_detect_pills(benchmark, cvtest, tray_image):
+    boxes = benchmark(cvtest.detect_pills, tray_image)
+    assert len(boxes) == 8
+
+
+@pytest.mark.benchmark(group="vision")
+def test_detect_faces(benchmark, cvtest):
+    cascade = cvtest.load_face_cascade()
+    if cascade is None:
+        pytest.skip("Haar cascade data not available")
+    benchmark(cvtest.detect_faces, make_face_image(), cascade)
+
+
+@pytest.fixture(scope="module")
+def tray_frames(tray_image):
+    cv2 = pytest.importorskip("cv2")
+    with_pill = tray_image.copy()
+    cv2.circle(with_pill, (300, 400), 20, (235, 235, 235), -1)
+    return tray_image, with_pill
+
+
+@pytest.mark.benchmark(group="vision")
+def test_tray_inventory_full_recount(benchmark, tray_frames):
+    from preception.tray_inventory import TrayInventory
+
+    inv = TrayInventory()
+    benchmark(inv.recount, tray_frames[0])
+
+
+@pytest.mark.benchmark(group="vision")
+def test_tray_inventory_static_frame(benchmark, tray_frames):
+    from preception.tray_inventory import TrayInventory
+
+    inv = TrayInventory()
+    inv.update(tray_frames[0])
+    benchmark(inv.update, tray_frames[0])
+
+
+@pytest.mark.benchmark(group="vision")
+def test_tray_inventory_one_pill_changed(benchmark, tray_frames):
+    from preception.tray_inventory import TrayInventory
+
+    inv = TrayInventory()
+    inv.update(tray_frames[0])
+    frames = iter(tray_frames * 1000000)
+    benchmark(lambda: inv.update(next(frames)))
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    from storage import LocalStore
+
+    store = LocalStore(tmp_path_factory.mktemp("store") / "robot.db", cache_size=16384)
+    store.upsert_patients(
+        {"patient_id": f"patient_{i}", "room": f"{100 + i % 2500}", "pill": "red_round"} for i in range(10000)
+    )
+    yield store
+    store.close()
+
+
+@pytest.mark.benchmark(group="store")
+def test_store_patient_cached(benchmark, store):
+    store.patient("patient_42")
+    benchmark(store.pill_matches, "patient_42", "red_round")
+
+
+@pytest.mark.benchmark(group="store")
+def test_store_patient_uncached(benchmark, store):
+    def lookup():
+        store.cache.invalidate([("patients", "patient_4242")])
+        return store.patient("patient_4242")
+
+    benchmark(lookup)
+
+
+@pytest.mark.benchmark(group="store")
+def test_store_patients_in_room(benchmark, store):
+    benchmark(store.patients_in_room, "204")
@@ -0,0 +1,52 @@
+# tests/benchmarks/conftest.py
+"""
+Hot-path benchmark suite (pytest-benchmark) on fake hardware.
+
+  python -m pytest tests/benchmarks/bench_hotpaths.py
+  python -m pytest tests/benchmarks/bench_hotpaths.py --benchmark-autosave
+  python -m pytest tests/benchmarks/bench_hotpaths.py --benchmark-compare --benchmark-compare-fail=mean:25%
+  python -m pytest tests/benchmarks/bench_hotpaths.py --hw-latency 0.0002
+
+Runs are saved only with --benchmark-autosave or --benchmark-save, by
+default under tests/benchmarks/results/<machine>/ (numbered JSON files,
+commit id included; git-ignored), so --benchmark-compare diffs against
+the previous saved run on the same machine. --benchmark-storage points
+elsewhere. The files are named bench_*.py, so the regular test run does
+not collect them.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+TESTS_DIR = Path(__file__).resolve().parents[1]
+ROBOT_DIR = TESTS_DIR.parent
+for path in (ROBOT_DIR, TESTS_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--hw-latency",
+        type=float,
+        default=0.0,
+        help="seconds per fake hardware call (I2C/SPI/GPIO/camera)",
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Runs before pytest-benchmark builds its session from these options
+    if not hasattr(config.option, "benchmark_storage"):
+        return
+    if config.option.benchmark_storage == "file://./.benchmarks":
+        config.option.benchmark_storage = RESULTS_DIR.as_uri()
+
+
+@pytest.fixture
+def hw_latency(request):
+    return request.config.getoption("--hw-latency")
@@ -0,0 +1,9 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+# Modules import each other relative to the robot/ directory
+# (e.g. "from navigation.state_machine import RobotState").
+ROBOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROBOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROBOT_DIR))
@@ -0,0 +1,84 @@
+# tests/mock/Mock_drive.py
+import time
+from collections import deque
+
+from mock.latency import simulate_latency
+
+
+class MockEasyGoPiGo3:
+    """
+    Stand-in for easygopigo3.EasyGoPiGo3 with a simple wheel model:
+    each wheel turns at its commanded deg/s and the encoders integrate
+    that over the (injectable) clock. Every call to the board costs
+    `latency` seconds (an SPI transaction on the real GoPiGo3).
+    """
+
+    WHEEL_DIAMETER = 66.5      # mm
+    WHEEL_BASE_WIDTH = 117.0   # mm
+
+    def __init__(self, clock=time.monotonic, latency: float = 0.0, max_calls: int | None = None):
+        """
+        :param latency: seconds per board call
+        :param max_calls: keep only the newest calls (benchmarks issue millions)
+        """
+        self.clock = clock
+        self.latency = latency
+        self.speed = 300
+        self._left_dps = 0.0
+        self._right_dps = 0.0
+        self._left_deg = 0.0
+        self._right_deg = 0.0
+        self._last = clock()
+        self.calls = [] if max_calls is None else deque(maxlen=max_calls)
+
+    def _advance(self):
+        now = self.clock()
+        dt = now - self._last
+        self._last = now
+        self._left_deg += self._left_dps * dt
+        self._right_deg += self._right_dps * dt
+
+    def _set_wheels(self, left, right):
+        simulate_latency(self.latency)
+        self._advance()
+        self._left_dps = left
+        self._right_dps = right
+
+    def set_speed(self, speed):
+        self.calls.append(("set_speed", speed))
+        simulate_latency(self.latency)
+        self.speed = speed
+
+    def forward(self):
+        self.calls.append(("forward",))
+        self._set_wheels(self.speed, self.speed)
+
+    def backward(self):
+        self.calls.append(("backward",))
+        self._set_wheels(-self.speed, -self.speed)
+
+    def left(self):
+        # Real EasyGoPiGo3.left() only drives the right wheel
+        self.calls.append(("left",))
+        self._set_wheels(0.0, self.speed)
+
+    def right(self):
+        self.calls.append(("right",))
+        self._set_wheels(self.speed, 0.0)
+
+    def spin_left(self):
+        self.calls.append(("spin_left",))
+        self._set_wheels(-self.speed, self.speed)
+
+    def spin_right(self):
+        self.calls.append(("spin_right",))
+        self._set_wheels(self.speed, -self.speed)
+
+    def stop(self):
+        self.calls.append(("stop",))
+        self._set_wheels(0.0, 0.0)
+
+    def read_encoders(self):
+        simulate_latency(self.latency)
+        self._advance()
+        return int(self._left_deg), int(self._right_deg)
@@ -0,0 +1,186 @@
+# tests/mock/Mock_sensors.py
+import itertools
+import time
+import types
+
+from mock.latency import simulate_latency
+
+SPEED_OF_SOUND_CM_S = 34300.0
+
+
+class FakeGPIO:
+    """
+    Stand-in for the RPi.GPIO module with an HC-SR04 on it: after the
+    trigger pin falls, the echo pin goes high for the round-trip time
+    of the next distance in `distances_cm`.
+    """
+
+    BCM = 11
+    BOARD = 10
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+
+    def __init__(self, distances_cm=(100.0,), echo_pin: int | None = None, latency: float = 0.0):
+        """
+        :param distances_cm: readings to cycle through
+        :param echo_pin: pin that carries the echo (default: first IN pin)
+        :param latency: seconds per pin access
+        """
+        self._distances = itertools.cycle(distances_cm)
+        self.echo_pin = echo_pin
+        self.latency = latency
+        self.mode = None
+        self.pins = {}     # pin -> IN/OUT
+        self.levels = {}   # output pin -> level
+        self._echo_start = None
+        self._echo_end = None
+
+    def setmode(self, mode):
+        self.mode = mode
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, pin, direction, **kwargs):
+        self.pins[pin] = direction
+        if direction == self.IN and self.echo_pin is None:
+            self.echo_pin = pin
+
+    def output(self, pin, value):
+        simulate_latency(self.latency)
+        was_high = self.levels.get(pin)
+        self.levels[pin] = int(bool(value))
+        if was_high and not value:
+            # Trigger pulse ended: the sensor answers ~0.2 ms later
+            width = 2.0 * next(self._distances) / SPEED_OF_SOUND_CM_S
+            self._echo_start = time.time() + 0.0002
+            self._echo_end = self._echo_start + width
+
+    def input(self, pin):
+        simulate_latency(self.latency)
+        if pin != self.echo_pin or self._echo_start is None:
+            return self.LOW
+        now = time.time()
+        return self.HIGH if self._echo_start <= now < self._echo_end else self.LOW
+
+    def cleanup(self, pins=None):
+        self.levels.clear()
+
+
+class FakeDistanceSensor:
+    """
+    Stand-in for gpiozero.DistanceSensor (distance in metres).
+    """
+
+    def __init__(self, trigger=None, echo=None, max_distance: float = 1.0, distances_cm=(100.0,), latency: float = 0.0):
+        self.trigger = trigger
+        self.echo = echo
+        self.max_distance = max_distance
+        self.latency = latency
+        self._distances = itertools.cycle(distances_cm)
+
+    @property
+    def distance(self) -> float:
+        simulate_latency(self.latency)
+        return min(self.max_distance, next(self._distances) / 100.0)
+
+
+def fake_gpiozero_module(distances_cm=(100.0,), latency: float = 0.0):
+    """
+    Module to put in sys.modules["gpiozero"] for sensors.ultrasonic.
+    """
+    module = types.ModuleType("gpiozero")
+
+    def DistanceSensor(trigger=None, echo=None, max_distance: float = 1.0, **kwargs):
+        return FakeDistanceSensor(trigger, echo, max_distance, distances_cm, latency)
+
+    module.DistanceSensor = DistanceSensor
+    return module
+
+
+class FakeVideoCapture:
+    """
+    Stand-in for cv2.VideoCapture that serves fixture frames in a loop.
+    Each read() takes `latency` seconds (sensor readout + transfer).
+    """
+
+    def __init__(self, source=0, frames=(), latency: float = 0.0, copy: bool = True):
+        """
+        :param frames: images (H x W x 3 uint8 arrays) to cycle through;
+                       none means the device failed to open
+        :param copy: return a copy, as a real capture fills a new buffer
+        """
+        self.source = source
+        self.frames = list(frames)
+        self.latency = latency
+        self.copy = copy
+        self.reads = 0
+        self.props = {}
+        self._opened = bool(self.frames)
+        self._next = itertools.cycle(self.frames) if self.frames else None
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def read(self):
+        if not self._opened:
+            return False, None
+        simulate_latency(self.latency)
+        self.reads += 1
+        frame = next(self._next)
+        return True, frame.copy() if self.copy else frame
+
+    def set(self, prop, value) -> bool:
+        self.props[prop] = value
+        return True
+
+    def get(self, prop):
+        return self.props.get(prop, 0.0)
+
+    def release(self):
+        self._opened = False
+
+
+# -------------------------
+# Fixture images
+# -------------------------
+
+def make_tray_image(pills: int = 6, width: int = 640, height: int = 480, seed: int = 0):
+    """
+    Dark tray with white and red round pills (BGR), for detect_pills.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    img = np.full((height, width, 3), 40, dtype=np.uint8)
+    img += rng.integers(0, 12, size=img.shape, dtype=np.uint8)  # sensor noise
+    yy, xx = np.mgrid[0:height, 0:width]
+    for i in range(pills):
+        cx = 60 + (i % 4) * 150 + int(rng.integers(-10, 10))
+        cy = 80 + (i // 4) * 160 + int(rng.integers(-10, 10))
+        r = int(rng.integers(16, 26))
+        disc = (xx - cx) ** 2 + (yy - cy) ** 2 <= r * r
+        img[disc] = (235, 235, 235) if i % 2 == 0 else (30, 30, 200)
+    return img
+
+
+def make_face_image(width: int = 640, height: int = 480):
+    """
+    Grey scene with a schematic face: a bright oval with dark eyes and
+    mouth. Enough structure for the Haar cascade to do real work.
+    """
+    import numpy as np
+
+    img = np.full((height, width, 3), 90, dtype=np.uint8)
+    yy, xx = np.mgrid[0:height, 0:width]
+    cx, cy = width // 2, height // 2
+    face = ((xx - cx) / 90.0) ** 2 + ((yy - cy) / 120.0) ** 2 <= 1.0
+    img[face] = (170, 190, 220)
+    for ex in (cx - 35, cx + 35):
+        eye = ((xx - ex) / 16.0) ** 2 + ((yy - (cy - 30)) / 9.0) ** 2 <= 1.0
+        img[eye] = (30, 30, 30)
+    mouth = (abs(yy - (cy + 55)) <= 6) & (abs(xx - cx) <= 40)
+    img[mouth] = (40, 40, 90)
+    return img
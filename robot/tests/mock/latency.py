@@ -0,0 +1,17 @@
+# tests/mock/latency.py
+import time
+
+
+def simulate_latency(seconds: float):
+    """
+    Block for a simulated bus/device delay. Sub-millisecond delays spin
+    on perf_counter, since sleep() cannot resolve them.
+    """
+    if seconds <= 0:
+        return
+    if seconds >= 0.002:
+        time.sleep(seconds)
+        return
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
@@ -0,0 +1,77 @@
+# tests/mock/mock_arm.py
+import types
+
+from mock.latency import simulate_latency
+
+
+class FakeServo:
+    """
+    One PCA9685 channel. Setting .angle is one I2C write.
+    """
+
+    def __init__(self, kit, channel: int):
+        self.kit = kit
+        self.channel = channel
+        self.actuation_range = 180
+        self._angle = None
+
+    @property
+    def angle(self):
+        return self._angle
+
+    @angle.setter
+    def angle(self, value):
+        if value is not None and not 0 <= value <= self.actuation_range:
+            raise ValueError(f"Angle out of range: {value}")
+        simulate_latency(self.kit.latency)
+        self._angle = value
+        self.kit.writes += 1
+
+    def set_pulse_width_range(self, min_pulse: int, max_pulse: int):
+        pass
+
+
+class FakeServoKit:
+    """
+    Stand-in for adafruit_servokit.ServoKit with a per-write I2C latency.
+    """
+
+    def __init__(self, channels: int = 16, latency: float = 0.0, **kwargs):
+        """
+        :param latency: seconds per angle write
+        """
+        self.channels = channels
+        self.latency = latency
+        self.writes = 0
+        self.servo = [FakeServo(self, ch) for ch in range(channels)]
+
+
+def fake_servokit_module(latency: float = 0.0):
+    """
+    Module to put in sys.modules["adafruit_servokit"], so ServoArm
+    builds on FakeServoKit. The created kit is kept as module.kit.
+    """
+    module = types.ModuleType("adafruit_servokit")
+
+    def ServoKit(channels: int = 16, **kwargs):
+        module.kit = FakeServoKit(channels, latency=latency, **kwargs)
+        return module.kit
+
+    module.ServoKit = ServoKit
+    module.kit = None
+    return module
+
+
+ARM_CONFIG = {
+    "arm": {
+        "servo_channels": {"base": 0, "shoulder": 1, "elbow": 2, "gripper": 3},
+        "home_angles": {"base": 90, "shoulder": 90, "elbow": 90, "gripper": 90},
+        "limits": {
+            "base": [0, 180],
+            "shoulder": [10, 170],
+            "elbow": [10, 170],
+            "gripper": [20, 160],
+        },
+        "link_lengths_cm": {"shoulder": 10.0, "elbow": 12.0},
+    }
+}
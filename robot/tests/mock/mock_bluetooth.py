@@ -0,0 +1,76 @@
+# tests/mock/mock_bluetooth.py
+import socket
+
+from communication.bluetooth_server import BluetoothServer
+
+
+class LoopbackBluetoothServer(BluetoothServer):
+    """
+    BluetoothServer over a loopback TCP socket, so the lifecycle and
+    command round trip can be exercised without Bluetooth hardware.
+    """
+
+    def __init__(self, nav=None, controller=None, sensors=None):
+        super().__init__(
+            nav or MockNav(),
+            controller or MockController(),
+            sensors or MockSensors(),
+            config={},
+        )
+        self._listen_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._listen_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listen_sock.bind(("127.0.0.1", 0))
+        self._listen_sock.listen(1)
+        self.address = self._listen_sock.getsockname()
+
+    def _transport_available(self) -> bool:
+        return True
+
+    def _open_server_socket(self):
+        return self._listen_sock
+
+    def connect(self, timeout: float = 2.0):
+        """
+        Open a client connection and consume the CONNECTED greeting.
+        """
+        sock = socket.create_connection(self.address, timeout=timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        assert sock.recv(64) == b"CONNECTED\n"
+        return sock
+
+
+class MockNav:
+    """
+    Long-running behaviors as cancellable control loops.
+    """
+
+    def __init__(self, tick_sec: float = 0.05, scan_ticks: int = 4):
+        self.tick_sec = tick_sec
+        self.scan_ticks = scan_ticks
+        self.ticks = 0
+
+    def drive_forward_safe(self, job):
+        while not job.wait(self.tick_sec):
+            self.ticks += 1
+
+    def search_for_pill(self, job):
+        for i in range(self.scan_ticks):
+            if job.wait(self.tick_sec):
+                return
+            job.set_progress((i + 1) / self.scan_ticks)
+
+
+class MockController:
+    def __init__(self):
+        self.stops = 0
+
+    def stop(self):
+        self.stops += 1
+
+
+class MockSensors:
+    def __init__(self, distance_cm=42.0):
+        self.distance_cm = distance_cm
+
+    def get_front_distance(self):
+        return self.distance_cm
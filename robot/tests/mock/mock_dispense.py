@@ -0,0 +1,103 @@
+# tests/mock/mock_dispense.py
+import threading
+
+from dispensing.actions import DispenseActions
+from mock.mock_bluetooth import MockNav
+from preception.verification import Decision, Outcome
+
+# Seconds per stage. These are assumptions (estimates of drive distance,
+# arm travel and camera warm-up), not measurements on the robot; pass
+# durations= once the stages have been timed through RobotActions.
+DEFAULT_DURATIONS = {
+    "drive_to_room": 6.0,
+    "final_approach": 2.0,
+    "warm_vision": 2.5,
+    "preposition_arm": 1.2,
+    "prefetch": 0.4,
+    "verify": 0.6,
+    "dispense": 3.0,
+}
+
+
+class TimedActions(DispenseActions):
+    """
+    DispenseActions that only take time: each call sleeps its duration
+    (times scale) and is logged in .calls.
+    """
+
+    def __init__(self, durations=None, scale: float = 1.0, outcomes=None, fail=None):
+        """
+        :param outcomes: dose id -> Outcome for verify (default VERIFIED)
+        :param fail: action name that raises RuntimeError
+        """
+        self.durations = dict(DEFAULT_DURATIONS, **(durations or {}))
+        self.scale = scale
+        self.outcomes = outcomes or {}
+        self.fail = fail
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _act(self, name, run, *args):
+        with self._lock:
+            self.calls.append((name, *args))
+        if self.fail == name:
+            raise RuntimeError(f"{name} failed")
+        run.wait(self.durations[name] * self.scale)
+
+    def prefetch(self, doses, run):
+        self._act("prefetch", run)
+        return {d.patient_id: {"id": d.patient_id} for d in doses}
+
+    def drive_to_room(self, room, run):
+        self._act("drive_to_room", run, room)
+
+    def final_approach(self, room, run):
+        self._act("final_approach", run, room)
+
+    def warm_vision(self, run):
+        self._act("warm_vision", run)
+
+    def preposition_arm(self, run):
+        self._act("preposition_arm", run)
+
+    def verify(self, dose, record, run):
+        self._act("verify", run, dose.id)
+        outcome = self.outcomes.get(dose.id, Outcome.VERIFIED)
+        return Decision(outcome, dose.patient_id, dose.pill, 0.99, 0.99, 3, 0.2)
+
+    def dispense(self, dose, run):
+        self._act("dispense", run, dose.id)
+
+
+class GoalNav(MockNav):
+    """
+    MockNav with the Navigator calls RobotActions uses: go_to() sets a
+    goal, drive_forward_safe() ticks until the goal is reached (pose
+    jumps there) and pose_provider() reports where the robot ended up.
+    """
+
+    def __init__(self, tick_sec: float = 0.001, drive_ticks: int = 3, reach: bool = True):
+        """
+        :param drive_ticks: ticks per drive
+        :param reach: False leaves the robot short of every goal (no route)
+        """
+        super().__init__(tick_sec=tick_sec)
+        self.drive_ticks = drive_ticks
+        self.reach = reach
+        self.pose = (0.0, 0.0, 0.0)
+        self.goals = []  # (goal, route_key) per go_to()
+
+    def go_to(self, goal_xy, route_key=None):
+        self.goals.append((tuple(goal_xy), route_key))
+
+    def drive_forward_safe(self, job):
+        for _ in range(self.drive_ticks):
+            if job.wait(self.tick_sec):
+                return
+            self.ticks += 1
+        if self.reach:
+            x, y = self.goals[-1][0]
+            self.pose = (x, y, 0.0)
+
+    def pose_provider(self):
+        return self.pose
@@ -0,0 +1,35 @@
+import sys
+
+import pytest
+
+from mock.mock_arm import ARM_CONFIG, fake_servokit_module
+
+
+@pytest.fixture
+def arm(monkeypatch):
+    module = fake_servokit_module()
+    monkeypatch.setitem(sys.modules, "adafruit_servokit", module)
+    from arm import servo_arm
+
+    monkeypatch.setattr(servo_arm.time, "sleep", lambda s: None)
+    return servo_arm.ServoArm(ARM_CONFIG), module.kit
+
+
+def test_servo_arm_homes_and_clamps_to_limits(arm):
+    arm, kit = arm
+    assert kit.writes == 4
+    assert [kit.servo[ch].angle for ch in range(4)] == [90, 90, 90, 90]
+
+    arm.move_joint("shoulder", 200.0)
+    assert kit.servo[1].angle == 170
+    assert kit.writes == 5
+
+
+def test_servo_arm_move_to_xyz_writes_each_joint(arm):
+    arm, kit = arm
+    before = kit.writes
+    arm.move_to_xyz(12.0, 4.0, 6.0)
+    assert kit.writes > before
+    for joint, (lo, hi) in ARM_CONFIG["arm"]["limits"].items():
+        angle = kit.servo[ARM_CONFIG["arm"]["servo_channels"][joint]].angle
+        assert lo <= angle <= hi
@@ -1 +1,337 @@
-pass
\ No newline at end of file
+# tests/test_communication.py
+import os
+import signal
+import socket
+import threading
+import time
+
+import pytest
+
+from communication import CommandHandler, CommandServer, TcpTransport, UnixTransport
+from communication.framing import BINARY, FrameError, Framer, encode_request
+from communication.jobs import JobExecutor, JobStatus
+from communication.telemetry import TelemetryHub
+from mock.mock_bluetooth import LoopbackBluetoothServer, MockController, MockNav, MockSensors
+
+
+def test_round_trip_and_stop_unblocks_client():
+    server = LoopbackBluetoothServer()
+    assert server.start_background()
+    client = server.connect()
+
+    client.sendall(b"PING\n")
+    assert client.recv(64) == b"PONG\n"
+    client.sendall(b"STOP\n")
+    assert client.recv(64) == b"OK\n"
+    assert server.controller.stops == 1
+
+    # The server thread is blocked in recv(); stop() must wake it
+    server.stop()
+    server.join(timeout=1.0)
+    assert not server.server_thread.is_alive()
+    client.close()
+
+
+def test_idle_server_does_not_spin():
+    server = LoopbackBluetoothServer()
+    waiter = threading.Thread(target=server.start, kwargs={"install_signal_handlers": False})
+    waiter.start()
+    client = server.connect()
+
+    cpu0 = time.process_time()
+    time.sleep(0.5)
+    cpu = time.process_time() - cpu0
+
+    server.stop()
+    waiter.join(timeout=2.0)
+    client.close()
+
+    assert not waiter.is_alive()
+    # The old busy-wait loop burned ~0.5 s of CPU here
+    assert cpu < 0.1
+
+
+def test_sigterm_stops_blocking_start():
+    server = LoopbackBluetoothServer()
+    timer = threading.Timer(0.2, os.kill, (os.getpid(), signal.SIGTERM))
+    timer.start()
+
+    t0 = time.monotonic()
+    server.start()  # returns once the signal handler runs
+    assert time.monotonic() - t0 < 2.0
+    assert not server.server_thread.is_alive()
+    assert signal.getsignal(signal.SIGTERM) != server._on_signal
+
+
+# -------------------------
+# asyncio CommandServer
+# -------------------------
+
+def _command_server(*transports):
+    handler = CommandHandler(MockNav(), MockController(), MockSensors())
+    server = CommandServer(handler, transports)
+    server.start_in_thread()
+    return server
+
+
+def _connect(address, family=socket.AF_INET):
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(2.0)
+    sock.connect(address)
+    assert sock.recv(64) == b"CONNECTED\n"
+    return sock
+
+
+def test_command_server_serves_many_clients_over_tcp_and_unix(tmp_path):
+    tcp = TcpTransport(port=0)
+    unix = UnixTransport(str(tmp_path / "robot.sock"))
+    server = _command_server(tcp, unix)
+
+    clients = [_connect(("127.0.0.1", tcp.port)) for _ in range(8)]
+    clients.append(_connect(unix.path, socket.AF_UNIX))
+
+    # A client that never reads must not hold up the others
+    clients[0].sendall(b"DIST\n" * 100)
+
+    for sock in clients[1:]:
+        sock.sendall(b"PING\n")
+    for sock in clients[1:]:
+        assert sock.recv(64) == b"PONG\n"
+    assert len(server.clients) == 9
+
+    server.stop()
+    server.join()
+    # Shutdown closes every session
+    assert clients[1].recv(64) == b""
+    for sock in clients:
+        sock.close()
+    assert not (tmp_path / "robot.sock").exists()
+
+
+class BrokenTransport(TcpTransport):
+    name = "broken"
+
+    def __init__(self):
+        super().__init__(port=0)
+        self.closed = False
+
+    async def start(self, client_connected_cb, limit: int):
+        raise OSError("RFCOMM sockets are not supported on this system")
+
+    def close(self):
+        self.closed = True
+
+
+def test_command_server_skips_transports_that_fail_to_start():
+    broken, tcp = BrokenTransport(), TcpTransport(port=0)
+    server = _command_server(broken, tcp)  # listed first, like rfcomm in config.json
+    try:
+        sock = _connect(("127.0.0.1", tcp.port))
+        sock.sendall(b"PING\n")
+        assert sock.recv(64) == b"PONG\n"
+        sock.close()
+        assert broken.closed and server.transports == [tcp]
+    finally:
+        server.stop()
+        server.join()
+
+    alone = CommandServer(CommandHandler(MockNav(), MockController(), MockSensors()), [BrokenTransport()])
+    with pytest.raises(RuntimeError, match="did not start"):
+        alone.start_in_thread()
+
+
+# -------------------------
+# Framing
+# -------------------------
+
+def test_framer_reassembles_split_and_merged_commands():
+    framer = Framer()
+    framer.feed(b"PI")
+    assert list(framer) == []
+    framer.feed(b"NG\r\nDIST\n#7 STOP\nPI")
+    assert list(framer) == [(None, "PING"), (None, "DIST"), (7, "STOP")]
+    assert framer.buffered == 2
+
+
+def test_framer_switches_to_binary_mid_packet():
+    framer = Framer()
+    framer.feed(b"MODE BINARY\n" + encode_request(5, "PING", BINARY) + encode_request(6, "DIST", BINARY)[:6])
+
+    req_id, cmd = next(framer)
+    assert framer.handle_control(req_id, cmd) == b"OK\n"
+    assert list(framer) == [(5, "PING")]
+    assert framer.encode(5, "PONG") == encode_request(5, "PONG", BINARY)
+
+    framer.feed(encode_request(6, "DIST", BINARY)[6:])
+    assert list(framer) == [(6, "DIST")]
+
+
+def test_framer_rejects_oversized_frames():
+    framer = Framer(max_frame=16)
+    framer.feed(b"X" * 32)
+    with pytest.raises(FrameError):
+        list(framer)
+
+
+def test_bluetooth_server_pipelined_commands_get_matched_replies():
+    server = LoopbackBluetoothServer()
+    server.start_background()
+    client = server.connect()
+
+    # Split across packets, then several commands in one packet
+    client.sendall(b"PI")
+    time.sleep(0.05)
+    client.sendall(b"NG\n#1 DIST\n#2 PING\n#3 NOPE\n")
+
+    expected = b"PONG\n#1 DIST 42.0\n#2 PONG\n#3 UNKNOWN_COMMAND\n"
+    data = b""
+    while len(data) < len(expected):
+        data += client.recv(256)
+    assert data == expected
+
+    server.stop()
+    server.join()
+    client.close()
+
+
+# -------------------------
+# Jobs
+# -------------------------
+
+def test_dist_without_a_reading_reports_none():
+    handler = CommandHandler(MockNav(), MockController(), MockSensors(distance_cm=None))
+    assert handler.handle("DIST") == "DIST NONE"
+    handler.sensors.distance_cm = 12.34
+    assert handler.handle("DIST") == "DIST 12.3"
+
+
+def test_repeated_start_auto_collapses_into_one_job():
+    handler = CommandHandler(MockNav(), MockController(), MockSensors())
+
+    first = handler.handle("START_AUTO")
+    assert first == "OK JOB 1"
+    assert handler.handle("START_AUTO") == "OK JOB 1 RUNNING"
+    assert len(handler.jobs.jobs(active_only=True)) == 1
+    assert handler.handle("JOB 1").startswith("JOB 1 START_AUTO")
+
+    assert handler.handle("CANCEL 1") == "OK"
+    assert handler.jobs.get(1).join(timeout=1.0)
+    assert handler.handle("JOB 1") == "JOB 1 START_AUTO CANCELLED 0.00"
+    assert handler.handle("CANCEL 1") == "JOB_FINISHED"
+    assert handler.handle("CANCEL 99") == "UNKNOWN_JOB"
+    handler.jobs.shutdown()
+
+
+def test_stop_cancels_motion_jobs_within_one_tick():
+    nav = MockNav(tick_sec=0.05, scan_ticks=1000)
+    handler = CommandHandler(nav, MockController(), MockSensors())
+    handler.handle("START_AUTO")
+    handler.handle("PILL_SCAN")
+    time.sleep(0.12)
+
+    t0 = time.monotonic()
+    assert handler.handle("STOP") == "OK"
+    for job in handler.jobs.jobs():
+        assert job.join(timeout=1.0)
+    elapsed = time.monotonic() - t0
+
+    assert elapsed < nav.tick_sec
+    assert handler.handle("JOBS") == "JOBS"
+    assert all(j.status.name == "CANCELLED" for j in handler.jobs.jobs())
+    handler.jobs.shutdown()
+
+
+def test_job_executor_bounds_workers_and_queue():
+    release = threading.Event()
+    running = []
+
+    def blocker(job):
+        running.append(job.id)
+        release.wait(1.0)
+
+    executor = JobExecutor(workers=2, max_queued=1)
+    jobs = [executor.submit(f"k{i}", blocker)[0] for i in range(3)]
+    assert executor.submit("k3", blocker) == (None, False)
+
+    time.sleep(0.05)
+    assert sorted(running) == [1, 2]
+    assert jobs[2].status == JobStatus.QUEUED
+
+    # A cancelled queued job never runs
+    executor.cancel(jobs[2].id)
+    release.set()
+    assert jobs[2].join(timeout=1.0)
+    assert jobs[2].status == JobStatus.CANCELLED
+    assert sorted(running) == [1, 2]
+    executor.shutdown()
+
+
+# -------------------------
+# Telemetry
+# -------------------------
+
+def _read_lines(sock, n):
+    data = b""
+    while data.count(b"\n") < n:
+        data += sock.recv(4096)
+    return data.decode().splitlines()
+
+
+def test_subscribe_pushes_only_changed_fields():
+    state = {"state": "AUTO", "dist": 50.0}
+    hub = TelemetryHub({k: (lambda k=k: state[k]) for k in state}, sample_hz=100, max_rate_hz=100)
+    tcp = TcpTransport(port=0)
+    server = CommandServer(CommandHandler(MockNav(), MockController(), MockSensors()), [tcp], telemetry=hub)
+    server.start_in_thread()
+    client = _connect(("127.0.0.1", tcp.port))
+
+    client.sendall(b"#1 SUBSCRIBE 50\n")
+    ack, first = _read_lines(client, 2)
+    assert ack == "#1 OK SUBSCRIBED 50"
+    assert first.split()[2:] == ["state=AUTO", "dist=50.0"]
+
+    state["dist"] = 42.04
+    line = _read_lines(client, 1)[0]
+    assert line.split()[2:] == ["dist=42.0"]
+
+    client.sendall(b"#2 UNSUBSCRIBE\n")
+    assert _read_lines(client, 1) == ["#2 OK"]
+    state["state"] = "IDLE"
+    client.settimeout(0.1)
+    with pytest.raises(socket.timeout):
+        client.recv(64)
+
+    server.stop()
+    server.join()
+    client.close()
+
+
+def test_lagging_subscriber_drops_samples_instead_of_buffering():
+    counter = {"n": 0}
+
+    def payload():
+        counter["n"] += 1
+        return f"{counter['n']}" + "x" * 4000
+
+    hub = TelemetryHub({"blob": payload}, sample_hz=1000, max_rate_hz=1000)
+    tcp = TcpTransport(port=0)
+    server = CommandServer(
+        CommandHandler(MockNav(), MockController(), MockSensors()),
+        [tcp],
+        telemetry=hub,
+        write_high_water=16 * 1024,
+    )
+    server.start_in_thread()
+    client = _connect(("127.0.0.1", tcp.port))
+    client.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    client.sendall(b"SUBSCRIBE 1000\n")
+
+    # Never read: the server must stay within its high-water mark
+    time.sleep(0.5)
+    session = next(iter(server.clients.values()))
+    assert session.writer.transport.get_write_buffer_size() <= 16 * 1024 + 4200
+    assert session.subscription.dropped > 0
+
+    server.stop()
+    server.join()
+    client.close()
@@ -0,0 +1,73 @@
+# tests/test_config.py
+import json
+import os
+
+import pytest
+
+from utils import load_json
+from utils.config import CONFIG_PATH, ConfigError, ConfigService, get_config
+
+
+def _write(path, data, bump_ns=0):
+    path.write_text(json.dumps(data))
+    if bump_ns:
+        # Make the change visible even on coarse-mtime filesystems
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + bump_ns))
+
+
+def test_repo_config_is_valid_and_cached():
+    service = get_config()
+    assert service is get_config(CONFIG_PATH)
+    assert service.section("drive")["turn_speed"] > 0
+    # main._build_sonar and the RFCOMM transport read these sections
+    assert {"trig_pin", "echo_pin"} <= set(service.section("ultrasonic"))
+    assert service.section("bluetooth")["uuid"]
+    assert load_json(CONFIG_PATH)["drive"] == dict(service.section("drive"))
+
+
+def test_unknown_keys_and_bad_types_are_rejected(tmp_path):
+    path = tmp_path / "config.json"
+    _write(path, {"drive": {"turn_spped": 40, "default_speed": "fast"}})
+
+    with pytest.raises(ConfigError) as exc:
+        ConfigService(path)
+    errors = exc.value.errors
+    assert "drive.turn_spped: unknown key (did you mean 'turn_speed'?)" in errors
+    assert "drive.default_speed: expected int, got str" in errors
+
+
+def test_section_views_are_read_only(tmp_path):
+    path = tmp_path / "config.json"
+    _write(path, {"server": {"transports": [{"type": "tcp", "port": 1}]}})
+    view = ConfigService(path).section("server")
+
+    with pytest.raises(TypeError):
+        view["max_clients"] = 3
+    with pytest.raises(TypeError):
+        view["transports"][0]["port"] = 2
+    assert view["transports"][0].get("host", "127.0.0.1") == "127.0.0.1"
+
+
+def test_reload_notifies_only_changed_sections(tmp_path):
+    path = tmp_path / "config.json"
+    cfg = {"drive": {"default_speed": 60}, "bluetooth": {"service_name": "robot"}}
+    _write(path, cfg)
+    service = ConfigService(path)
+
+    seen = []
+    service.subscribe("drive", lambda view: seen.append(("drive", view["default_speed"])))
+    service.subscribe("bluetooth", lambda view: seen.append(("bluetooth", view)))
+
+    assert service.check_reload() == []  # unchanged file is not re-parsed
+
+    cfg["drive"]["default_speed"] = 80
+    _write(path, cfg, bump_ns=10**9)
+    assert service.check_reload() == ["drive"]
+    assert seen == [("drive", 80)]
+
+    # An invalid edit keeps the previous config
+    cfg["drive"]["default_speed"] = 500
+    _write(path, cfg, bump_ns=2 * 10**9)
+    assert service.check_reload() == []
+    assert service.section("drive")["default_speed"] == 80
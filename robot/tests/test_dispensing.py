@@ -0,0 +1,241 @@
+# tests/test_dispensing.py
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dispensing import DispenseOrchestrator, StageGraph
+from dispensing.actions import RobotActions
+from mock.mock_arm import ARM_CONFIG, fake_servokit_module
+from mock.mock_dispense import GoalNav, TimedActions
+from mock.Mock_sensors import FakeVideoCapture, make_tray_image
+from preception.verification import Outcome
+from scheduling import DoseStatus, MedicationScheduler
+from storage import AuditLog, AuditReader
+
+SCALE = 0.01  # 6 s drive -> 60 ms
+
+
+def test_stage_graph_order_overlap_and_failure():
+    g = StageGraph()
+    g.add("a", lambda run: 1)
+    g.add("b", lambda run: run.results["a"] + 1, after=("a",))
+    g.add("c", lambda run: run.wait(0.05))
+    g.add("d", lambda run: run.results["b"] + 1, after=("b", "c"))
+    assert g.order() == ["a", "b", "c", "d"]
+    with ThreadPoolExecutor(4) as pool:
+        run = g.run(pool)
+        assert run.results["d"] == 3 and run.failed is None
+
+        g.add("boom", lambda run: 1 / 0, after=("a",))
+        g.add("never", lambda run: "ran", after=("boom",))
+        run = g.run(pool)
+    assert run.failed.stage == "boom"
+    assert "never" not in run.results
+
+    g.add("loop", lambda run: None, after=("loop",))
+    with pytest.raises(ValueError):
+        g.order()
+
+
+def make_round(n=3):
+    sched = MedicationScheduler(clock=lambda: 0.0)
+    for i in range(n):
+        sched.add(f"p{i}", "204", "red_round", due=0.0)
+    return sched
+
+
+def test_parallel_round_saves_time_and_reports_doses(tmp_path):
+    sequential = DispenseOrchestrator(TimedActions(scale=SCALE), make_round(), parallel=False)
+    seq = sequential.run_next()
+
+    sched = make_round()
+    actions = TimedActions(scale=SCALE, outcomes={2: Outcome.MISMATCH})
+    audit = AuditLog(tmp_path, group_ms=1, fsync=False)
+    orch = DispenseOrchestrator(actions, sched, audit=audit)
+    try:
+        par = orch.run_next()
+    finally:
+        orch.shutdown()
+        audit.close()
+
+    assert par.error is None
+    assert par.outcomes == {1: "dispensed", 2: "MISMATCH", 3: "dispensed"}
+    assert sched.get(2).status == DoseStatus.READY and sched.get(1) is None
+    # Warm-up, prefetch and the arm all ran behind the drive
+    assert par.timings["warm_vision"][1] < par.timings["drive"][1]
+    assert par.timings["preposition_arm"][0] < par.timings["approach"][1]
+    assert par.wall_sec < seq.wall_sec - 0.03
+    assert par.saved_per_dose_sec > 0.01
+    reader = AuditReader(tmp_path)
+    assert [(r.kind, r.data["outcome"]) for r in reader.history("p0")] == [("verify", "VERIFIED"), ("dispense", "dispensed")]
+    assert [(r.kind, r.data["outcome"]) for r in reader.history("p1")] == [("verify", "MISMATCH")]
+
+
+def test_failed_stage_returns_doses_to_the_queue():
+    sched = make_round(2)
+    orch = DispenseOrchestrator(TimedActions(scale=SCALE, fail="final_approach"), sched)
+    try:
+        report = orch.run_next()
+    finally:
+        orch.shutdown()
+    assert report.error.stage == "approach"
+    assert set(report.outcomes.values()) == {"FAILED"}
+    assert sched.ready_count == 2
+
+
+
+class FlakyAudit:
+    """Audit log whose dispense records fail to write."""
+
+    def __init__(self):
+        self.kinds = []
+
+    def append(self, kind, patient_id=None, **data):
+        if kind == "dispense":
+            raise OSError("disk full")
+        self.kinds.append(kind)
+        return len(self.kinds)
+
+
+def test_audit_failure_after_dispensing_does_not_requeue_the_dose():
+    sched = make_round(2)
+    audit = FlakyAudit()
+    orch = DispenseOrchestrator(TimedActions(scale=SCALE), sched, audit=audit)
+    try:
+        report = orch.run_next()
+    finally:
+        orch.shutdown()
+
+    assert report.error is None
+    assert report.outcomes == {1: "dispensed", 2: "dispensed"}
+    assert sched.get(1) is None and sched.get(2) is None
+    assert sched.ready_count == 0
+    assert audit.kinds == ["verify", "verify"]
+
+
+def test_closed_audit_log_still_settles_every_dose(tmp_path):
+    sched = make_round(2)
+    audit = AuditLog(tmp_path, group_ms=1, fsync=False)
+    audit.close()
+    orch = DispenseOrchestrator(TimedActions(scale=SCALE), sched, audit=audit)
+    try:
+        report = orch.run_next()
+    finally:
+        orch.shutdown()
+
+    # The verify record can't be written, so nothing is given
+    assert report.error.stage == "verify_1"
+    assert set(report.outcomes.values()) == {"FAILED"}
+    assert sched.ready_count == 2
+    assert all(sched.get(i).status == DoseStatus.READY for i in (1, 2))
+
+# -------------------------
+# RobotActions on fake hardware
+# -------------------------
+
+ROOM_CONFIG = {
+    "dispense": {
+        "rooms": {"204": {"approach": [300.0, 50.0], "bedside": [320.0, 80.0]}},
+        # Within reach of the 10 + 12 cm links in ARM_CONFIG
+        "arm_present_xyz": [16.0, 0.0, 10.0],
+        "warmup_frames": 2,
+    },
+    "verification": {"deadline_sec": 1.0},
+}
+
+
+@pytest.fixture
+def robot_parts(monkeypatch):
+    pytest.importorskip("cv2")
+    module = fake_servokit_module()
+    monkeypatch.setitem(sys.modules, "adafruit_servokit", module)
+    from arm import servo_arm
+    from sensors.camera import Camera
+    from sensors.sensor_manager import SensorManager
+
+    monkeypatch.setattr(servo_arm.time, "sleep", lambda s: None)
+    arm = servo_arm.ServoArm(ARM_CONFIG)
+    sensors = SensorManager(camera=Camera(cap=FakeVideoCapture(frames=[make_tray_image()])))
+    return arm, module.kit, sensors
+
+
+def run_robot_round(nav, arm, sensors, pill="red_round"):
+    actions = RobotActions(nav, arm, sensors, ROOM_CONFIG, classify=lambda frame: ("p0", 0.99, pill, 0.99))
+    sched = make_round(1)
+    orch = DispenseOrchestrator(actions, sched)
+    try:
+        return orch.run_next(), sched
+    finally:
+        orch.shutdown()
+
+
+def test_robot_actions_run_a_round_on_fakes(robot_parts):
+    arm, kit, sensors = robot_parts
+    nav = GoalNav()
+    report, sched = run_robot_round(nav, arm, sensors)
+
+    assert report.error is None
+    assert report.outcomes == {1: "dispensed"} and sched.get(1) is None
+    assert nav.goals == [((300.0, 50.0), ("room", "204")), ((320.0, 80.0), ("bedside", "204"))]
+    # Camera warmed up and verified from fake frames
+    assert sensors.camera.cap.reads > ROOM_CONFIG["dispense"]["warmup_frames"]
+    # Pick, hand over and release: gripper ends open
+    assert kit.servo[3].angle == ARM_CONFIG["arm"]["limits"]["gripper"][1]
+
+
+def test_robot_actions_fail_the_drive_when_the_goal_is_not_reached(robot_parts):
+    arm, kit, sensors = robot_parts
+    report, sched = run_robot_round(GoalNav(reach=False), arm, sensors)
+
+    assert report.error.stage == "drive"
+    assert set(report.outcomes.values()) == {"FAILED"}
+    assert sched.ready_count == 1
+
+
+def test_robot_actions_report_a_pill_mismatch(robot_parts):
+    arm, kit, sensors = robot_parts
+    report, sched = run_robot_round(GoalNav(), arm, sensors, pill="white_oval")
+
+    assert report.outcomes == {1: "MISMATCH"}
+    assert sched.get(1).status == DoseStatus.READY
+
+
+class BlindSensors:
+    """Camera that never delivers a frame."""
+
+    def __init__(self):
+        self.grabs = 0
+
+    def get_camera_frame(self):
+        self.grabs += 1
+        if self.grabs > 1000:
+            raise AssertionError("verify() is spinning on the camera")
+        return None
+
+
+class ClockRun:
+    """GraphRun stand-in whose wait() advances a fake clock."""
+
+    cancelled = False
+
+    def __init__(self):
+        self.now = 0.0
+
+    def wait(self, timeout):
+        self.now += timeout
+        return False
+
+
+def test_robot_actions_back_off_when_the_camera_returns_nothing():
+    run = ClockRun()
+    sensors = BlindSensors()
+    config = dict(ROOM_CONFIG, dispense=dict(ROOM_CONFIG["dispense"], frame_retry_sec=0.05))
+    actions = RobotActions(None, None, sensors, config, classify=None, clock=lambda: run.now)
+    dose = make_round(1).get(1)
+
+    decision = actions.verify(dose, None, run)
+
+    assert decision.outcome == Outcome.TIMEOUT
+    # One grab per retry interval until the 1 s deadline
+    assert 19 <= sensors.grabs <= 22
@@ -0,0 +1,102 @@
+# tests/test_drive.py
+import math
+import time
+
+from drive.gopigo_drive import GopiGoDrive
+from drive.odometry import Odometry
+from mock.Mock_drive import MockEasyGoPiGo3
+
+
+class FakeClock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def make_odometry(clock):
+    gpg = MockEasyGoPiGo3(clock=clock)
+    drive = GopiGoDrive({"default_speed": 100}, gpg=gpg)
+    odom = Odometry(drive, clock=clock)
+    return drive, odom
+
+
+def run(odom, clock, seconds, dt=0.01):
+    for _ in range(int(round(seconds / dt))):
+        clock.t += dt
+        odom.sample()
+
+
+def test_straight_line():
+    clock = FakeClock()
+    drive, odom = make_odometry(clock)
+    odom.sample()
+
+    drive.forward()
+    run(odom, clock, 1.0)
+
+    x, y, theta = odom.pose()
+    expected = 100 * math.pi * 6.65 / 360.0  # 1 s at 100 deg/s
+    assert abs(x - expected) < 0.5
+    assert abs(y) < 1e-6
+    assert abs(theta) < 1e-6
+
+
+def test_left_turn_pivots_about_left_wheel():
+    clock = FakeClock()
+    drive, odom = make_odometry(clock)
+    odom.sample()
+
+    drive.turn_left(100)
+    run(odom, clock, 1.0)
+
+    x, y, theta = odom.pose()
+    arc = 100 * math.pi * 6.65 / 360.0
+    expected_theta = arc / 11.7
+    assert abs(theta - expected_theta) < 0.05
+    # Centre moves on a circle of radius half the wheel base
+    assert abs(math.hypot(x, y - 5.85) - 5.85) < 0.2
+
+
+def test_pose_at_interpolates_history():
+    clock = FakeClock()
+    drive, odom = make_odometry(clock)
+    odom.sample()
+
+    drive.forward()
+    run(odom, clock, 0.5)
+    x_mid, _, _ = odom.pose_at(0.25)
+    x_end, _, _ = odom.pose()
+
+    assert abs(x_mid - x_end / 2.0) < 0.5
+    assert odom.pose_at(-1.0)[0] == 0.0
+    assert odom.pose_at(10.0)[0] == x_end
+
+
+def test_history_ring_buffer_is_bounded():
+    clock = FakeClock()
+    gpg = MockEasyGoPiGo3(clock=clock)
+    drive = GopiGoDrive({}, gpg=gpg)
+    odom = Odometry(drive, history_size=16, clock=clock)
+
+    run(odom, clock, 1.0)
+
+    assert len(odom.history) == 16
+    assert odom.history.oldest_time() > 0.8
+
+
+def test_background_sampling():
+    gpg = MockEasyGoPiGo3()
+    drive = GopiGoDrive({}, gpg=gpg)
+    odom = Odometry(drive, rate_hz=200)
+
+    odom.start()
+    try:
+        drive.forward(100)
+        time.sleep(0.1)
+    finally:
+        odom.stop()
+
+    assert len(odom.history) > 5
+    assert odom.pose()[0] > 0.0
@@ -0,0 +1,52 @@
+# tests/test_logger.py
+import json
+import logging
+
+from utils import logger as logger_mod
+from utils.logger import kv, setup_logger
+
+
+def read_json_lines(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_structured_records_reach_json_file(tmp_path):
+    path = tmp_path / "robot.log"
+    log = setup_logger("test.logger.file", log_file=str(path))
+    other = setup_logger("test.logger.other")
+
+    log.info("Obstacle", extra=kv(distance_cm=12.5))
+    other.info("not for this file")
+    logger_mod.shutdown()
+
+    entries = read_json_lines(path)
+    assert len(entries) == 1
+    assert entries[0]["msg"] == "Obstacle"
+    assert entries[0]["distance_cm"] == 12.5
+    assert entries[0]["logger"] == "test.logger.file"
+
+
+def test_file_rotates_by_size(tmp_path):
+    path = tmp_path / "rot.log"
+    log = setup_logger("test.logger.rotate", log_file=str(path), max_bytes=300, backup_count=2)
+    for i in range(50):
+        log.info("tick", extra=kv(i=i))
+    logger_mod.shutdown()
+
+    assert (tmp_path / "rot.log.1").exists()
+    assert not (tmp_path / "rot.log.3").exists()
+
+
+def test_disabled_level_does_not_enqueue():
+    log = setup_logger("test.logger.quiet", level=logging.WARNING)
+    logger_mod.shutdown()  # listener stopped: anything enqueued stays queued
+    before = logger_mod._queue.qsize()
+
+    log.debug("skipped %s", object())
+    log.info("skipped")
+    assert logger_mod._queue.qsize() == before
+
+    log.warning("kept")
+    assert logger_mod._queue.qsize() == before + 1
+    logger_mod.shutdown()
@@ -0,0 +1,96 @@
+# tests/test_metrics.py
+import threading
+import urllib.request
+
+import pytest
+
+from utils.metrics import MetricsServer, Registry, timed
+
+
+def test_counter_sums_across_threads():
+    reg = Registry()
+    c = reg.counter("ticks", "Ticks")
+
+    def work():
+        for _ in range(10000):
+            c.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert c.value == 40000
+    assert reg.counter("ticks") is c
+
+
+
+def test_short_lived_threads_fold_into_the_total():
+    reg = Registry()
+    c = reg.counter("jobs")
+    h = reg.histogram("job_seconds", buckets=(0.01, 1.0))
+
+    def work():
+        c.inc()
+        h.observe(0.5)
+
+    for _ in range(1000):
+        t = threading.Thread(target=work)
+        t.start()
+        t.join()
+
+    assert c.value == 1000
+    assert h.count == 1000
+    assert len(c._shards) < 10
+    assert len(h._shards) < 10
+
+def test_histogram_buckets_and_timers():
+    reg = Registry()
+    h = reg.histogram("op_seconds", buckets=(0.01, 0.1, 1.0))
+    for v in (0.005, 0.05, 0.5, 5.0):
+        h.observe(v)
+
+    @timed(h)
+    def op():
+        return 42
+
+    assert op() == 42
+    with h.time():
+        pass
+
+    counts, count, total = h.snapshot()
+    assert count == 6
+    assert counts == [3, 1, 1, 1]
+    assert total == pytest.approx(5.555, abs=1e-3)
+
+    text = reg.render()
+    assert 'op_seconds_bucket{le="0.01"} 3' in text
+    assert 'op_seconds_bucket{le="+Inf"} 6' in text
+    assert "# TYPE op_seconds histogram" in text
+
+
+def test_labels_and_type_conflicts():
+    reg = Registry()
+    reg.counter("errors", "Errors", {"sensor": "sonar"}).inc(2)
+    reg.counter("errors", "Errors", {"sensor": "camera"}).inc()
+    reg.gauge("queue_depth").set_function(lambda: 7)
+
+    text = reg.render()
+    assert text.count("# TYPE errors counter") == 1
+    assert 'errors_total{sensor="sonar"} 2' in text
+    assert "queue_depth 7" in text
+    with pytest.raises(ValueError):
+        reg.gauge("errors", labels={"sensor": "sonar"})
+
+
+def test_scrape_endpoint_serves_prometheus_text():
+    reg = Registry()
+    reg.counter("pings").inc(3)
+    server = MetricsServer(reg, port=0).start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=2) as resp:
+            body = resp.read().decode()
+            assert resp.headers["Content-Type"].startswith("text/plain")
+    finally:
+        server.stop()
+    assert "pings_total 3" in body
@@ -0,0 +1,572 @@
+# tests/test_navigation.py
+import math
+import random
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from navigation.navigation import Navigator
+from navigation.obstacle_avoidance import AvoidPhase, ObstacleAvoidance
+from navigation.state_machine import RobotState, StateMachine
+
+CM_PER_SPEED_UNIT = 0.058
+TRUE_DECEL_CM_S2 = 80.0
+ACTUATION_LATENCY_SEC = 0.1
+DT = 0.05  # 20 Hz control loop
+
+
+class ApproachWorld:
+    """
+    1-D approach profile: robot driving at a wall or a moving obstacle.
+    Acts as both the drive and the sensor for Navigator.
+    """
+
+    def __init__(self, gap_cm, obstacle_speed_cm_s=0.0, noise_cm=0.5, seed=0):
+        self.default_speed = 60
+        self.gap = gap_cm
+        self.obstacle_speed = obstacle_speed_cm_s
+        self.noise = noise_cm
+        self.rng = random.Random(seed)
+
+        self.t = 0.0
+        self.v = 0.0
+        self.target_v = 0.0
+        self._pending = []  # (apply_at, target_v)
+
+        self.trigger_gap = None
+        self.min_gap = gap_cm
+
+    # drive interface
+    def forward(self, speed=None):
+        self._command(speed * CM_PER_SPEED_UNIT)
+
+    def stop(self):
+        if self.trigger_gap is None:
+            self.trigger_gap = self.gap
+        self._command(0.0)
+
+    def turn_left(self, speed=None):
+        self._command(0.0)
+
+    def emergency_stop(self):
+        self.stop()
+
+    def _command(self, v):
+        self._pending.append((self.t + ACTUATION_LATENCY_SEC, v))
+
+    # sensor interface
+    def get_front_distance_cm(self):
+        return self.gap + self.rng.gauss(0.0, self.noise)
+
+    def advance(self, dt):
+        self.t += dt
+        while self._pending and self._pending[0][0] <= self.t:
+            self.target_v = self._pending.pop(0)[1]
+        if self.v > self.target_v:
+            self.v = max(self.target_v, self.v - TRUE_DECEL_CM_S2 * dt)
+        else:
+            self.v = self.target_v
+        self.gap -= (self.v + self.obstacle_speed) * dt
+        self.min_gap = min(self.min_gap, self.gap)
+
+
+def run_profile(world, auto_speed, avoidance_cfg=None, seconds=8.0):
+    fsm = StateMachine()
+    cfg = {
+        "navigation": {
+            "auto_speed": auto_speed,
+            "avoidance": {"cm_per_speed_unit": CM_PER_SPEED_UNIT, **(avoidance_cfg or {})},
+        }
+    }
+    nav = Navigator(world, world, fsm, cfg)
+    nav.avoidance.clock = lambda: world.t
+    nav.enable_autonomy()
+
+    for _ in range(int(seconds / DT)):
+        nav.step()
+        world.advance(DT)
+        if world.trigger_gap is not None and world.v == 0.0:
+            break
+    return fsm
+
+
+# Drive speeds are clamped to 0..100 (GoPiGo wheel deg/s): at most ~5.8 cm/s
+
+def test_full_speed_approach_stops_before_wall():
+    world = ApproachWorld(gap_cm=60.0)
+    fsm = run_profile(world, auto_speed=100, seconds=20.0)
+
+    assert fsm.state == RobotState.AVOID
+    assert world.trigger_gap > 10.0
+    assert world.min_gap > 5.0
+
+
+def test_crawl_approach_gets_closer_than_fixed_threshold():
+    world = ApproachWorld(gap_cm=40.0)
+    run_profile(world, auto_speed=30, seconds=20.0)  # ~1.7 cm/s
+
+    assert world.trigger_gap is not None
+    assert world.trigger_gap < 25.0
+    assert world.min_gap > 5.0
+
+
+def test_braking_distance_grows_with_speed():
+    slow = ApproachWorld(gap_cm=30.0)
+    fast = ApproachWorld(gap_cm=60.0)
+    run_profile(slow, auto_speed=20, seconds=20.0)
+    run_profile(fast, auto_speed=100, seconds=20.0)
+
+    assert fast.trigger_gap > slow.trigger_gap + 2.0
+
+
+def test_moving_obstacle_triggers_on_time_to_collision():
+    # Person walking at the robot while it crawls
+    world = ApproachWorld(gap_cm=150.0, obstacle_speed_cm_s=40.0)
+    run_profile(world, auto_speed=30)
+
+    assert world.trigger_gap is not None
+    assert world.trigger_gap > 25.0
+
+
+def test_turning_in_place_does_not_fake_closing_speed():
+    distance, now = [200.0], [0.0]
+    avoid, drive, fsm = make_avoidance(distance, now)
+    avoid.ttc_threshold_sec = 1.0
+    avoid.stop_distance_cm = 10.0
+
+    # Sweeping beam: range drops fast while the heading changes
+    for i in range(8):
+        now[0], distance[0] = 0.05 * i, 200.0 - 15.0 * i
+        avoid.set_commanded_speed(0.0, turning=True)
+        avoid.step()
+    assert avoid.closing_speed_cm_s() == 0.0 and avoid.phase == AvoidPhase.IDLE
+
+    # The same ranges while driving straight are a real approach
+    for i in range(8):
+        now[0], distance[0] = 1.0 + 0.05 * i, 200.0 - 15.0 * i
+        avoid.set_commanded_speed(100.0)
+        avoid.step()
+    assert fsm.state == RobotState.AVOID and drive.calls[0] == "stop"
+
+
+def test_fixed_threshold_mode_is_unchanged():
+    world = ApproachWorld(gap_cm=60.0, noise_cm=0.0)
+    run_profile(world, auto_speed=100, avoidance_cfg={"predictive": False}, seconds=20.0)
+
+    assert 20.0 < world.trigger_gap < 25.0
+
+
+class CallLog:
+    def __init__(self):
+        self.calls = []
+
+    def stop(self):
+        self.calls.append("stop")
+
+    def turn_left(self, speed=None):
+        self.calls.append("turn_left")
+
+
+def make_avoidance(distance, now):
+    drive = CallLog()
+    sensors = SimpleNamespace(get_front_distance_cm=lambda: distance[0])
+    fsm = StateMachine()
+    fsm.on_autonomy_enabled()
+    avoid = ObstacleAvoidance(
+        drive, sensors, fsm, stop_distance_cm=25.0, turn_duration=0.6, settle_duration=0.1, clock=lambda: now[0]
+    )
+    return avoid, drive, fsm
+
+
+def test_avoidance_phases_stop_turn_verify():
+    distance, now = [100.0], [0.0]
+    avoid, drive, fsm = make_avoidance(distance, now)
+
+    avoid.step()
+    assert avoid.phase == AvoidPhase.IDLE and drive.calls == []
+
+    distance[0] = 20.0
+    avoid.step()
+    assert avoid.phase == AvoidPhase.STOPPING and fsm.state == RobotState.AVOID
+    assert drive.calls == ["stop"]
+
+    now[0] = 0.05
+    avoid.step()  # settling: returns at once, no sensor read
+    assert avoid.phase == AvoidPhase.STOPPING and avoid.last_distance_cm is None
+
+    now[0] = 0.1
+    avoid.step()
+    assert avoid.phase == AvoidPhase.TURNING and drive.calls == ["stop", "turn_left"]
+
+    now[0] = 0.7
+    avoid.step()
+    assert avoid.phase == AvoidPhase.VERIFYING and drive.calls[-1] == "stop"
+
+    avoid.step()  # still blocked: turn again
+    assert avoid.phase == AvoidPhase.TURNING
+
+    now[0], distance[0] = 1.3, 100.0
+    avoid.step()
+    avoid.step()
+    assert avoid.phase == AvoidPhase.IDLE and fsm.state == RobotState.AUTO
+
+    # STOP pre-empts a manoeuvre in progress
+    distance[0] = 20.0
+    avoid.step()
+    fsm.on_emergency_stop()
+    avoid.step()
+    assert avoid.phase == AvoidPhase.IDLE
+
+
+def test_avoidance_reacts_within_1ms():
+    distance, now = [20.0], [0.0]
+    avoid, drive, fsm = make_avoidance(distance, now)
+    samples = []
+    for i in range(300):
+        t0 = time.perf_counter()
+        avoid.step()  # reading below threshold -> drive.stop()
+        samples.append(time.perf_counter() - t0)
+        assert drive.calls == ["stop"] * (i + 1)
+        avoid.cancel()
+        fsm.on_autonomy_enabled()
+    samples.sort()
+    assert samples[len(samples) // 2] < 1e-3
+    assert samples[int(0.99 * len(samples))] < 1e-3
+
+
+# -------------------------
+# Occupancy grid
+# -------------------------
+
+def make_grid():
+    pytest.importorskip("numpy")
+    from navigation.occupancy_grid import OccupancyGrid
+
+    return OccupancyGrid(400.0, 300.0, resolution_cm=5.0, origin_cm=(-100.0, -150.0), max_range_cm=200.0)
+
+
+def test_grid_log_odds_update_and_clamp():
+    grid = make_grid()
+    pose = (0.0, 0.0, 0.0)
+    # Ranges at cell centres, so the beam's central rays end in the cell
+    hit = grid.world_to_cell(102.5, 1.0)
+    free = grid.world_to_cell(52.5, 1.0)
+
+    changed = grid.update(pose, 102.5)
+    assert grid.log_odds[hit] == pytest.approx(grid.l_occ)
+    assert grid.log_odds[free] == pytest.approx(grid.l_free)
+    assert hit[0] * grid.cols + hit[1] in changed and grid.version == 1
+    assert grid.log_odds[grid.world_to_cell(-50.0, 0.0)] == 0.0  # behind the sensor
+
+    for _ in range(20):
+        grid.update(pose, 102.5)
+    assert grid.log_odds[hit] == pytest.approx(grid.l_max)
+    assert grid.log_odds[free] == pytest.approx(grid.l_min)
+    assert grid.is_occupied(102.5, 1.0) and not grid.is_occupied(52.5, 1.0)
+    assert grid.is_occupied(1000.0, 0.0)  # off the map
+    assert len(grid.update(pose, 102.5)) == 0  # nothing flips: version unchanged
+    assert grid.version == 1
+
+
+def test_grid_rays_clear_a_moved_obstacle():
+    grid = make_grid()
+    pose = (0.0, 0.0, 0.0)
+    for _ in range(3):
+        grid.update(pose, 62.5)
+    assert grid.is_occupied(62.5, 1.0)
+
+    # Obstacle gone: the beam now passes through its cells
+    for _ in range(8):
+        grid.update(pose, 152.5)
+    assert not grid.is_occupied(62.5, 1.0) and grid.is_occupied(152.5, 1.0)
+
+    # No echo marks free space only
+    before = grid.log_odds.copy()
+    grid.update((0.0, 0.0, math.pi / 2), math.inf)
+    assert (grid.log_odds <= before).all()
+    assert len(grid.update(pose, None)) == 0
+
+
+def test_grid_window_is_a_clipped_view():
+    grid = make_grid()
+    view, (row0, col0) = grid.window(0.0, 0.0, 20.0)
+    assert view.shape == (9, 9) and (row0, col0) == (26, 16)
+    view[4, 4] = 3.0
+    assert grid.log_odds[grid.world_to_cell(0.0, 0.0)] == 3.0  # no copy
+
+    edge, (row0, col0) = grid.window(-100.0, -150.0, 20.0)
+    assert (row0, col0) == (0, 0) and edge.shape == (5, 5)
+
+
+def test_grid_save_load_round_trip(tmp_path):
+    grid = make_grid()
+    grid.update((0.0, 0.0, 0.3), 120.0)
+    grid.save(tmp_path / "map.npz")
+
+    loaded = type(grid).load(tmp_path / "map.npz")
+    assert (loaded.rows, loaded.cols, loaded.origin_cm) == (grid.rows, grid.cols, grid.origin_cm)
+    assert (loaded.log_odds == grid.log_odds).all()
+    assert loaded.update((0.0, 0.0, 0.3), 120.0).tolist() == grid.update((0.0, 0.0, 0.3), 120.0).tolist()
+
+
+# -------------------------
+# Planner, route cache, waypoint following
+# -------------------------
+
+def test_indexed_heap_as_used_by_the_planner():
+    # D* Lite upserts with update(), drops settled cells with discard()
+    # and reads tuple keys through top_key()/peek()
+    from utils.indexed_heap import IndexedHeap
+
+    rng = random.Random(5)
+    heap, ref = IndexedHeap(), {}
+    assert heap.top_key() is None and heap.peek() is None
+    for step in range(3000):
+        op = rng.random()
+        if op < 0.6 or not ref:
+            item = rng.randrange(200)
+            ref[item] = (rng.randrange(100), rng.randrange(100))
+            heap.update(item, ref[item])
+        elif op < 0.8:
+            item = rng.randrange(200)
+            heap.discard(item)
+            ref.pop(item, None)
+            assert item not in heap
+        else:
+            assert heap.top_key() == min(ref.values())
+            item, key = heap.peek()
+            assert heap.pop() == (item, key) and key == ref.pop(item)
+    assert sorted(ref.values()) == [heap.pop()[1] for _ in range(len(heap))]
+    heap.update(1, (0, 0))
+    heap.clear()
+    assert not heap and 1 not in heap
+
+
+def path_cost(cells, cols):
+    from navigation.planner import DIAGONAL, STRAIGHT
+
+    return sum(STRAIGHT if (a - b) in (1, -1, cols, -cols) else DIAGONAL for a, b in zip(cells, cells[1:]))
+
+
+def test_incremental_repair_matches_full_replan():
+    np = pytest.importorskip("numpy")
+    from navigation.occupancy_grid import OccupancyGrid
+    from navigation.planner import GridPlanner
+
+    rng = random.Random(2)
+    grid = OccupancyGrid(300.0, 200.0, resolution_cm=5.0)
+    planner = GridPlanner(grid)
+    start, goal = (20.0, 100.0), (280.0, 100.0)
+    plans = routes = 0
+    for _ in range(120):
+        # Wall segments appear and disappear under the robot's nose
+        x, y = rng.uniform(40.0, 260.0), rng.uniform(0.0, 200.0)
+        row, col = grid.world_to_cell(x, y)
+        rows = np.arange(row, min(row + rng.randint(1, 12), grid.rows))
+        cells = (rows[:, None] * grid.cols + np.arange(col, min(col + 2, grid.cols))).ravel()
+        grid.log_odds.reshape(-1)[cells] = rng.choice((3.0, -3.0))
+        planner.notify_changed(cells)
+        start = (start[0] + rng.uniform(0.0, 2.0), start[1])
+
+        repaired = planner.plan_cells(start, goal)
+        fresh = GridPlanner(grid).plan_cells(start, goal)
+        plans += 1
+        assert (repaired is None) == (fresh is None)
+        if fresh is not None:
+            routes += 1
+            assert path_cost(repaired, grid.cols) == path_cost(fresh, grid.cols)
+            assert not any(planner.is_blocked(c) for c in repaired)
+    assert routes >= 20 and plans - routes >= 20  # both outcomes exercised
+
+
+def test_route_cache_invalidates_only_routes_on_changed_cells():
+    from navigation.planner import RouteCache
+
+    cache = RouteCache()
+    cache.put("a", [1, 2, 3])
+    cache.put("b", [3, 4, 5])
+    cache.put("c", [7, 8])
+    assert sorted(cache.invalidate([3, 9])) == ["a", "b"]
+    assert cache.get("a") is None and cache.get("c") == [7, 8] and len(cache) == 1
+    assert cache.invalidate([1, 2, 4, 5]) == []  # index cleaned with the routes
+    cache.put("c", [9])
+    assert cache.invalidate([7]) == [] and cache.get("c") == [9]
+
+
+def test_cached_route_is_reused_only_from_nearby_start():
+    pytest.importorskip("numpy")
+    from navigation.occupancy_grid import OccupancyGrid
+    from navigation.planner import GridPlanner
+
+    planner = GridPlanner(OccupancyGrid(300.0, 200.0, resolution_cm=5.0))
+    first = planner.route("ward", (20.0, 100.0), (280.0, 100.0))
+    cached = planner.routes.get("ward")
+    assert first[-1] == pytest.approx((282.5, 102.5))
+
+    # Part way along the route: the rest of the cached path
+    again = planner.route("ward", (150.0, 100.0), (280.0, 100.0))
+    assert planner.routes.get("ward") is cached and again[-1] == first[-1]
+
+    # Somewhere else entirely: planned again from there
+    elsewhere = planner.route("ward", (150.0, 20.0), (280.0, 100.0))
+    assert planner.routes.get("ward") is not cached
+    assert planner.routes.get("ward")[0] == planner._to_cell((150.0, 20.0))
+    assert elsewhere[-1] == first[-1]
+
+
+def test_budgeted_search_resumes_to_the_full_plan():
+    pytest.importorskip("numpy")
+    from navigation.occupancy_grid import OccupancyGrid
+    from navigation.planner import PENDING, GridPlanner
+
+    grid = OccupancyGrid(300.0, 200.0, resolution_cm=5.0)
+    grid.log_odds[0:30, 28:32] = 3.0  # wall the route has to go round
+    start, goal = (20.0, 50.0), (280.0, 50.0)
+    planner = GridPlanner(grid)
+    planner.notify_changed(range(grid.rows * grid.cols))
+
+    calls, cells = 1, planner.plan_cells(start, goal, max_expansions=20)
+    while cells is PENDING:
+        calls, cells = calls + 1, planner.plan_cells(start, goal, max_expansions=20)
+
+    full = GridPlanner(grid).plan_cells(start, goal)
+    assert calls > 10
+    assert path_cost(cells, grid.cols) == path_cost(full, grid.cols)
+
+
+class PoseDrive:
+    def __init__(self, pose):
+        self.pose = pose
+        self.calls = []
+
+    def forward(self, speed=None):
+        self.calls.append("forward")
+
+    def turn_left(self, speed=None):
+        self.calls.append("turn_left")
+
+    def turn_right(self, speed=None):
+        self.calls.append("turn_right")
+
+    def stop(self):
+        self.calls.append("stop")
+
+
+def test_waypoint_follower_turns_then_drives():
+    from navigation.waypoint_follower import WaypointFollower
+
+    drive = PoseDrive((0.0, 0.0, 0.0))
+    follower = WaypointFollower(drive, lambda: drive.pose, waypoint_tolerance_cm=5.0, heading_tolerance_deg=20.0)
+    follower.set_path([(2.0, 0.0), (100.0, 0.0), (100.0, 100.0)])
+
+    assert not follower.step() and drive.calls == ["forward"]  # first waypoint already reached
+    assert follower.remaining == [(100.0, 0.0), (100.0, 100.0)]
+
+    drive.pose = (98.0, 0.0, 0.0)
+    assert not follower.step() and drive.calls[-1] == "turn_left" and follower.turning
+    drive.pose = (100.0, 10.0, math.pi / 2 + 1.0)
+    follower.step()
+    assert drive.calls[-1] == "turn_right"
+    drive.pose = (100.0, 10.0, math.pi / 2)
+    follower.step()
+    assert drive.calls[-1] == "forward" and not follower.turning
+
+    drive.pose = (100.0, 97.0, math.pi / 2)
+    assert follower.step() and drive.calls[-1] == "stop" and not follower.active
+
+    unknown = WaypointFollower(drive, lambda: None)
+    unknown.set_path([(50.0, 50.0)])
+    assert not unknown.step() and drive.calls[-1] == "stop"  # no pose: hold still
+
+
+def test_state_machine_table_and_log():
+    fsm = StateMachine()
+    fsm.on_autonomy_enabled()
+    fsm.on_obstacle_detected()
+    fsm.on_manipulation_done()  # not in table for AVOID: ignored
+    fsm.on_obstacle_cleared()
+    fsm.on_emergency_stop()
+    fsm.on_obstacle_detected()  # STOP is not pre-empted by AVOID
+
+    assert fsm.state == RobotState.STOP
+    assert [(r.from_state, r.to_state) for r in fsm.transitions()] == [
+        (RobotState.IDLE, RobotState.AUTO),
+        (RobotState.AUTO, RobotState.AVOID),
+        (RobotState.AVOID, RobotState.AUTO),
+        (RobotState.AUTO, RobotState.STOP),
+    ]
+    assert len(fsm.transitions(state=RobotState.AUTO)) == 2
+
+
+def test_state_machine_listeners_run_off_thread():
+    import threading
+
+    fsm = StateMachine(log_size=2)
+    seen = []
+    done = threading.Event()
+
+    def listener(record):
+        seen.append((record.to_state, threading.current_thread()))
+        if record.to_state == RobotState.STOP:
+            done.set()
+
+    fsm.add_listener(listener)
+    fsm.on_manual_command()
+    fsm.on_idle()
+    fsm.on_emergency_stop()
+
+    assert done.wait(1.0)
+    fsm.close()
+    assert [s for s, _ in seen] == [RobotState.MANUAL, RobotState.IDLE, RobotState.STOP]
+    assert all(t is not threading.current_thread() for _, t in seen)
+    assert len(fsm.transitions()) == 2
+
+    # Closed: transitions are logged, nothing piles up for a dead notifier
+    for _ in range(100):
+        fsm.on_manual_command()
+        fsm.on_idle()
+    assert fsm._notify_queue.qsize() == 0 and len(seen) == 3
+
+
+def test_simulated_episode_reaches_goal():
+    pytest.importorskip("numpy")
+    from simulation.runner import run_episode
+
+    spec = {
+        "seed": 1,
+        "width_cm": 300.0,
+        "height_cm": 200.0,
+        "obstacles": [(120.0, 0.0, 160.0, 120.0)],
+        "start": (40.0, 60.0, 0.0),
+        "goal": (260.0, 60.0),
+        "dt": 0.05,
+        "max_time_sec": 300.0,
+    }
+    result = run_episode(spec)
+
+    assert result["reached"]
+    assert result["collisions"] == 0
+    assert result["speedup"] > 1.0
+
+
+def test_navigator_spreads_planning_over_ticks():
+    pytest.importorskip("numpy")
+    from navigation.occupancy_grid import OccupancyGrid
+    from sensors.sensor_manager import SensorManager
+
+    drive = PoseDrive((20.0, 100.0, 0.0))
+    drive.default_speed = 50
+    config = {"navigation": {"auto_speed": 50, "planner": {"max_expansions_per_step": 10}}}
+    grid = OccupancyGrid(300.0, 200.0, resolution_cm=5.0)
+    nav = Navigator(drive, SensorManager(), StateMachine(), config, grid=grid, pose_provider=lambda: drive.pose)
+
+    nav.go_to((280.0, 100.0))
+    ticks = 0
+    while not nav.follower.active:
+        nav.step()
+        ticks += 1
+        assert ticks < 1000
+    # Held still while the first plan was being searched
+    assert ticks > 1 and set(drive.calls[:ticks - 1]) == {"stop"}
+    assert nav.follower.remaining[-1] == pytest.approx((282.5, 102.5))
@@ -0,0 +1,81 @@
+# tests/test_recording.py
+import math
+
+from navigation.navigation import Navigator
+from navigation.occupancy_grid import OccupancyGrid
+from navigation.state_machine import RobotState, StateMachine
+from recording import FlightRecorder, Kind, RecordingDrive, read_recording
+from recording.replay import replay
+from sensors.sensor_manager import SensorManager
+from simulation.clock import VirtualClock
+from simulation.runner import DEFAULT_CONFIG
+from simulation.sim_drive import SimDrive
+from simulation.sim_sensors import SimUltrasonic
+from simulation.world import RoomMap
+
+
+def test_ring_keeps_newest_records(tmp_path):
+    path = tmp_path / "ring.rec"
+    with FlightRecorder(path, capacity=8, meta={"role": "test"}, clock=lambda: 1.5) as rec:
+        for i in range(20):
+            rec.sonar(float(i) if i % 5 else None)
+
+    recording = read_recording(path)
+    assert recording.meta == {"role": "test"}
+    assert [r.seq for r in recording.records] == list(range(13, 21))
+    assert recording.overwritten == 12
+    distances = [r.a for r in recording.records]
+    assert math.isnan(distances[3])  # i == 15
+    assert distances[-1] == 19.0
+
+
+def _record_sim_run(path, steps=400):
+    grid_spec = {"width_cm": 400.0, "height_cm": 300.0, "resolution_cm": 5.0, "occupied_threshold": 1.0}
+    clock = VirtualClock()
+    world = RoomMap(400.0, 300.0, [(180.0, 100.0, 240.0, 200.0)])
+    sim = SimDrive(DEFAULT_CONFIG["drive"], world, pose=(40.0, 150.0, 0.0))
+    rec = FlightRecorder(path, capacity=20000, meta={"config": DEFAULT_CONFIG, "grid": grid_spec}, clock=clock)
+
+    drive = RecordingDrive(sim, rec)
+    sensors = SensorManager(ultrasonic=SimUltrasonic(world, sim, seed=3), recorder=rec)
+    fsm = StateMachine(clock=clock)
+    fsm.add_listener(rec.transition)
+    nav = Navigator(
+        drive, sensors, fsm, DEFAULT_CONFIG,
+        grid=OccupancyGrid(**grid_spec), pose_provider=lambda: sim.pose, clock=clock,
+    )
+    nav.recorder = rec
+
+    nav.go_to((360.0, 150.0))
+    for _ in range(steps):
+        nav.step()
+        sim.advance(0.05)
+        clock.advance(0.05)
+        if fsm.state == RobotState.IDLE:
+            break
+    fsm.close()
+    rec.close()
+    return fsm
+
+
+def test_replay_reproduces_recorded_run(tmp_path):
+    path = tmp_path / "run.rec"
+    live_fsm = _record_sim_run(path)
+
+    recording = read_recording(path)
+    assert recording.of_kind(Kind.TICK)
+    assert len(recording.of_kind(Kind.FSM)) == len(live_fsm.transitions())
+
+    result = replay(recording)
+    assert result["ticks"] == len(recording.of_kind(Kind.TICK))
+    assert result["first_divergent_tick"] is None
+    assert result["transitions_match"]
+
+
+def test_replay_detects_config_change(tmp_path):
+    path = tmp_path / "run.rec"
+    _record_sim_run(path, steps=100)
+
+    config = {**DEFAULT_CONFIG, "navigation": {**DEFAULT_CONFIG["navigation"], "auto_speed": 60}}
+    result = replay(read_recording(path), config=config)
+    assert result["first_divergent_tick"] is not None
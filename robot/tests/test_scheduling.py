@@ -0,0 +1,75 @@
+# tests/test_scheduling.py
+import random
+
+import pytest
+
+from scheduling import DoseStatus, IndexedHeap, MedicationScheduler, Priority
+
+
+def test_indexed_heap_matches_sorted_reference():
+    rng = random.Random(3)
+    heap, ref = IndexedHeap(), {}
+    for step in range(3000):
+        op = rng.random()
+        if op < 0.5 or not ref:
+            item = step
+            ref[item] = rng.random()
+            heap.push(item, ref[item])
+        elif op < 0.7:
+            item = rng.choice(list(ref))
+            ref[item] = rng.random()
+            heap.update(item, ref[item])
+        elif op < 0.85:
+            item = rng.choice(list(ref))
+            assert heap.remove(item) == ref.pop(item)
+        else:
+            item, key = heap.pop()
+            assert key == min(ref.values()) == ref.pop(item)
+    assert sorted(ref.values()) == [heap.pop()[1] for _ in range(len(heap))]
+
+
+def make_scheduler():
+    return MedicationScheduler(early_sec=600, late_sec=600, max_round_doses=3, clock=lambda: 0.0)
+
+
+def test_rounds_follow_priority_and_group_by_room():
+    s = make_scheduler()
+    a = s.add("p1", "101", "red_round", due=1000)
+    b = s.add("p2", "102", "white_oval", due=1000, priority=Priority.HIGH)
+    c = s.add("p3", "102", "red_round", due=1100)
+    d = s.add("p4", "102", "red_round", due=5000)  # window not open yet
+
+    assert s.next_round(now=100) is None
+    assert s.pending_count == 4
+
+    rnd = s.next_round(now=700)
+    assert rnd.room == "102"
+    assert [x.id for x in rnd.doses] == [b.id, c.id]
+    assert d.status == DoseStatus.PENDING and a.status == DoseStatus.READY
+
+    s.complete(b.id)
+    s.release(c.id, now=800)
+    assert c.status == DoseStatus.READY and c.attempts == 1
+    assert [x.id for x in s.next_round(now=800).doses] == [a.id]
+    assert len(s) == 3
+
+
+def test_reschedule_cancel_and_missed_window():
+    s = make_scheduler()
+    a = s.add("p1", "101", "red_round", due=1000)
+    b = s.add("p1", "101", "white_oval", due=1000)
+    c = s.add("p2", "103", "red_round", due=1000, priority=Priority.STAT)
+
+    s.reschedule(a.id, 3000)
+    s.cancel(c.id)
+    assert c.status == DoseStatus.CANCELLED
+    assert [d.id for d in s.for_patient("p1")] == [b.id, a.id]
+    with pytest.raises(KeyError):
+        s.cancel(c.id)
+
+    missed = s.advance(now=1700)
+    assert missed == [b] and b.status == DoseStatus.MISSED
+    rnd = s.next_round(now=2500)
+    assert rnd.doses == [a]
+    with pytest.raises(ValueError):
+        s.reschedule(a.id, 4000)
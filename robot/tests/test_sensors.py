@@ -1 +1,73 @@
-pass
\ No newline at end of file
+import sys
+
+from mock.Mock_sensors import FakeVideoCapture, fake_gpiozero_module
+from sensors.camera import Camera
+from sensors.sensor_bus import DISTANCE, FRAME, FRAME_CAPACITY, SensorBus
+from sensors.sensor_manager import SensorManager
+
+
+def test_ultrasonic_reads_fake_distances(monkeypatch):
+    monkeypatch.setitem(sys.modules, "gpiozero", fake_gpiozero_module(distances_cm=(150.0, 42.5)))
+    from sensors.ultrasonic import UltrasonicSensor
+
+    sensors = SensorManager(ultrasonic=UltrasonicSensor(23, 24))
+    assert sensors.get_front_distance_cm() == 150.0
+    assert sensors.get_front_distance_cm() == 42.5
+
+
+def test_camera_uses_injected_capture():
+    frame = object()
+    cap = FakeVideoCapture(frames=[frame], copy=False)
+    sensors = SensorManager(camera=Camera(cap=cap))
+    assert sensors.get_camera_frame() is frame
+    sensors.camera.release()
+    assert not cap.isOpened()
+
+
+def test_bus_ring_keeps_latest_samples_in_time_order():
+    bus = SensorBus(capacity=4)
+    seen = []
+    bus.subscribe(DISTANCE, seen.append)
+    for i in range(10):
+        bus.publish(DISTANCE, 100.0 + i, t=float(i))
+    assert bus.publish(DISTANCE, 0.0, t=5.0) is None  # older than newest
+
+    assert bus.latest(DISTANCE).value == 109.0
+    assert [s.t for s in bus.window(DISTANCE, 0.0, 99.0)] == [6.0, 7.0, 8.0, 9.0]
+    assert bus.nearest(DISTANCE, 7.4).t == 7.0
+    assert bus.nearest(DISTANCE, 2.0).t == 6.0
+    assert bus.nearest(DISTANCE, 2.0, max_skew=1.0) is None
+    assert len(seen) == 10 and bus.topic(DISTANCE).dropped == 1
+
+
+def test_frame_aligned_with_nearest_distance_without_copies():
+    clock = [0.0]
+    bus = SensorBus(clock=lambda: clock[0])
+    frame = object()
+    cap = FakeVideoCapture(frames=[frame], copy=False)
+    sensors = SensorManager(camera=Camera(cap=cap), bus=bus)
+
+    for t, d in ((0.00, 80.0), (0.05, 75.0), (0.10, 70.0)):
+        clock[0] = t
+        bus.publish(DISTANCE, d)
+    clock[0] = 0.06
+    sensors.get_camera_frame()
+
+    frame_sample, dist_sample = sensors.frame_with_distance(max_skew_sec=0.02)
+    assert frame_sample.value is frame
+    assert dist_sample.value == 75.0
+    assert bus.snapshot([FRAME])[FRAME] is frame_sample
+    clock[0] = 0.5
+    sensors.get_camera_frame()
+    assert sensors.frame_with_distance(max_skew_sec=0.02) is None
+
+
+def test_frame_topic_keeps_only_a_few_frames():
+    bus = SensorBus()
+    cap = FakeVideoCapture(frames=[object() for _ in range(10)], copy=False)
+    sensors = SensorManager(camera=Camera(cap=cap), bus=bus)
+    for _ in range(10):
+        sensors.get_camera_frame()
+
+    assert len(bus.topic(FRAME)) == FRAME_CAPACITY
+    assert bus.topic(DISTANCE).capacity == bus.capacity
@@ -0,0 +1,33 @@
+# tests/test_startup.py
+import subprocess
+import sys
+from pathlib import Path
+
+ROBOT_DIR = Path(__file__).resolve().parents[1]
+
+
+def _modules_after(code: str):
+    proc = subprocess.run(
+        [sys.executable, "-c", code + "\nimport sys; print(' '.join(sys.modules))"],
+        cwd=ROBOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(proc.stdout.splitlines()[-1].split())
+
+
+def test_vision_role_does_not_load_navigation():
+    # Camera pulls in cv2 and with it NumPy, so only the navigation
+    # stack is checked here
+    loaded = _modules_after("import main; main.build('vision')")
+    assert "navigation.navigation" not in loaded
+    assert "navigation.planner" not in loaded
+    assert "navigation.occupancy_grid" not in loaded
+
+
+def test_hardware_modules_load_lazily():
+    loaded = _modules_after("import sensors.camera, communication.bluetooth_server, navigation.navigation")
+    assert "cv2" not in loaded
+    assert "bluetooth" not in loaded
+    assert "numpy" not in loaded
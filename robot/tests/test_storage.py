@@ -0,0 +1,137 @@
+# tests/test_storage.py
+import threading
+import time
+
+import pytest
+
+from storage import AuditLog, AuditReader, LocalStore, LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", None)
+    assert cache.get("a") == 1  # "b" is now the oldest
+    cache.put("c", 3)
+    assert "b" not in cache and cache.get("b", "gone") == "gone"
+    assert cache.get("c") == 3 and cache.hits == 2 and cache.misses == 1
+
+
+def make_store(tmp_path):
+    store = LocalStore(tmp_path / "robot.db", cache_size=16, batch_size=3)
+    store.upsert_pills([{"pill_id": "red_round", "name": "tic tac"}, {"pill_id": "white_oval", "name": "Vitamin D"}])
+    store.upsert_patients(
+        {"patient_id": f"p{i}", "name": f"Patient {i}", "room": f"{100 + i % 3}", "pill": "red_round", "updated": 1.0}
+        for i in range(10)
+    )
+    return store
+
+
+def test_read_through_cache_sees_upserts(tmp_path):
+    with make_store(tmp_path) as store:
+        assert store.pill_matches("p1", "red_round") and not store.pill_matches("p1", "white_oval")
+        assert store.patient("nobody") is None
+        assert store.pill("red_round")["name"] == "tic tac"
+        hits = store.cache.hits
+        store.patient("p1")
+        assert store.cache.hits == hits + 1
+
+        # A stale sync row is ignored; a newer one replaces the cached record
+        assert store.upsert_patients([{"patient_id": "p1", "pill": "white_oval", "updated": 0.5}]) == 0
+        assert store.upsert_patients([{"patient_id": "p1", "pill": "white_oval", "updated": 2.0}]) == 1
+        assert store.pill_matches("p1", "white_oval")
+        store.upsert_patients([{"patient_id": "nobody", "room": "101"}])
+        assert store.patient("nobody")["room"] == "101"
+
+    with LocalStore(tmp_path / "robot.db") as reopened:
+        assert reopened.count("patients") == 11
+
+
+def test_indexed_queries(tmp_path):
+    with make_store(tmp_path) as store:
+        store.upsert_doses(
+            {"patient_id": p["patient_id"], "pill": p["pill"], "room": p["room"], "due": due}
+            for p in store.patients_in_room("101")
+            for due in (100.0, 200.0)
+        )
+        assert [p["patient_id"] for p in store.patients_in_room("101")] == ["p1", "p4", "p7"]
+        assert len(store.patients_on_pill("red_round")) == 10
+        assert [d["due"] for d in store.doses_for_patient("p4")] == [100.0, 200.0]
+        assert len(store.doses_in_room("101", 150.0, 250.0)) == 3
+        assert store.doses_between(0, 150.0)[0]["priority"] == 2
+
+        plan = " ".join(
+            r[3] for r in store._conn.execute("EXPLAIN QUERY PLAN SELECT * FROM doses WHERE room = ? AND due > 0", ("101",))
+        )
+        assert "idx_doses_room" in plan
+
+
+def test_audit_log_group_commit_rotation_and_patient_history(tmp_path):
+    with AuditLog(tmp_path, segment_bytes=4096, group_ms=5, fsync=False) as log:
+        for i in range(200):
+            log.append("verify", f"p{i % 4}", dose=i, outcome="VERIFIED")
+            if i % 25 == 24:
+                assert log.flush(timeout=5)  # rotation happens between commits
+        assert log.wait_durable(log.append("startup"), timeout=5)  # no patient
+    assert len(list(tmp_path.glob("audit-*.idx"))) >= 2  # sealed segments
+
+    reader = AuditReader(tmp_path)
+    history = reader.history("p1")
+    assert [r.data["dose"] for r in history] == list(range(1, 200, 4))
+    assert history[0].kind == "verify" and history[0].patient_id == "p1"
+    assert [r.seq for r in reader.records(since_seq=195)] == [196, 197, 198, 199, 200, 201]
+
+
+def test_audit_log_truncates_torn_tail_and_rebuilds_lost_index(tmp_path):
+    with AuditLog(tmp_path, segment_bytes=2048, group_ms=1, fsync=False) as log:
+        for i in range(60):
+            log.append("dispense", "p1", dose=i)
+            if i % 10 == 9:
+                log.flush(timeout=5)
+    segments = sorted(tmp_path.glob("audit-*.log"))
+    size = segments[-1].stat().st_size
+    with open(segments[-1], "ab") as f:
+        f.write(b"\x40\x00\x00\x00torn")  # crash mid-record
+    sorted(tmp_path.glob("audit-*.idx"))[0].unlink()  # crash while sealing
+
+    with AuditLog(tmp_path, group_ms=1, fsync=False) as log:
+        assert segments[-1].stat().st_size == size
+        assert log.last_seq == 60
+        assert log.wait_durable(log.append("dispense", "p1", dose=60), timeout=5)
+        assert [r.data["dose"] for r in log.history("p1")] == list(range(61))
+    assert len(list(tmp_path.glob("audit-*.idx"))) == len(segments) - 1
+
+
+def test_audit_log_appender_blocked_on_full_queue_sees_failed_commit(tmp_path):
+    log = AuditLog(tmp_path, group_ms=1, max_pending=1, fsync=False)
+    gate = threading.Event()
+
+    def failing_commit(batch):
+        gate.wait(5)
+        raise OSError("card failed")
+
+    log._commit = failing_commit
+    log.append("verify", "p1")  # taken by the flusher, stuck in the commit
+    deadline = time.monotonic() + 5
+    while log._pending and time.monotonic() < deadline:
+        time.sleep(0.001)
+    log.append("verify", "p2")  # fills the queue
+
+    result = []
+
+    def blocked_append():
+        try:
+            result.append(log.append("verify", "p3"))
+        except OSError as e:
+            result.append(e)
+
+    appender = threading.Thread(target=blocked_append)
+    appender.start()
+    time.sleep(0.05)  # let it block on the full queue
+    gate.set()
+    appender.join(5)
+    log.close()
+
+    assert isinstance(result[0], OSError)
+    with pytest.raises(OSError):
+        log.append("verify", "p4")
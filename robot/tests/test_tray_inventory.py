@@ -0,0 +1,41 @@
+# tests/test_tray_inventory.py
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from mock.Mock_sensors import make_tray_image  # noqa: E402
+from preception.tray_inventory import TrayInventory  # noqa: E402
+
+WHITE = (235, 235, 235)
+RED = (30, 30, 200)
+
+
+def add_pills(img, centers, color, r=20):
+    img = img.copy()
+    for c in centers:
+        cv2.circle(img, c, r, color, -1)
+    return img
+
+
+def test_counts_pills_per_type_and_splits_touching_ones():
+    tray = make_tray_image(pills=8)
+    tray = add_pills(tray, [(300, 400), (338, 400)], WHITE)
+    tray = add_pills(tray, [(500, 400), (536, 405), (518, 436)], RED)
+    assert TrayInventory().update(tray) == {"white_oval": 6, "red_round": 7}
+
+
+def test_incremental_update_recounts_only_changed_tiles():
+    tray = make_tray_image(pills=8)
+    inv = TrayInventory()
+    assert inv.update(tray) == {"white_oval": 4, "red_round": 4}
+
+    assert inv.update(tray) == {"white_oval": 4, "red_round": 4}
+    assert inv.last_update["changed_tiles"] == 0
+
+    with_more = add_pills(tray, [(300, 400), (338, 400)], WHITE)
+    assert inv.update(with_more) == {"white_oval": 6, "red_round": 4}
+    assert 0 < inv.last_update["processed_fraction"] < 0.25
+
+    # Take one pill back out: only its tiles change
+    assert inv.update(add_pills(tray, [(300, 400)], WHITE)) == {"white_oval": 5, "red_round": 4}
+    assert inv.update(tray) == inv.recount(tray)
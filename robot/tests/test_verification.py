@@ -0,0 +1,86 @@
+# tests/test_verification.py
+import numpy as np
+import pytest
+
+from preception.verification import Outcome, VerificationAggregator
+
+PRESCRIBED = {"patient_1": "red_round"}
+
+
+def matches(patient_id, pill_id):
+    return PRESCRIBED.get(patient_id) == pill_id
+
+
+def make_aggregator(**kwargs):
+    clock = [0.0]
+    agg = VerificationAggregator(matches, clock=lambda: clock[0], **kwargs).start()
+    return agg, clock
+
+
+def feed(agg, clock, frames, dt=0.1):
+    for frame in frames:
+        clock[0] += dt
+        decision = agg.add(*frame)
+        if decision is not None:
+            return decision
+    return None
+
+
+def test_clear_case_commits_early():
+    agg, clock = make_aggregator(confidence=0.99, min_frames=2)
+    decision = feed(agg, clock, [("patient_1", 0.95, "red_round", 0.95)] * 10)
+    assert decision.outcome == Outcome.VERIFIED
+    assert decision.frames == 2
+    assert decision.elapsed_sec == pytest.approx(0.2)
+    assert decision.pill_confidence >= 0.99
+
+
+def test_conflicting_frames_need_more_evidence_and_can_mismatch():
+    agg, clock = make_aggregator(confidence=0.99)
+    frames = [
+        ("patient_1", 0.9, "white_oval", 0.9),
+        ("patient_1", 0.9, "red_round", 0.9),   # one misread cancels one vote
+        (None, 0.0, None, 0.0),                 # nothing seen adds nothing
+    ] + [("patient_1", 0.9, "white_oval", 0.9)] * 5
+    decision = feed(agg, clock, frames)
+    assert decision.outcome == Outcome.MISMATCH
+    assert decision.pill_id == "white_oval"
+    assert decision.frames == 6
+
+
+def test_deadline_gives_up_instead_of_guessing():
+    agg, clock = make_aggregator(confidence=0.99, deadline_sec=1.0, window_frames=4)
+    frames = [("patient_1", 0.9, "red_round", 0.9), ("patient_1", 0.9, "white_oval", 0.9)] * 20
+    decision = feed(agg, clock, frames, dt=0.25)
+    assert decision.outcome == Outcome.TIMEOUT
+    assert decision.frames == 4
+    assert agg.add("patient_1", 0.95, "red_round", 0.95) is decision
+
+
+class FakeCapture:
+    def __init__(self, index):
+        self.frame = np.zeros((120, 160, 3), dtype=np.uint8)
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        return True, self.frame.copy()
+
+    def release(self):
+        pass
+
+
+def test_cvtest_quit_before_a_decision_skips_the_demo_image(monkeypatch):
+    cvtest = pytest.importorskip("preception.cvtest")
+    cv2 = cvtest.cv2
+    monkeypatch.setattr(cv2, "VideoCapture", FakeCapture)
+    monkeypatch.setattr(cv2, "imshow", lambda *a: None)
+    monkeypatch.setattr(cv2, "destroyAllWindows", lambda: None)
+    monkeypatch.setattr(cv2, "waitKey", lambda ms: ord("q"))
+
+    def no_demo():
+        raise AssertionError("fell through to the demo image")
+
+    monkeypatch.setattr(cvtest, "load_demo_frame", no_demo)
+    cvtest.main(display_ms=None)
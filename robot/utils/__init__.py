@@ -1,6 +1,9 @@
 # utils/__init__.py
 
-from .logger import setup_logger
+from .config import ConfigError, ConfigService, get_config, load_json
+from .indexed_heap import IndexedHeap
+from .logger import kv, log, setup_logger, shutdown
+from .metrics import REGISTRY, MetricsServer, timed
 from .math_utils import (
     clamp,
     deg2rad,
@@ -9,7 +12,18 @@ from .math_utils import (
 )
 
 __all__ = [
+    "ConfigError",
+    "ConfigService",
+    "get_config",
+    "load_json",
+    "IndexedHeap",
     "setup_logger",
+    "kv",
+    "log",
+    "shutdown",
+    "REGISTRY",
+    "MetricsServer",
+    "timed",
     "clamp",
     "deg2rad",
     "rad2deg",
@@ -0,0 +1,406 @@
+# utils/config.py
+"""
+Central config service.
+
+- config.json is parsed once and validated against a typed schema
+  (unknown keys are errors, so typos like "turn_spped" are caught)
+- Subsystems get read-only views of their section
+- check_reload() re-reads the file only when its mtime/size changed and
+  notifies subscribers of the sections that actually changed
+"""
+
+import json
+import threading
+from pathlib import Path
+from types import MappingProxyType
+
+from .logger import setup_logger
+
+log = setup_logger(__name__)
+
+CONFIG_PATH = Path(__file__).resolve().parents[1] / "config.json"
+
+
+class ConfigError(ValueError):
+    """
+    config.json failed to parse or validate. .errors lists every problem.
+    """
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__("; ".join(self.errors))
+
+
+# -------------------------
+# Schema
+# -------------------------
+
+class Field:
+    def __init__(
+        self,
+        type_,
+        required: bool = False,
+        min=None,
+        max=None,
+        choices=None,
+        items=None,
+    ):
+        """
+        :param type_: int, float, bool, str, dict or list
+        :param required: missing key is an error
+        :param min: lower bound (numbers)
+        :param max: upper bound (numbers)
+        :param choices: allowed values
+        :param items: Field or schema dict for dict values / list items
+        """
+        self.type = type_
+        self.required = required
+        self.min = min
+        self.max = max
+        self.choices = choices
+        self.items = items
+
+    def validate(self, value, path: str, errors: list):
+        if not _is_type(value, self.type):
+            errors.append(f"{path}: expected {self.type.__name__}, got {type(value).__name__}")
+            return
+        if self.min is not None and value < self.min:
+            errors.append(f"{path}: {value} < {self.min}")
+        if self.max is not None and value > self.max:
+            errors.append(f"{path}: {value} > {self.max}")
+        if self.choices is not None and value not in self.choices:
+            errors.append(f"{path}: {value!r} not in {list(self.choices)}")
+
+        if self.items is not None:
+            children = value.items() if isinstance(value, dict) else enumerate(value)
+            for key, child in children:
+                _validate(child, self.items, f"{path}.{key}", errors)
+
+
+def _is_type(value, type_) -> bool:
+    if type_ is float:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if type_ is int:
+        return isinstance(value, int) and not isinstance(value, bool)
+    return isinstance(value, type_)
+
+
+def _validate(value, schema, path: str, errors: list):
+    if isinstance(schema, Field):
+        schema.validate(value, path, errors)
+        return
+
+    # Nested section: dict of key -> Field / schema dict
+    if not isinstance(value, dict):
+        errors.append(f"{path}: expected object, got {type(value).__name__}")
+        return
+    for key, child in value.items():
+        child_path = f"{path}.{key}" if path else key
+        if key not in schema:
+            import difflib  # error path only; keeps startup light
+
+            hint = difflib.get_close_matches(key, list(schema), n=1)
+            suffix = f" (did you mean {hint[0]!r}?)" if hint else ""
+            errors.append(f"{child_path}: unknown key{suffix}")
+            continue
+        _validate(child, schema[key], child_path, errors)
+    for key, child in schema.items():
+        if isinstance(child, Field) and child.required and key not in value:
+            errors.append(f"{path}.{key}: missing" if path else f"{key}: missing")
+
+
+def validate(data: dict, schema: dict):
+    """
+    Raise ConfigError listing every problem in data.
+    """
+    errors = []
+    _validate(data, schema, "", errors)
+    if errors:
+        raise ConfigError(errors)
+
+
+JOINTS = ("base", "shoulder", "elbow", "gripper")
+_JOINT_MAP = {j: Field(int, min=0, max=180) for j in JOINTS}
+_SPEED = dict(min=0, max=100)
+
+ROBOT_SCHEMA = {
+    "drive": {
+        "default_speed": Field(int, **_SPEED),
+        "turn_speed": Field(int, **_SPEED),
+    },
+    "arm": {
+        "servo_channels": {j: Field(int, min=0, max=15) for j in JOINTS},
+        "home_angles": _JOINT_MAP,
+        "limits": Field(dict, items=Field(list, items=Field(float, min=0, max=180))),
+        "link_lengths_cm": Field(dict, items=Field(float, min=0)),
+    },
+    "navigation": {
+        "auto_speed": Field(int, **_SPEED),
+        "manual_timeout_sec": Field(float, min=0),
+        "avoidance": {
+            "predictive": Field(bool),
+            "stop_distance_cm": Field(float, min=0),
+            "turn_duration_sec": Field(float, min=0),
+            "settle_duration_sec": Field(float, min=0),
+            "ttc_threshold_sec": Field(float, min=0),
+            "reaction_time_sec": Field(float, min=0),
+            "max_decel_cm_s2": Field(float, min=1e-6),
+            "cm_per_speed_unit": Field(float, min=1e-6),
+        },
+        "planner": {
+            "inflation_radius_cm": Field(float, min=0),
+            "route_reuse_radius_cm": Field(float, min=0),
+            "max_expansions_per_step": Field(int, min=1),
+            "waypoint_tolerance_cm": Field(float, min=0),
+            "heading_tolerance_deg": Field(float, min=0, max=180),
+        },
+    },
+    "ultrasonic": {
+        "trig_pin": Field(int, required=True, min=0),
+        "echo_pin": Field(int, required=True, min=0),
+        "timeout_s": Field(float, min=0),
+    },
+    "bluetooth": {
+        "service_name": Field(str),
+        "uuid": Field(str),
+    },
+    "verification": {
+        "window_frames": Field(int, min=1),
+        "confidence": Field(float, min=0.5, max=0.9999),
+        "deadline_sec": Field(float, min=0),
+        "min_frames": Field(int, min=1),
+    },
+    "schedule": {
+        "early_window_sec": Field(float, min=0),
+        "late_window_sec": Field(float, min=0),
+        "max_round_doses": Field(int, min=1),
+    },
+    "dispense": {
+        "parallel": Field(bool),
+        "workers": Field(int, min=1),
+        "rooms": Field(dict, items=Field(dict, items=Field(list, items=Field(float)))),
+        "arm_ready_xyz": Field(list, items=Field(float)),
+        "arm_pick_xyz": Field(list, items=Field(float)),
+        "arm_present_xyz": Field(list, items=Field(float)),
+        "warmup_frames": Field(int, min=0),
+        "arrive_tolerance_cm": Field(float, min=0),
+        "frame_retry_sec": Field(float, min=0),
+    },
+    "store": {
+        "path": Field(str),
+        "cache_size": Field(int, min=0),
+        "batch_size": Field(int, min=1),
+    },
+    "audit": {
+        "directory": Field(str),
+        "segment_bytes": Field(int, min=4096),
+        "group_ms": Field(float, min=0),
+        "max_pending": Field(int, min=1),
+        "fsync": Field(bool),
+    },
+    "metrics": {
+        "enabled": Field(bool),
+        "host": Field(str),
+        "port": Field(int, min=0, max=65535),
+    },
+    "server": {
+        "max_clients": Field(int, min=1),
+        "transports": Field(
+            list,
+            items={
+                "type": Field(str, required=True, choices=("tcp", "unix", "rfcomm")),
+                "host": Field(str),
+                "port": Field(int, min=0, max=65535),
+                "path": Field(str),
+                "channel": Field(int, min=1, max=30),
+            },
+        ),
+    },
+}
+
+
+# -------------------------
+# Read-only views
+# -------------------------
+
+_EMPTY = MappingProxyType({})
+
+
+def load_json(path: str | Path):
+    """
+    Plain JSON load, no schema (config files go through ConfigService).
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def freeze(obj):
+    """
+    Deep read-only copy: dicts -> MappingProxyType, lists -> tuples.
+    """
+    if isinstance(obj, dict):
+        return MappingProxyType({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(freeze(v) for v in obj)
+    return obj
+
+
+# -------------------------
+# Service
+# -------------------------
+
+class ConfigService:
+    def __init__(self, path: str | Path = CONFIG_PATH, schema: dict | None = ROBOT_SCHEMA):
+        """
+        :param path: config.json location
+        :param schema: validation schema (None = no validation)
+        """
+        self.path = Path(path)
+        self.schema = schema
+
+        self._lock = threading.RLock()
+        self._raw = {}
+        self._data = _EMPTY
+        self._stamp = None
+        self._subscribers = {}  # section -> [callback]
+
+        self._watch_stop = threading.Event()
+        self._watch_thread = None
+
+        self.load()
+
+    # -------------------------
+    # Loading
+    # -------------------------
+
+    def _stat(self):
+        st = self.path.stat()
+        return st.st_mtime_ns, st.st_size
+
+    def _parse(self) -> dict:
+        try:
+            raw = load_json(self.path)
+        except json.JSONDecodeError as e:
+            raise ConfigError([f"{self.path.name}: {e}"]) from e
+        if self.schema is not None:
+            validate(raw, self.schema)
+        return raw
+
+    def load(self):
+        """
+        (Re)load unconditionally. Raises ConfigError if invalid.
+        """
+        with self._lock:
+            stamp = self._stat()
+            raw = self._parse()
+            self._raw, self._data, self._stamp = raw, freeze(raw), stamp
+
+    def check_reload(self):
+        """
+        Reload if the file changed on disk. An invalid edit is reported
+        and ignored: the previous config stays active.
+        :return: names of the sections that changed
+        """
+        with self._lock:
+            try:
+                stamp = self._stat()
+            except OSError as e:
+                log.warning("Cannot stat %s: %s", self.path, e)
+                return []
+            if stamp == self._stamp:
+                return []
+
+            try:
+                raw = self._parse()
+            except (ConfigError, OSError) as e:
+                log.warning("Ignoring invalid %s: %s", self.path.name, e)
+                self._stamp = stamp  # don't re-parse until it changes again
+                return []
+
+            old = self._raw
+            changed = sorted(
+                name for name in set(old) | set(raw) if old.get(name) != raw.get(name)
+            )
+            self._raw, self._data, self._stamp = raw, freeze(raw), stamp
+            callbacks = [
+                (name, cb) for name in changed for cb in self._subscribers.get(name, ())
+            ]
+
+        for name, cb in callbacks:
+            try:
+                cb(self.section(name))
+            except Exception as e:
+                log.error("%s subscriber failed: %s", name, e)
+        return changed
+
+    # -------------------------
+    # Access
+    # -------------------------
+
+    @property
+    def data(self):
+        """
+        Whole config, read-only (Mapping with .get like a dict).
+        """
+        return self._data
+
+    def section(self, name: str):
+        """
+        Read-only view of one top-level section (empty if absent).
+        """
+        return self._data.get(name, _EMPTY)
+
+    def subscribe(self, section: str, callback):
+        """
+        callback(view) runs after a reload that changed this section,
+        on the thread that called check_reload().
+        """
+        with self._lock:
+            self._subscribers.setdefault(section, []).append(callback)
+
+    def unsubscribe(self, section: str, callback):
+        with self._lock:
+            callbacks = self._subscribers.get(section, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    # -------------------------
+    # Background watch
+    # -------------------------
+
+    def start_watching(self, interval_sec: float = 1.0):
+        """
+        Poll the file's mtime on a background thread.
+        """
+        if self._watch_thread is not None:
+            return
+        self._watch_stop.clear()
+
+        def run():
+            while not self._watch_stop.wait(interval_sec):
+                self.check_reload()
+
+        self._watch_thread = threading.Thread(target=run, daemon=True)
+        self._watch_thread.start()
+
+    def stop_watching(self):
+        self._watch_stop.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join(timeout=1.0)
+            self._watch_thread = None
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_config(path: str | Path = CONFIG_PATH) -> ConfigService:
+    """
+    Shared ConfigService for path: the file is parsed once per process.
+    """
+    key = Path(path).resolve()
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = _services[key] = ConfigService(key)
+        return service
@@ -0,0 +1,136 @@
+# utils/indexed_heap.py
+"""
+Binary min-heap that knows where each item sits, so an item's key can be
+changed or the item removed in O(log n) (heapq can only pop the top).
+Shared by the medication scheduler and the D* Lite planner.
+"""
+
+
+class IndexedHeap:
+    """
+    Items are hashable ids; keys are anything orderable (tuples work).
+    """
+
+    def __init__(self):
+        self._heap = []  # [key, item]; keys are changed in place
+        self._pos = {}   # item -> index in _heap
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, item):
+        return item in self._pos
+
+    def clear(self):
+        self._heap.clear()
+        self._pos.clear()
+
+    def push(self, item, key):
+        if item in self._pos:
+            raise ValueError(f"{item!r} already in heap")
+        self._heap.append([key, item])
+        self._pos[item] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def peek(self):
+        """
+        (item, key) with the smallest key, or None if empty.
+        """
+        if not self._heap:
+            return None
+        key, item = self._heap[0]
+        return item, key
+
+    def top_key(self):
+        """
+        Smallest key without its item, or None if empty.
+        """
+        return self._heap[0][0] if self._heap else None
+
+    def pop(self):
+        """
+        Remove and return (item, key) with the smallest key.
+        """
+        if not self._heap:
+            raise IndexError("pop from empty heap")
+        key, item = self._heap[0]
+        self._remove_at(0)
+        return item, key
+
+    def key(self, item):
+        return self._heap[self._pos[item]][0]
+
+    def update(self, item, key):
+        """
+        Change an item's key (push it if absent).
+        """
+        i = self._pos.get(item)
+        if i is None:
+            self.push(item, key)
+            return
+        old = self._heap[i][0]
+        self._heap[i][0] = key
+        if key < old:
+            self._sift_up(i)
+        else:
+            self._sift_down(i)
+
+    def remove(self, item):
+        """
+        Remove an item; returns its key (KeyError if absent).
+        """
+        i = self._pos[item]
+        key = self._heap[i][0]
+        self._remove_at(i)
+        return key
+
+    def discard(self, item):
+        if item in self._pos:
+            self.remove(item)
+
+    # -------------------------
+    # Internal helpers
+    # -------------------------
+
+    def _remove_at(self, i: int):
+        heap = self._heap
+        del self._pos[heap[i][1]]
+        last = heap.pop()
+        if i < len(heap):
+            heap[i] = last
+            self._pos[last[1]] = i
+            # The moved entry may belong above or below its new slot
+            self._sift_down(i)
+            self._sift_up(self._pos[last[1]])
+
+    def _sift_up(self, i: int):
+        heap, pos = self._heap, self._pos
+        entry = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if not entry[0] < heap[parent][0]:
+                break
+            heap[i] = heap[parent]
+            pos[heap[i][1]] = i
+            i = parent
+        heap[i] = entry
+        pos[entry[1]] = i
+
+    def _sift_down(self, i: int):
+        heap, pos = self._heap, self._pos
+        n = len(heap)
+        entry = heap[i]
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            right = child + 1
+            if right < n and heap[right][0] < heap[child][0]:
+                child = right
+            if not heap[child][0] < entry[0]:
+                break
+            heap[i] = heap[child]
+            pos[heap[i][1]] = i
+            i = child
+        heap[i] = entry
+        pos[entry[1]] = i
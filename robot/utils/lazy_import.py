@@ -0,0 +1,83 @@
+# utils/lazy_import.py
+"""
+Deferred imports for heavy or hardware-only modules (cv2, RPi.GPIO,
+PyBluez, ...). The module is imported on first attribute access, so
+tools and roles that never touch it never pay for it.
+"""
+
+import importlib
+import importlib.util
+import threading
+import time
+
+_lock = threading.Lock()
+_load_times = {}  # module name -> seconds spent importing it
+
+
+class LazyModule:
+    """
+    Stand-in for a module; imports it on first attribute access.
+    """
+
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_module"]
+                if module is None:
+                    name = self.__dict__["_name"]
+                    t0 = time.perf_counter()
+                    module = importlib.import_module(name)
+                    _load_times[name] = time.perf_counter() - t0
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__["_module"] is not None
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module {self.__dict__['_name']!r} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    Module proxy that imports name on first use.
+    A missing module raises ImportError at that point.
+    """
+    return LazyModule(name)
+
+
+def optional_import(name: str) -> LazyModule | None:
+    """
+    Like lazy_import, but None if the module is not installed.
+    Only locates the module (no import), so it stays cheap.
+    """
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        # Parent package missing (e.g. "RPi" for "RPi.GPIO")
+        spec = None
+    return LazyModule(name) if spec is not None else None
+
+
+def import_report():
+    """
+    Modules loaded through lazy proxies, slowest first: [(name, seconds)].
+    """
+    with _lock:
+        return sorted(_load_times.items(), key=lambda kv: kv[1], reverse=True)
@@ -1,41 +1,231 @@
 # utils/logger.py
+"""
+Non-blocking logging for the robot stack.
+
+Loggers from setup_logger() only put records on a bounded queue; one
+background QueueListener thread formats them and writes to the console
+and (size-rotated) files. A slow terminal or SD card therefore never
+stalls the control loop, and when the queue is full records are
+dropped (and counted) instead of blocking.
+
+Records are structured: pass fields with extra=kv(distance_cm=12.3).
+Console lines show them as key=value; files get one JSON object per line.
+"""
+
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import threading
 from typing import Optional
 
+QUEUE_SIZE = 10000
+
+_lock = threading.Lock()
+_queue = None
+_queue_handler = None
+_listener = None
+_dispatch = None
+_console = None
+_files = {}  # path -> handler
+
+
+# -------------------------
+# Structured records
+# -------------------------
+
+def kv(**fields) -> dict:
+    """
+    Structured fields for a record: log.info("Obstacle", extra=kv(cm=12.3)).
+    Build it only on enabled paths (or guard with isEnabledFor) if the
+    values are expensive to compute.
+    """
+    return {"fields": fields}
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__(
+            "[%(asctime)s] [%(levelname)s] %(name)s: %(message)s",
+            datefmt="%H:%M:%S",
+        )
+
+    def format(self, record):
+        text = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            text += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "t": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+# -------------------------
+# Queue plumbing
+# -------------------------
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue without formatting and without ever blocking the caller.
+    Message formatting happens on the listener thread, so log arguments
+    should be values (numbers, strings), not objects mutated later.
+    """
+
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Dispatcher(logging.Handler):
+    """
+    The listener's single handler; fans records out to the console and
+    file handlers, which can be added while running.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.targets = []
+
+    def emit(self, record):
+        for handler in list(self.targets):
+            if record.levelno >= handler.level and handler.filter(record):
+                handler.handle(record)
+
+
+class _NameFilter(logging.Filter):
+    """
+    Pass records from the loggers attached to one file.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.names = set()
+
+    def filter(self, record):
+        return record.name in self.names
+
+
+def _ensure_listener():
+    # Caller holds _lock
+    global _queue, _queue_handler, _listener, _dispatch, _console
+    if _queue is None:
+        _queue = queue.Queue(maxsize=QUEUE_SIZE)
+        _queue_handler = _NonBlockingQueueHandler(_queue)
+        _dispatch = _Dispatcher()
+        _console = logging.StreamHandler()
+        _console.setFormatter(TextFormatter())
+        _dispatch.targets.append(_console)
+        atexit.register(shutdown)
+    if _listener is None:
+        _listener = logging.handlers.QueueListener(_queue, _dispatch)
+        _listener.start()
+
+
+def shutdown():
+    """
+    Flush queued records and stop the listener thread.
+    setup_logger() starts it again if needed.
+    """
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in _dispatch.targets:
+            try:
+                handler.flush()
+            except (OSError, ValueError):
+                # Stream already closed (interpreter exit, captured stderr)
+                pass
+
+
+def dropped_records() -> int:
+    """
+    Records discarded because the queue was full.
+    """
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
 
 def setup_logger(
     name: str,
     level: int = logging.INFO,
     log_file: Optional[str] = None,
+    max_bytes: int = 1_000_000,
+    backup_count: int = 3,
+    json_file: bool = True,
 ) -> logging.Logger:
     """
     Create and configure a logger.
 
     :param name: logger name (usually __name__)
     :param level: logging level
-    :param log_file: optional file path
+    :param log_file: optional file path, rotated by size
+    :param max_bytes: rotate log_file at this size (0 = never)
+    :param backup_count: rotated files kept
+    :param json_file: write log_file as JSON lines (else plain text)
     """
     logger = logging.getLogger(name)
     logger.setLevel(level)
 
-    # Prevent duplicate handlers
-    if logger.handlers:
-        return logger
+    with _lock:
+        _ensure_listener()
 
-    formatter = logging.Formatter(
-        "[%(asctime)s] [%(levelname)s] %(name)s: %(message)s",
-        datefmt="%H:%M:%S",
-    )
+        # Prevent duplicate handlers
+        if _queue_handler not in logger.handlers:
+            logger.addHandler(_queue_handler)
+            logger.propagate = False
 
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-
-    # Optional file handler
-    if log_file:
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        # Optional file handler (one per path, shared by the loggers using it)
+        if log_file:
+            file_handler = _files.get(log_file)
+            if file_handler is None:
+                file_handler = logging.handlers.RotatingFileHandler(
+                    log_file, maxBytes=max_bytes, backupCount=backup_count
+                )
+                file_handler.setFormatter(JsonFormatter() if json_file else TextFormatter())
+                file_handler.addFilter(_NameFilter())
+                _files[log_file] = file_handler
+                _dispatch.targets.append(file_handler)
+            file_handler.filters[0].names.add(name)
 
     return logger
+
+
+def set_console_level(level: int):
+    """
+    Console verbosity (files keep everything their loggers emit).
+    """
+    with _lock:
+        _ensure_listener()
+        _console.setLevel(level)
+
+
+def log(msg: str):
+    """
+    Drop-in for the old utils.log(): timestamped, non-blocking.
+    """
+    setup_logger("robot").info(msg)
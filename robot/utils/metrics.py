@@ -0,0 +1,380 @@
+# utils/metrics.py
+"""
+In-process metrics: counters, gauges and fixed-bucket histograms.
+
+- Each thread writes its own preallocated shard, so recording a sample
+  takes no lock and allocates nothing (a few hundred ns); shards are
+  summed at scrape time
+- Metrics are module-level objects created once at import
+  (REGISTRY.counter(...) returns the existing one for the same name)
+- MetricsServer serves REGISTRY in Prometheus text format on loopback:
+  curl http://127.0.0.1:9100/metrics
+"""
+
+import functools
+import math
+import threading
+import time
+import weakref
+from bisect import bisect_left
+
+_perf = time.perf_counter
+
+# Seconds; spans a 10 us control-loop stage to a 10 s vision pass
+DEFAULT_BUCKETS = (
+    1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _label_text(labels: tuple, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+# -------------------------
+# Metric types
+# -------------------------
+
+class _Sharded:
+    """
+    Per-thread value lists: only the owning thread writes a shard, so
+    writes need no lock; readers sum all shards.
+
+    When a thread exits its thread-local is dropped, and a finalizer
+    folds the shard into _retired so short-lived threads don't pile up
+    shards.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._shards = {}  # token -> shard
+        self._retired = [0] * size
+        self._next_token = 0
+        self._shards_lock = threading.Lock()
+
+    def _new_shard(self) -> list:
+        shard = [0] * self._size
+        owner = _ShardOwner()
+        with self._shards_lock:
+            token = self._next_token
+            self._next_token += 1
+            self._shards[token] = shard
+        weakref.finalize(owner, self._retire, token)
+        self._local.owner = owner
+        self._local.shard = shard
+        return shard
+
+    def _retire(self, token: int):
+        with self._shards_lock:
+            shard = self._shards.pop(token, None)
+            if shard is not None:
+                for i, v in enumerate(shard):
+                    self._retired[i] += v
+
+    def _totals(self) -> list:
+        with self._shards_lock:
+            shards = list(self._shards.values())
+            totals = list(self._retired)
+        for shard in shards:
+            for i, v in enumerate(shard):
+                totals[i] += v
+        return totals
+
+
+class _ShardOwner:
+    """
+    Lives only in a thread's thread-local; collected when the thread exits.
+    """
+
+    __slots__ = ("__weakref__",)
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str = "", labels: tuple = ()):
+        super().__init__(1)
+        self.name = name
+        self.help = help
+        self.labels = labels
+
+    def inc(self, n=1):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard[0] += n
+
+    @property
+    def value(self):
+        return self._totals()[0]
+
+    def samples(self):
+        yield self.name + "_total", self.labels, "", self.value
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str = "", labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.value = 0.0
+        self._fn = None
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, n=1):
+        with self._lock:
+            self.value += n
+
+    def dec(self, n=1):
+        with self._lock:
+            self.value -= n
+
+    def set_function(self, fn):
+        """
+        Read the value from fn() at scrape time (costs nothing in between).
+        """
+        self._fn = fn
+
+    def samples(self):
+        value = self.value
+        if self._fn is not None:
+            try:
+                value = self._fn()
+            except Exception:
+                value = math.nan
+        yield self.name, self.labels, "", value
+
+
+class _Timer:
+    __slots__ = ("observe", "t0")
+
+    def __init__(self, observe):
+        self.observe = observe
+
+    def __enter__(self):
+        self.t0 = _perf()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.observe(_perf() - self.t0)
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str = "", labels: tuple = (), buckets=DEFAULT_BUCKETS):
+        """
+        :param buckets: sorted upper bounds; +Inf is implied
+        """
+        self.bounds = tuple(sorted(buckets))
+        # Shard: one count per bucket, +Inf, then the sum of values
+        super().__init__(len(self.bounds) + 2)
+        self.name = name
+        self.help = help
+        self.labels = labels
+
+    def observe(self, value: float):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard[bisect_left(self.bounds, value)] += 1
+        shard[-1] += value
+
+    def snapshot(self):
+        """
+        (bucket counts incl. +Inf, count, sum)
+        """
+        totals = self._totals()
+        counts = totals[:-1]
+        return counts, sum(counts), totals[-1]
+
+    @property
+    def count(self) -> int:
+        return self.snapshot()[1]
+
+    def time(self):
+        """
+        with hist.time(): ...  -- observes the block's duration in seconds.
+        """
+        return _Timer(self.observe)
+
+    def quantile(self, q: float) -> float:
+        """
+        Upper bound of the bucket holding the q-quantile (rough, for logs).
+        """
+        counts, total, _ = self.snapshot()
+        if total == 0:
+            return math.nan
+        rank = q * total
+        seen = 0
+        for bound, c in zip(self.bounds + (math.inf,), counts):
+            seen += c
+            if seen >= rank:
+                return bound
+        return math.inf
+
+    def samples(self):
+        counts, total, s = self.snapshot()
+        cumulative = 0
+        for bound, c in zip(self.bounds + (math.inf,), counts):
+            cumulative += c
+            yield self.name + "_bucket", self.labels, f'le="{_fmt(bound)}"', cumulative
+        yield self.name + "_sum", self.labels, "", s
+        yield self.name + "_count", self.labels, "", total
+
+
+def timed(hist: Histogram):
+    """
+    Decorator: observe each call's duration in hist.
+    """
+
+    def decorate(fn):
+        observe = hist.observe
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = _perf()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(_perf() - t0)
+
+        return wrapper
+
+    return decorate
+
+
+# -------------------------
+# Registry
+# -------------------------
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}  # (name, labels) -> metric
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help, labels, **kwargs):
+        labels = tuple(sorted((labels or {}).items()))
+        key = (name, labels)
+        with self._lock:
+            metric = self._metrics.get(key)
+            if metric is None:
+                metric = self._metrics[key] = cls(name, help, labels, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name!r} already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str = "", labels: dict | None = None) -> Counter:
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str = "", labels: dict | None = None) -> Gauge:
+        return self._get(Gauge, name, help, labels)
+
+    def histogram(self, name: str, help: str = "", labels: dict | None = None, buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, labels, buckets=buckets)
+
+    def get(self, name: str, labels: dict | None = None):
+        return self._metrics.get((name, tuple(sorted((labels or {}).items()))))
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: (m.name, m.labels))
+        lines = []
+        family = None
+        for m in metrics:
+            if m.name != family:
+                family = m.name
+                if m.help:
+                    lines.append(f"# HELP {m.name} {m.help}")
+                lines.append(f"# TYPE {m.name} {m.kind}")
+            for sample, labels, extra, value in m.samples():
+                lines.append(f"{sample}{_label_text(labels, extra)} {_fmt(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# -------------------------
+# Scrape endpoint
+# -------------------------
+
+def _handler_class(registry: Registry):
+    # http.server pulls in email/html/...; only load it when serving
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Scrapes every few seconds would flood the log
+            pass
+
+    return MetricsHandler
+
+
+class MetricsServer:
+    def __init__(self, registry: Registry = REGISTRY, host: str = "127.0.0.1", port: int = 9100):
+        """
+        :param host: bind address; keep it loopback (no auth on this endpoint)
+        :param port: TCP port (0 = pick a free one, see .port)
+        """
+        from http.server import ThreadingHTTPServer
+
+        self._httpd = ThreadingHTTPServer((host, port), _handler_class(registry))
+        self._httpd.daemon_threads = True
+        self.host = host
+        self.port = self._httpd.server_address[1]
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, config: dict, registry: Registry = REGISTRY):
+        """
+        :param config: full config; uses the "metrics" section
+        """
+        cfg = config.get("metrics", {})
+        return cls(registry, host=cfg.get("host", "127.0.0.1"), port=cfg.get("port", 9100))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None